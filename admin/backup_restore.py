@@ -9,6 +9,9 @@ import tempfile
 import zipfile
 from io import BytesIO
 
+from utils.blob_store import BLOB_DIR_NAME
+from utils.zip_download import ZIP_CACHE_DIR_NAME
+
 
 def _safe_join(base_path, rel_path):
     """Проверяет, что результирующий путь внутри base_path (защита от path traversal)."""
@@ -22,6 +25,16 @@ def _safe_join(base_path, rel_path):
     return target if target.startswith(base) else None
 
 
+def _write_restored_file(target, data):
+    """Записывает файл из архива. Существующий файл сначала удаляется: он может быть
+    жесткой ссылкой на blob, и запись поверх изменила бы все файлы с тем же содержимым."""
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    if os.path.lexists(target):
+        os.unlink(target)
+    with open(target, "wb") as f:
+        f.write(data)
+
+
 def _folder_summary(folder_path, label):
     """Сводка по одной папке: список файлов или подпапок с count/size."""
     files_list = []
@@ -72,11 +85,16 @@ def preview_folders_backup(instance_path, static_uploads_path, uploads_root_path
     }
 
 
-def _add_folder_to_zip(zf, folder_path, zip_prefix):
-    """Добавляет содержимое папки в ZIP с префиксом zip_prefix."""
+def _add_folder_to_zip(zf, folder_path, zip_prefix, skip_dirs=()):
+    """Добавляет содержимое папки в ZIP с префиксом zip_prefix.
+
+    skip_dirs — имена подпапок верхнего уровня, которые не попадают в архив.
+    """
     if not os.path.isdir(folder_path):
         return
-    for root, _dirs, files in os.walk(folder_path, topdown=True, followlinks=True):
+    for root, dirs, files in os.walk(folder_path, topdown=True, followlinks=True):
+        if skip_dirs and os.path.abspath(root) == os.path.abspath(folder_path):
+            dirs[:] = [d for d in dirs if d not in skip_dirs]
         for name in files:
             fpath = os.path.join(root, name)
             if not os.path.isfile(fpath):
@@ -98,8 +116,12 @@ def export_folders_backup(instance_path, static_uploads_path, uploads_root_path)
     try:
         os.close(fd)
         with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
-            _add_folder_to_zip(zf, instance_path, "instance")
-            _add_folder_to_zip(zf, static_uploads_path, "static_uploads")
+            # zip_cache/ — архивы «Скачать все», собираются заново по первому запросу
+            _add_folder_to_zip(zf, instance_path, "instance", skip_dirs=(ZIP_CACHE_DIR_NAME,))
+            # blobs/ — контентно-адресуемое хранилище: те же данные уже лежат в папках
+            # разделов (жесткие ссылки), после восстановления его пересобирает
+            # команда `flask dedup-uploads`
+            _add_folder_to_zip(zf, static_uploads_path, "static_uploads", skip_dirs=(BLOB_DIR_NAME,))
             _add_folder_to_zip(zf, uploads_root_path, "uploads")
         return path
     except Exception:
@@ -166,9 +188,7 @@ def import_folders_backup(zip_bytes, instance_path, static_uploads_path, uploads
             if not target or not target.startswith(instance_abs):
                 continue
             try:
-                os.makedirs(os.path.dirname(target), exist_ok=True)
-                with open(target, "wb") as f:
-                    f.write(zf.read(name))
+                _write_restored_file(target, zf.read(name))
             except (OSError, zipfile.BadZipFile):
                 pass
         elif name.startswith("static_uploads/"):
@@ -179,9 +199,7 @@ def import_folders_backup(zip_bytes, instance_path, static_uploads_path, uploads
             if not target or not target.startswith(static_uploads_abs):
                 continue
             try:
-                os.makedirs(os.path.dirname(target), exist_ok=True)
-                with open(target, "wb") as f:
-                    f.write(zf.read(name))
+                _write_restored_file(target, zf.read(name))
             except (OSError, zipfile.BadZipFile):
                 pass
         elif name.startswith("uploads/"):
@@ -194,8 +212,6 @@ def import_folders_backup(zip_bytes, instance_path, static_uploads_path, uploads
             if not target or not target.startswith(dest_abs):
                 continue
             try:
-                os.makedirs(os.path.dirname(target), exist_ok=True)
-                with open(target, "wb") as f:
-                    f.write(zf.read(name))
+                _write_restored_file(target, zf.read(name))
             except (OSError, zipfile.BadZipFile):
                 pass
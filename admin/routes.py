@@ -11,12 +11,14 @@ from .backup_restore import (
 )
 from info.models import InfoSection
 from database import db
-from utils.logger import logger
+from utils.logger import get_logger
 import json
 import os
 from io import BytesIO
 from datetime import datetime
 
+logger = get_logger(__name__)
+
 
 @admin_bp.route('/sitemap')
 @login_required
@@ -191,9 +193,9 @@ def delete_section(section_id):
                 try:
                     if os.path.exists(info_file.file_path):
                         os.remove(info_file.file_path)
-                        logger.debug(f"Файл удален с диска: {info_file.file_path}")
+                        logger.debug("Файл удален с диска: %s", info_file.file_path)
                     db.session.delete(info_file)
-                    logger.debug(f"Запись о файле удалена из БД: {info_file.filename}")
+                    logger.debug("Запись о файле удалена из БД: %s", info_file.filename)
                 except Exception as e:
                     logger.error(f"Ошибка при удалении файла {info_file.filename}: {e}")
         except Exception as e:
@@ -285,6 +287,62 @@ def _backup_paths():
     )
 
 
+@admin_bp.route('/deletions')
+@login_required
+def deletions():
+    """Очередь фонового удаления медиа новостей и объявлений"""
+    from models.models import DeletionJob
+    from sqlalchemy import func
+
+    counts = dict(db.session.query(DeletionJob.status, func.count(DeletionJob.id)).group_by(DeletionJob.status).all())
+    # Сначала незавершенные задания, затем последние выполненные
+    jobs = (DeletionJob.query
+            .order_by((DeletionJob.status == 'done').asc(), DeletionJob.id.desc())
+            .limit(200)
+            .all())
+    return render_template('admin/deletions.html', jobs=jobs, counts=counts)
+
+
+@admin_bp.route('/api/deletions/<int:job_id>/retry', methods=['POST'])
+@login_required
+def retry_deletion(job_id):
+    """Повторить ошибочное задание удаления"""
+    from utils.deletion_queue import deletion_queue
+
+    try:
+        if not deletion_queue.retry(job_id):
+            return jsonify({'success': False, 'error': 'Задание не найдено или не завершилось ошибкой'}), 404
+        return jsonify({'success': True})
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Ошибка при повторе задания удаления {job_id}: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@admin_bp.route('/api/static-export', methods=['GET', 'POST'])
+@login_required
+def static_export_api():
+    """Статический экспорт публичных страниц: GET — итог последнего запуска, POST — запуск в фоне"""
+    from utils.static_export import static_export
+
+    if not static_export.export_dir:
+        return jsonify({'success': False, 'error': 'Каталог экспорта не настроен (STATIC_EXPORT_DIR)'}), 400
+    if request.method == 'GET':
+        return jsonify({'success': True, 'last_run': static_export.last_run})
+
+    try:
+        data = request.get_json(silent=True) or {}
+        sections = [s for s in data.get('sections') or [] if isinstance(s, str)]
+        if sections:
+            static_export.schedule(static_export.section_urls(sections))
+        else:
+            static_export.schedule(full=True)
+        return jsonify({'success': True, 'message': 'Экспорт запущен'})
+    except Exception as e:
+        logger.error(f"Ошибка запуска статического экспорта: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @admin_bp.route('/backup/export-preview')
 @login_required
 def backup_export_preview():
@@ -342,6 +400,9 @@ def backup_import():
         instance_path, static_uploads_path, uploads_root_path = _backup_paths()
         clear_before = request.form.get('clear_before', 'true').lower() in ('1', 'true', 'yes')
         import_folders_backup(raw, instance_path, static_uploads_path, uploads_root_path, clear_before=clear_before)
+        # БД заменена целиком, минуя сессию: все кэши сбрасываем явно (и в других воркерах)
+        from utils.invalidation import invalidation, ALL
+        invalidation.publish({ALL})
         logger.info("Восстановление из резервной копии выполнено успешно")
         return jsonify({'success': True, 'message': 'Резервная копия восстановлена (instance, static/uploads, uploads)'})
     except ValueError as e:
@@ -1,4 +1,4 @@
-from flask import render_template, redirect, url_for, request, flash, jsonify, send_file
+from flask import render_template, redirect, url_for, request, flash, jsonify, send_file, abort
 from flask_login import login_required
 from . import announcements_bp
 from models.models import Announcement
@@ -9,12 +9,17 @@ from flask_wtf import FlaskForm
 from flask_wtf.file import FileAllowed
 from datetime import datetime
 from sqlalchemy import func, desc
-from utils.file_helpers import save_image, save_document, get_content_folder_path, get_content_documents
-from utils.logger import logger
+from utils.file_helpers import save_image, save_document, get_content_folder_path, get_content_documents, record_document, content_zip_entries
+from utils.deletion_queue import deletion_queue
+from utils.logger import get_logger
+from utils.media import media_redirect
+from utils.zip_download import zip_response
 import os
 import mimetypes
 import urllib.parse
 
+logger = get_logger(__name__)
+
 
 class AnnouncementForm(FlaskForm):
     title = StringField('Заголовок', validators=[DataRequired()])
@@ -44,8 +49,8 @@ def announcements_list():
 @announcements_bp.route('/<int:announcement_id>')
 def announcement_detail(announcement_id):
     item = Announcement.query.get_or_404(announcement_id)
-    # Получаем документы из файловой системы
-    doc_files = get_content_documents('announcements', announcement_id, item.publication_date)
+    # Документы берутся из item.files (kind='doc') вместе с изображениями
+    doc_files = get_content_documents('announcements', announcement_id, item.files)
     return render_template('announcements/announcement_detail.html', item=item, doc_files=doc_files)
 
 
@@ -77,18 +82,19 @@ def announcement_create():
                             from models.models import File
                             file_obj = File(filename=saved_name, announcement_id=item.id, kind='image')
                             db.session.add(file_obj)
-                            logger.debug(f'Added file {saved_name} for announcement {item.id}')
+                            logger.debug('Added file %s for announcement %s', saved_name, item.id)
                         except Exception as e:
                             logger.error(f'Failed to add file {saved_name}: {e}')
 
-        # Обработка документов (сохраняем только в файловую систему, без БД)
+        # Обработка документов (файл на диске и запись File(kind='doc') с размером и MIME-типом)
         if form.files.data:
             for file in form.files.data:
                 if file and file.filename:
                     try:
                         saved_name = save_document(file, 'announcements', item.id, publication_dt)
                         if saved_name:
-                            logger.debug(f'Saved document {saved_name} for announcement {item.id} (file system only)')
+                            record_document('announcements', item.id, saved_name, publication_dt, display_name=file.filename)
+                            logger.debug('Saved document %s for announcement %s', saved_name, item.id)
                     except Exception as e:
                         logger.error(f'Failed to save document {file.filename}: {e}')
         
@@ -131,18 +137,19 @@ def announcement_edit(announcement_id):
                             from models.models import File
                             file_obj = File(filename=saved_name, announcement_id=item.id, kind='image')
                             db.session.add(file_obj)
-                            logger.debug(f'Added file {saved_name} for announcement {item.id}')
+                            logger.debug('Added file %s for announcement %s', saved_name, item.id)
                         except Exception as e:
                             logger.error(f'Failed to add file {saved_name}: {e}')
         
-        # Доп. загрузка документов (сохраняем только в файловую систему, без БД)
+        # Доп. загрузка документов (файл на диске и запись File(kind='doc') с размером и MIME-типом)
         if form.files.data:
             for file in form.files.data:
                 if file and file.filename:
                     try:
                         saved_name = save_document(file, 'announcements', item.id, item.publication_date)
                         if saved_name:
-                            logger.debug(f'Saved document {saved_name} for announcement {item.id} (file system only)')
+                            record_document('announcements', item.id, saved_name, item.publication_date, display_name=file.filename)
+                            logger.debug('Saved document %s for announcement %s', saved_name, item.id)
                     except Exception as e:
                         logger.error(f'Failed to save document {file.filename}: {e}')
         
@@ -228,8 +235,11 @@ def announcement_review(announcement_id):
 def announcement_delete(announcement_id):
     item = Announcement.query.get_or_404(announcement_id)
     try:
+        # Папку с фото и документами удаляет фоновый обработчик (страница /admin/deletions)
+        deletion_queue.enqueue('announcements', item)
         db.session.delete(item)
         db.session.commit()
+        deletion_queue.wake()
         logger.info(f'Successfully deleted announcement {announcement_id}')
         flash('Объявление удалено')
         return redirect(url_for('announcements.announcements_list'))
@@ -240,6 +250,16 @@ def announcement_delete(announcement_id):
         return redirect(url_for('announcements.announcements_list'))
 
 
+@announcements_bp.route('/<int:announcement_id>/download_all')
+def download_all(announcement_id):
+    """ZIP со всеми файлами объявления (архив кэшируется на диске)"""
+    item = Announcement.query.get_or_404(announcement_id)
+    entries = content_zip_entries('announcements', item)
+    if not entries:
+        abort(404)
+    return zip_response(entries, f'announcements-{item.id}', None, f'{item.title}.zip')
+
+
 @announcements_bp.route('/download/<int:announcement_id>/<filename>')
 def download_file(announcement_id, filename):
     """Скачивание файла объявления"""
@@ -255,6 +275,11 @@ def download_file(announcement_id, filename):
             flash('Файл не найден', 'error')
             return redirect(url_for('announcements.announcement_detail', announcement_id=announcement_id))
         
+        # Файл отдается по неизменяемому URL /media/<sha256>/<имя> с бессрочным кэшированием
+        media_response = media_redirect(filename, file_path=file_path)
+        if media_response is not None:
+            return media_response
+        
         # Определяем MIME-тип
         mimetype, _ = mimetypes.guess_type(file_path)
         if not mimetype:
@@ -274,9 +299,8 @@ def download_file(announcement_id, filename):
         # Устанавливаем заголовки
         response.headers['Content-Disposition'] = f'attachment; filename*=UTF-8\'\'{encoded_filename}'
         response.headers['X-Content-Type-Options'] = 'nosniff'
-        response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-        response.headers['Pragma'] = 'no-cache'
-        response.headers['Expires'] = '0'
+        # Сюда доходят только файлы, которые не удалось поместить в хранилище /media
+        response.headers['Cache-Control'] = 'no-cache'
         
         return response
         
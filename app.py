@@ -5,7 +5,7 @@
 
 from flask import Flask
 from flask_login import LoginManager
-from database import db
+from database import db, configure_database, install_sqlite_pragmas
 from config import config
 import os
 from werkzeug.exceptions import RequestEntityTooLarge
@@ -54,30 +54,28 @@ def create_app():
             'Настоятельно рекомендуется задать SECRET_KEY в переменных окружения.'
         )
     
+    # Уровни логов по модулям, формат (text/json) и выборка DEBUG-записей
+    from utils import logger as app_logging
+    app_logging.init_app(app)
+
     instance_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance')
     os.makedirs(instance_path, exist_ok=True)
     if not os.environ.get('DATABASE_URL'):
         db_path = os.path.join(instance_path, 'site.db')
         app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
 
+    # Параметры движков (профиль SQLite) задаются до init_app
+    configure_database(app)
+
     # Инициализация расширений
     db.init_app(app)
 
+    # Схема БД обновляется миграциями (flask db-upgrade) до запуска воркеров,
+    # здесь только сверяется номер версии в schema_version
     with app.app_context():
-        try:
-            with db.engine.connect() as conn:
-                r = conn.execute(db.text("PRAGMA table_info(info_file)"))
-                rows = r.fetchall()
-            names = [row[1] for row in rows] if rows else []
-            with db.engine.connect() as conn:
-                if 'file_data' not in names:
-                    conn.execute(db.text("ALTER TABLE info_file ADD COLUMN file_data BLOB"))
-                    conn.commit()
-                if 'stored_in_db' not in names:
-                    conn.execute(db.text("ALTER TABLE info_file ADD COLUMN stored_in_db INTEGER DEFAULT 1"))
-                    conn.commit()
-        except Exception:
-            pass
+        install_sqlite_pragmas(app)
+        from migrations import check_schema_version
+        check_schema_version(app)
 
     # Настройка Flask-Login
     login_manager = LoginManager()
@@ -86,35 +84,43 @@ def create_app():
     login_manager.login_message = 'Пожалуйста, войдите в систему для доступа к этой странице.'
     login_manager.login_message_category = 'info'
     
-    # Контекстный процессор для форм
-    @app.context_processor
-    def inject_forms():
-        from users.forms import LoginForm
-        return dict(login_form=LoginForm())
-    
-    # Контекстный процессор для версии для слабовидящих
-    @app.context_processor
-    def inject_visually_impaired_version():
-        """Передает URL версии для слабовидящих из раздела 'main' в шаблоны"""
-        try:
-            import json as _json
-            from info.models import InfoSection
-            
-            main_section = InfoSection.query.filter_by(endpoint='main').first()
-            visually_impaired_url = ''
-            
-            if main_section and main_section.text:
-                try:
-                    text_data = _json.loads(main_section.text)
-                    if isinstance(text_data, dict) and 'form_data' in text_data:
-                        form_data = text_data.get('form_data', {})
-                        visually_impaired_url = form_data.get('visually_impaired_version', '') or ''
-                except Exception:
-                    pass
-            
-            return dict(visually_impaired_url=visually_impaired_url)
-        except Exception:
-            return dict(visually_impaired_url='')
+    # Шина сброса кэшей по тегам (хуки моделей, журнал для других воркеров)
+    from utils.invalidation import invalidation
+    invalidation.init_app(app)
+
+    # Глобальные переменные шаблонов login_form и visually_impaired_url:
+    # ленивые, настройки раздела 'main' кэшируются на процесс
+    from utils.site_settings import site_settings
+    site_settings.init_app(app)
+
+    # Cache-Control: public для анонимных GET публичных страниц (без cookie сессии)
+    from utils import http_cache
+    http_cache.init_app(app)
+
+    # Таблица url -> раздел для /p/<slug> и фолбэка 404 (без SQL на промахах)
+    from info.url_map import section_url_map
+    section_url_map.init_app(app)
+
+    # Ленты новостей и объявлений главной страницы и контент PageContent (снимки на процесс)
+    from main.content_cache import home_feed, page_contents
+    home_feed.init_app(app)
+    page_contents.init_app(app)
+
+    # Разобранное меню питания удаляется вместе с файлом меню
+    from utils import nutrition_menu
+    nutrition_menu.init_app(app)
+
+    # Неизменяемые URL загруженных файлов /media/<sha256>/<имя> (старые URL скачивания — 302)
+    from utils import media
+    media.init_app(app)
+
+    # Фоновое удаление папок медиа удаленных новостей и объявлений
+    from utils.deletion_queue import deletion_queue
+    deletion_queue.init_app(app)
+
+    # Статический экспорт публичных страниц: перерисовка затронутых страниц после сохранения
+    from utils.static_export import static_export
+    static_export.init_app(app)
 
     # Разделы бокового меню (дерево) + обратная совместимость
     @app.context_processor
@@ -481,6 +487,19 @@ def create_app():
     app.register_blueprint(sidebar_bp, url_prefix='/sidebar')
     app.register_blueprint(admin_bp, url_prefix='/admin')
 
+    # CLI-команды обслуживания (flask --app app <команда>)
+    from cli import (init_db_command, dedup_uploads_command, db_upgrade_command, db_version_command,
+                     nutrition_parse_menus_command, import_content_documents_command,
+                     process_deletions_command, freeze_command)
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(db_upgrade_command)
+    app.cli.add_command(db_version_command)
+    app.cli.add_command(dedup_uploads_command)
+    app.cli.add_command(nutrition_parse_menus_command)
+    app.cli.add_command(import_content_documents_command)
+    app.cli.add_command(process_deletions_command)
+    app.cli.add_command(freeze_command)
+
     @app.route('/health')
     def health():
         """Лёгкий эндпоинт для проверки живости сервиса (uptime-мониторы, пинги для Render)."""
@@ -646,6 +665,13 @@ def create_app():
                 if not mimetype:
                     mimetype = 'application/octet-stream'
 
+            # Файл отдается по неизменяемому URL /media/<sha256>/<имя> с бессрочным кэшированием
+            from utils.media import media_redirect
+            media_response = media_redirect(download_filename, file_path=file_path, file_data=file_data,
+                                            content_hash=info_file.content_hash if info_file else None)
+            if media_response is not None:
+                return media_response
+
             # Кодируем имя файла для правильного отображения
             encoded_filename = urllib.parse.quote(download_filename.encode('utf-8'))
 
@@ -876,11 +902,13 @@ def create_app():
                     from info.models import InfoSection
                     import re as _re
                     from datetime import datetime as _dt
+                    from info.url_map import section_url_map
 
                     path = (_request.path or '').strip()
 
-                    # 1) Точное совпадение URL
-                    section = InfoSection.query.filter_by(url=path).first() if path else None
+                    # 1) Точное совпадение URL (промах по таблице маршрутов не обращается к БД)
+                    section_id = section_url_map.section_id_for_url(path)
+                    section = db.session.get(InfoSection, section_id) if section_id else None
                     if section:
                         today = _dt.now().strftime('%d.%m.%Y')
                         return _render_template('info/section.html', section=section, children=[], today=today), 200
@@ -888,10 +916,9 @@ def create_app():
                     # 2) Обратная совместимость: /<endpoint> -> /sidebar/<endpoint> или другой сохраненный url
                     m = _re.fullmatch(r'/([A-Za-z0-9][A-Za-z0-9-]{0,79})', path or '')
                     if m:
-                        ep = m.group(1)
-                        section_by_ep = InfoSection.query.filter_by(endpoint=ep).first()
-                        if section_by_ep and section_by_ep.url and section_by_ep.url != path:
-                            return _redirect(section_by_ep.url, code=301)
+                        entry = section_url_map.lookup_endpoint(m.group(1))
+                        if entry and entry[1] and entry[1] != path:
+                            return _redirect(entry[1], code=301)
                 except Exception:
                     pass
 
@@ -924,63 +951,6 @@ def create_app():
             error_details=app.config.get('DEBUG') and str(getattr(e, 'orig', e)) or None
         ), 503
 
-    # Создание таблиц базы данных
-    with app.app_context():
-        # Импортируем все модели для создания таблиц
-        from models.models import PageContent
-        from info.models import InfoSection
-        import json
-        db.create_all()
-        
-        # Автоматическое создание обязательных разделов, если их нет
-        required_sections = {
-            'education': {
-                'title': 'Образование',
-                'url': '/sveden/education',
-                'form_data': {
-                    'title': 'Образование',
-                    'implemented_programs': '',
-                    'adapted_programs': '',
-                    'curriculum_noo': '',
-                    'curriculum_ooo': '',
-                    'curriculum_soo': '',
-                    'calendar_schedule': '',
-                    'student_numbers_noo': '',
-                    'student_numbers_ooo': '',
-                    'student_numbers_soo': '',
-                    'student_numbers_document': '',
-                    'education_languages': '',
-                    'professional_programs': '',
-                    'graduate_employment': ''
-                }
-            }
-        }
-        
-        for endpoint, section_data in required_sections.items():
-            section = InfoSection.query.filter_by(endpoint=endpoint).first()
-            if not section:
-                text_data = {
-                    'form_data': section_data.get('form_data', {})
-                }
-                section = InfoSection(
-                    endpoint=endpoint,
-                    title=section_data['title'],
-                    url=section_data['url'],
-                    text=json.dumps(text_data, ensure_ascii=False),
-                    content_blocks=json.dumps([], ensure_ascii=False)
-                )
-                db.session.add(section)
-        
-        try:
-            db.session.commit()
-            app.logger.info("Обязательные разделы проверены и созданы при необходимости")
-        except Exception as e:
-            db.session.rollback()
-            # Логируем ошибку, но не прерываем запуск приложения
-            app.logger.warning(f"Ошибка при создании обязательных разделов: {e}")
-            # Игнорируем ошибки при создании разделов (они могут уже существовать)
-            pass
-    
     # Страница очистки файлов обслуживается в модуле info
     
     return app
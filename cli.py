@@ -1,8 +1,6 @@
 import click
 from flask.cli import with_appcontext
 from database import db
-from info.models import InfoSection
-import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,64 +8,179 @@ logger = logging.getLogger(__name__)
 @click.command('init-db')
 @with_appcontext
 def init_db_command():
-    """Clear the existing data and create new tables."""
-    # db.create_all() # Usually we might want to just ensure tables, not drop. 
-    # But wait, create_all does not drop. 
-    # Let's just run create_all safely.
-    
-    # Импортируем все модели для создания таблиц
-    # Note: imports should be inside the function or at top level if no circular deps
-    from models.models import PageContent, User, News, Announcement, File, InfoFile
-    
-    db.create_all()
+    """Create missing tables and seed required sections (same as db-upgrade)."""
+    _run_migrations()
     click.echo('Initialized the database.')
-    
-    # Автоматическое создание обязательных разделов
-    _ensure_required_sections()
-
-def _ensure_required_sections():
-    required_sections = {
-        'education': {
-            'title': 'Образование',
-            'url': '/sveden/education',
-            'form_data': {
-                'title': 'Образование',
-                'implemented_programs': '',
-                'adapted_programs': '',
-                'curriculum_noo': '',
-                'curriculum_ooo': '',
-                'curriculum_soo': '',
-                'calendar_schedule': '',
-                'student_numbers_noo': '',
-                'student_numbers_ooo': '',
-                'student_numbers_soo': '',
-                'student_numbers_document': '',
-                'education_languages': '',
-                'professional_programs': '',
-                'graduate_employment': ''
-            }
-        }
-    }
-    
-    for endpoint, section_data in required_sections.items():
-        section = InfoSection.query.filter_by(endpoint=endpoint).first()
-        if not section:
-            text_data = {
-                'form_data': section_data.get('form_data', {})
-            }
-            section = InfoSection(
-                endpoint=endpoint,
-                title=section_data['title'],
-                url=section_data['url'],
-                text=json.dumps(text_data, ensure_ascii=False),
-                content_blocks=json.dumps([], ensure_ascii=False)
-            )
-            db.session.add(section)
-            click.echo(f"Created required section: {endpoint}")
-    
+
+
+@click.command('db-upgrade')
+@click.option('--target', type=int, default=None, help='Обновить схему до указанной версии.')
+@with_appcontext
+def db_upgrade_command(target):
+    """Применяет недостающие миграции схемы (запускать до старта воркеров)."""
+    _run_migrations(target)
+
+
+@click.command('db-version')
+@with_appcontext
+def db_version_command():
+    """Показывает текущую и последнюю версию схемы БД."""
+    from migrations import get_current_version, get_head_version
+    click.echo(f'Версия схемы: {get_current_version()}, последняя: {get_head_version()}')
+
+
+def _run_migrations(target=None):
+    from migrations import upgrade, get_current_version
+
+    applied = upgrade(target=target)
+    for version, name in applied:
+        click.echo(f'Применена миграция {version:04d}_{name}')
+    if not applied:
+        click.echo('Схема БД актуальна.')
+    click.echo(f'Версия схемы: {get_current_version()}')
+
+@click.command('dedup-uploads')
+@click.option('--dry-run', is_flag=True, help='Только посчитать, сколько места освободится.')
+@click.option('--prune', is_flag=True, help='Удалить blob-файлы, на которые не ссылается ни один раздел.')
+@with_appcontext
+def dedup_uploads_command(dry_run, prune):
+    """Переводит существующие загрузки на контентно-адресуемое хранилище (SHA-256)."""
+    from utils.blob_store import deduplicate_tree, prune_unreferenced_blobs
+    from file_manager import file_manager
+
+    stats = deduplicate_tree(file_manager.base_upload_path, dry_run=dry_run)
+    click.echo(
+        f"Файлов: {stats['files']}, уникальных: {stats['unique']}, "
+        f"заменено ссылками: {stats['linked']}, без изменений: {stats['unchanged']}, "
+        f"ошибок: {stats['errors']}"
+    )
+    click.echo(f"Освобождено: {stats['saved_bytes'] / (1024 * 1024):.1f} МБ")
+
+    if not dry_run:
+        updated = _backfill_info_file_hashes()
+        click.echo(f"Записей InfoFile с заполненным content_hash: {updated}")
+
+    if prune:
+        removed, freed = prune_unreferenced_blobs(file_manager.base_upload_path, dry_run=dry_run)
+        click.echo(f"Неиспользуемых blob-файлов: {removed} ({freed / (1024 * 1024):.1f} МБ)")
+
+
+def _backfill_info_file_hashes():
+    """Заполняет InfoFile.content_hash для файлов, которые есть на диске"""
+    import os
+    from models.models import InfoFile
+    from utils.blob_store import file_sha256
+
+    updated = 0
+    # Выбираем только id/путь, чтобы не загружать file_data всех записей
+    rows = db.session.query(InfoFile.id, InfoFile.file_path).filter(InfoFile.content_hash.is_(None)).all()
+    for file_id, file_path in rows:
+        if file_path and os.path.isfile(file_path):
+            try:
+                content_hash = file_sha256(file_path)
+            except OSError as e:
+                logger.warning(f"Не удалось посчитать хэш {file_path}: {e}")
+                continue
+            InfoFile.query.filter_by(id=file_id).update({InfoFile.content_hash: content_hash})
+            updated += 1
     try:
         db.session.commit()
-        click.echo("Required sections check completed.")
     except Exception as e:
         db.session.rollback()
-        click.echo(f"Error checking required sections: {e}")
+        click.echo(f"Error updating file hashes: {e}")
+        return 0
+    return updated
+
+
+@click.command('nutrition-parse-menus')
+@click.option('--force', is_flag=True, help='Разобрать заново и меню, которые уже есть в БД.')
+@with_appcontext
+def nutrition_parse_menus_command(force):
+    """Разбирает загруженные файлы меню питания (YYYY-MM-DD-sm.xlsx) в таблицу блюд."""
+    import os
+    from models.models import InfoFile, NutritionMenu
+    from utils.nutrition_menu import import_menu, menu_date_from_filename, MenuParseError
+
+    parsed_dates = set() if force else {row.menu_date for row in db.session.query(NutritionMenu.menu_date)}
+    rows = (db.session.query(InfoFile.id, InfoFile.filename, InfoFile.file_path)
+            .filter(InfoFile.field_name == 'menu_file', InfoFile.filename.like('%.xlsx'))
+            .order_by(InfoFile.upload_date)
+            .all())
+
+    imported = skipped = failed = 0
+    for file_id, filename, file_path in rows:
+        menu_date = menu_date_from_filename(filename)
+        if menu_date is None or menu_date in parsed_dates:
+            skipped += 1
+            continue
+        # Содержимое берем с диска, а при его отсутствии — из БД (file_data грузим только для этой записи)
+        data = None
+        if file_path and os.path.isfile(file_path):
+            with open(file_path, 'rb') as f:
+                data = f.read()
+        if data is None:
+            data = db.session.query(InfoFile.file_data).filter_by(id=file_id).scalar()
+        if not data:
+            click.echo(f'{filename}: файл не найден')
+            failed += 1
+            continue
+        try:
+            import_menu(filename, data, menu_date)
+            db.session.commit()
+        except MenuParseError as e:
+            db.session.rollback()
+            click.echo(f'{filename}: {e}')
+            failed += 1
+            continue
+        parsed_dates.add(menu_date)
+        imported += 1
+
+    click.echo(f'Разобрано меню: {imported}, пропущено: {skipped}, ошибок: {failed}')
+
+
+@click.command('import-content-documents')
+@with_appcontext
+def import_content_documents_command():
+    """Создает записи File(kind='doc') для документов новостей и объявлений, которые есть только на диске."""
+    from utils.file_helpers import import_content_documents
+
+    with db.engine.begin() as conn:
+        created = import_content_documents(conn)
+    click.echo(f'Добавлено записей документов: {created}')
+
+
+@click.command('process-deletions')
+@with_appcontext
+def process_deletions_command():
+    """Выполняет задания удаления медиа удаленных новостей и объявлений (очередь /admin/deletions)."""
+    from utils.deletion_queue import deletion_queue
+
+    processed = deletion_queue.process_pending()
+    click.echo(f'Выполнено заданий удаления: {processed}')
+
+
+@click.command('freeze')
+@click.option('--output', type=click.Path(file_okay=False), default=None,
+              help='Каталог экспорта (по умолчанию STATIC_EXPORT_DIR).')
+@click.option('--section', 'sections', multiple=True,
+              help='Перерисовать только раздел с этим endpoint и его родителя (можно несколько).')
+@with_appcontext
+def freeze_command(output, sections):
+    """Экспортирует публичные страницы в статический HTML для nginx."""
+    import os
+    from flask import current_app
+    from utils.static_export import static_export
+
+    output = output or current_app.config.get('STATIC_EXPORT_DIR')
+    if not output:
+        raise click.UsageError('Укажите --output или STATIC_EXPORT_DIR.')
+    output = os.path.abspath(output)
+    if sections:
+        stats = static_export.export_urls(sorted(static_export.section_urls(sections)), export_dir=output)
+    else:
+        stats = static_export.export_all(export_dir=output)
+    click.echo(
+        f"Страниц: {stats['pages']}, записано: {stats['written']}, без изменений: {stats['unchanged']}, "
+        f"удалено: {stats['removed']}, ошибок: {stats['errors']}; "
+        f"файлов static обновлено: {stats['media_linked']}, удалено: {stats['media_removed']}"
+    )
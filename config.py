@@ -20,9 +20,74 @@ class Config:
         SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Пул соединений PostgreSQL (database.configure_database): пул одного воркера
+    # рассчитывается по GUNICORN_THREADS, общий лимит DB_MAX_CONNECTIONS делится
+    # на WEB_CONCURRENCY воркеров. DB_POOL_SIZE=0 — автоматический расчет.
+    WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 1))
+    GUNICORN_THREADS = int(os.environ.get('GUNICORN_THREADS', 1))
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 0))
+    DB_MAX_CONNECTIONS = int(os.environ.get('DB_MAX_CONNECTIONS', 20))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000))
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS = int(os.environ.get('DB_IDLE_IN_TRANSACTION_TIMEOUT_MS', 60000))
+    # Реплика PostgreSQL для чтения в GET-запросах (необязательно)
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+    # Применять миграции при старте, если схема отстает (для локального запуска).
+    # На сервере миграции выполняет "flask --app app db-upgrade" до запуска gunicorn.
+    AUTO_MIGRATE = os.environ.get('AUTO_MIGRATE', '1').lower() not in ('0', 'false', 'no')
+    # Профиль SQLite (database.configure_database / install_sqlite_pragmas).
+    # Применяется только к sqlite:// URI, для PostgreSQL игнорируется.
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 15000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 128 * 1024 * 1024))
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 32 * 1024))
+    SQLITE_POOL_SIZE = int(os.environ.get('SQLITE_POOL_SIZE', 5))
+    SQLITE_MAX_OVERFLOW = int(os.environ.get('SQLITE_MAX_OVERFLOW', 10))
+    # Чтение в GET/HEAD-запросах через отдельные read-only соединения
+    SQLITE_READONLY_GET = os.environ.get('SQLITE_READONLY_GET', '1').lower() not in ('0', 'false', 'no')
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER') or 'uploads'
     # Ограничение размера загружаемых файлов (по умолчанию 512 МБ — для импорта полного архива сайта)
     MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 512 * 1024 * 1024))
+    # Загрузка по частям (/info/upload_chunked, /sidebar/upload_chunked): размер части и
+    # предельный размер файла проверяются при init, до передачи содержимого
+    CHUNKED_UPLOAD_MAX_SIZE = int(os.environ.get('CHUNKED_UPLOAD_MAX_SIZE', MAX_CONTENT_LENGTH))
+    CHUNKED_UPLOAD_CHUNK_SIZE = int(os.environ.get('CHUNKED_UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024))
+    CHUNKED_UPLOAD_MAX_CHUNK_SIZE = 16 * 1024 * 1024
+    CHUNKED_UPLOAD_TTL_SECONDS = 24 * 60 * 60  # брошенные загрузки удаляются через сутки
+    # Кэш настроек сайта (раздел 'main'): срок, за который изменения доходят до других воркеров
+    SITE_SETTINGS_TTL_SECONDS = int(os.environ.get('SITE_SETTINGS_TTL_SECONDS', 60))
+    # Время жизни таблицы url -> раздел в других воркерах (в своем сбрасывается сразу)
+    SECTION_URL_MAP_TTL_SECONDS = int(os.environ.get('SECTION_URL_MAP_TTL_SECONDS', 30))
+    # Ленты новостей и объявлений на главной: срок, за который изменения доходят до других воркеров
+    HOME_FEED_TTL_SECONDS = int(os.environ.get('HOME_FEED_TTL_SECONDS', 60))
+    # Кэширование JSON меню питания браузером и прокси (/sidebar/api/nutrition/menu)
+    NUTRITION_MENU_MAX_AGE = int(os.environ.get('NUTRITION_MENU_MAX_AGE', 300))
+    # Кэширование публичных страниц прокси для анонимных посетителей (0 — отключить)
+    PUBLIC_PAGE_MAX_AGE = int(os.environ.get('PUBLIC_PAGE_MAX_AGE', 60))
+    # Пакетная загрузка (/info/upload_files): число потоков для параллельного сохранения на диск
+    UPLOAD_BATCH_WORKERS = int(os.environ.get('UPLOAD_BATCH_WORKERS', 4))
+    # Фоновое удаление медиа удаленных новостей и объявлений (utils/deletion_queue.py):
+    # поток в каждом воркере; 0 — задания выполняет только "flask process-deletions"
+    DELETION_WORKER_ENABLED = os.environ.get('DELETION_WORKER_ENABLED', '1').lower() not in ('0', 'false', 'no')
+    DELETION_POLL_SECONDS = int(os.environ.get('DELETION_POLL_SECONDS', 30))
+    # Шина сброса кэшей (utils/invalidation.py): журнал тегов в БД для других воркеров gunicorn
+    # и период его опроса; 0 — только свой процесс (остальные кэши устаревают по TTL)
+    INVALIDATION_SHARED = os.environ.get('INVALIDATION_SHARED', '1').lower() not in ('0', 'false', 'no')
+    INVALIDATION_POLL_SECONDS = float(os.environ.get('INVALIDATION_POLL_SECONDS', 1))
+    # Статический экспорт публичных страниц для nginx (utils/static_export.py): каталог
+    # экспорта (пусто — отключен); при STATIC_EXPORT_AUTO страницы обновляются после сохранения
+    STATIC_EXPORT_DIR = os.environ.get('STATIC_EXPORT_DIR') or None
+    STATIC_EXPORT_AUTO = os.environ.get('STATIC_EXPORT_AUTO', '1').lower() not in ('0', 'false', 'no')
+    STATIC_EXPORT_DELAY_SECONDS = float(os.environ.get('STATIC_EXPORT_DELAY_SECONDS', 2))
+    
+    # Логирование (utils/logger.py): общий уровень, уровни модулей ('file_manager=WARNING,news.routes=DEBUG'),
+    # формат 'text' или 'json' и доля DEBUG-записей шумных модулей ('info.routes=0.05')
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_LEVELS = os.environ.get('LOG_LEVELS', '')
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text')
+    LOG_SAMPLE_RATES = os.environ.get('LOG_SAMPLE_RATES', '')
     
     # Настройки сервера
     HOST = '0.0.0.0'  # Доступен на всех сетевых интерфейсах
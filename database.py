@@ -1,8 +1,315 @@
 """
 Централизованная конфигурация базы данных
+
+Помимо единого экземпляра db здесь настраиваются движки в зависимости от СУБД:
+
+SQLite (локальный запуск, небольшие установки под gunicorn):
+- PRAGMA на каждое новое соединение: WAL, synchronous=NORMAL, busy_timeout,
+  mmap_size, cache_size, foreign_keys;
+- пул соединений вместо открытия файла на каждый запрос;
+- отдельный read-only движок (mode=ro + query_only) для чтения в GET-запросах.
+
+PostgreSQL (Render):
+- размер пула по числу воркеров и потоков gunicorn с общим лимитом соединений;
+- pool_pre_ping / pool_recycle против разорванных соединений;
+- statement_timeout и idle_in_transaction_session_timeout на уровне сессии;
+- необязательная реплика (DATABASE_REPLICA_URL) для чтения в GET-запросах.
+
+Чтение в GET/HEAD-запросах направляется на bind READ_ONLY_BIND_KEY, пока в
+текущей транзакции не было записи (см. RoutingSession).
 """
 
+import os
+import sqlite3
+
+import sqlalchemy as sa
+from flask import has_request_context, request
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+
+# Ключ bind-а для соединений только на чтение: read-only SQLite или реплика PostgreSQL
+READ_ONLY_BIND_KEY = '__readonly__'
+
+READ_ONLY_METHODS = frozenset(('GET', 'HEAD'))
+
+# Флаг в session.info: в текущей транзакции уже были записи
+_WRITES_FLAG = 'has_writes'
+
+
+class RoutingSession(Session):
+    """
+    Сессия, направляющая чтение в GET/HEAD-запросах на read-only движок.
+
+    Запись (flush) и любое чтение после записи в той же транзакции идут через
+    основной движок, поэтому запрос всегда видит собственные изменения.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._can_use_read_only_bind():
+            engine = self._db.engines.get(READ_ONLY_BIND_KEY)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _can_use_read_only_bind(self):
+        if self._flushing or self.info.get(_WRITES_FLAG):
+            return False
+        if not has_request_context():
+            return False
+        return request.method in READ_ONLY_METHODS
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_session_writes(session, flush_context):
+    session.info[_WRITES_FLAG] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+@event.listens_for(RoutingSession, 'after_rollback')
+def _reset_session_writes(session):
+    session.info.pop(_WRITES_FLAG, None)
+
 
 # Создаем единый экземпляр базы данных
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+
+def is_sqlite_uri(uri):
+    """Проверяет, что URI указывает на SQLite"""
+    return bool(uri) and str(uri).startswith('sqlite')
+
+
+def sqlite_file_path(uri):
+    """Путь к файлу БД SQLite или None для in-memory базы"""
+    database = make_url(uri).database
+    if not database or database == ':memory:' or database.startswith('file:'):
+        return None
+    return database
+
+
+def sqlite_pragmas(config, read_only=False):
+    """
+    Список PRAGMA для нового соединения SQLite.
+
+    journal_mode хранится в самом файле БД, поэтому задается только на
+    соединениях с правом записи; synchronous на read-only соединении не нужен.
+    """
+    pragmas = [
+        f"busy_timeout={int(config.get('SQLITE_BUSY_TIMEOUT_MS', 15000))}",
+        f"cache_size=-{int(config.get('SQLITE_CACHE_SIZE_KB', 32 * 1024))}",
+        f"mmap_size={int(config.get('SQLITE_MMAP_SIZE', 128 * 1024 * 1024))}",
+        'foreign_keys=ON',
+        'temp_store=MEMORY',
+    ]
+    if read_only:
+        pragmas.append('query_only=ON')
+    else:
+        pragmas.insert(0, f"journal_mode={config.get('SQLITE_JOURNAL_MODE', 'WAL')}")
+        pragmas.insert(1, f"synchronous={config.get('SQLITE_SYNCHRONOUS', 'NORMAL')}")
+    return pragmas
+
+
+def _apply_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in pragmas:
+            cursor.execute(f'PRAGMA {pragma}')
+    finally:
+        cursor.close()
+
+
+def is_postgresql_uri(uri):
+    """Проверяет, что URI указывает на PostgreSQL"""
+    return bool(uri) and str(uri).startswith(('postgresql', 'postgres://'))
+
+
+def normalize_database_url(url):
+    """Исправляет устаревшую схему postgres:// (Heroku/Render) на postgresql://"""
+    if url and url.startswith('postgres://'):
+        return url.replace('postgres://', 'postgresql://', 1)
+    return url
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def pool_sizing(config):
+    """
+    Размер пула соединений одного воркера gunicorn.
+
+    Каждый воркер держит свой пул, поэтому пул рассчитывается на число потоков
+    воркера (GUNICORN_THREADS), а общий лимит DB_MAX_CONNECTIONS делится между
+    воркерами (WEB_CONCURRENCY). DB_POOL_SIZE задает размер пула явно.
+
+    Returns:
+        (pool_size, max_overflow)
+    """
+    workers = max(1, int(config.get('WEB_CONCURRENCY') or _env_int('WEB_CONCURRENCY', 1)))
+    threads = max(1, int(config.get('GUNICORN_THREADS') or _env_int('GUNICORN_THREADS', 1)))
+    per_worker = max(1, int(config.get('DB_MAX_CONNECTIONS', 20)) // workers)
+
+    pool_size = int(config.get('DB_POOL_SIZE') or threads)
+    pool_size = max(1, min(pool_size, per_worker))
+    max_overflow = max(0, min(threads, per_worker - pool_size))
+    return pool_size, max_overflow
+
+
+def _postgresql_engine_options(config):
+    pool_size, max_overflow = pool_sizing(config)
+    session_options = []
+    statement_timeout = int(config.get('DB_STATEMENT_TIMEOUT_MS', 0) or 0)
+    if statement_timeout:
+        session_options.append(f'-c statement_timeout={statement_timeout}')
+    idle_timeout = int(config.get('DB_IDLE_IN_TRANSACTION_TIMEOUT_MS', 0) or 0)
+    if idle_timeout:
+        session_options.append(f'-c idle_in_transaction_session_timeout={idle_timeout}')
+
+    connect_args = {
+        'connect_timeout': int(config.get('DB_CONNECT_TIMEOUT', 10)),
+        'application_name': config.get('DB_APPLICATION_NAME', 'site-junona'),
+    }
+    if session_options:
+        connect_args['options'] = ' '.join(session_options)
+
+    return {
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': int(config.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(config.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': True,
+        'connect_args': connect_args,
+    }
+
+
+def _sqlite_engine_options(config):
+    busy_timeout = int(config.get('SQLITE_BUSY_TIMEOUT_MS', 15000)) / 1000
+    return {
+        'pool_size': int(config.get('SQLITE_POOL_SIZE', 5)),
+        'max_overflow': int(config.get('SQLITE_MAX_OVERFLOW', 10)),
+        'pool_timeout': busy_timeout,
+        'connect_args': {'timeout': busy_timeout, 'check_same_thread': False},
+    }
+
+
+def _sqlite_read_only_bind(uri, engine_options):
+    db_path = sqlite_file_path(uri)
+    timeout = engine_options['connect_args']['timeout']
+
+    def _connect_read_only():
+        # mode=ro: файл открывается без права записи, даже если запрос попытается писать
+        return sqlite3.connect(
+            f'file:{db_path}?mode=ro', uri=True, timeout=timeout, check_same_thread=False
+        )
+
+    bind = {key: value for key, value in engine_options.items() if key != 'connect_args'}
+    bind.update(url=uri, creator=_connect_read_only)
+    return bind
+
+
+def configure_database(app):
+    """
+    Готовит параметры движков до db.init_app(app).
+
+    Параметры подбираются по СУБД основного URI; явно заданные в конфигурации
+    SQLALCHEMY_ENGINE_OPTIONS имеют приоритет. Для чтения в GET-запросах
+    добавляется bind READ_ONLY_BIND_KEY: read-only соединения с тем же файлом
+    SQLite (SQLITE_READONLY_GET) или реплика PostgreSQL (DATABASE_REPLICA_URL).
+    """
+    config = app.config
+    uri = config.get('SQLALCHEMY_DATABASE_URI')
+    read_only_bind = None
+
+    if is_sqlite_uri(uri):
+        if not sqlite_file_path(uri):
+            return
+        engine_options = _sqlite_engine_options(config)
+        if config.get('SQLITE_READONLY_GET', True):
+            read_only_bind = _sqlite_read_only_bind(uri, engine_options)
+    elif is_postgresql_uri(uri):
+        engine_options = _postgresql_engine_options(config)
+        replica_url = normalize_database_url(config.get('DATABASE_REPLICA_URL'))
+        if replica_url:
+            read_only_bind = dict(engine_options, url=replica_url)
+    else:
+        return
+
+    engine_options.update(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
+
+    if read_only_bind:
+        binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+        binds[READ_ONLY_BIND_KEY] = read_only_bind
+        config['SQLALCHEMY_BINDS'] = binds
+
+
+def install_sqlite_pragmas(app):
+    """
+    Подписывает движки SQLite приложения на событие connect (после db.init_app).
+
+    Вызывать внутри app_context().
+    """
+    config = app.config
+    for key, engine in db.engines.items():
+        if engine.dialect.name != 'sqlite':
+            continue
+        pragmas = sqlite_pragmas(config, read_only=(key == READ_ONLY_BIND_KEY))
+
+        def _on_connect(dbapi_connection, connection_record, pragmas=pragmas):
+            _apply_pragmas(dbapi_connection, pragmas)
+
+        event.listen(engine, 'connect', _on_connect)
+
+
+def add_missing_columns(bind, table_name, columns):
+    """
+    Добавляет в существующую таблицу недостающие колонки.
+
+    Состав колонок определяется через sqlalchemy.inspect, а типы и значения по
+    умолчанию компилируются диалектом движка (BLOB/BYTEA, 1/true), поэтому
+    функция работает одинаково на SQLite и PostgreSQL.
+
+    Args:
+        bind: Движок или соединение SQLAlchemy (соединение — внутри транзакции миграции)
+        table_name: Имя таблицы
+        columns: Список (name, type, default, indexed)
+
+    Returns:
+        Список добавленных колонок (пустой, если таблицы еще нет)
+    """
+    if isinstance(bind, sa.engine.Engine):
+        with bind.begin() as conn:
+            return add_missing_columns(conn, table_name, columns)
+
+    conn = bind
+    inspector = sa.inspect(conn)
+    if not inspector.has_table(table_name):
+        return []
+    existing = {column['name'] for column in inspector.get_columns(table_name)}
+
+    dialect = conn.dialect
+    quote = dialect.identifier_preparer.quote
+    added = []
+    for name, column_type, default, indexed in columns:
+        if name in existing:
+            continue
+        ddl = f'ALTER TABLE {quote(table_name)} ADD COLUMN {quote(name)} {column_type.compile(dialect=dialect)}'
+        if default is not None:
+            literal = sa.literal(default, column_type).compile(
+                dialect=dialect, compile_kwargs={'literal_binds': True}
+            )
+            ddl += f' DEFAULT {literal}'
+        conn.execute(sa.text(ddl))
+        if indexed:
+            conn.execute(sa.text(
+                f'CREATE INDEX IF NOT EXISTS {quote(f"ix_{table_name}_{name}")} '
+                f'ON {quote(table_name)} ({quote(name)})'
+            ))
+        added.append(name)
+    return added
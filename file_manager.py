@@ -4,6 +4,7 @@
 """
 
 import os
+import threading
 import uuid
 from datetime import datetime
 from werkzeug.utils import secure_filename
@@ -13,7 +14,13 @@ import mimetypes
 import re
 import unicodedata
 from database import db
-from utils.logger import logger
+from utils.logger import get_logger
+from utils.blob_store import BLOB_DIR_NAME, store_upload, link_blob, is_same_file
+
+logger = get_logger(__name__)
+
+_name_lock = threading.Lock()
+
 
 class FileManager:
     """Класс для управления файлами в проекте"""
@@ -112,7 +119,7 @@ class FileManager:
         # Создаем папку если её нет
         os.makedirs(folder_path, exist_ok=True)
         
-        logger.debug(f'Created info folder path: {folder_path}')
+        logger.debug('Created info folder path: %s', folder_path)
         return folder_path
     
     def create_documents_folder(self, section_name, date=None):
@@ -277,6 +284,51 @@ class FileManager:
             logger.error(f"Ошибка при оптимизации изображения {file_path}: {e}")
             return False
     
+    def _next_free_path(self, folder_path, filename):
+        """Подбирает свободное имя name_N.ext в папке"""
+        file_path = os.path.join(folder_path, filename)
+        name, ext = os.path.splitext(filename)
+        counter = 1
+        while os.path.exists(file_path):
+            filename = f"{name}_{counter}{ext}"
+            file_path = os.path.join(folder_path, filename)
+            counter += 1
+        return filename, file_path
+
+    def _store_deduplicated(self, file, folder_path, filename, optimize=False, overwrite=False):
+        """
+        Сохраняет файл через blob-хранилище (SHA-256) и создает ссылку в папке раздела.
+
+        Если файл с этим именем в папке уже ссылается на тот же blob, он и
+        возвращается (повторная загрузка не порождает name_1.ext, name_2.ext...).
+        То же содержимое под другим именем получает свою ссылку на общий blob:
+        у каждого файла раздела своя запись InfoFile.
+
+        Returns:
+            (filename, file_path, sha256, reused_existing) — reused_existing истинно,
+            если файл по этому пути уже был (его нельзя удалять при откате загрузки)
+        """
+        _, ext = os.path.splitext(filename)
+        transform = self.optimize_image if optimize else None
+        sha256, blob_path, _size, _is_new = store_upload(file, ext, self.base_upload_path, transform)
+
+        # Подбор имени и создание ссылки — под блокировкой: пакетная загрузка сохраняет
+        # файлы параллельно, и одинаковые имена не должны получить один и тот же путь
+        with _name_lock:
+            if overwrite:
+                file_path = os.path.join(folder_path, filename)
+                reused_existing = os.path.exists(file_path)
+            else:
+                existing_path = os.path.join(folder_path, filename)
+                if is_same_file(blob_path, existing_path):
+                    logger.debug('Файл %s с тем же содержимым уже есть в %s', filename, folder_path)
+                    return filename, existing_path, sha256, True
+                filename, file_path = self._next_free_path(folder_path, filename)
+                reused_existing = False
+
+            link_blob(blob_path, file_path)
+        return filename, file_path, sha256, reused_existing
+
     def save_file(self, file, section_name, field_name=None, optimize_images=True):
         """Сохраняет файл в папку раздела"""
         if not file or not file.filename:
@@ -293,21 +345,11 @@ class FileManager:
         if not original_filename:
             original_filename = 'file'
         
-        # Проверяем, существует ли файл с таким именем
-        file_path = os.path.join(section_folder, original_filename)
-        counter = 1
-        while os.path.exists(file_path):
-            name, ext = os.path.splitext(original_filename)
-            original_filename = f"{name}_{counter}{ext}"
-            file_path = os.path.join(section_folder, original_filename)
-            counter += 1
-        
-        # Сохраняем файл
-        file.save(file_path)
-        
-        # Оптимизируем изображения если нужно
-        if optimize_images and self.is_image_file(original_filename):
-            self.optimize_image(file_path)
+        # Сохраняем файл через blob-хранилище (одинаковое содержимое хранится один раз)
+        optimize = optimize_images and self.is_image_file(original_filename)
+        original_filename, file_path, sha256, reused_existing = self._store_deduplicated(
+            file, section_folder, original_filename, optimize=optimize
+        )
         
         # Получаем информацию о файле
         file_size = os.path.getsize(file_path)
@@ -323,11 +365,17 @@ class FileManager:
             'is_image': is_image,
             'size': file_size,
             'mime_type': mime_type,
+            'sha256': sha256,
+            'reused_existing': reused_existing,
             'created_at': datetime.now().isoformat()
         }
     
-    def save_info_file(self, file, section_endpoint, field_name=None, optimize_images=True):
-        """Сохраняет файл в раздел Сведения только в файловую систему (без хранения содержимого в БД)"""
+    def save_info_file(self, file, section_endpoint, field_name=None, optimize_images=True, section_url=None):
+        """Сохраняет файл в раздел Сведения только в файловую систему (без хранения содержимого в БД)
+
+        section_url — URL раздела, если он уже известен вызывающему коду; тогда раздел
+        не запрашивается из БД (так метод можно вызывать из рабочих потоков).
+        """
         if not file or not file.filename:
             return None
             
@@ -353,32 +401,21 @@ class FileManager:
         
         # Для Excel меню (field_name == 'menu_file') лучше перезаписывать файл с тем же именем,
         # чтобы повторная загрузка обновляла контент (и не создавались _1/_2).
-        reused_existing = False
+        # Файлы с одинаковым содержимым хранятся один раз (blob-хранилище),
+        # повторная загрузка того же файла в раздел возвращает существующее имя.
+        optimize = optimize_images and is_image
         if field_name == 'menu_file':
-            filename = original_filename
-            file_path = os.path.join(folder_path, filename)
             try:
-                file.save(file_path)  # overwrite if exists
+                filename, file_path, sha256, reused_existing = self._store_deduplicated(
+                    file, folder_path, original_filename, optimize=optimize, overwrite=True
+                )
             except Exception as e:
-                logger.error(f"Ошибка при сохранении файла меню {filename}: {e}")
+                logger.error(f"Ошибка при сохранении файла меню {original_filename}: {e}")
                 raise
         else:
-            # Проверяем, существует ли файл с таким именем, и добавляем номер если нужно
-            filename = original_filename
-            file_path = os.path.join(folder_path, filename)
-            counter = 1
-            while os.path.exists(file_path):
-                name, ext = os.path.splitext(original_filename)
-                filename = f"{name}_{counter}{ext}"
-                file_path = os.path.join(folder_path, filename)
-                counter += 1
-            
-            # Сохраняем файл
-            file.save(file_path)
-        
-        # Оптимизируем изображения если нужно (только если сохраняли новый файл)
-        if optimize_images and is_image and not reused_existing:
-            self.optimize_image(file_path)
+            filename, file_path, sha256, reused_existing = self._store_deduplicated(
+                file, folder_path, original_filename, optimize=optimize
+            )
         
         # Получаем информацию о файле с диска
         file_size = os.path.getsize(file_path)
@@ -387,6 +424,11 @@ class FileManager:
         # Определяем URL для скачивания
         if section_endpoint == 'food' or field_name == 'menu_file':
             download_url = f'/food/{filename}'
+        elif section_url is not None:
+            if section_url.startswith('/sidebar/'):
+                download_url = f'/sidebar/download_file/{section_endpoint}/{filename}'
+            else:
+                download_url = f'/info/download_file/{section_endpoint}/{filename}'
         else:
             # Проверяем, является ли раздел sidebar разделом
             try:
@@ -418,6 +460,8 @@ class FileManager:
             'is_image': is_image,
             'size': file_size,
             'mime_type': mime_type,
+            'sha256': sha256,
+            'reused_existing': reused_existing,
             'created_at': upload_date.isoformat()
         }
     
@@ -437,21 +481,11 @@ class FileManager:
         if not original_filename:
             original_filename = 'document'
         
-        # Проверяем, существует ли файл с таким именем
-        file_path = os.path.join(section_folder, original_filename)
-        counter = 1
-        while os.path.exists(file_path):
-            name, ext = os.path.splitext(original_filename)
-            original_filename = f"{name}_{counter}{ext}"
-            file_path = os.path.join(section_folder, original_filename)
-            counter += 1
-        
-        # Сохраняем файл
-        file.save(file_path)
-        
-        # Оптимизируем изображения если нужно
-        if optimize_images and self.is_image_file(original_filename):
-            self.optimize_image(file_path)
+        # Сохраняем файл через blob-хранилище
+        optimize = optimize_images and self.is_image_file(original_filename)
+        original_filename, file_path, sha256, _ = self._store_deduplicated(
+            file, section_folder, original_filename, optimize=optimize
+        )
         
         return {
             'filename': original_filename,
@@ -461,13 +495,14 @@ class FileManager:
             'url': f'/info/download_file/{section_name}/{original_filename}',
             'is_image': self.is_image_file(original_filename),
             'size': os.path.getsize(file_path),
+            'sha256': sha256,
             'created_at': datetime.now().isoformat()
         }
     
     def delete_file(self, filename, section_name, field_name=None):
         """Удаляет файл из папки, БД и form_data"""
         try:
-            logger.debug(f"Удаление файла {filename} из раздела {section_name}, поле: {field_name}")
+            logger.debug("Удаление файла %s из раздела %s, поле: %s", filename, section_name, field_name)
             
             # Ищем файл в БД для определения пути (с обработкой ошибок, если колонок нет)
             info_file = None
@@ -490,7 +525,7 @@ class FileManager:
                     )
                     info_file = None
                 else:
-                    logger.error(f"Ошибка при поиске файла в InfoFile: {e}")
+                    logger.error("Ошибка при поиске файла в InfoFile: %s", e)
                     info_file = None
             
             file_deleted = False
@@ -505,43 +540,43 @@ class FileManager:
                 
                 # Если файл хранится в БД, удаляем только из БД
                 if stored_in_db:
-                    logger.info(f"Удаление файла из БД: {filename} (размер: {getattr(info_file, 'file_size', 0)} байт)")
+                    logger.info("Удаление файла из БД: %s (размер: %s байт)", filename, getattr(info_file, 'file_size', 0))
                 else:
                     # Если файл хранится в файловой системе, удаляем с диска
                     file_path = getattr(info_file, 'file_path', None)
                     if file_path and os.path.exists(file_path):
                         try:
                             os.remove(file_path)
-                            logger.info(f"Файл удален с диска: {file_path}")
+                            logger.info("Файл удален с диска: %s", file_path)
                             file_deleted = True
                         except Exception as e:
-                            logger.warning(f"Не удалось удалить файл с диска {file_path}: {e}")
+                            logger.warning("Не удалось удалить файл с диска %s: %s", file_path, e)
                 
                 # Удаляем запись из БД
                 try:
                     db.session.delete(info_file)
                     db.session.commit()
-                    logger.info(f"Запись о файле удалена из БД: {filename}")
+                    logger.info("Запись о файле удалена из БД: %s", filename)
                     file_deleted = True
                 except Exception as e:
-                    logger.error(f"Ошибка при удалении из БД: {e}")
+                    logger.error("Ошибка при удалении из БД: %s", e)
                     db.session.rollback()
             else:
                 # Если файл не найден в БД (документ), ищем в файловой системе
                 # Ищем в новой структуре info/год/раздел/
                 found_path = None
-                logger.debug(f"Файл не найден в БД, ищем в файловой системе: {filename}, раздел: {section_name}")
+                logger.debug("Файл не найден в БД, ищем в файловой системе: %s, раздел: %s", filename, section_name)
                 for root, dirs, files_list in os.walk(os.path.join(self.base_upload_path, 'info')):
                     if filename in files_list:
                         found_path = os.path.join(root, filename)
                         if os.path.exists(found_path):
                             try:
                                 os.remove(found_path)
-                                logger.info(f"Файл удален из файловой системы: {found_path}")
+                                logger.info("Файл удален из файловой системы: %s", found_path)
                                 file_deleted = True
                                 break
                             except Exception as e:
-                                logger.warning(f"Не удалось удалить файл {found_path}: {e}")
+                                logger.warning("Не удалось удалить файл %s: %s", found_path, e)
                 
                 # Если не найден в новой структуре, проверяем другие возможные пути
                 if not file_deleted:
@@ -558,29 +593,29 @@ class FileManager:
                         if os.path.exists(file_path):
                             try:
                                 os.remove(file_path)
-                                logger.info(f"Файл удален: {file_path}")
+                                logger.info("Файл удален: %s", file_path)
                                 file_deleted = True
                                 break
                             except Exception as e:
-                                logger.warning(f"Не удалось удалить файл {file_path}: {e}")
+                                logger.warning("Не удалось удалить файл %s: %s", file_path, e)
                 
                 # Если все еще не найден, ищем во всех папках uploads
                 if not file_deleted:
-                    logger.debug(f"Файл не найден в стандартных местах, ищем во всех папках uploads: {filename}")
+                    logger.debug("Файл не найден в стандартных местах, ищем во всех папках uploads: %s", filename)
                     for root, dirs, files_list in os.walk(self.base_upload_path):
                         if filename in files_list:
                             found_path = os.path.join(root, filename)
                             if os.path.exists(found_path):
                                 try:
                                     os.remove(found_path)
-                                    logger.info(f"Файл удален из файловой системы (глобальный поиск): {found_path}")
+                                    logger.info("Файл удален из файловой системы (глобальный поиск): %s", found_path)
                                     file_deleted = True
                                     break
                                 except Exception as e:
-                                    logger.warning(f"Не удалось удалить файл {found_path}: {e}")
+                                    logger.warning("Не удалось удалить файл %s: %s", found_path, e)
                 
                 if not file_deleted:
-                    logger.warning(f"Файл не найден в файловой системе для удаления: {filename}, раздел: {section_name}")
+                    logger.warning("Файл не найден в файловой системе для удаления: %s, раздел: %s", filename, section_name)
             
             # Удаляем файл из form_data в section.text
             try:
@@ -610,7 +645,7 @@ class FileManager:
                                 if len(new_files) != len(files):
                                     form_data[field_name] = ', '.join(new_files) if new_files else ''
                                     updated = True
-                                    logger.info(f"Файл удален из поля {field_name} в form_data")
+                                    logger.info("Файл удален из поля %s в form_data", field_name)
                             elif isinstance(field_value, list):
                                 # Поле file_with_name: массив объектов {url, displayName, filename}
                                 def _file_match(f):
@@ -622,14 +657,14 @@ class FileManager:
                                 if len(new_list) != len(field_value):
                                     form_data[field_name] = new_list
                                     updated = True
-                                    logger.info(f"Файл удален из поля {field_name} (массив) в form_data")
+                                    logger.info("Файл удален из поля %s (массив) в form_data", field_name)
                             elif isinstance(field_value, dict):
                                 # Один файл в виде объекта
                                 fn = field_value.get('filename') or (field_value.get('url') or '').split('/')[-1].strip()
                                 if fn == filename:
                                     form_data[field_name] = ''
                                     updated = True
-                                    logger.info(f"Файл удален из поля {field_name} (объект) в form_data")
+                                    logger.info("Файл удален из поля %s (объект) в form_data", field_name)
                         
                         # Удаляем из списка files (для раздела main)
                         if 'files' in form_data and isinstance(form_data['files'], list):
@@ -640,7 +675,7 @@ class FileManager:
                             ]
                             if len(form_data['files']) != original_count:
                                 updated = True
-                                logger.info(f"Файл удален из списка files в form_data")
+                                logger.info("Файл удален из списка files в form_data")
                         
                         # Удаляем из всех полей, содержащих этот файл (если field_name не указан или для очистки дубликатов)
                         # Если field_name указан, удаляем только из этого поля
@@ -662,28 +697,28 @@ class FileManager:
                                     if len(new_files) != len(files):
                                         form_data[field_key] = ', '.join(new_files) if new_files else ''
                                         updated = True
-                                        logger.info(f"Файл удален из поля {field_key} в form_data")
+                                        logger.info("Файл удален из поля %s в form_data", field_key)
                         
                         if updated:
                             data['form_data'] = form_data
                             section.text = json.dumps(data, ensure_ascii=False)
                             try:
                                 db.session.commit()
-                                logger.info(f"Файл удален из form_data раздела {section_name}")
+                                logger.info("Файл удален из form_data раздела %s", section_name)
                             except Exception as e:
-                                logger.error(f"Ошибка при обновлении form_data: {e}")
+                                logger.error("Ошибка при обновлении form_data: %s", e)
                                 db.session.rollback()
             except Exception as e:
-                logger.error(f"Ошибка при удалении файла из form_data: {e}")
+                logger.error("Ошибка при удалении файла из form_data: %s", e)
             
             if file_deleted or info_file:
                 return True
             else:
-                logger.warning(f"Файл не найден: {filename} в разделе {section_name}")
+                logger.warning("Файл не найден: %s в разделе %s", filename, section_name)
                 return False
                 
         except Exception as e:
-            logger.error(f"Ошибка при удалении файла {filename}: {e}")
+            logger.error("Ошибка при удалении файла %s: %s", filename, e)
             return False
     
     def get_file_info(self, filename, section_name):
@@ -814,7 +849,7 @@ class FileManager:
                         download_url = f'/sidebar/download_file/{section_name}/{info_file.filename}'
                 except Exception as e:
                     # Если не удалось проверить, используем стандартный URL
-                    logger.debug(f"Не удалось определить тип раздела для {section_name}: {e}")
+                    logger.debug("Не удалось определить тип раздела для %s: %s", section_name, e)
                 
                 # Если не определили как sidebar, используем метод get_download_url
                 if not download_url:
@@ -822,7 +857,7 @@ class FileManager:
                         download_url = info_file.get_download_url()
                     except Exception as e:
                         # Если метод get_download_url не работает, формируем URL вручную
-                        logger.debug(f"Ошибка при вызове get_download_url для {info_file.filename}: {e}")
+                        logger.debug("Ошибка при вызове get_download_url для %s: %s", info_file.filename, e)
                         download_url = f'/info/download_file/{section_name}/{info_file.filename}'
                 
                 file_info = {
@@ -906,10 +941,10 @@ class FileManager:
                                 data['form_data'] = form_data
                                 section.text = json.dumps(data, ensure_ascii=False)
                 except Exception as e:
-                    logger.debug(f"Ошибка при обновлении form_data: {e}")
+                    logger.debug("Ошибка при обновлении form_data: %s", e)
                 
                 db.session.commit()
-                logger.debug(f"Обновлено display_name для файла {info_file.filename}: {display_name}")
+                logger.debug("Обновлено display_name для файла %s: %s", info_file.filename, display_name)
                 return True
             return False
         except Exception as e:
@@ -995,7 +1030,7 @@ class FileManager:
         
         # Очищаем папки в старой структуре
         for section_name in os.listdir(self.base_upload_path):
-            if section_name != 'pages':  # Пропускаем папку pages
+            if section_name not in ('pages', BLOB_DIR_NAME):  # Пропускаем папку pages и blob-хранилище
                 cleaned_count += self._clean_section_directory(section_name, used_files)
         
         return cleaned_count
@@ -0,0 +1,185 @@
+"""
+Пакетная проверка файлов, на которые ссылается раздел
+
+Раньше каждая ссылка в form_data и content_blocks проверялась отдельно:
+запрос InfoFile по имени файла и, при промахе, обход всей папки uploads.
+FileLookup собирает имена файлов раздела заранее, загружает их записи
+InfoFile одним запросом (filename IN (...), без BLOB file_data), а папки
+uploads/info и остальной uploads обходит не более одного раза каждую и только
+если без этого не обойтись.
+"""
+
+import os
+
+from sqlalchemy.orm import defer
+
+from database import db
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def file_name_from_url(file_url):
+    """Имя файла из ссылки вида /info/download_file/<раздел>/<имя>|<отображаемое имя>"""
+    if not isinstance(file_url, str):
+        return ''
+    return file_url.split('|')[0].strip().split('/')[-1].strip()
+
+
+def collect_file_names(value, is_file_url):
+    """
+    Имена файлов во всех ссылках значения (form_data, блоки).
+
+    Строки разбиваются по запятым (поля с несколькими файлами), словари и
+    списки обходятся рекурсивно; ключ filename словаря тоже считается именем.
+    """
+    names = set()
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            for part in item.split(','):
+                part = part.strip()
+                if is_file_url(part):
+                    name = file_name_from_url(part)
+                    if name:
+                        names.add(name)
+        elif isinstance(item, dict):
+            if isinstance(item.get('filename'), str) and item['filename']:
+                names.add(item['filename'])
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+    return names
+
+
+def collect_file_urls(value, is_file_url):
+    """
+    Ссылки на файлы в значении (form_data, блоки) в порядке появления, без повторов.
+
+    Ссылка возвращается как есть, вместе с отображаемым именем после «|»;
+    у словарей {url, displayName/name} имя берется из словаря.
+    """
+    urls = []
+    seen = set()
+
+    def add(url, name=None):
+        url = url.strip()
+        clean = url.split('|')[0].strip()
+        if not is_file_url(clean) or clean in seen:
+            return
+        seen.add(clean)
+        if name and '|' not in url:
+            url = f'{clean}|{name}'
+        urls.append(url)
+
+    def walk(item):
+        if isinstance(item, str):
+            for part in item.split(','):
+                add(part)
+        elif isinstance(item, dict):
+            if isinstance(item.get('url'), str):
+                add(item['url'], item.get('displayName') or item.get('name'))
+            for key, nested in item.items():
+                if key != 'url':
+                    walk(nested)
+        elif isinstance(item, list):
+            for nested in item:
+                walk(nested)
+
+    walk(value)
+    return urls
+
+
+class FileLookup:
+    """Проверка существования файлов раздела по заранее загруженным данным"""
+
+    def __init__(self, uploads_root, filenames, is_file_url=None):
+        # Lazy import to avoid circular imports at module load time
+        from models.models import InfoFile
+
+        self.uploads_root = uploads_root
+        self.is_file_url = is_file_url
+        self.uploads_info_root = os.path.join(uploads_root, 'info')
+        self._rows = {}
+        self._info = None
+        self._other = None
+
+        filenames = sorted(name for name in filenames if name)
+        if not filenames:
+            return
+        try:
+            rows = (InfoFile.query
+                    .options(defer(InfoFile.file_data))
+                    .filter(InfoFile.filename.in_(filenames))
+                    .order_by(InfoFile.id)
+                    .all())
+        except Exception as e:
+            logger.debug("Ошибка при загрузке файлов раздела из БД: %s", e)
+            rows = []
+        for row in rows:
+            self._rows.setdefault(row.filename, []).append(row)
+
+    def info_file(self, filename, section_endpoint=None):
+        """Запись InfoFile по имени файла (и разделу, если указан)"""
+        for row in self._rows.get(filename, ()):
+            if section_endpoint is None or row.section_endpoint == section_endpoint:
+                return row
+        return None
+
+    def _walk(self, top, skip=None):
+        """Имя файла -> путь к первому экземпляру в каталоге top (один обход)"""
+        found = {}
+        for root, dirs, files in os.walk(top):
+            if skip is not None:
+                dirs[:] = [d for d in dirs if os.path.join(root, d) != skip]
+            for name in files:
+                found.setdefault(name, os.path.join(root, name))
+        return found
+
+    def _info_files(self):
+        """Файлы структуры info/год/раздел/ (обходится при первой необходимости)"""
+        if self._info is None:
+            self._info = self._walk(self.uploads_info_root)
+        return self._info
+
+    def _other_files(self):
+        """Остальные файлы uploads — последняя попытка для файлов старой структуры"""
+        if self._other is None:
+            self._other = self._walk(self.uploads_root, skip=self.uploads_info_root)
+        return self._other
+
+    def find_path(self, filename):
+        """Путь к файлу на диске по имени (сначала info/, затем остальной uploads) или None"""
+        return self._info_files().get(filename) or self._other_files().get(filename)
+
+    def exists(self, file_url, section_endpoint=None):
+        """То же, что info.routes._file_exists, без запросов и обходов на каждую ссылку"""
+        if self.is_file_url is not None and not self.is_file_url(file_url):
+            return True
+        filename = file_name_from_url(file_url)
+        if not filename:
+            return False
+
+        info_file = self.info_file(filename, section_endpoint)
+        if info_file is not None:
+            if info_file.file_path and os.path.exists(info_file.file_path):
+                return True
+            # Путь в БД неверный: ищем файл в info/ и обновляем путь
+            found = self._info_files().get(filename)
+            if found:
+                info_file.file_path = found
+                try:
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                return True
+            logger.debug("Файл в БД, но не найден на диске: %s", filename)
+            return False
+
+        if filename in self._info_files():
+            return True
+        # Старая структура по URL (путь относительно рабочего каталога)
+        if file_url.startswith('/') and os.path.exists(file_url.split('|')[0].strip()[1:]):
+            return True
+        return filename in self._other_files()
@@ -3,6 +3,7 @@
 """
 
 from database import db
+from utils.content_blocks import build_blocks_index, dump_blocks, file_names, normalize_blocks
 import json
 
 class InfoSection(db.Model):
@@ -15,6 +16,10 @@ class InfoSection(db.Model):
     title = db.Column(db.String(200), nullable=False)
     text = db.Column(db.Text)
     content_blocks = db.Column(db.Text)  # JSON строка с блоками контента
+    # Индекс блоков (типы, число элементов, ссылки на файлы), см. utils.content_blocks
+    blocks_index = db.Column(db.Text)
+    # Версия содержимого для мастеров: сохранение с устаревшей версией отклоняется (409)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
     
     def get_content_blocks(self):
         """Получить блоки контента как список"""
@@ -26,8 +31,22 @@ class InfoSection(db.Model):
         return []
     
     def set_content_blocks(self, blocks):
-        """Установить блоки контента"""
-        self.content_blocks = json.dumps(blocks, ensure_ascii=False)
+        """Установить блоки контента (вложенные блоки разворачиваются, индекс пересчитывается)"""
+        self.content_blocks, self.blocks_index = dump_blocks(blocks)
+
+    def get_blocks_index(self):
+        """Индекс блоков; для строк, записанных в обход set_content_blocks, строится на лету"""
+        if self.blocks_index:
+            try:
+                return json.loads(self.blocks_index)
+            except (TypeError, ValueError):
+                pass
+        blocks = self.get_content_blocks()
+        return build_blocks_index(normalize_blocks(blocks) if isinstance(blocks, list) else blocks)
+
+    def block_file_names(self, kind):
+        """Имена файлов блоков: kind — 'documents' или 'photos'"""
+        return file_names(self.get_blocks_index().get(kind))
     
     def to_dict(self):
         """Преобразовать в словарь"""
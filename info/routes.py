@@ -2,8 +2,8 @@
 Новые маршруты для информационных страниц с улучшенной системой
 """
 
-from flask import render_template, request, redirect, url_for, flash, jsonify, send_file, current_app
-from flask_login import login_required
+from flask import render_template, request, redirect, url_for, flash, jsonify, send_file, current_app, abort
+from flask_login import login_required, current_user
 from . import info_bp
 from .models import InfoSection
 from database import db
@@ -12,7 +12,11 @@ import json
 import uuid
 from datetime import datetime
 from file_manager import file_manager
-from utils.logger import logger
+from utils import chunked_upload
+from utils.file_helpers import store_uploads_concurrently, remove_batch_files
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 # Маппинг новых endpoint'ов согласно методическим рекомендациям 2024
@@ -156,6 +160,12 @@ def show_section_new(section_endpoint):
     except Exception:
         children = []
 
+    # Архив блюд: один месяц из таблицы DailyDish (?month=YYYY-MM&page=N)
+    extra_context = {}
+    if actual_endpoint == 'nutrition-dishes-archive':
+        from utils.dish_archive import load_archive_page
+        extra_context['dish_archive'] = load_archive_page(request.args.get('month'), request.args.get('page', 1, type=int))
+
     response = make_response(
         render_template(
             'info/section.html',
@@ -163,13 +173,11 @@ def show_section_new(section_endpoint):
             children=children,
             today=today,
             is_sveden=is_sveden,
+            **extra_context,
         )
     )
     
-    # Отключаем кэширование
-    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-    response.headers['Pragma'] = 'no-cache'
-    response.headers['Expires'] = '0'
+    # Cache-Control выставляет utils.http_cache: public для анонимных, no-store для редакторов
     
     return response
 
@@ -306,7 +314,8 @@ def get_section_data(section_endpoint):
             'title': section.title,
             'text': section.text,
             'content_blocks': section.get_content_blocks(),
-            'form_data': form_data
+            'form_data': form_data,
+            'version': section.version
         }
     })
 
@@ -566,10 +575,47 @@ def _create_new_section(section_id, section_data):
     return section
 
 
+def _apply_info_patch(section, patch):
+    """Применяет патч мастера: меняются только переданные ключи"""
+    # Lazy import to avoid circular imports at module load time
+    from .section_patch import read_text_data, patched_form_data
+
+    text_data = read_text_data(section)
+    if 'title' in patch:
+        section.title = patch['title'] or section.title
+    if 'text' in patch:
+        text_data['text'] = patch['text']
+    text_data['form_data'] = patched_form_data(text_data['form_data'], patch)
+    section.text = json.dumps(text_data, ensure_ascii=False)
+    if 'content_blocks' in patch:
+        section.set_content_blocks(patch['content_blocks'])
+
+
+def _create_info_section_from_patch(section_id, patch):
+    """Новый раздел из патча мастера"""
+    section_data = dict(patch.get('fields') or {})
+    for key in ('title', 'text', 'content_blocks'):
+        if key in patch:
+            section_data[key] = patch[key]
+    return _create_new_section(section_id, section_data)
+
+
 @info_bp.route('/wizard_save', methods=['POST'])
 @login_required
 def wizard_save():
-    """Сохранение данных мастера заполнения"""
+    """
+    Сохранение данных мастера заполнения.
+
+    JSON-запрос — патчи измененных полей с версиями разделов (см. info.section_patch);
+    форма с wizard_data — полные данные разделов (старые формы редактирования).
+    """
+    if request.is_json:
+        # Lazy import to avoid circular imports at module load time
+        from .section_patch import save_section_patches
+        payload = request.get_json(silent=True) or {}
+        return save_section_patches(payload, _apply_info_patch, _create_info_section_from_patch,
+                                    save_single=bool(payload.get('save_single')))
+
     try:
         wizard_data = request.form.get('wizard_data')
         save_single = request.form.get('save_single', 'false').lower() == 'true'
@@ -579,12 +625,18 @@ def wizard_save():
         
         data = json.loads(wizard_data)
         
+        # Все разделы запроса загружаются одним запросом
+        # Lazy import to avoid circular imports at module load time
+        from .section_patch import load_sections
+        sections = load_sections(data)
+        
         # Обрабатываем каждый раздел
         for section_id, section_data in data.items():
-            section = InfoSection.query.filter_by(endpoint=section_id).first()
+            section = sections.get(section_id)
             
             if section:
                 _update_existing_section(section, section_data)
+                section.version = (section.version or 0) + 1
             else:
                 new_section = _create_new_section(section_id, section_data)
                 db.session.add(new_section)
@@ -648,268 +700,403 @@ def reset_file_data():
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)})
 
+
+# Разрешенные расширения для загрузки в разделы Сведений
+ALLOWED_UPLOAD_EXTENSIONS = {
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx',
+    '.jpg', '.jpeg', '.png', '.gif',
+    '.sig',
+    # Архивы
+    '.zip', '.rar', '.7z', '.tar', '.gz', '.tgz',
+}
+
+
+# Разделы Сведений, файлы которых хранятся в структуре info/год/раздел/
+INFO_FOLDER_SECTIONS = {
+    'main', 'about', 'documents', 'education', 'standards', 'structure', 'management',
+    'teachers', 'material', 'facilities', 'scholarships', 'paid-services', 'paid',
+    'financial', 'finance', 'vacancies', 'nutrition', 'food', 'international',
+}
+
+
+def _is_allowed_upload_name(filename):
+    """Проверяет расширение загружаемого файла"""
+    _, ext = os.path.splitext(filename or '')
+    return ext.lower() in ALLOWED_UPLOAD_EXTENSIONS
+
+
 @info_bp.route('/upload_file', methods=['POST'])
 @login_required
 def upload_file():
     """Загрузка файла на сервер с сохранением в базе данных"""
     try:
-        if 'file' not in request.files:
-            return jsonify({'success': False, 'error': 'Файл не найден'})
-        
         # Проверяем общий размер запроса относительно MAX_CONTENT_LENGTH
+        # (до обращения к request.files, чтобы не принимать тело запроса целиком)
         max_len = current_app.config.get('MAX_CONTENT_LENGTH')
         if max_len and request.content_length and request.content_length > max_len:
             max_mb = round(max_len / (1024 * 1024))
             return jsonify({'success': False, 'error': f'Файл слишком большой. Максимум {max_mb} МБ'}), 413
 
+        if 'file' not in request.files:
+            return jsonify({'success': False, 'error': 'Файл не найден'})
+
         file = request.files['file']
         section = request.form.get('section', 'general')
         if not section or section == 'undefined':
             section = 'main'
         field_name = request.form.get('field_name')
         
-        if file.filename == '':
-            return jsonify({'success': False, 'error': 'Файл не выбран'})
-        
-        # Серверная валидация типа файла
-        allowed_ext = {
-            '.pdf', '.doc', '.docx', '.xls', '.xlsx',
-            '.jpg', '.jpeg', '.png', '.gif',
-            '.sig',
-            # Архивы
-            '.zip', '.rar', '.7z', '.tar', '.gz', '.tgz',
-        }
-        _, ext = os.path.splitext(file.filename)
-        if ext.lower() not in allowed_ext:
-            return jsonify({'success': False, 'error': f'Недопустимый формат файла: {ext}. Разрешено: {", ".join(sorted(allowed_ext))}'})
-        
-        # Получаем раздел из базы данных; если нет — создаём пустой
-        section_obj = InfoSection.query.filter_by(endpoint=section).first()
-        if not section_obj:
-            section_obj = InfoSection(
-                endpoint=section,
-                title=section,
-                url=f'/{section}',
-                text=json.dumps({'form_data': {}}, ensure_ascii=False)
-            )
-            db.session.add(section_obj)
-            db.session.commit()
-        
-        # НЕ удаляем старые файлы автоматически - пользователь должен удалять их вручную
-        # Это предотвращает случайное удаление файлов при повторной загрузке
-        
-        # Используем новую систему загрузки файлов с сохранением в БД
-        # Для разделов Сведения используем новую структуру папок info/год/раздел/
-        if section in ['main', 'about', 'documents', 'education', 'standards', 'structure', 'management', 'teachers', 'material', 'facilities', 'scholarships', 'paid-services', 'paid', 'financial', 'finance', 'vacancies', 'nutrition', 'food', 'international']:
-            file_info = file_manager.save_info_file(file, section, field_name)
+        return _save_uploaded_file(file, section, field_name)
+    except ValueError as e:
+        try:
+            from utils.error_utils import handle_api_error
+            return handle_api_error(e, 'При загрузке файла')
+        except ImportError:
+            return jsonify({'success': False, 'error': str(e), 'instructions': ['Проверьте формат файла', 'Убедитесь, что файл не поврежден']}), 400
+    except Exception as e:
+        try:
+            from utils.error_utils import handle_api_error
+            return handle_api_error(e, 'При загрузке файла')
+        except ImportError:
+            return jsonify({'success': False, 'error': f'Ошибка при загрузке файла: {str(e)}', 'instructions': ['Попробуйте загрузить файл снова', 'Проверьте размер файла', 'Если проблема сохраняется, сообщите администратору']}), 500
+
+
+@info_bp.route('/upload_files', methods=['POST'])
+@login_required
+def upload_files():
+    """Пакетная загрузка файлов: параллельное сохранение на диск и одна транзакция на пакет"""
+    max_len = current_app.config.get('MAX_CONTENT_LENGTH')
+    if max_len and request.content_length and request.content_length > max_len:
+        max_mb = round(max_len / (1024 * 1024))
+        return jsonify({'success': False, 'error': f'Файлы слишком большие. Максимум {max_mb} МБ за запрос'}), 413
+
+    files = [f for f in request.files.getlist('files') + request.files.getlist('file') if f and f.filename]
+    if not files:
+        return jsonify({'success': False, 'error': 'Файлы не найдены', 'results': []})
+
+    section = request.form.get('section', 'general')
+    if not section or section == 'undefined':
+        section = 'main'
+    field_name = request.form.get('field_name')
+
+    results = [None] * len(files)
+    to_store = []
+    for index, file in enumerate(files):
+        if _is_allowed_upload_name(file.filename):
+            to_store.append(index)
         else:
-            file_info = file_manager.save_file(file, section, field_name)
+            _, ext = os.path.splitext(file.filename)
+            results[index] = {'success': False, 'original_name': file.filename,
+                              'error': f'Недопустимый формат файла: {ext}'}
+
+    stored = {}
+    try:
+        section_obj = _get_or_create_upload_section(section)
+        stored = store_uploads_concurrently(
+            files, to_store, lambda file: _store_upload_on_disk(file, section, field_name, section_obj.url)
+        )
+
+        for index in to_store:
+            file_info, error = stored[index]
+            if error or not file_info:
+                results[index] = {'success': False, 'original_name': files[index].filename,
+                                  'error': error or 'Ошибка при сохранении файла'}
+                continue
+            results[index] = _register_uploaded_file(section_obj, file_info, field_name)
+
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Ошибка пакетной загрузки в раздел {section}: {e}", exc_info=True)
+        remove_batch_files(stored)
+        for index in to_store:
+            results[index] = {'success': False, 'original_name': files[index].filename,
+                              'error': f'Ошибка при сохранении в базу данных: {e}'}
+
+    uploaded = sum(1 for r in results if r and r.get('success'))
+    return jsonify({
+        'success': uploaded > 0,
+        'uploaded': uploaded,
+        'failed': len(results) - uploaded,
+        'results': results
+    })
+
+
+def _save_uploaded_file(file, section, field_name):
+    """Сохраняет загруженный файл в раздел: файл на диске, запись InfoFile и form_data раздела.
+
+    Используется обычной загрузкой (upload_file) и сборкой загрузки по частям.
+    """
+    if file.filename == '':
+        return jsonify({'success': False, 'error': 'Файл не выбран'})
+    
+    # Серверная валидация типа файла
+    _, ext = os.path.splitext(file.filename)
+    if not _is_allowed_upload_name(file.filename):
+        return jsonify({'success': False, 'error': f'Недопустимый формат файла: {ext}. Разрешено: {", ".join(sorted(ALLOWED_UPLOAD_EXTENSIONS))}'})
+    
+    section_obj = _get_or_create_upload_section(section)
+    
+    # НЕ удаляем старые файлы автоматически - пользователь должен удалять их вручную
+    # Это предотвращает случайное удаление файлов при повторной загрузке
+    file_info = _store_upload_on_disk(file, section, field_name, section_obj.url)
+    
+    if file_info:
+        result = _register_uploaded_file(section_obj, file_info, field_name)
+        db.session.commit()
+        return jsonify(result)
+    else:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': 'Ошибка при сохранении файла'})
+
+
+def _get_or_create_upload_section(section):
+    """Возвращает раздел для загрузки; если его нет — создаёт пустой (без commit)"""
+    section_obj = InfoSection.query.filter_by(endpoint=section).first()
+    if not section_obj:
+        section_obj = InfoSection(
+            endpoint=section,
+            title=section,
+            url=f'/{section}',
+            text=json.dumps({'form_data': {}}, ensure_ascii=False)
+        )
+        db.session.add(section_obj)
+        db.session.flush()
+    return section_obj
+
+
+def _store_upload_on_disk(file, section, field_name, section_url=None):
+    """Сохраняет файл на диск (без обращений к БД, можно вызывать из потоков)"""
+    # Для разделов Сведения используем структуру папок info/год/раздел/
+    if section in INFO_FOLDER_SECTIONS:
+        return file_manager.save_info_file(file, section, field_name, section_url=section_url or '')
+    return file_manager.save_file(file, section, field_name)
+
+
+def _register_uploaded_file(section_obj, file_info, field_name):
+    """Записывает сохраненный файл в InfoFile и form_data раздела (без commit).
+
+    Returns:
+        dict — JSON-ответ для клиента
+    """
+    section = section_obj.endpoint
+    # Создаем или обновляем запись в БД для сохранения original_filename
+    from models.models import InfoFile
+    db_file = None
+    try:
+        # Ищем существующую запись
+        query = InfoFile.query.filter_by(
+            filename=file_info['filename'],
+            section_endpoint=section
+        )
+        if field_name:
+            query = query.filter_by(field_name=field_name)
+        db_file = query.first()
+        
+        # Если не нашли с учетом field_name, ищем без него (для совместимости)
+        if not db_file:
+            db_file = InfoFile.query.filter_by(
+                filename=file_info['filename'],
+                section_endpoint=section
+            ).first()
         
-        if file_info:
-            # Создаем или обновляем запись в БД для сохранения original_filename
-            from models.models import InfoFile
-            db_file = None
+        # Если записи нет, создаем новую
+        if not db_file:
+            # Читаем данные файла для сохранения в БД
+            file_data = None
             try:
-                # Ищем существующую запись
-                query = InfoFile.query.filter_by(
-                    filename=file_info['filename'],
-                    section_endpoint=section
-                )
-                if field_name:
-                    query = query.filter_by(field_name=field_name)
-                db_file = query.first()
-                
-                # Если не нашли с учетом field_name, ищем без него (для совместимости)
-                if not db_file:
-                    db_file = InfoFile.query.filter_by(
-                        filename=file_info['filename'],
-                        section_endpoint=section
-                    ).first()
-                
-                # Если записи нет, создаем новую
-                if not db_file:
-                    # Читаем данные файла для сохранения в БД
-                    file_data = None
-                    try:
-                        with open(file_info['file_path'], 'rb') as f:
-                            file_data = f.read()
-                    except Exception as e:
-                        logger.warning(f"Не удалось прочитать файл для сохранения в БД: {e}")
-                    
-                    db_file = InfoFile(
-                        filename=file_info['filename'],
-                        original_filename=file_info['original_name'],
-                        file_path=file_info['file_path'],
-                        section_endpoint=section,
-                        field_name=field_name,
-                        file_size=file_info['size'],
-                        mime_type=file_info.get('mime_type'),
-                        is_image=file_info.get('is_image', False),
-                        display_name=file_info['original_name'],
-                        file_data=file_data,
-                        stored_in_db=file_data is not None
-                    )
-                    db.session.add(db_file)
-                    db.session.commit()
-                    logger.info(f"Создана запись InfoFile для файла {file_info['filename']}")
-                else:
-                    # Обновляем original_filename, если он изменился или отсутствует
-                    if not db_file.original_filename or db_file.original_filename != file_info['original_name']:
-                        db_file.original_filename = file_info['original_name']
-                        if not db_file.display_name:
-                            db_file.display_name = file_info['original_name']
-                        db.session.commit()
-                        logger.info(f"Обновлен original_filename для файла {file_info['filename']}")
+                with open(file_info['file_path'], 'rb') as f:
+                    file_data = f.read()
             except Exception as e:
-                # Обрабатываем ошибки при сохранении в БД
-                error_str = str(e).lower()
-                db_file = None
-                
-                # Всегда пытаемся выполнить rollback, если сессия активна
-                try:
-                    if db.session.is_active:
-                        db.session.rollback()
-                except Exception as rollback_error:
-                    logger.error(f"Ошибка при rollback транзакции: {rollback_error}")
-                
-                # Проверяем тип ошибки
-                if 'no such column' in error_str or 'file_data' in error_str:
-                    # Ошибка схемы БД - поля еще не добавлены
-                    logger.warning(
-                        "Поля file_data/stored_in_db еще не добавлены в БД. "
-                        "Пропускаю сохранение файла в InfoFile. Имя будет взято из запроса."
-                    )
-                else:
-                    # Другие ошибки БД - логируем как ошибку с полным traceback
-                    logger.error(f"Ошибка при сохранении файла в InfoFile: {e}", exc_info=True)
+                logger.warning(f"Не удалось прочитать файл для сохранения в БД: {e}")
             
-            # Используем display_name из БД, если есть, иначе original_name
-            # Важно: original_name содержит оригинальное имя с правильным расширением
-            display_name = db_file.display_name if db_file and db_file.display_name else file_info['original_name']
+            db_file = InfoFile(
+                filename=file_info['filename'],
+                original_filename=file_info['original_name'],
+                file_path=file_info['file_path'],
+                section_endpoint=section,
+                field_name=field_name,
+                file_size=file_info['size'],
+                mime_type=file_info.get('mime_type'),
+                is_image=file_info.get('is_image', False),
+                display_name=file_info['original_name'],
+                file_data=file_data,
+                stored_in_db=file_data is not None,
+                content_hash=file_info.get('sha256')
+            )
+            db.session.add(db_file)
+            db.session.flush()
+            logger.info(f"Создана запись InfoFile для файла {file_info['filename']}")
+        else:
+            # Обновляем original_filename, если он изменился или отсутствует
+            if not db_file.original_filename or db_file.original_filename != file_info['original_name']:
+                db_file.original_filename = file_info['original_name']
+                if not db_file.display_name:
+                    db_file.display_name = file_info['original_name']
+                logger.info(f"Обновлен original_filename для файла {file_info['filename']}")
+    except Exception as e:
+        # Запись InfoFile — часть общей транзакции загрузки: откат выполняет вызывающий код
+        logger.error(f"Ошибка при сохранении файла в InfoFile: {e}", exc_info=True)
+        raise
+    
+    # Используем display_name из БД, если есть, иначе original_name
+    # Важно: original_name содержит оригинальное имя с правильным расширением
+    display_name = db_file.display_name if db_file and db_file.display_name else file_info['original_name']
+    
+    # Убеждаемся, что display_name содержит правильное расширение
+    if display_name:
+        _, display_ext = os.path.splitext(display_name)
+        _, original_ext = os.path.splitext(file_info['original_name'])
+        # Если расширения не совпадают, используем расширение из original_name
+        if display_ext.lower() != original_ext.lower() and original_ext:
+            name_without_ext, _ = os.path.splitext(display_name)
+            display_name = name_without_ext + original_ext
+    
+    # Обновляем данные раздела с новым файлом
+    try:
+        if section_obj.text:
+            data = json.loads(section_obj.text)
+        else:
+            data = {'form_data': {}}
+        
+        if field_name:
+            # Для конкретного поля - добавляем файл к существующим (если есть)
+            # Сохраняем URL с display_name для правильного отображения в шаблоне
+            file_url_with_name = f"{file_info['url']}|{display_name}"
             
-            # Убеждаемся, что display_name содержит правильное расширение
-            if display_name:
-                _, display_ext = os.path.splitext(display_name)
-                _, original_ext = os.path.splitext(file_info['original_name'])
-                # Если расширения не совпадают, используем расширение из original_name
-                if display_ext.lower() != original_ext.lower() and original_ext:
-                    name_without_ext, _ = os.path.splitext(display_name)
-                    display_name = name_without_ext + original_ext
+            # Проверяем, нет ли уже этого файла в текущем поле
+            # Это предотвращает дублирование при повторной загрузке
+            filename_to_check = file_info['filename']
+            file_already_in_field = False
+            if field_name in data['form_data'] and data['form_data'][field_name]:
+                existing_value = data['form_data'][field_name]
+                if isinstance(existing_value, str):
+                    existing_files = [f.strip() for f in existing_value.split(',') if f.strip()]
+                    for existing_file_url in existing_files:
+                        existing_file_url_clean = existing_file_url.split('|')[0].strip() if '|' in existing_file_url else existing_file_url.strip()
+                        existing_filename = existing_file_url_clean.split('/')[-1].strip()
+                        # Сравниваем имена файлов (без суффиксов _2, _3 и т.д.)
+                        base_name_1, ext_1 = os.path.splitext(filename_to_check)
+                        base_name_2, ext_2 = os.path.splitext(existing_filename)
+                        # Убираем суффиксы _2, _3 и т.д. для сравнения
+                        base_name_1_clean = base_name_1.rsplit('_', 1)[0] if '_' in base_name_1 and base_name_1.rsplit('_', 1)[-1].isdigit() else base_name_1
+                        base_name_2_clean = base_name_2.rsplit('_', 1)[0] if '_' in base_name_2 and base_name_2.rsplit('_', 1)[-1].isdigit() else base_name_2
+                        if base_name_1_clean == base_name_2_clean and ext_1.lower() == ext_2.lower():
+                            file_already_in_field = True
+                            logger.info(f"Файл {filename_to_check} уже есть в поле {field_name}, не добавляем дубликат")
+                            break
             
-            # Обновляем данные раздела с новым файлом
-            try:
-                if section_obj.text:
-                    data = json.loads(section_obj.text)
-                else:
-                    data = {'form_data': {}}
-                
-                if field_name:
-                    # Для конкретного поля - добавляем файл к существующим (если есть)
-                    # Сохраняем URL с display_name для правильного отображения в шаблоне
-                    file_url_with_name = f"{file_info['url']}|{display_name}"
-                    
-                    # Проверяем, нет ли уже этого файла в текущем поле
-                    # Это предотвращает дублирование при повторной загрузке
-                    filename_to_check = file_info['filename']
-                    file_already_in_field = False
-                    if field_name in data['form_data'] and data['form_data'][field_name]:
-                        existing_value = data['form_data'][field_name]
-                        if isinstance(existing_value, str):
-                            existing_files = [f.strip() for f in existing_value.split(',') if f.strip()]
-                            for existing_file_url in existing_files:
-                                existing_file_url_clean = existing_file_url.split('|')[0].strip() if '|' in existing_file_url else existing_file_url.strip()
-                                existing_filename = existing_file_url_clean.split('/')[-1].strip()
-                                # Сравниваем имена файлов (без суффиксов _2, _3 и т.д.)
-                                base_name_1, ext_1 = os.path.splitext(filename_to_check)
-                                base_name_2, ext_2 = os.path.splitext(existing_filename)
-                                # Убираем суффиксы _2, _3 и т.д. для сравнения
-                                base_name_1_clean = base_name_1.rsplit('_', 1)[0] if '_' in base_name_1 and base_name_1.rsplit('_', 1)[-1].isdigit() else base_name_1
-                                base_name_2_clean = base_name_2.rsplit('_', 1)[0] if '_' in base_name_2 and base_name_2.rsplit('_', 1)[-1].isdigit() else base_name_2
-                                if base_name_1_clean == base_name_2_clean and ext_1.lower() == ext_2.lower():
-                                    file_already_in_field = True
-                                    logger.info(f"Файл {filename_to_check} уже есть в поле {field_name}, не добавляем дубликат")
-                                    break
-                    
-                    if not file_already_in_field:
-                        # Проверяем, есть ли уже файлы в этом поле
-                        if field_name in data['form_data'] and data['form_data'][field_name]:
-                            existing_value = data['form_data'][field_name]
-                            # Если это строка с файлами через запятую, добавляем новый файл
-                            if isinstance(existing_value, str) and (existing_value.startswith('/download_file/') or existing_value.startswith('/info/download_file/')):
-                                # Проверяем, нет ли уже этого файла в списке
-                                existing_files = [f.strip() for f in existing_value.split(',') if f.strip()]
-                                # Проверяем по URL (без display_name)
-                                file_url_clean = file_info['url']
-                                if not any(f.startswith(file_url_clean) for f in existing_files):
-                                    existing_files.append(file_url_with_name)
-                                    data['form_data'][field_name] = ', '.join(existing_files)
-                                # Если файл уже есть, не добавляем
-                            else:
-                                # Если поле не содержит файлов, заменяем
-                                data['form_data'][field_name] = file_url_with_name
-                        else:
-                            # Поле пустое, просто устанавливаем значение
-                            data['form_data'][field_name] = file_url_with_name
+            if not file_already_in_field:
+                # Проверяем, есть ли уже файлы в этом поле
+                if field_name in data['form_data'] and data['form_data'][field_name]:
+                    existing_value = data['form_data'][field_name]
+                    # Если это строка с файлами через запятую, добавляем новый файл
+                    if isinstance(existing_value, str) and (existing_value.startswith('/download_file/') or existing_value.startswith('/info/download_file/')):
+                        # Проверяем, нет ли уже этого файла в списке
+                        existing_files = [f.strip() for f in existing_value.split(',') if f.strip()]
+                        # Проверяем по URL (без display_name)
+                        file_url_clean = file_info['url']
+                        if not any(f.startswith(file_url_clean) for f in existing_files):
+                            existing_files.append(file_url_with_name)
+                            data['form_data'][field_name] = ', '.join(existing_files)
+                        # Если файл уже есть, не добавляем
                     else:
-                        # Файл уже есть в текущем поле - просто не добавляем дубликат
-                        logger.info(f"Файл {file_info['filename']} уже есть в поле {field_name}, пропускаем добавление")
-                        # Важно: возвращаем url, чтобы клиент мог правильно обработать ответ
-                        return jsonify({
-                            'success': True, 
-                            'message': 'Файл уже загружен в это поле', 
-                            'filename': file_info['filename'],
-                            'original_name': file_info['original_name'],
-                            'display_name': display_name,
-                            'url': file_info['url'],
-                            'is_image': file_info.get('is_image', False),
-                            'size': file_info.get('size'),
-                            'mime_type': file_info.get('mime_type'),
-                            'id': db_file.id if db_file else None
-                        })
+                        # Если поле не содержит файлов, заменяем
+                        data['form_data'][field_name] = file_url_with_name
                 else:
-                    # Для раздела main - добавляем в список файлов
-                    if 'files' not in data['form_data']:
-                        data['form_data']['files'] = []
-                    
-                    data['form_data']['files'].append({
-                        'filename': file_info['filename'],
-                        'original_name': file_info['original_name'],
-                        'url': file_info['url'],
-                        'size': file_info['size'],
-                        'uploaded_at': file_info['created_at']
-                    })
-                
-                section_obj.text = json.dumps(data, ensure_ascii=False)
-                db.session.commit()
-            except Exception as e:
-                logger.error(f"Ошибка при обновлении данных раздела: {e}")
+                    # Поле пустое, просто устанавливаем значение
+                    data['form_data'][field_name] = file_url_with_name
+            else:
+                # Файл уже есть в текущем поле - просто не добавляем дубликат
+                logger.info(f"Файл {file_info['filename']} уже есть в поле {field_name}, пропускаем добавление")
+                # Важно: возвращаем url, чтобы клиент мог правильно обработать ответ
+                return {
+                    'success': True, 
+                    'message': 'Файл уже загружен в это поле', 
+                    'filename': file_info['filename'],
+                    'original_name': file_info['original_name'],
+                    'display_name': display_name,
+                    'url': file_info['url'],
+                    'is_image': file_info.get('is_image', False),
+                    'size': file_info.get('size'),
+                    'mime_type': file_info.get('mime_type'),
+                    'id': db_file.id if db_file else None
+                }
+        else:
+            # Для раздела main - добавляем в список файлов
+            if 'files' not in data['form_data']:
+                data['form_data']['files'] = []
             
-            return jsonify({
-                'success': True,
+            data['form_data']['files'].append({
                 'filename': file_info['filename'],
                 'original_name': file_info['original_name'],
-                'display_name': display_name,
                 'url': file_info['url'],
-                'is_image': file_info['is_image'],
                 'size': file_info['size'],
-                'mime_type': file_info['mime_type'],
-                'id': db_file.id if db_file else None
+                'uploaded_at': file_info['created_at']
             })
-        else:
-            return jsonify({'success': False, 'error': 'Ошибка при сохранении файла'})
-            
-    except ValueError as e:
-        try:
-            from utils.error_utils import handle_api_error
-            return handle_api_error(e, 'При загрузке файла')
-        except ImportError:
-            return jsonify({'success': False, 'error': str(e), 'instructions': ['Проверьте формат файла', 'Убедитесь, что файл не поврежден']}), 400
+        
+        section_obj.text = json.dumps(data, ensure_ascii=False)
     except Exception as e:
-        try:
-            from utils.error_utils import handle_api_error
-            return handle_api_error(e, 'При загрузке файла')
-        except ImportError:
-            return jsonify({'success': False, 'error': f'Ошибка при загрузке файла: {str(e)}', 'instructions': ['Попробуйте загрузить файл снова', 'Проверьте размер файла', 'Если проблема сохраняется, сообщите администратору']}), 500
+        logger.error(f"Ошибка при обновлении данных раздела: {e}")
+    
+    return {
+        'success': True,
+        'filename': file_info['filename'],
+        'original_name': file_info['original_name'],
+        'display_name': display_name,
+        'url': file_info['url'],
+        'is_image': file_info['is_image'],
+        'size': file_info['size'],
+        'mime_type': file_info['mime_type'],
+        'id': db_file.id if db_file else None
+    }
+
+
+def _chunked_section(section):
+    if not section or section == 'undefined':
+        return 'main'
+    return section
+
+
+def _chunked_save_error(e):
+    from utils.error_utils import handle_api_error
+    return handle_api_error(e, 'При сборке загруженного файла')
+
+
+@info_bp.route('/upload_chunked/init', methods=['POST'])
+@login_required
+def upload_chunked_init():
+    """Начало загрузки по частям: проверка типа и размера до передачи содержимого"""
+    return chunked_upload.init_response(_chunked_section, _is_allowed_upload_name)
+
+
+@info_bp.route('/upload_chunked/<upload_id>/<int:index>', methods=['PUT', 'POST'])
+@login_required
+def upload_chunked_part(upload_id, index):
+    """Прием одной части файла (тело запроса — содержимое части, заголовок X-Chunk-SHA256)"""
+    return chunked_upload.chunk_response(upload_id, index)
+
+
+@info_bp.route('/upload_chunked/<upload_id>', methods=['GET'])
+@login_required
+def upload_chunked_status(upload_id):
+    """Статус загрузки по частям (для продолжения после обрыва)"""
+    return chunked_upload.status_response(upload_id)
+
+
+@info_bp.route('/upload_chunked/<upload_id>', methods=['DELETE'])
+@login_required
+def upload_chunked_abort(upload_id):
+    """Отмена загрузки по частям"""
+    return chunked_upload.abort_response(upload_id)
+
+
+@info_bp.route('/upload_chunked/<upload_id>/complete', methods=['POST'])
+@login_required
+def upload_chunked_complete(upload_id):
+    """Сборка файла из частей и сохранение в раздел так же, как upload_file"""
+    return chunked_upload.complete_response(upload_id, _save_uploaded_file, _chunked_save_error)
+
 
 @info_bp.route('/download_file/<section>/<filename>')
 @info_bp.route('/info/download_file/<section>/<filename>')
@@ -1010,7 +1197,7 @@ def download_file(section, filename):
                                                     download_filename = display_name
                                             break
                 except Exception as e:
-                    logger.debug(f"Не удалось получить оригинальное имя из form_data: {e}")
+                    logger.debug("Не удалось получить оригинальное имя из form_data: %s", e)
         
         # Если файл не найден ни в БД, ни в файловой системе
         if not file_data and (not file_path or not os.path.exists(file_path)):
@@ -1044,6 +1231,13 @@ def download_file(section, filename):
             if not mimetype:
                 mimetype = 'application/octet-stream'
         
+        # Файл отдается по неизменяемому URL /media/<sha256>/<имя> с бессрочным кэшированием
+        from utils.media import media_redirect
+        media_response = media_redirect(download_filename, file_path=file_path, file_data=file_data,
+                                        content_hash=info_file.content_hash if info_file else None)
+        if media_response is not None:
+            return media_response
+        
         # Кодируем имя файла для правильного отображения в браузере
         encoded_filename = urllib.parse.quote(download_filename.encode('utf-8'))
         
@@ -1078,9 +1272,8 @@ def download_file(section, filename):
         
         # Добавляем заголовки для правильного определения типа файла
         response.headers['X-Content-Type-Options'] = 'nosniff'
-        response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-        response.headers['Pragma'] = 'no-cache'
-        response.headers['Expires'] = '0'
+        # Сюда доходят только файлы, которые не удалось поместить в хранилище /media
+        response.headers['Cache-Control'] = 'no-cache'
         
         return response
         
@@ -1089,6 +1282,69 @@ def download_file(section, filename):
         flash('Ошибка при скачивании файла', 'error')
         return redirect(url_for('main.index'))
 
+@info_bp.route('/download_all/<section_endpoint>')
+def download_all(section_endpoint):
+    """ZIP со всеми файлами раздела (архив кэшируется на диске по версии раздела)"""
+    # Lazy import to avoid circular imports at module load time
+    from utils.zip_download import zip_response
+
+    actual_endpoint = ENDPOINT_MAPPING.get(section_endpoint, section_endpoint)
+    section = InfoSection.query.filter_by(endpoint=actual_endpoint).first()
+    if not section:
+        abort(404)
+    entries = _section_zip_entries(section)
+    if not entries:
+        abort(404)
+    return zip_response(entries, f'section-{section.endpoint}', section.version,
+                        f'{section.title or section.endpoint}.zip')
+
+
+def _section_zip_entries(section):
+    """Файлы раздела для архива «Скачать все»: ссылки из form_data и блоков в порядке появления"""
+    # Lazy import to avoid circular imports at module load time
+    from utils.content_blocks import is_file_url
+    from utils.zip_download import ZipEntry, file_entry
+    from .file_lookup import FileLookup, collect_file_urls, file_name_from_url
+    from .section_patch import read_text_data
+
+    urls = collect_file_urls([read_text_data(section)['form_data'], section.get_content_blocks()], is_file_url)
+    uploads_root = os.path.join(current_app.root_path, 'static', 'uploads')
+    lookup = FileLookup(uploads_root, {file_name_from_url(url) for url in urls}, is_file_url=is_file_url)
+
+    entries = []
+    for url in urls:
+        clean, _, display_name = url.partition('|')
+        clean, display_name = clean.strip(), display_name.strip()
+        filename = file_name_from_url(clean)
+        entry = None
+        if clean.startswith('/static/uploads/'):
+            path = os.path.normpath(os.path.join(current_app.root_path, clean.lstrip('/')))
+            if path.startswith(uploads_root + os.sep):
+                entry = file_entry(display_name or filename, path)
+        else:
+            info_file = lookup.info_file(filename, section.endpoint) or lookup.info_file(filename)
+            name = display_name or (info_file and (info_file.original_filename or info_file.display_name)) or filename
+            if info_file and info_file.file_path and os.path.isfile(info_file.file_path):
+                entry = file_entry(name, info_file.file_path)
+            elif info_file and info_file.stored_in_db:
+                entry = ZipEntry(name, None, info_file.id, info_file.file_size, info_file.content_hash or info_file.id)
+            else:
+                path = lookup.find_path(filename)
+                entry = file_entry(name, path) if path else None
+        if entry is None:
+            continue
+
+        # Расширение имени в архиве совпадает с реальным файлом (как при скачивании по одному)
+        file_ext = os.path.splitext(filename)[1]
+        name_no_ext, name_ext = os.path.splitext(entry.arcname)
+        if file_ext and name_ext and file_ext.lower() != name_ext.lower():
+            entry = entry._replace(arcname=name_no_ext + file_ext)
+        elif file_ext and not name_ext:
+            entry = entry._replace(arcname=entry.arcname + file_ext)
+        entries.append(entry)
+    return entries
+
+
 @info_bp.route('/delete_file', methods=['POST'])
 @login_required
 def delete_file():
@@ -1099,7 +1355,7 @@ def delete_file():
         section = data.get('section')
         field_name = data.get('field_name')
         
-        logger.debug(f"delete_file: filename={filename}, section={section}, field_name={field_name}")
+        logger.debug("delete_file: filename=%s, section=%s, field_name=%s", filename, section, field_name)
         
         if not all([filename, section]):
             logger.warning(f"delete_file: Missing data - filename={filename}, section={section}")
@@ -1228,7 +1484,7 @@ def get_section_files(section_endpoint):
                                                 'is_image': False,
                                                 'field_name': field_name
                                             })
-                                            logger.debug(f"Добавлен файл из form_data: {filename} для поля {field_name}")
+                                            logger.debug("Добавлен файл из form_data: %s для поля %s", filename, field_name)
                 except Exception as e:
                     logger.error(f"Ошибка при загрузке файлов из form_data: {e}")
         else:
@@ -1246,7 +1502,7 @@ def get_section_files(section_endpoint):
                 if _file_exists(file_url, section_endpoint):
                     valid_files.append(file_info)
                 else:
-                    logger.debug(f"Файл не существует, исключаем из списка: {filename}")
+                    logger.debug("Файл не существует, исключаем из списка: %s", filename)
             elif isinstance(file_path, str) and os.path.exists(file_path):
                 # Это путь к файлу, проверяем существование
                 valid_files.append(file_info)
@@ -1255,10 +1511,10 @@ def get_section_files(section_endpoint):
                 if _file_exists(file_info['url'], section_endpoint):
                     valid_files.append(file_info)
                 else:
-                    logger.debug(f"Файл не существует по URL, исключаем: {file_info.get('filename')}")
+                    logger.debug("Файл не существует по URL, исключаем: %s", file_info.get('filename'))
             else:
                 # Если нет пути и URL, пропускаем
-                logger.debug(f"Файл без пути и URL, исключаем: {file_info.get('filename')}")
+                logger.debug("Файл без пути и URL, исключаем: %s", file_info.get('filename'))
         
         # Удаляем дубликаты по базовому имени файла (без суффиксов _2, _3)
         unique_files = []
@@ -1390,10 +1646,10 @@ def _file_exists(file_url, section_endpoint=None):
                         return True
             # Если файл не найден в файловой системе, но есть в БД - файл удален
             if not found:
-                logger.debug(f"Файл в БД, но не найден на диске: {filename}")
+                logger.debug("Файл в БД, но не найден на диске: %s", filename)
                 return False
     except Exception as e:
-        logger.debug(f"Ошибка при проверке файла в БД: {e}")
+        logger.debug("Ошибка при проверке файла в БД: %s", e)
     
     # Если файла нет в БД, проверяем файловую систему напрямую
     # Проверяем новую структуру папок info/год/раздел/
@@ -1437,17 +1693,27 @@ def _file_exists(file_url, section_endpoint=None):
                 if os.path.exists(file_path):
                     return True
     
-    logger.debug(f"Файл не найден: {filename} (URL: {file_url}, раздел: {section_endpoint})")
+    logger.debug("Файл не найден: %s (URL: %s, раздел: %s)", filename, file_url, section_endpoint)
     return False
 
 
+def _section_file_lookup(*values):
+    """FileLookup для всех файлов, на которые ссылаются значения (form_data, блоки)"""
+    # Lazy import to avoid circular imports at module load time
+    from .file_lookup import FileLookup, collect_file_names
+
+    names = set()
+    for value in values:
+        names |= collect_file_names(value, _is_file_field)
+    return FileLookup(os.path.join(current_app.root_path, 'static', 'uploads'), names, is_file_url=_is_file_field)
+
+
 def _update_form_data_file_names(section):
     """Обновляет имена файлов в form_data на основе данных из БД"""
     if not section.text:
         return False
     
     try:
-        from models.models import InfoFile
         data = json.loads(section.text)
         if 'form_data' not in data:
             return False
@@ -1455,6 +1721,9 @@ def _update_form_data_file_names(section):
         form_data = data['form_data']
         updated = False
         
+        # Записи InfoFile всех файлов раздела — одним запросом
+        lookup = _section_file_lookup(form_data)
+        
         # Обновляем имена файлов во всех полях
         for field_key, field_value in form_data.items():
             if isinstance(field_value, str) and field_value.strip():
@@ -1476,29 +1745,17 @@ def _update_form_data_file_names(section):
                             file_url_clean = file_url.split('|')[0] if '|' in file_url else file_url
                             filename = file_url_clean.split('/')[-1]
                             
-                            # Ищем файл в БД (с обработкой ошибок, если колонок нет)
-                            try:
-                                info_file = InfoFile.query.filter_by(
-                                    filename=filename,
-                                    section_endpoint=section.endpoint
-                                ).first()
-                                
-                                if info_file:
-                                    # Используем display_name или original_filename
-                                    display_name = info_file.display_name if info_file.display_name else info_file.original_filename
-                                    new_file_url = f"{file_url_clean}|{display_name}"
-                                    if new_file_url != file_url:
-                                        updated = True
-                                    new_files.append(new_file_url)
-                                else:
-                                    # Если файла нет в БД, оставляем как есть
-                                    new_files.append(file_url)
-                            except Exception as db_error:
-                                # Если ошибка из-за отсутствующих колонок, просто пропускаем обновление
-                                if 'no such column' in str(db_error).lower() or 'file_data' in str(db_error):
-                                    new_files.append(file_url)
-                                else:
-                                    raise
+                            info_file = lookup.info_file(filename, section.endpoint)
+                            if info_file:
+                                # Используем display_name или original_filename
+                                display_name = info_file.display_name if info_file.display_name else info_file.original_filename
+                                new_file_url = f"{file_url_clean}|{display_name}"
+                                if new_file_url != file_url:
+                                    updated = True
+                                new_files.append(new_file_url)
+                            else:
+                                # Если файла нет в БД, оставляем как есть
+                                new_files.append(file_url)
                         else:
                             new_files.append(file_url)
                     
@@ -1534,6 +1791,15 @@ def _clean_section_files(section):
         cleaned_data = {}
         section_cleaned = 0  # сколько удалено несуществующих
         section_updated = False  # были ли изменения (в т.ч. дедуп)
+
+        # Блоки без файлов (по индексу блоков) не разбираются
+        try:
+            blocks = section.get_content_blocks() if section.get_blocks_index().get('files') else []
+        except Exception:
+            blocks = []
+
+        # Файлы form_data и блоков проверяются по одному запросу к InfoFile и одному обходу uploads
+        lookup = _section_file_lookup(form_data, blocks)
         
         # Специальная обработка для раздела main с новой структурой
         if section.endpoint == 'main' and 'files' in form_data:
@@ -1545,11 +1811,11 @@ def _clean_section_files(section):
                         
                         # Проверяем существование файла используя улучшенную функцию
                         file_url = f"/info/download_file/{section.endpoint}/{filename}"
-                        if _file_exists(file_url, section.endpoint):
+                        if lookup.exists(file_url, section.endpoint):
                             existing_files.append(file_info)
                         else:
                             section_cleaned += 1
-                            logger.debug(f"Удаляем несуществующий файл из files списка: {filename} (раздел: {section.endpoint})")
+                            logger.debug("Удаляем несуществующий файл из files списка: %s (раздел: %s)", filename, section.endpoint)
                     else:
                         existing_files.append(file_info)
                 
@@ -1599,11 +1865,11 @@ def _clean_section_files(section):
                                 file_url.startswith('/info/download_file/')):
                                 
                                 # Проверяем существование файла с указанием раздела
-                                if _file_exists(file_url, section.endpoint):
+                                if lookup.exists(file_url, section.endpoint):
                                     existing_files.append(file_url)
                                 else:
                                     section_cleaned += 1
-                                    logger.debug(f"Удаляем несуществующий файл из form_data: {file_url} (раздел: {section.endpoint})")
+                                    logger.debug("Удаляем несуществующий файл из form_data: %s (раздел: %s)", file_url, section.endpoint)
                             else:
                                 # Если это не файловая ссылка, оставляем как есть
                                 existing_files.append(file_url)
@@ -1625,11 +1891,6 @@ def _clean_section_files(section):
                     cleaned_data[field_name] = field_value
         
         # Также очищаем ссылки на несуществующие файлы в content_blocks (фото/документы/фото персон)
-        try:
-            blocks = section.get_content_blocks()
-        except Exception:
-            blocks = []
-
         blocks_updated = False
 
         def clean_file_list(urls):
@@ -1640,7 +1901,7 @@ def _clean_section_files(section):
             cleaned = []
             for u in urls:
                 if isinstance(u, str) and _is_file_field(u):
-                    if _file_exists(u, None):
+                    if lookup.exists(u, None):
                         cleaned.append(u)
                     else:
                         section_cleaned += 1
@@ -1661,7 +1922,7 @@ def _clean_section_files(section):
                 if isinstance(d, dict):
                     url = d.get('url')
                     if isinstance(url, str) and _is_file_field(url):
-                        if _file_exists(url, None):
+                        if lookup.exists(url, None):
                             cleaned.append(d)
                         else:
                             section_cleaned += 1
@@ -1669,7 +1930,7 @@ def _clean_section_files(section):
                     else:
                         cleaned.append(d)
                 elif isinstance(d, str) and _is_file_field(d):
-                    if _file_exists(d, None):
+                    if lookup.exists(d, None):
                         cleaned.append(d)
                     else:
                         section_cleaned += 1
@@ -1700,13 +1961,13 @@ def _clean_section_files(section):
                         for dish in dishes:
                             if isinstance(dish, dict):
                                 if isinstance(dish.get('photo'), str) and _is_file_field(dish.get('photo')):
-                                    if not _file_exists(dish.get('photo'), None):
+                                    if not lookup.exists(dish.get('photo'), None):
                                         dish['photo'] = ''
                                         section_cleaned += 1
                                         blocks_updated = True
                                 mf = dish.get('menu_file_url') or dish.get('menu_file')
                                 if isinstance(mf, str) and _is_file_field(mf):
-                                    if not _file_exists(mf, None):
+                                    if not lookup.exists(mf, None):
                                         # не удаляем ключ, просто очищаем
                                         if 'menu_file_url' in dish:
                                             dish['menu_file_url'] = ''
@@ -1718,7 +1979,7 @@ def _clean_section_files(section):
                 if btype in ('daily-dish',):
                     dish = b.get('dish')
                     if isinstance(dish, dict) and isinstance(dish.get('photo'), str) and _is_file_field(dish.get('photo')):
-                        if not _file_exists(dish.get('photo'), None):
+                        if not lookup.exists(dish.get('photo'), None):
                             dish['photo'] = ''
                             section_cleaned += 1
                             blocks_updated = True
@@ -1729,7 +1990,7 @@ def _clean_section_files(section):
                     if isinstance(persons, list):
                         for p in persons:
                             if isinstance(p, dict) and isinstance(p.get('photo'), str) and _is_file_field(p.get('photo')):
-                                if not _file_exists(p.get('photo'), None):
+                                if not lookup.exists(p.get('photo'), None):
                                     p['photo'] = ''
                                     section_cleaned += 1
                                     blocks_updated = True
@@ -2056,9 +2317,9 @@ def force_cleanup():
                                         
                                         if file_exists:
                                             valid_urls.append(file_url)
-                                            logger.debug(f"Файл существует: {filename}")
+                                            logger.debug("Файл существует: %s", filename)
                                         else:
-                                            logger.debug(f"Файл не найден: {filename}")
+                                            logger.debug("Файл не найден: %s", filename)
                                             total_cleaned += 1
                                     else:
                                         valid_urls.append(file_url)
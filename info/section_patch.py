@@ -0,0 +1,184 @@
+"""
+Сохранение мастеров разделов патчами с проверкой версии
+
+Мастер отправляет JSON только с измененными полями каждого раздела и версией,
+с которой он начинал редактирование:
+
+    {"sections": {
+        "<endpoint>": {
+            "version": 3,              # версия из GET /section/<endpoint> (0 — новый раздел)
+            "title": "...",            # необязательно
+            "text": "...",             # необязательно
+            "content_blocks": [...],   # необязательно, список блоков целиком
+            "fields": {"key": "..."},  # измененные ключи form_data
+            "unset": ["key"]           # удаленные ключи form_data
+        }
+    }}
+
+Все разделы запроса загружаются одним запросом (endpoint IN (...)) и
+сохраняются в одной транзакции. Если версия хотя бы одного раздела устарела
+(его успели сохранить в другой вкладке или другим пользователем), не
+сохраняется ничего и возвращается 409 с текущими версиями разделов.
+"""
+
+import json
+
+from flask import jsonify
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from database import db
+from utils.logger import logger
+from .models import InfoSection
+
+
+# Ключи патча раздела; остальные ключи считаются ошибкой формата
+PATCH_KEYS = {'version', 'title', 'text', 'content_blocks', 'fields', 'unset'}
+
+
+class SectionConflict(Exception):
+    """Версия раздела изменилась с момента загрузки мастера"""
+
+    def __init__(self, conflicts):
+        super().__init__('Раздел был изменен после загрузки мастера')
+        self.conflicts = conflicts
+
+
+def load_sections(endpoints):
+    """Разделы по списку endpoint одним запросом: словарь endpoint -> InfoSection"""
+    endpoints = list(endpoints)
+    if not endpoints:
+        return {}
+    rows = InfoSection.query.filter(InfoSection.endpoint.in_(endpoints)).all()
+    return {section.endpoint: section for section in rows}
+
+
+def read_text_data(section):
+    """Содержимое поля text раздела: {'text': ..., 'form_data': {...}}"""
+    try:
+        data = json.loads(section.text) if section is not None and section.text else {}
+    except (TypeError, ValueError):
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    if not isinstance(data.get('form_data'), dict):
+        data['form_data'] = {}
+    return data
+
+
+def patched_form_data(form_data, patch, clean_value=None):
+    """Копия form_data с примененными fields и unset патча"""
+    result = dict(form_data or {})
+    for key, value in (patch.get('fields') or {}).items():
+        result[key] = clean_value(key, value) if clean_value else value
+    for key in patch.get('unset') or []:
+        result.pop(key, None)
+    return result
+
+
+def _validate_patches(payload):
+    """Проверяет формат запроса; возвращает словарь endpoint -> патч или текст ошибки"""
+    sections = payload.get('sections') if isinstance(payload, dict) else None
+    if not isinstance(sections, dict) or not sections:
+        return None, 'Данные мастера не получены'
+    for endpoint, patch in sections.items():
+        if not endpoint or not isinstance(patch, dict):
+            return None, f'Некорректные данные раздела {endpoint!r}'
+        unknown = set(patch) - PATCH_KEYS
+        if unknown:
+            return None, f'Неизвестные поля раздела {endpoint}: {", ".join(sorted(unknown))}'
+        version = patch.get('version')
+        if not isinstance(version, int) or isinstance(version, bool) or version < 0:
+            return None, f'Не указана версия раздела {endpoint}'
+        if not isinstance(patch.get('fields', {}), dict) or not isinstance(patch.get('unset', []), list):
+            return None, f'Некорректные поля раздела {endpoint}'
+        if 'content_blocks' in patch and not isinstance(patch['content_blocks'], list):
+            return None, f'Некорректные блоки раздела {endpoint}'
+    return sections, None
+
+
+def _apply_all(patches, apply_patch, create_section):
+    """Применяет патчи в текущей транзакции; возвращает новые версии разделов"""
+    sections = load_sections(patches)
+
+    conflicts = {}
+    for endpoint, patch in patches.items():
+        section = sections.get(endpoint)
+        current = section.version if section is not None else 0
+        if patch['version'] != current:
+            conflicts[endpoint] = current
+    if conflicts:
+        raise SectionConflict(conflicts)
+
+    versions = {}
+    for endpoint, patch in patches.items():
+        section = sections.get(endpoint)
+        if section is None:
+            section = create_section(endpoint, patch)
+            section.version = 1
+            db.session.add(section)
+            versions[endpoint] = 1
+            continue
+
+        # Сравнение с заменой: другой воркер мог сохранить раздел между
+        # загрузкой строк и этим UPDATE
+        base = patch['version']
+        result = db.session.execute(
+            update(InfoSection)
+            .where(InfoSection.id == section.id, InfoSection.version == base)
+            .values(version=base + 1)
+            .execution_options(synchronize_session='evaluate')
+        )
+        if result.rowcount != 1:
+            db.session.rollback()
+            current = db.session.query(InfoSection.version).filter_by(id=section.id).scalar()
+            raise SectionConflict({endpoint: current or 0})
+        apply_patch(section, patch)
+        versions[endpoint] = base + 1
+    return versions
+
+
+def save_section_patches(payload, apply_patch, create_section, save_single=False):
+    """
+    Сохраняет патчи разделов одной транзакцией.
+
+    Args:
+        payload: JSON запроса ({"sections": {...}, "save_single": bool})
+        apply_patch: функция(section, patch), применяющая патч к существующему разделу
+        create_section: функция(endpoint, patch) -> новый InfoSection
+        save_single: сохраняется один шаг мастера (влияет только на текст сообщения)
+
+    Returns:
+        Ответ Flask: 200 с новыми версиями, 400 при ошибке формата, 409 при конфликте версий
+    """
+    patches, error = _validate_patches(payload)
+    if error:
+        return jsonify({'success': False, 'error': error}), 400
+
+    try:
+        versions = _apply_all(patches, apply_patch, create_section)
+        db.session.commit()
+    except SectionConflict as e:
+        db.session.rollback()
+        logger.info(f"Конфликт версий при сохранении мастера: {e.conflicts}")
+        return jsonify({
+            'success': False,
+            'error': 'Раздел был изменен в другом окне или другим пользователем. Обновите страницу мастера.',
+            'conflicts': e.conflicts,
+        }), 409
+    except IntegrityError:
+        # Новый раздел с тем же endpoint успели создать параллельно
+        db.session.rollback()
+        current = {endpoint: section.version for endpoint, section in load_sections(patches).items()}
+        return jsonify({
+            'success': False,
+            'error': 'Раздел был создан в другом окне или другим пользователем. Обновите страницу мастера.',
+            'conflicts': current,
+        }), 409
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Ошибка сохранения патчей мастера: {e}", exc_info=True)
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+    message = 'Шаг успешно сохранен' if save_single else 'Все данные успешно сохранены'
+    return jsonify({'success': True, 'message': message, 'versions': versions})
@@ -0,0 +1,90 @@
+"""
+Таблица маршрутов динамических разделов InfoSection в памяти процесса
+
+Два словаря: url -> id раздела и endpoint -> (id, канонический url). Строятся
+одним запросом при первом обращении и перестраиваются по тегу 'sections' шины
+utils/invalidation.py после коммита, в котором раздел был создан, изменен или
+удален (в других воркерах — при следующем опросе журнала шины).
+SECTION_URL_MAP_TTL_SECONDS ограничивает возраст таблицы, если шина отключена.
+
+Используется обработчиком 404 и /p/<slug>: запрос на несуществующий URL
+(например, /wp-login.php от ботов) стоит одного промаха по словарю вместо
+двух SQL-запросов.
+"""
+
+import threading
+import time
+
+from database import db
+from utils.invalidation import invalidation
+from utils.logger import logger
+
+
+DEFAULT_TTL_SECONDS = 30
+
+
+class SectionUrlMap:
+    """Соответствие url/endpoint -> раздел для всех InfoSection"""
+
+    def __init__(self, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._tables = None
+        self._built_at = 0.0
+
+    def init_app(self, app):
+        """Читает TTL из конфигурации и подписывается на изменения InfoSection"""
+        self.ttl_seconds = app.config.get('SECTION_URL_MAP_TTL_SECONDS', self.ttl_seconds)
+        invalidation.subscribe(('sections',), lambda tags: self.invalidate())
+
+    def section_id_for_url(self, url):
+        """id раздела с данным url или None"""
+        by_url, _ = self._get_tables()
+        return by_url.get(url) if url else None
+
+    def lookup_endpoint(self, endpoint):
+        """(id, url) раздела с данным endpoint или None"""
+        _, by_endpoint = self._get_tables()
+        return by_endpoint.get(endpoint) if endpoint else None
+
+    def invalidate(self):
+        """Сбрасывает таблицу (следующее обращение перестроит ее из БД)"""
+        self._tables = None
+
+    def _get_tables(self):
+        tables = self._tables
+        if tables is not None and time.monotonic() - self._built_at < self.ttl_seconds:
+            return tables
+        with self._lock:
+            if self._tables is not None and time.monotonic() - self._built_at < self.ttl_seconds:
+                return self._tables
+            tables = _build_tables()
+            if tables is None:
+                return {}, {}
+            self._tables = tables
+            self._built_at = time.monotonic()
+            return tables
+
+
+def _build_tables():
+    """Строит словари одним запросом; None — если БД недоступна"""
+    # Lazy import to avoid circular imports at module load time
+    from info.models import InfoSection
+
+    try:
+        rows = db.session.query(InfoSection.id, InfoSection.endpoint, InfoSection.url).all()
+    except Exception as e:
+        logger.warning(f'Не удалось построить таблицу URL разделов: {e}')
+        return None
+
+    by_url = {}
+    by_endpoint = {}
+    for section_id, endpoint, url in rows:
+        if url and url not in by_url:
+            by_url[url] = section_id
+        if endpoint:
+            by_endpoint[endpoint] = (section_id, url)
+    return by_url, by_endpoint
+
+
+section_url_map = SectionUrlMap()
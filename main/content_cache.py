@@ -0,0 +1,207 @@
+"""
+Кэш данных публичных страниц main: PageContent и ленты главной страницы
+
+PageContent: JSON разбирается и нормализуется один раз на процесс и
+сбрасывается по тегу 'page:<page_key>' шины utils/invalidation.py (в других
+воркерах — при следующем опросе журнала шины). Если шина не передает теги
+между воркерами (INVALIDATION_SHARED=0) или журнал шины не читается
+(invalidation.healthy ложно), на каждый запрос сверяется updated_at.
+
+Ленты новостей и объявлений главной страницы хранятся как легкие снимки
+(без ORM-объектов) и перечитываются по тегам 'news'/'announcements' (изменены
+новости, объявления или их файлы), по истечении HOME_FEED_TTL_SECONDS или в
+момент публикации отложенной записи.
+
+Возвращаемые словари и списки общие для всех запросов — их нельзя изменять.
+"""
+
+import json
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import func, desc
+
+from database import db
+from models.models import News, Announcement, File, PageContent
+from utils.invalidation import invalidation
+from .page_defaults import PAGE_DEFAULTS, DEFAULT_BLOCK_ORDER
+
+
+DEFAULT_FEED_TTL_SECONDS = 60
+
+FeedItem = namedtuple('FeedItem', ['id', 'title', 'is_featured', 'publication_date', 'created_at', 'preview_url'])
+
+# Лента: модель, внешний ключ в File, фильтр URL файла, число записей на главной
+_FEEDS = {
+    'news': (News, 'news_id', 'news_file_url', 12),
+    'announcements': (Announcement, 'announcement_id', 'announcement_file_url', 3),
+}
+
+
+def _normalize_index(data):
+    """Совместимость со старыми данными главной: header_tagline и блок slider"""
+    if 'header_tags' not in data and data.get('header_tagline'):
+        data['header_tags'] = [t.strip() for t in data['header_tagline'].split('•') if t.strip()]
+    block_order = data.get('block_order', DEFAULT_BLOCK_ORDER)
+    if isinstance(block_order, list) and 'slider' not in block_order:
+        if 'header' in block_order:
+            idx = block_order.index('header') + 1
+            block_order = block_order[:idx] + ['slider'] + block_order[idx:]
+        else:
+            block_order = ['slider'] + block_order
+        data['block_order'] = block_order
+    return data
+
+
+_NORMALIZERS = {
+    'index': _normalize_index,
+}
+
+
+def _parse_content(page_key, content):
+    data = {}
+    if content:
+        try:
+            data = json.loads(content)
+        except (TypeError, ValueError):
+            data = {}
+    if not isinstance(data, dict):
+        data = {}
+    normalize = _NORMALIZERS.get(page_key)
+    return normalize(data) if normalize else data
+
+
+class PageContentCache:
+    """Разобранный контент PageContent, ключ версии — updated_at"""
+
+    def __init__(self):
+        self._entries = {}
+        self._defaults = {}
+        self.check_version = True
+
+    def init_app(self, app):
+        """Подписывается на теги 'page:*'; без общего журнала шины всегда сверяет updated_at"""
+        self.check_version = not app.config.get('INVALIDATION_SHARED', True)
+        invalidation.subscribe(('page:*',), self._invalidate_tags)
+
+    def get(self, page_key):
+        """
+        Контент страницы для публичного показа (без записи в БД).
+
+        Если записи нет (миграции еще не применены), возвращаются значения
+        по умолчанию из PAGE_DEFAULTS.
+        """
+        entry = self._entries.get(page_key)
+        if entry is not None and not self.check_version and invalidation.healthy:
+            return entry[1]
+
+        version_row = db.session.query(PageContent.updated_at).filter_by(page_key=page_key).first()
+        if version_row is None:
+            return self._get_defaults(page_key)
+
+        if entry is not None and version_row[0] is not None and entry[0] == version_row[0]:
+            return entry[1]
+
+        row = db.session.query(PageContent.updated_at, PageContent.content).filter_by(page_key=page_key).first()
+        if row is None:
+            return self._get_defaults(page_key)
+        data = _parse_content(page_key, row.content)
+        if row.updated_at is not None:
+            self._entries[page_key] = (row.updated_at, data)
+        return data
+
+    def invalidate(self):
+        self._entries = {}
+
+    def _invalidate_tags(self, tags):
+        if '*' in tags:
+            self.invalidate()
+            return
+        for tag in tags:
+            self._entries.pop(tag.split(':', 1)[1], None)
+
+    def _get_defaults(self, page_key):
+        data = self._defaults.get(page_key)
+        if data is None:
+            data = _parse_content(page_key, json.dumps(PAGE_DEFAULTS.get(page_key, {}), ensure_ascii=False))
+            self._defaults[page_key] = data
+        return data
+
+
+class HomeFeedCache:
+    """Последние новости и объявления для главной страницы"""
+
+    def __init__(self, ttl_seconds=DEFAULT_FEED_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._feeds = {}
+
+    def init_app(self, app):
+        """Читает TTL из конфигурации и подписывается на изменения новостей и объявлений"""
+        self.ttl_seconds = app.config.get('HOME_FEED_TTL_SECONDS', self.ttl_seconds)
+        invalidation.subscribe(('news', 'announcements'), lambda tags: self.invalidate())
+
+    def news(self):
+        return self._get('news')
+
+    def announcements(self):
+        return self._get('announcements')
+
+    def invalidate(self):
+        self._feeds = {}
+
+    def _get(self, name):
+        entry = self._feeds.get(name)
+        if entry is not None and time.monotonic() < entry[0]:
+            return entry[1]
+        items, next_publication = _load_feed(*_FEEDS[name])
+        lifetime = self.ttl_seconds
+        if next_publication is not None:
+            lifetime = min(lifetime, max((next_publication - datetime.utcnow()).total_seconds(), 0))
+        if lifetime > 0:
+            self._feeds[name] = (time.monotonic() + lifetime, items)
+        return items
+
+
+def _load_feed(model, fk_name, url_filter, limit):
+    """
+    Снимок ленты и время ближайшей отложенной публикации.
+
+    URL превью (первое изображение записи) вычисляется здесь один раз:
+    фильтр шаблона ищет файл на диске и не должен вызываться на каждый рендер.
+    """
+    now = datetime.utcnow()
+    published_at = func.coalesce(model.publication_date, model.created_at)
+    rows = (db.session.query(model.id, model.title, model.is_featured, model.publication_date, model.created_at)
+                .filter(model.is_published.is_(True))
+                .filter(published_at <= now)
+                .order_by(desc(model.is_featured), desc(published_at))
+                .limit(limit)
+                .all())
+
+    previews = {}
+    ids = [row.id for row in rows]
+    if ids:
+        fk = getattr(File, fk_name)
+        for owner_id, filename in (db.session.query(fk, File.filename)
+                                       .filter(fk.in_(ids), File.kind == 'image')
+                                       .order_by(File.id)):
+            previews.setdefault(owner_id, filename)
+
+    file_url = current_app.jinja_env.filters[url_filter]
+    items = [
+        FeedItem(row.id, row.title, row.is_featured, row.publication_date, row.created_at,
+                 file_url(previews[row.id], row.id) if row.id in previews else None)
+        for row in rows
+    ]
+
+    next_publication = (db.session.query(func.min(published_at))
+                            .filter(model.is_published.is_(True))
+                            .filter(published_at > now)
+                            .scalar())
+    return items, next_publication
+
+
+page_contents = PageContentCache()
+home_feed = HomeFeedCache()
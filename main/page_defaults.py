@@ -0,0 +1,106 @@
+"""
+Содержимое редактируемых страниц по умолчанию (PageContent)
+
+Записи создаются миграцией при установке; публичные страницы используют эти
+значения только если записи в БД нет, и ничего не сохраняют.
+"""
+
+DEFAULT_BLOCK_ORDER = ['header', 'slider', 'announcements', 'news', 'school_info', 'directions', 'events_achievements']
+
+PAGE_DEFAULTS = {
+    'index': {
+        'block_order': list(DEFAULT_BLOCK_ORDER),
+        'slider_images': [],
+        'header_title': 'МБОУ "ИТ Гимназия "Юнона"',
+        'header_subtitle': 'при ВИТИ НИЯУ МИФИ г. Волгодонска',
+        'header_tags': ['🚀 Инновационное образование', '💻 IT-технологии', '🔬 Научные исследования'],
+        'achievements': [
+            'Победители и призёры олимпиад',
+            'Участники всероссийских конкурсов',
+            'Высокие результаты ЕГЭ и ОГЭ'
+        ],
+        'it_infrastructure': [
+            'Собственная IT-лаборатория',
+            'Современный медиацентр',
+            'Цифровые образовательные ресурсы'
+        ],
+        'teachers': [
+            'Профессиональный коллектив',
+            'Высшая квалификационная категория',
+            'Постоянное повышение квалификации'
+        ],
+        'partnership': [
+            'ВИТИ НИЯУ МИФИ',
+            'Ведущие IT-компании',
+            'Научно-исследовательские центры'
+        ],
+        'directions': [
+            {'title': 'IT-Направление', 'desc': 'Программирование, веб-разработка, кибербезопасность, искусственный интеллект'},
+            {'title': 'Естественные науки', 'desc': 'Физика, химия, биология, математика с углублённым изучением'},
+            {'title': 'Гуманитарные науки', 'desc': 'Русский язык, литература, история, обществознание'},
+            {'title': 'Творческое развитие', 'desc': 'Искусство, музыка, театр, медиа-творчество'}
+        ],
+        'events': [
+            {'date': 'Сентябрь 2024', 'text': 'Начало нового учебного года'},
+            {'date': 'Октябрь 2024', 'text': 'IT-конференция для учащихся'},
+            {'date': 'Ноябрь 2024', 'text': 'Научно-практическая конференция'},
+            {'date': 'Декабрь 2024', 'text': 'Новогодний IT-фестиваль'}
+        ],
+        'achievements_list': [
+            '🥇 1 место в региональной олимпиаде по программированию',
+            '🥈 2 место в конкурсе "IT-проект года"',
+            '🥉 3 место в научно-технической конференции',
+            '⭐ Сертификация по кибербезопасности'
+        ],
+        'partners': [
+            'ВИТИ НИЯУ МИФИ',
+            'IT-компании региона',
+            'Научные центры'
+        ]
+    },
+    'contacts': {
+        'address': '347389, Ростовская обл, Волгодонск, ул. К.Маркса, 64А',
+        'phone': '8 (8639) 27-97-76',
+        'email': 'junona@rostovschool.ru',
+        'work_hours': 'Пн-Пт 8:00–17:00'
+    },
+    'info': {
+        'parent_links': [
+            {'text': 'Расписание занятий', 'url': '/schedule'},
+            {'text': 'Электронный дневник', 'url': 'https://dnevnik.ru'},
+            {'text': 'Питание в школе', 'url': '/sveden/catering'}
+        ],
+        'student_links': [
+            {'text': 'Кружки и секции', 'url': '/clubs'},
+            {'text': 'Олимпиады и конкурсы', 'url': '/olympiads'},
+            {'text': 'Библиотека', 'url': '/library'}
+        ],
+        'document_links': [
+            {'text': 'Устав образовательной организации', 'url': '/sveden/document'},
+            {'text': 'Лицензия на осуществление образовательной деятельности', 'url': '/sveden/document'},
+            {'text': 'Локальные нормативные акты', 'url': '/sveden/document'}
+        ],
+        'contact_address': 'Адрес: ул. К.Маркса, 64А, Волгодонск',
+        'contact_phone': 'Телефон: 8 (8639) 27-97-76',
+        'contact_email': 'junona@rostovschool.ru',
+        'resource_links': [
+            {'text': 'Министерство просвещения РФ', 'url': 'https://edu.gov.ru'},
+            {'text': 'Федеральный портал "Российское образование"', 'url': 'http://www.edu.ru'},
+            {'text': 'Единое окно доступа к образовательным ресурсам', 'url': 'http://window.edu.ru'}
+        ],
+        'staff_links': [
+            {'text': 'Электронный журнал', 'url': 'https://elj.ru'},
+            {'text': 'Методические материалы', 'url': '/methodology'},
+            {'text': 'Повышение квалификации', 'url': '/professional-development'}
+        ]
+    },
+    'about': {
+        'history': 'Гимназия "Юнона" основана в 1995 году. За годы работы школа стала одним из лидеров в области IT-образования в регионе.',
+        'mission': 'Создание условий для развития талантов, воспитание патриотизма, формирование современных компетенций у учащихся.',
+        'achievements': [
+            'Победы в региональных и всероссийских олимпиадах',
+            'Участие в международных проектах',
+            'Собственная IT-лаборатория и медиацентр'
+        ]
+    },
+}
@@ -2,10 +2,10 @@ from flask import render_template, request, redirect, url_for, flash, jsonify, a
 from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
 from . import main_bp
-from models.models import News, Announcement, PageContent
+from models.models import PageContent
+from .content_cache import page_contents, home_feed
 from database import db
 from datetime import datetime
-from sqlalchemy import func, desc
 import json
 import re
 import os
@@ -58,87 +58,13 @@ def _make_unique_info_endpoint(base_endpoint: str) -> str:
 
 @main_bp.route('/')
 def index():
-    now = datetime.utcnow()
-    news_dt = func.coalesce(News.publication_date, News.created_at)
-    ann_dt = func.coalesce(Announcement.publication_date, Announcement.created_at)
-    news = (News.query
-                .filter(News.is_published.is_(True))
-                .filter(news_dt <= now)
-                .order_by(desc(News.is_featured), desc(news_dt))
-                .limit(12)
-                .all())
-    announcements = (Announcement.query
-                        .filter(Announcement.is_published.is_(True))
-                        .filter(ann_dt <= now)
-                        .order_by(desc(Announcement.is_featured), desc(ann_dt))
-                        .limit(3)
-                        .all())
-    
-    # Получаем редактируемый контент главной страницы
-    default_block_order = ['header', 'slider', 'announcements', 'news', 'school_info', 'directions', 'events_achievements']
-    page_content = PageContent.get_or_create('index', {
-        'block_order': default_block_order,
-        'slider_images': [],
-        'header_title': 'МБОУ "ИТ Гимназия "Юнона"',
-        'header_subtitle': 'при ВИТИ НИЯУ МИФИ г. Волгодонска',
-        'header_tags': ['🚀 Инновационное образование', '💻 IT-технологии', '🔬 Научные исследования'],
-        'achievements': [
-            'Победители и призёры олимпиад',
-            'Участники всероссийских конкурсов',
-            'Высокие результаты ЕГЭ и ОГЭ'
-        ],
-        'it_infrastructure': [
-            'Собственная IT-лаборатория',
-            'Современный медиацентр',
-            'Цифровые образовательные ресурсы'
-        ],
-        'teachers': [
-            'Профессиональный коллектив',
-            'Высшая квалификационная категория',
-            'Постоянное повышение квалификации'
-        ],
-        'partnership': [
-            'ВИТИ НИЯУ МИФИ',
-            'Ведущие IT-компании',
-            'Научно-исследовательские центры'
-        ],
-        'directions': [
-            {'title': 'IT-Направление', 'desc': 'Программирование, веб-разработка, кибербезопасность, искусственный интеллект'},
-            {'title': 'Естественные науки', 'desc': 'Физика, химия, биология, математика с углублённым изучением'},
-            {'title': 'Гуманитарные науки', 'desc': 'Русский язык, литература, история, обществознание'},
-            {'title': 'Творческое развитие', 'desc': 'Искусство, музыка, театр, медиа-творчество'}
-        ],
-        'events': [
-            {'date': 'Сентябрь 2024', 'text': 'Начало нового учебного года'},
-            {'date': 'Октябрь 2024', 'text': 'IT-конференция для учащихся'},
-            {'date': 'Ноябрь 2024', 'text': 'Научно-практическая конференция'},
-            {'date': 'Декабрь 2024', 'text': 'Новогодний IT-фестиваль'}
-        ],
-        'achievements_list': [
-            '🥇 1 место в региональной олимпиаде по программированию',
-            '🥈 2 место в конкурсе "IT-проект года"',
-            '🥉 3 место в научно-технической конференции',
-            '⭐ Сертификация по кибербезопасности'
-        ],
-        'partners': [
-            'ВИТИ НИЯУ МИФИ',
-            'IT-компании региона',
-            'Научные центры'
-        ]
-    })
-    
-    content_data = page_content.get_content()
-    if 'header_tags' not in content_data and content_data.get('header_tagline'):
-        content_data['header_tags'] = [t.strip() for t in content_data['header_tagline'].split('•') if t.strip()]
-    block_order = content_data.get('block_order', default_block_order)
-    if isinstance(block_order, list) and 'slider' not in block_order:
-        if 'header' in block_order:
-            idx = block_order.index('header') + 1
-            block_order = block_order[:idx] + ['slider'] + block_order[idx:]
-        else:
-            block_order = ['slider'] + block_order
-        content_data['block_order'] = block_order
-    return render_template('main/index.html', news=news, announcements=announcements, page_content=content_data)
+    # Только чтение: контент и ленты берутся из кэша процесса, записи создает миграция
+    return render_template(
+        'main/index.html',
+        news=home_feed.news(),
+        announcements=home_feed.announcements(),
+        page_content=page_contents.get('index'),
+    )
 
 
 ALLOWED_SLIDER_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif', 'webp'}
@@ -176,13 +102,7 @@ def slider_upload():
 
 @main_bp.route('/contacts')
 def contacts():
-    page_content = PageContent.get_or_create('contacts', {
-        'address': '347389, Ростовская обл, Волгодонск, ул. К.Маркса, 64А',
-        'phone': '8 (8639) 27-97-76',
-        'email': 'junona@rostovschool.ru',
-        'work_hours': 'Пн-Пт 8:00–17:00'
-    })
-    content_data = page_content.get_content()
+    content_data = page_contents.get('contacts')
     return render_template('main/contacts.html', page_content=content_data)
 
 @main_bp.route('/search')
@@ -195,51 +115,12 @@ def sitemap():
 
 @main_bp.route('/info')
 def info():
-    page_content = PageContent.get_or_create('info', {
-        'parent_links': [
-            {'text': 'Расписание занятий', 'url': '/schedule'},
-            {'text': 'Электронный дневник', 'url': 'https://dnevnik.ru'},
-            {'text': 'Питание в школе', 'url': '/sveden/catering'}
-        ],
-        'student_links': [
-            {'text': 'Кружки и секции', 'url': '/clubs'},
-            {'text': 'Олимпиады и конкурсы', 'url': '/olympiads'},
-            {'text': 'Библиотека', 'url': '/library'}
-        ],
-        'document_links': [
-            {'text': 'Устав образовательной организации', 'url': '/sveden/document'},
-            {'text': 'Лицензия на осуществление образовательной деятельности', 'url': '/sveden/document'},
-            {'text': 'Локальные нормативные акты', 'url': '/sveden/document'}
-        ],
-        'contact_address': 'Адрес: ул. К.Маркса, 64А, Волгодонск',
-        'contact_phone': 'Телефон: 8 (8639) 27-97-76',
-        'contact_email': 'junona@rostovschool.ru',
-        'resource_links': [
-            {'text': 'Министерство просвещения РФ', 'url': 'https://edu.gov.ru'},
-            {'text': 'Федеральный портал "Российское образование"', 'url': 'http://www.edu.ru'},
-            {'text': 'Единое окно доступа к образовательным ресурсам', 'url': 'http://window.edu.ru'}
-        ],
-        'staff_links': [
-            {'text': 'Электронный журнал', 'url': 'https://elj.ru'},
-            {'text': 'Методические материалы', 'url': '/methodology'},
-            {'text': 'Повышение квалификации', 'url': '/professional-development'}
-        ]
-    })
-    content_data = page_content.get_content()
+    content_data = page_contents.get('info')
     return render_template('main/info.html', page_content=content_data)
 
 @main_bp.route('/about')
 def about():
-    page_content = PageContent.get_or_create('about', {
-        'history': 'Гимназия "Юнона" основана в 1995 году. За годы работы школа стала одним из лидеров в области IT-образования в регионе.',
-        'mission': 'Создание условий для развития талантов, воспитание патриотизма, формирование современных компетенций у учащихся.',
-        'achievements': [
-            'Победы в региональных и всероссийских олимпиадах',
-            'Участие в международных проектах',
-            'Собственная IT-лаборатория и медиацентр'
-        ]
-    })
-    content_data = page_content.get_content()
+    content_data = page_contents.get('about')
     return render_template('main/about.html', page_content=content_data)
 
 @main_bp.route('/p/<path:slug>')
@@ -260,11 +141,19 @@ def public_page(slug):
     endpoint_base = f"page-{slug_norm.replace('/', '-')}"
     endpoint_base = endpoint_base[:100]
 
-    section = InfoSection.query.filter_by(url=url).first()
+    # Поиск через таблицу маршрутов: несуществующая страница не стоит запросов к БД
+    from info.url_map import section_url_map
+
+    section = None
+    section_id = section_url_map.section_id_for_url(url)
+    if section_id:
+        section = db.session.get(InfoSection, section_id)
     if not section:
         # Фолбэк: если страницу уже создали по endpoint, но URL отличается — подцепим её и обновим URL.
-        section = InfoSection.query.filter_by(endpoint=endpoint_base).first()
-        if section and section.url != url:
+        entry = section_url_map.lookup_endpoint(endpoint_base)
+        section = db.session.get(InfoSection, entry[0]) if entry else None
+        # URL исправляет только редактор: GET посетителя не пишет в БД
+        if section and section.url != url and current_user.is_authenticated:
             try:
                 section.url = url
                 db.session.commit()
@@ -302,14 +191,15 @@ def public_page(slug):
                 def get_content_blocks(self):
                     return []
 
+                def block_file_names(self, kind):
+                    return []
+
             title = slug_norm.split('/')[-1].replace('-', ' ').title()
             section = TempSection(endpoint_base, title or 'Страница', url)
 
     today = datetime.now().strftime('%d.%m.%Y')
+    # Cache-Control выставляет utils.http_cache: public для анонимных, no-store для редакторов
     response = make_response(render_template('info/section.html', section=section, children=[], today=today))
-    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-    response.headers['Pragma'] = 'no-cache'
-    response.headers['Expires'] = '0'
     return response
 
 
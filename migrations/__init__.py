@@ -0,0 +1,24 @@
+"""
+Версионные миграции схемы базы данных
+
+Миграции выполняются один раз до запуска воркеров (flask db-upgrade в
+pre-start/release), а create_app только сверяет номер версии в таблице
+schema_version. Новые миграции добавляются в конец списка MIGRATIONS
+в migrations/versions.py.
+"""
+
+from .runner import (
+    SCHEMA_VERSION_TABLE,
+    get_current_version,
+    get_head_version,
+    check_schema_version,
+    upgrade,
+)
+
+__all__ = [
+    'SCHEMA_VERSION_TABLE',
+    'get_current_version',
+    'get_head_version',
+    'check_schema_version',
+    'upgrade',
+]
@@ -0,0 +1,140 @@
+"""
+Исполнитель миграций: таблица schema_version, блокировка и применение по порядку
+"""
+
+from datetime import datetime
+
+import sqlalchemy as sa
+
+from database import db
+from utils.logger import logger
+
+
+SCHEMA_VERSION_TABLE = 'schema_version'
+
+# Ключ advisory-блокировки PostgreSQL для миграций (произвольная константа)
+_PG_LOCK_KEY = 7_310_031
+
+_metadata = sa.MetaData()
+schema_version = sa.Table(
+    SCHEMA_VERSION_TABLE,
+    _metadata,
+    sa.Column('version', sa.Integer, primary_key=True, autoincrement=False),
+    sa.Column('name', sa.String(100), nullable=False),
+    sa.Column('applied_at', sa.DateTime, nullable=False),
+)
+
+
+def _migrations():
+    # Lazy import to avoid circular imports at module load time
+    from migrations.versions import MIGRATIONS
+    return MIGRATIONS
+
+
+def get_head_version():
+    """Номер последней известной миграции"""
+    migrations = _migrations()
+    return migrations[-1].version if migrations else 0
+
+
+def get_current_version(bind=None):
+    """Номер последней примененной миграции (0 — схема еще не версионирована)"""
+    bind = bind or db.engine
+    # Один запрос на старте воркера; inspect нужен только если таблицы еще нет
+    try:
+        with bind.connect() as conn:
+            return conn.execute(sa.select(sa.func.max(schema_version.c.version))).scalar() or 0
+    except (sa.exc.OperationalError, sa.exc.ProgrammingError):
+        if not sa.inspect(bind).has_table(SCHEMA_VERSION_TABLE):
+            return 0
+        raise
+
+
+def _applied_versions(conn):
+    return set(conn.execute(sa.select(schema_version.c.version)).scalars())
+
+
+def _lock(conn):
+    """
+    Сериализует параллельные запуски миграций (несколько воркеров или хостов).
+
+    PostgreSQL — транзакционная advisory-блокировка; SQLite — BEGIN IMMEDIATE,
+    который сразу берет блокировку записи, так что вторая копия ждет busy_timeout.
+    """
+    dialect = conn.dialect.name
+    if dialect == 'postgresql':
+        conn.execute(sa.text('SELECT pg_advisory_xact_lock(:key)'), {'key': _PG_LOCK_KEY})
+    elif dialect == 'sqlite':
+        conn.exec_driver_sql('BEGIN IMMEDIATE')
+
+
+def upgrade(target=None, bind=None):
+    """
+    Применяет недостающие миграции по порядку.
+
+    Каждая миграция выполняется в своей транзакции вместе с записью в
+    schema_version; уже примененные версии перепроверяются под блокировкой.
+
+    Args:
+        target: Номер версии, до которой обновлять (по умолчанию — последняя)
+        bind: Движок (по умолчанию db.engine)
+
+    Returns:
+        Список примененных миграций (version, name)
+    """
+    engine = bind or db.engine
+    _metadata.create_all(engine, checkfirst=True)
+
+    applied = []
+    for migration in _migrations():
+        if target is not None and migration.version > target:
+            break
+        with engine.begin() as conn:
+            _lock(conn)
+            if migration.version in _applied_versions(conn):
+                continue
+            logger.info(f'Применение миграции {migration.version:04d}_{migration.name}')
+            migration.apply(conn)
+            conn.execute(schema_version.insert().values(
+                version=migration.version,
+                name=migration.name,
+                applied_at=datetime.utcnow(),
+            ))
+        applied.append((migration.version, migration.name))
+    return applied
+
+
+def check_schema_version(app):
+    """
+    Проверка версии схемы при старте приложения.
+
+    Выполняет только чтение номера версии. Если схема отстает, миграции
+    применяются при AUTO_MIGRATE, иначе в лог пишется предупреждение.
+
+    Returns:
+        Текущая версия схемы или None, если БД недоступна
+    """
+    try:
+        current = get_current_version()
+    except Exception as e:
+        logger.warning(f'Не удалось прочитать версию схемы БД: {e}')
+        return None
+
+    head = get_head_version()
+    if current >= head:
+        return current
+
+    if app.config.get('AUTO_MIGRATE', True):
+        try:
+            applied = upgrade()
+            if applied:
+                logger.info(f'Схема БД обновлена до версии {head} (миграций: {len(applied)})')
+            return head
+        except Exception as e:
+            logger.error(f'Ошибка применения миграций: {e}')
+            return current
+
+    logger.warning(
+        f'Схема БД устарела: версия {current}, требуется {head}. Выполните "flask --app app db-upgrade"'
+    )
+    return current
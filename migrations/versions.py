@@ -0,0 +1,362 @@
+"""
+Список миграций схемы и начальных данных
+
+Каждая миграция — функция(conn), выполняемая в транзакции вместе с записью
+в schema_version. Миграции должны быть идемпотентными: базы, созданные до
+появления schema_version, проходят их с версии 0.
+"""
+
+import json
+from collections import namedtuple
+from datetime import datetime
+
+import sqlalchemy as sa
+
+from database import db, add_missing_columns
+
+
+Migration = namedtuple('Migration', ['version', 'name', 'apply'])
+
+
+# Таблицы в том виде, в каком их создают миграции. Миграции не берут схему из
+# живых моделей: колонка, добавленная в модель позже, попала бы в CREATE и
+# INSERT уже выпущенной миграции, которая выполняется до появления колонки в БД.
+_metadata = sa.MetaData()
+
+BASELINE_TABLES = (
+    sa.Table(
+        'news', _metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('title', sa.String(255), nullable=False),
+        sa.Column('content', sa.Text, nullable=False),
+        sa.Column('created_at', sa.DateTime),
+        sa.Column('publication_date', sa.DateTime, nullable=True),
+        sa.Column('is_featured', sa.Boolean),
+        sa.Column('is_published', sa.Boolean),
+        sa.Column('image', sa.String(255), nullable=True),
+    ),
+    sa.Table(
+        'announcement', _metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('title', sa.String(255), nullable=False),
+        sa.Column('content', sa.Text, nullable=False),
+        sa.Column('created_at', sa.DateTime),
+        sa.Column('publication_date', sa.DateTime, nullable=True),
+        sa.Column('is_featured', sa.Boolean),
+        sa.Column('is_published', sa.Boolean),
+        sa.Column('image', sa.String(255), nullable=True),
+    ),
+    sa.Table(
+        'file', _metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('filename', sa.String(255), nullable=False),
+        sa.Column('upload_date', sa.DateTime),
+        sa.Column('news_id', sa.Integer, sa.ForeignKey('news.id'), nullable=True),
+        sa.Column('announcement_id', sa.Integer, sa.ForeignKey('announcement.id'), nullable=True),
+        sa.Column('kind', sa.String(20)),
+        sa.Column('is_preview', sa.Boolean),
+    ),
+    sa.Table(
+        'info_file', _metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('filename', sa.String(255), nullable=False),
+        sa.Column('original_filename', sa.String(255), nullable=False),
+        sa.Column('file_path', sa.String(500), nullable=True),
+        sa.Column('section_endpoint', sa.String(100), nullable=False),
+        sa.Column('field_name', sa.String(100), nullable=True),
+        sa.Column('file_size', sa.Integer, nullable=False),
+        sa.Column('mime_type', sa.String(100), nullable=True),
+        sa.Column('is_image', sa.Boolean),
+        sa.Column('upload_date', sa.DateTime),
+        sa.Column('display_name', sa.String(255), nullable=True),
+        sa.Column('file_data', sa.LargeBinary, nullable=True),
+        sa.Column('stored_in_db', sa.Boolean),
+        sa.Column('content_hash', sa.String(64), nullable=True, index=True),
+    ),
+    sa.Table(
+        'page_content', _metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('page_key', sa.String(100), unique=True, nullable=False),
+        sa.Column('content', sa.Text),
+        sa.Column('updated_at', sa.DateTime),
+    ),
+    sa.Table(
+        'user', _metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('username', sa.String(150), unique=True, nullable=False),
+        sa.Column('password_hash', sa.String(256), nullable=False),
+        sa.Column('is_admin', sa.Boolean),
+    ),
+    sa.Table(
+        'info_section', _metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('endpoint', sa.String(100), unique=True, nullable=False),
+        sa.Column('url', sa.String(200), nullable=False),
+        sa.Column('title', sa.String(200), nullable=False),
+        sa.Column('text', sa.Text),
+        sa.Column('content_blocks', sa.Text),
+    ),
+)
+
+NUTRITION_MENU_TABLES = (
+    sa.Table(
+        'nutrition_menu', _metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('menu_date', sa.Date, unique=True, nullable=False, index=True),
+        sa.Column('filename', sa.String(255), nullable=False),
+        sa.Column('school', sa.String(255), nullable=True),
+        sa.Column('parsed_at', sa.DateTime),
+    ),
+    sa.Table(
+        'nutrition_menu_item', _metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('menu_id', sa.Integer, sa.ForeignKey('nutrition_menu.id'), nullable=False, index=True),
+        sa.Column('position', sa.Integer, nullable=False),
+        sa.Column('meal', sa.String(100), nullable=True),
+        sa.Column('section', sa.String(100), nullable=True),
+        sa.Column('recipe', sa.String(50), nullable=True),
+        sa.Column('dish', sa.String(500), nullable=False),
+        sa.Column('weight', sa.String(50), nullable=True),
+        sa.Column('price', sa.Float, nullable=True),
+        sa.Column('calories', sa.Float, nullable=True),
+        sa.Column('proteins', sa.Float, nullable=True),
+        sa.Column('fats', sa.Float, nullable=True),
+        sa.Column('carbohydrates', sa.Float, nullable=True),
+    ),
+)
+
+DAILY_DISH_TABLE = sa.Table(
+    'daily_dish', _metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('title', sa.String(255), nullable=False),
+    sa.Column('dish_date', sa.Date, nullable=True),
+    sa.Column('publish_date', sa.Date, nullable=True, index=True),
+    sa.Column('photo', sa.String(500), nullable=True),
+    sa.Column('menu_file_url', sa.String(500), nullable=True),
+    sa.Column('menu_file_name', sa.String(255), nullable=True),
+    sa.Column('created_at', sa.DateTime),
+)
+
+DELETION_JOB_TABLE = sa.Table(
+    'deletion_job', _metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('content_type', sa.String(20), nullable=False),
+    sa.Column('content_id', sa.Integer, nullable=False),
+    sa.Column('title', sa.String(255), nullable=True),
+    sa.Column('paths', sa.Text, nullable=False),
+    sa.Column('status', sa.String(20), nullable=False, index=True),
+    sa.Column('attempts', sa.Integer, nullable=False),
+    sa.Column('files_removed', sa.Integer, nullable=False),
+    sa.Column('bytes_freed', sa.BigInteger, nullable=False),
+    sa.Column('error', sa.Text, nullable=True),
+    sa.Column('created_at', sa.DateTime),
+    sa.Column('started_at', sa.DateTime, nullable=True),
+    sa.Column('finished_at', sa.DateTime, nullable=True),
+)
+
+CACHE_INVALIDATION_TABLE = sa.Table(
+    'cache_invalidation', _metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('tag', sa.String(200), nullable=False),
+    sa.Column('origin', sa.String(32), nullable=False),
+    sa.Column('created_at', sa.DateTime, index=True),
+    sqlite_autoincrement=True,
+)
+
+
+def _baseline(conn):
+    """Таблицы первых релизов и колонки, добавленные в info_file после них"""
+    existing = set(sa.inspect(conn).get_table_names())
+    if not existing & {table.name for table in BASELINE_TABLES}:
+        # Новая БД: сразу схема текущих моделей, следующие миграции только проверят ее
+        # Lazy import to avoid circular imports at module load time
+        import models.models  # noqa: F401
+        import info.models  # noqa: F401
+
+        db.metadata.create_all(bind=conn, checkfirst=True)
+        return
+
+    _metadata.create_all(bind=conn, tables=BASELINE_TABLES, checkfirst=True)
+    add_missing_columns(conn, 'info_file', [
+        ('file_data', db.LargeBinary(), None, False),
+        ('stored_in_db', db.Boolean(), True, False),
+        ('content_hash', db.String(64), None, True),
+    ])
+
+
+REQUIRED_SECTIONS = {
+    'education': {
+        'title': 'Образование',
+        'url': '/sveden/education',
+        'form_data': {
+            'title': 'Образование',
+            'implemented_programs': '',
+            'adapted_programs': '',
+            'curriculum_noo': '',
+            'curriculum_ooo': '',
+            'curriculum_soo': '',
+            'calendar_schedule': '',
+            'student_numbers_noo': '',
+            'student_numbers_ooo': '',
+            'student_numbers_soo': '',
+            'student_numbers_document': '',
+            'education_languages': '',
+            'professional_programs': '',
+            'graduate_employment': ''
+        }
+    }
+}
+
+
+def _required_sections(conn):
+    """Обязательные разделы, без которых не открываются страницы /sveden/*"""
+    table = sa.table(
+        'info_section',
+        sa.column('endpoint'), sa.column('title'), sa.column('url'), sa.column('text'), sa.column('content_blocks'),
+    )
+    existing = set(conn.execute(
+        sa.select(table.c.endpoint).where(table.c.endpoint.in_(list(REQUIRED_SECTIONS)))
+    ).scalars())
+    for endpoint, section_data in REQUIRED_SECTIONS.items():
+        if endpoint in existing:
+            continue
+        conn.execute(table.insert().values(
+            endpoint=endpoint,
+            title=section_data['title'],
+            url=section_data['url'],
+            text=json.dumps({'form_data': section_data.get('form_data', {})}, ensure_ascii=False),
+            content_blocks=json.dumps([], ensure_ascii=False),
+        ))
+
+
+def _page_content_defaults(conn):
+    """Контент редактируемых страниц по умолчанию (раньше создавался при первом GET)"""
+    # Lazy import to avoid circular imports at module load time
+    from main.page_defaults import PAGE_DEFAULTS
+
+    table = sa.table('page_content', sa.column('page_key'), sa.column('content'), sa.column('updated_at', sa.DateTime))
+    existing = set(conn.execute(
+        sa.select(table.c.page_key).where(table.c.page_key.in_(list(PAGE_DEFAULTS)))
+    ).scalars())
+    for page_key, content in PAGE_DEFAULTS.items():
+        if page_key in existing:
+            continue
+        conn.execute(table.insert().values(
+            page_key=page_key,
+            content=json.dumps(content, ensure_ascii=False),
+            updated_at=datetime.utcnow(),
+        ))
+
+
+def _nutrition_menu(conn):
+    """Таблицы разобранных меню питания"""
+    _metadata.create_all(bind=conn, tables=NUTRITION_MENU_TABLES, checkfirst=True)
+
+
+def _daily_dishes(conn):
+    """Таблица блюд архива «Ежедневное меню»; блюда переносятся из JSON блоков dishes"""
+    # Lazy import to avoid circular imports at module load time
+    from utils.dish_archive import ARCHIVE_ENDPOINT, dish_fields
+
+    _metadata.create_all(bind=conn, tables=[DAILY_DISH_TABLE], checkfirst=True)
+
+    sections = sa.table('info_section', sa.column('id'), sa.column('endpoint'), sa.column('content_blocks'))
+    dishes = DAILY_DISH_TABLE
+    row = conn.execute(
+        sa.select(sections.c.id, sections.c.content_blocks).where(sections.c.endpoint == ARCHIVE_ENDPOINT)
+    ).first()
+    if row is None or not row.content_blocks:
+        return
+    try:
+        blocks = json.loads(row.content_blocks)
+    except (TypeError, ValueError):
+        return
+    if not isinstance(blocks, list):
+        return
+
+    moved = []
+    for block in blocks:
+        if isinstance(block, dict) and block.get('type') == 'dishes' and block.get('dishes'):
+            moved.extend(d for d in block['dishes'] if isinstance(d, dict))
+            block['dishes'] = []
+    if not moved:
+        return
+
+    now = datetime.utcnow()
+    rows = []
+    for data in moved:
+        fields = dish_fields(data)
+        if fields['title'] or fields['photo'] or fields['menu_file_url']:
+            rows.append(dict(fields, created_at=now))
+    if rows:
+        conn.execute(dishes.insert(), rows)
+    conn.execute(
+        sections.update().where(sections.c.id == row.id).values(content_blocks=json.dumps(blocks, ensure_ascii=False))
+    )
+
+
+def _info_section_version(conn):
+    """Версия содержимого раздела для сохранений мастера с проверкой конфликтов"""
+    add_missing_columns(conn, 'info_section', [
+        ('version', db.Integer(), 1, False),
+    ])
+
+
+def _info_section_blocks_index(conn):
+    """Нормализованные блоки разделов и их индекс (раньше нормализовались при каждом чтении)"""
+    # Lazy import to avoid circular imports at module load time
+    from utils.content_blocks import dump_blocks
+
+    add_missing_columns(conn, 'info_section', [
+        ('blocks_index', db.Text(), None, False),
+    ])
+
+    sections = sa.table('info_section', sa.column('id'), sa.column('content_blocks'), sa.column('blocks_index'))
+    rows = conn.execute(sa.select(sections.c.id, sections.c.content_blocks)).all()
+    for row in rows:
+        try:
+            blocks = json.loads(row.content_blocks) if row.content_blocks else []
+        except (TypeError, ValueError):
+            continue
+        content_blocks, blocks_index = dump_blocks(blocks)
+        conn.execute(
+            sections.update().where(sections.c.id == row.id)
+            .values(content_blocks=content_blocks, blocks_index=blocks_index)
+        )
+
+
+def _file_document_manifest(conn):
+    """Записи File(kind='doc') для документов новостей и объявлений, лежащих только на диске"""
+    # Lazy import to avoid circular imports at module load time
+    from utils.file_helpers import import_content_documents
+
+    add_missing_columns(conn, 'file', [
+        ('display_name', db.String(255), None, False),
+        ('file_size', db.Integer(), None, False),
+        ('mime_type', db.String(100), None, False),
+    ])
+    import_content_documents(conn)
+
+
+def _deletion_jobs(conn):
+    """Очередь фонового удаления медиа новостей и объявлений"""
+    _metadata.create_all(bind=conn, tables=[DELETION_JOB_TABLE], checkfirst=True)
+
+
+def _cache_invalidations(conn):
+    """Журнал тегов сброса кэшей для других воркеров"""
+    _metadata.create_all(bind=conn, tables=[CACHE_INVALIDATION_TABLE], checkfirst=True)
+
+
+MIGRATIONS = [
+    Migration(1, 'baseline', _baseline),
+    Migration(2, 'required_sections', _required_sections),
+    Migration(3, 'page_content_defaults', _page_content_defaults),
+    Migration(4, 'nutrition_menu', _nutrition_menu),
+    Migration(5, 'daily_dishes', _daily_dishes),
+    Migration(6, 'info_section_version', _info_section_version),
+    Migration(7, 'info_section_blocks_index', _info_section_blocks_index),
+    Migration(8, 'file_document_manifest', _file_document_manifest),
+    Migration(9, 'deletion_jobs', _deletion_jobs),
+    Migration(10, 'cache_invalidations', _cache_invalidations),
+]
@@ -38,6 +38,10 @@ class File(db.Model):
     # section relationship removed - Section model moved to info/models.py as InfoSection
     kind = db.Column(db.String(20), default='doc')  # 'image' | 'doc'
     is_preview = db.Column(db.Boolean, default=False)
+    # Манифест документа (kind='doc'): страницы новостей и объявлений не читают папку на диске
+    display_name = db.Column(db.String(255), nullable=True)  # Имя для отображения (исходное имя загрузки)
+    file_size = db.Column(db.Integer, nullable=True)  # Размер файла в байтах
+    mime_type = db.Column(db.String(100), nullable=True)
 
 
 class InfoFile(db.Model):
@@ -55,6 +59,7 @@ class InfoFile(db.Model):
     display_name = db.Column(db.String(255), nullable=True)  # Имя для отображения пользователю
     file_data = db.Column(db.LargeBinary, nullable=True)  # Данные файла в БД (BLOB)
     stored_in_db = db.Column(db.Boolean, default=True)  # Флаг: хранится ли файл в БД (True) или в файловой системе (False)
+    content_hash = db.Column(db.String(64), nullable=True, index=True)  # SHA-256 содержимого (blob-хранилище uploads/blobs)
     
     def __repr__(self):
         return f'<InfoFile {self.original_filename}>'
@@ -148,4 +153,127 @@ class User(UserMixin, db.Model):
 
     def check_password(self, password):
         from werkzeug.security import check_password_hash
-        return check_password_hash(self.password_hash, password) 
\ No newline at end of file
+        return check_password_hash(self.password_hash, password) 
+
+class NutritionMenu(db.Model):
+    """Разобранное меню питания на день (файл YYYY-MM-DD-sm.xlsx)"""
+    id = db.Column(db.Integer, primary_key=True)
+    menu_date = db.Column(db.Date, unique=True, nullable=False, index=True)
+    filename = db.Column(db.String(255), nullable=False)  # Имя загруженного файла меню
+    school = db.Column(db.String(255), nullable=True)  # Название организации из шапки меню
+    parsed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    items = db.relationship('NutritionMenuItem', backref='menu', lazy=True,
+                            cascade='all, delete-orphan', order_by='NutritionMenuItem.position')
+
+    def to_dict(self, items=None):
+        """Меню для API: блюда сгруппированы по приемам пищи в порядке файла"""
+        meals = []
+        by_meal = {}
+        for item in (self.items if items is None else items):
+            meal = by_meal.get(item.meal)
+            if meal is None:
+                meal = {'meal': item.meal, 'items': [], 'price': 0.0, 'calories': 0.0}
+                by_meal[item.meal] = meal
+                meals.append(meal)
+            meal['items'].append(item.to_dict())
+            meal['price'] += item.price or 0
+            meal['calories'] += item.calories or 0
+        for meal in meals:
+            meal['price'] = round(meal['price'], 2)
+            meal['calories'] = round(meal['calories'], 2)
+        return {
+            'date': self.menu_date.isoformat(),
+            'filename': self.filename,
+            'url': f'/food/{self.filename}',
+            'school': self.school,
+            'meals': meals,
+        }
+
+
+class NutritionMenuItem(db.Model):
+    """Блюдо из меню питания"""
+    id = db.Column(db.Integer, primary_key=True)
+    menu_id = db.Column(db.Integer, db.ForeignKey('nutrition_menu.id'), nullable=False, index=True)
+    position = db.Column(db.Integer, nullable=False, default=0)  # Порядок строки в файле
+    meal = db.Column(db.String(100), nullable=True)  # Прием пищи: завтрак, обед...
+    section = db.Column(db.String(100), nullable=True)  # Раздел: гор.блюдо, напиток...
+    recipe = db.Column(db.String(50), nullable=True)  # Номер рецептуры
+    dish = db.Column(db.String(500), nullable=False)
+    weight = db.Column(db.String(50), nullable=True)  # Выход, г (бывает вида "150/5")
+    price = db.Column(db.Float, nullable=True)
+    calories = db.Column(db.Float, nullable=True)
+    proteins = db.Column(db.Float, nullable=True)
+    fats = db.Column(db.Float, nullable=True)
+    carbohydrates = db.Column(db.Float, nullable=True)
+
+    def to_dict(self):
+        return {
+            'section': self.section,
+            'recipe': self.recipe,
+            'dish': self.dish,
+            'weight': self.weight,
+            'price': self.price,
+            'calories': self.calories,
+            'proteins': self.proteins,
+            'fats': self.fats,
+            'carbohydrates': self.carbohydrates,
+        }
+
+
+class DailyDish(db.Model):
+    """Блюдо дня из архива «Ежедневное меню» (раздел nutrition-dishes-archive)"""
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(255), nullable=False, default='')
+    dish_date = db.Column(db.Date, nullable=True)  # Дата из блока "Блюдо на день" раздела "Питание"
+    publish_date = db.Column(db.Date, nullable=True, index=True)  # Дата публикации (по ней сортировка и фильтр по месяцам)
+    photo = db.Column(db.String(500), nullable=True)
+    menu_file_url = db.Column(db.String(500), nullable=True)  # Ссылка на файл меню (/food/<filename>)
+    menu_file_name = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        """Блюдо в формате прежнего блока dishes (даты — DD.MM.YYYY)"""
+        return {
+            'id': self.id,
+            'title': self.title or '',
+            'date': self.dish_date.strftime('%d.%m.%Y') if self.dish_date else '',
+            'publish_date': self.publish_date.strftime('%d.%m.%Y') if self.publish_date else '',
+            'photo': self.photo or '',
+            'menu_file_url': self.menu_file_url or '',
+            'menu_file_name': self.menu_file_name or '',
+        }
+
+
+class DeletionJob(db.Model):
+    """Фоновое удаление папки медиа удаленной новости или объявления (utils/deletion_queue.py)"""
+    id = db.Column(db.Integer, primary_key=True)
+    content_type = db.Column(db.String(20), nullable=False)  # 'news' | 'announcements'
+    content_id = db.Column(db.Integer, nullable=False)
+    title = db.Column(db.String(255), nullable=True)  # Заголовок удаленного материала (для списка заданий)
+    paths = db.Column(db.Text, nullable=False, default='[]')  # JSON: абсолютные пути папок материала
+    status = db.Column(db.String(20), nullable=False, default='pending', index=True)  # pending | running | done | failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    files_removed = db.Column(db.Integer, nullable=False, default=0)
+    bytes_freed = db.Column(db.BigInteger, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def get_paths(self):
+        """Список папок задания"""
+        try:
+            paths = json.loads(self.paths) if self.paths else []
+        except (TypeError, ValueError):
+            return []
+        return [p for p in paths if isinstance(p, str)] if isinstance(paths, list) else []
+
+
+class CacheInvalidation(db.Model):
+    """Тег сброса кэшей для других воркеров (utils/invalidation.py)"""
+    __table_args__ = {'sqlite_autoincrement': True}  # id не переиспользуются после очистки таблицы
+
+    id = db.Column(db.Integer, primary_key=True)
+    tag = db.Column(db.String(200), nullable=False)  # 'sections', 'section:main', 'news:12', 'page:index', '*'
+    origin = db.Column(db.String(32), nullable=False)  # Процесс-источник (свои события он уже применил)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
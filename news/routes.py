@@ -1,4 +1,4 @@
-from flask import render_template, redirect, url_for, request, flash, jsonify, send_file
+from flask import render_template, redirect, url_for, request, flash, jsonify, send_file, abort
 from flask_login import login_required, current_user
 from . import news_bp
 from models.models import News
@@ -9,11 +9,17 @@ from flask_wtf import FlaskForm
 from flask_wtf.file import FileAllowed
 from datetime import datetime
 from sqlalchemy import func, desc
-from utils.file_helpers import save_image, save_document, get_content_folder_path, get_content_documents
-from utils.logger import logger
+from utils.file_helpers import save_image, save_document, get_content_folder_path, get_content_documents, record_document, content_zip_entries
+from utils.deletion_queue import deletion_queue
+from utils.logger import get_logger
+from utils.media import media_redirect
+from utils.zip_download import zip_response
 import os
 import mimetypes
 import urllib.parse
+import logging
+
+logger = get_logger(__name__)
 
 
 class NewsForm(FlaskForm):
@@ -44,8 +50,8 @@ def news_list():
 @news_bp.route('/<int:news_id>')
 def news_detail(news_id):
     item = News.query.get_or_404(news_id)
-    # Получаем документы из файловой системы
-    doc_files = get_content_documents('news', news_id, item.publication_date)
+    # Документы берутся из item.files (kind='doc') вместе с изображениями
+    doc_files = get_content_documents('news', news_id, item.files)
     return render_template('news/news_detail.html', item=item, doc_files=doc_files)
 
 
@@ -53,10 +59,9 @@ def news_detail(news_id):
 @login_required
 def news_create():
     form = NewsForm()
-    logger.debug(f'Form submitted: {form.is_submitted()}')
-    logger.debug(f'Form valid: {form.validate()}')
-    if form.errors:
-        logger.debug(f'Form errors: {form.errors}')
+    # Форма проверяется один раз и только при отправке: ошибки нужны шаблону и логу
+    if form.is_submitted() and not form.validate():
+        logger.debug('Form errors: %s', form.errors)
     
     if form.is_submitted():
         publication_dt = None
@@ -74,57 +79,59 @@ def news_create():
         
         # Обработка изображений (не выбираем превью на этом шаге)
         if form.images.data:
-            logger.debug(f'Processing {len(form.images.data)} images')
+            logger.debug('Processing %s images', len(form.images.data))
             for img in form.images.data:
                 if img and img.filename:
-                    logger.debug(f'Processing image: {img.filename}')
+                    logger.debug('Processing image: %s', img.filename)
                     saved_name = save_image(img, 'news', item.id, publication_dt)
                     if saved_name:
                         try:
                             from models.models import File
                             file_obj = File(filename=saved_name, news_id=item.id, kind='image')
                             db.session.add(file_obj)
-                            logger.debug(f'Added file {saved_name} for news {item.id}')
+                            logger.debug('Added file %s for news %s', saved_name, item.id)
                         except Exception as e:
-                            logger.error(f'Failed to add file {saved_name}: {e}')
+                            logger.error('Failed to add file %s: %s', saved_name, e)
                     else:
-                        logger.error(f'Failed to save image {img.filename}')
+                        logger.error('Failed to save image %s', img.filename)
                 else:
                     logger.debug('Skipping empty image')
 
-        # Обработка документов (сохраняем только в файловую систему, без БД)
+        # Обработка документов (файл на диске и запись File(kind='doc') с размером и MIME-типом)
         if form.files.data:
-            logger.debug(f'Processing {len(form.files.data)} documents')
+            logger.debug('Processing %s documents', len(form.files.data))
             for file in form.files.data:
                 if file and file.filename:
-                    logger.debug(f'Processing document: {file.filename}')
+                    logger.debug('Processing document: %s', file.filename)
                     try:
                         saved_name = save_document(file, 'news', item.id, publication_dt)
                         if saved_name:
-                            logger.debug(f'Saved document {saved_name} for news {item.id} (file system only)')
+                            record_document('news', item.id, saved_name, publication_dt, display_name=file.filename)
+                            logger.debug('Saved document %s for news %s', saved_name, item.id)
                         else:
-                            logger.error(f'Failed to save document {file.filename}')
+                            logger.error('Failed to save document %s', file.filename)
                     except Exception as e:
-                        logger.error(f'Failed to save document {file.filename}: {e}')
+                        logger.error('Failed to save document %s: %s', file.filename, e)
                 else:
                     logger.debug('Skipping empty document')
         
         try:
             db.session.commit()
-            logger.info(f'Successfully committed news {item.id}')
+            logger.info('Successfully committed news %s', item.id)
             
-            # Проверяем, что файлы действительно сохранились
-            from models.models import File
-            saved_files = File.query.filter_by(news_id=item.id).all()
-            logger.debug(f'Files in database for news {item.id}: {len(saved_files)}')
-            for f in saved_files:
-                logger.debug(f'File: {f.filename}, kind: {f.kind}')
+            # Проверяем, что файлы действительно сохранились (запрос только при включенном DEBUG)
+            if logger.isEnabledFor(logging.DEBUG):
+                from models.models import File
+                saved_files = File.query.filter_by(news_id=item.id).all()
+                logger.debug('Files in database for news %s: %s', item.id, len(saved_files))
+                for f in saved_files:
+                    logger.debug('File: %s, kind: %s', f.filename, f.kind)
             
             flash('Новость создана. Шаг 2: выберите превью и опубликуйте.')
             return redirect(url_for('news_bp.news_review', news_id=item.id))
         except Exception as e:
             db.session.rollback()
-            logger.error(f'Failed to commit news {item.id}: {e}')
+            logger.error('Failed to commit news %s: %s', item.id, e)
             flash(f'Ошибка при создании новости: {e}', 'error')
             return render_template('news/news_form.html', form=form, page_title='Новая новость (шаг 1)')
     return render_template('news/news_form.html', form=form, page_title='Новая новость (шаг 1)')
@@ -244,8 +251,11 @@ def news_review(news_id):
 def news_delete(news_id):
     item = News.query.get_or_404(news_id)
     try:
+        # Папку с фото и документами удаляет фоновый обработчик (страница /admin/deletions)
+        deletion_queue.enqueue('news', item)
         db.session.delete(item)
         db.session.commit()
+        deletion_queue.wake()
         logger.info(f'Successfully deleted news {news_id}')
         flash('Новость удалена')
         return redirect(url_for('news_bp.news_list'))
@@ -256,6 +266,16 @@ def news_delete(news_id):
         return redirect(url_for('news_bp.news_list'))
 
 
+@news_bp.route('/<int:news_id>/download_all')
+def download_all(news_id):
+    """ZIP со всеми файлами новости (архив кэшируется на диске)"""
+    item = News.query.get_or_404(news_id)
+    entries = content_zip_entries('news', item)
+    if not entries:
+        abort(404)
+    return zip_response(entries, f'news-{item.id}', None, f'{item.title}.zip')
+
+
 @news_bp.route('/download/<int:news_id>/<filename>')
 def download_file(news_id, filename):
     """Скачивание файла новости"""
@@ -271,6 +291,11 @@ def download_file(news_id, filename):
             flash('Файл не найден', 'error')
             return redirect(url_for('news_bp.news_detail', news_id=news_id))
         
+        # Файл отдается по неизменяемому URL /media/<sha256>/<имя> с бессрочным кэшированием
+        media_response = media_redirect(filename, file_path=file_path)
+        if media_response is not None:
+            return media_response
+        
         # Определяем MIME-тип
         mimetype, _ = mimetypes.guess_type(file_path)
         if not mimetype:
@@ -290,9 +315,8 @@ def download_file(news_id, filename):
         # Устанавливаем заголовки
         response.headers['Content-Disposition'] = f'attachment; filename*=UTF-8\'\'{encoded_filename}'
         response.headers['X-Content-Type-Options'] = 'nosniff'
-        response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-        response.headers['Pragma'] = 'no-cache'
-        response.headers['Expires'] = '0'
+        # Сюда доходят только файлы, которые не удалось поместить в хранилище /media
+        response.headers['Cache-Control'] = 'no-cache'
         
         return response
         
@@ -0,0 +1,24 @@
+"""
+Бенчмарк публичных страниц и API на синтетических данных.
+
+Состав:
+    seed.py    — временный корень сайта (SQLite + static/uploads) и генерация данных
+                 заданного масштаба: разделы с вложенностью, InfoFile, новости с
+                 изображениями, блюда архива, файлы меню питания
+    probes.py  — счетчики SQL-запросов и обращений к файловой системе
+    __main__.py — прогон эндпоинтов через test_client, p50/p95, сравнение с базовой линией
+    load.py    — нагрузочный тест под gunicorn (смесь публичного трафика и записей редактора)
+    wsgi.py    — приложение для gunicorn с uploads временного корня
+    file_queries.py — число запросов при открытии раздела не зависит от числа его файлов
+
+Запуск (из корня проекта):
+    python -m scripts.bench
+    python -m scripts.bench --sections 200 --files 2000 --news 500 --dishes 1000 --repeat 30
+    python -m scripts.bench --save-baseline bench-baseline.json
+    python -m scripts.bench --baseline bench-baseline.json
+    python -m scripts.bench.load --workers 2 --threads 4 --clients 16 --duration 30
+    python -m scripts.bench.file_queries
+
+Рабочая база и папка uploads не затрагиваются: все данные создаются во
+временной директории и удаляются после прогона (если не указан --keep).
+"""
@@ -0,0 +1,227 @@
+"""
+Прогон бенчмарка: python -m scripts.bench --help
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import urllib.parse
+
+from .probes import SqlCounter, FsCounter
+from .seed import PROJECT_ROOT, Scale, make_site_root, attach_site_root, remove_site_root, seed
+
+
+# Допуск при сравнении с базовой линией: задержка p50 может вырасти на 20%,
+# число SQL-запросов и обращений к файловой системе — не может
+DEFAULT_TOLERANCE = 0.2
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def _quote(url):
+    return urllib.parse.quote(url, safe='/?=&')
+
+
+def build_cases(files_by_section):
+    """Список (имя, URL) измеряемых эндпоинтов по сгенерированным данным"""
+    endpoints = list(files_by_section)
+    cases = [
+        ('main.index', '/'),
+        ('news_list', '/news/'),
+        ('get_nutrition_menu_files', '/sidebar/api/nutrition/menu-files'),
+    ]
+    if endpoints:
+        # bench-0 — корень дерева разделов (дочерние карточки), последний раздел — лист
+        cases.append(('show_section_new', f'/sveden/{endpoints[0]}'))
+        leaf = next((e for e in reversed(endpoints) if int(e.rsplit('-', 1)[1]) % 2 == 0), endpoints[0])
+        cases.append(('show_section_new:leaf', f'/sveden/{leaf}'))
+        sidebar = next((e for e in endpoints if int(e.rsplit('-', 1)[1]) % 2 == 1), None)
+        if sidebar:
+            cases.append(('dynamic_sidebar_section', f'/sidebar/{sidebar}'))
+
+    all_files = [item for files in files_by_section.values() for item in files]
+    stored = next((url for url, _, in_db in all_files if in_db), None)
+    legacy = next((url for url, _, in_db in all_files if not in_db), None)
+    if stored:
+        cases.append(('download_file:db', stored))
+    if legacy:
+        cases.append(('download_file:disk', legacy))
+    return cases
+
+
+def measure(client, url, repeat, sql, fs):
+    """Первый (холодный) запрос и repeat повторных: задержки, SQL, файловая система"""
+    samples = []
+    cold = None
+    status = None
+    for attempt in range(repeat + 1):
+        with sql, fs:
+            started = time.perf_counter()
+            response = client.get(_quote(url))
+            response.get_data()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            response.close()
+        status = response.status_code
+        sample = {'ms': elapsed_ms, 'sql': sql.count, 'fs': fs.count, 'fs_calls': dict(fs.calls)}
+        if attempt == 0:
+            cold = sample
+        else:
+            samples.append(sample)
+
+    latencies = [s['ms'] for s in samples]
+    top_fs = {}
+    for s in samples:
+        for name, count in s['fs_calls'].items():
+            top_fs[name] = max(top_fs.get(name, 0), count)
+    return {
+        'url': url,
+        'status': status,
+        'cold_ms': round(cold['ms'], 2),
+        'p50_ms': round(_percentile(latencies, 50), 2),
+        'p95_ms': round(_percentile(latencies, 95), 2),
+        'sql': int(statistics.median(s['sql'] for s in samples)),
+        'sql_cold': cold['sql'],
+        'fs': int(statistics.median(s['fs'] for s in samples)),
+        'fs_calls': dict(sorted(top_fs.items(), key=lambda item: -item[1])),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Регрессии относительно базовой линии: список строк с описанием"""
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get('endpoints', {}).get(name)
+        if not before:
+            continue
+        if before['p50_ms'] and current['p50_ms'] > before['p50_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {before['p50_ms']} -> {current['p50_ms']} мс")
+        for key in ('sql', 'fs'):
+            if current[key] > before[key]:
+                regressions.append(f"{name}: {key} {before[key]} -> {current[key]}")
+    return regressions
+
+
+def _delta(current, before, key):
+    if not before or key not in before:
+        return ''
+    diff = current[key] - before[key]
+    if isinstance(diff, float):
+        return f' ({diff:+.1f})'
+    return f' ({diff:+d})' if diff else ''
+
+
+def print_report(results, baseline=None):
+    before_all = (baseline or {}).get('endpoints', {})
+    header = f"{'эндпоинт':<28} {'код':>4} {'холодный':>10} {'p50, мс':>16} {'p95, мс':>16} {'SQL':>10} {'ФС':>12}"
+    print(header)
+    print('-' * len(header))
+    for name, r in results.items():
+        before = before_all.get(name)
+        print(f"{name:<28} {r['status']:>4} {r['cold_ms']:>10.1f} "
+              f"{(str(r['p50_ms']) + _delta(r, before, 'p50_ms')):>16} "
+              f"{(str(r['p95_ms']) + _delta(r, before, 'p95_ms')):>16} "
+              f"{(str(r['sql']) + _delta(r, before, 'sql')):>10} "
+              f"{(str(r['fs']) + _delta(r, before, 'fs')):>12}")
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=False).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк эндпоинтов на синтетических данных')
+    defaults = Scale()
+    parser.add_argument('--sections', type=int, default=defaults.sections, help='Число разделов (дерево с вложенностью)')
+    parser.add_argument('--files', type=int, default=defaults.files, help='Число InfoFile, распределенных по разделам')
+    parser.add_argument('--news', type=int, default=defaults.news, help='Число новостей (1-3 изображения у каждой)')
+    parser.add_argument('--dishes', type=int, default=defaults.dishes, help='Число блюд архива')
+    parser.add_argument('--menus', type=int, default=defaults.menus, help='Число файлов меню питания')
+    parser.add_argument('--seed', type=int, default=defaults.seed, help='Зерно генератора')
+    parser.add_argument('--repeat', type=int, default=20, help='Запросов на эндпоинт (после холодного)')
+    parser.add_argument('--only', action='append', help='Измерять только эндпоинты с этим префиксом имени')
+    parser.add_argument('--baseline', help='JSON базовой линии для сравнения')
+    parser.add_argument('--save-baseline', help='Сохранить результаты как базовую линию')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Допустимый рост p50 относительно базовой линии (доля)')
+    parser.add_argument('--keep', action='store_true', help='Не удалять временный корень сайта')
+    args = parser.parse_args()
+    # Пути относительно каталога запуска: дальше рабочий каталог — временный корень сайта
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    save_path = os.path.abspath(args.save_baseline) if args.save_baseline else None
+
+    scale = Scale(sections=args.sections, files=args.files, news=args.news,
+                  dishes=args.dishes, menus=args.menus, seed=args.seed)
+
+    root = make_site_root()
+    sys.path.insert(0, PROJECT_ROOT)
+    try:
+        os.chdir(root)
+        from app import app
+
+        attach_site_root(app, root)
+        started = time.perf_counter()
+        files_by_section = seed(app, scale)
+        print(f'Данные сгенерированы за {time.perf_counter() - started:.1f} с: {scale.to_dict()}')
+        print(f'Корень сайта: {root}\n')
+
+        client = app.test_client()
+        sql, fs = SqlCounter(), FsCounter()
+        results = {}
+        for name, url in build_cases(files_by_section):
+            if args.only and not any(name.startswith(prefix) for prefix in args.only):
+                continue
+            results[name] = measure(client, url, args.repeat, sql, fs)
+
+        baseline = None
+        if baseline_path:
+            with open(baseline_path, encoding='utf-8') as f:
+                baseline = json.load(f)
+            if baseline.get('scale') != scale.to_dict():
+                print(f"ВНИМАНИЕ: масштаб базовой линии отличается: {baseline.get('scale')}\n")
+
+        print_report(results, baseline)
+
+        if save_path:
+            with open(save_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'revision': _git_revision(),
+                    'python': platform.python_version(),
+                    'scale': scale.to_dict(),
+                    'repeat': args.repeat,
+                    'endpoints': results,
+                }, f, ensure_ascii=False, indent=2)
+            print(f'\nБазовая линия сохранена: {save_path}')
+
+        if baseline:
+            regressions = compare(results, baseline, args.tolerance)
+            if regressions:
+                print('\nРегрессии:')
+                for line in regressions:
+                    print(f'  {line}')
+                return 1
+            print('\nРегрессий относительно базовой линии нет')
+        return 0
+    finally:
+        if args.keep:
+            os.chdir(PROJECT_ROOT)
+        else:
+            remove_site_root(root)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
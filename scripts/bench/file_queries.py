@@ -0,0 +1,132 @@
+"""
+Проверка: число SQL-запросов и обходов uploads при открытии раздела не зависит
+от количества его файлов.
+
+_update_form_data_file_names и _clean_section_files выполняются при каждом
+просмотре /sveden/<раздел> и /info/section/<раздел>. Скрипт создает разделы
+с разным числом вложений (в БД, только на диске и отсутствующих) и сравнивает
+число SQL-запросов и вызовов os.scandir на каждом из них.
+
+Запуск (из корня проекта):
+    python -m scripts.bench.file_queries
+    python -m scripts.bench.file_queries --sizes 5 40 160
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+
+from werkzeug.datastructures import FileStorage
+
+from .probes import SqlCounter, FsCounter
+from .seed import PROJECT_ROOT, make_site_root, attach_site_root, remove_site_root
+
+
+# Каждое третье вложение хранится только на диске, каждое пятое ссылается на удаленный файл
+DISK_ONLY_EVERY = 3
+MISSING_EVERY = 5
+
+
+def _seed_section(endpoint, count):
+    """Раздел с count документами в form_data и в блоке documents"""
+    from database import db
+    from info.models import InfoSection
+    from models.models import InfoFile
+    from file_manager import file_manager
+
+    section = InfoSection(endpoint=endpoint, url=f'/sveden/{endpoint}', title=f'Раздел {endpoint}')
+    db.session.add(section)
+    urls = []
+    for index in range(count):
+        name = f'Документ {index}.pdf'
+        if index % MISSING_EVERY == MISSING_EVERY - 1:
+            urls.append(f'/info/download_file/{endpoint}/removed_{index}.pdf')
+            continue
+        payload = f'%PDF-1.4 {endpoint} {index}'.encode()
+        info = file_manager.save_info_file(FileStorage(stream=io.BytesIO(payload), filename=name),
+                                           endpoint, field_name='documents', section_url=section.url)
+        urls.append(info['url'])
+        if index % DISK_ONLY_EVERY == 0:
+            continue
+        db.session.add(InfoFile(
+            filename=info['filename'], original_filename=name, file_path=info['file_path'],
+            section_endpoint=endpoint, field_name='documents', file_size=info['size'],
+            mime_type=info['mime_type'], is_image=False, display_name=name,
+            file_data=payload, stored_in_db=True, content_hash=info['sha256'],
+        ))
+    section.text = json.dumps({'text': '', 'form_data': {'documents': ', '.join(urls)}}, ensure_ascii=False)
+    section.set_content_blocks([{'type': 'documents', 'title': 'Документы',
+                                 'documents': [{'url': url, 'name': url.split('/')[-1]} for url in urls]}])
+    db.session.commit()
+
+
+def _measure(app, endpoint, sql, fs):
+    """SQL-запросы и вызовы os.scandir двух вспомогательных функций и двух страниц раздела"""
+    from info.models import InfoSection
+    from info.routes import _update_form_data_file_names, _clean_section_files
+
+    result = {}
+    with app.test_request_context():
+        section = InfoSection.query.filter_by(endpoint=endpoint).first()
+        # Первый проход убирает ссылки на отсутствующие файлы; измеряется повторный просмотр
+        _update_form_data_file_names(section)
+        _clean_section_files(section)
+        with sql, fs:
+            _update_form_data_file_names(section)
+            _clean_section_files(section)
+        result['helpers'] = (sql.count, fs.calls['os.scandir'])
+
+    client = app.test_client()
+    for name, url in (('sveden', f'/sveden/{endpoint}'), ('section_json', f'/info/section/{endpoint}')):
+        # Прогрев: первый запрос заполняет кэши процесса (настройки сайта, таблица маршрутов)
+        client.get(url).close()
+        with sql, fs:
+            client.get(url).close()
+        result[name] = (sql.count, fs.calls['os.scandir'])
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Число запросов при открытии раздела в зависимости от числа файлов')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5, 20, 80], help='Число вложений в разделах')
+    args = parser.parse_args()
+
+    root = make_site_root()
+    sys.path.insert(0, PROJECT_ROOT)
+    try:
+        os.chdir(root)
+        from app import app
+
+        attach_site_root(app, root)
+        with app.app_context():
+            for size in args.sizes:
+                _seed_section(f'files-{size}', size)
+
+        sql, fs = SqlCounter(), FsCounter()
+        results = {size: _measure(app, f'files-{size}', sql, fs) for size in args.sizes}
+
+        print(f"{'вложений':>9} " + ' '.join(f'{name + " SQL/scandir":>24}' for name in results[args.sizes[0]]))
+        for size, result in results.items():
+            print(f'{size:>9} ' + ' '.join(f'{f"{q} / {w}":>24}' for q, w in result.values()))
+
+        failures = []
+        first = results[args.sizes[0]]
+        for size, result in results.items():
+            for name, counts in result.items():
+                if counts[0] > first[name][0] or counts[1] > first[name][1]:
+                    failures.append(f'{name}: {args.sizes[0]} вложений -> {first[name]}, {size} -> {counts}')
+        if failures:
+            print('\nЧисло запросов растет с числом вложений:')
+            for line in failures:
+                print(f'  {line}')
+            return 1
+        print('\nЧисло SQL-запросов и обходов uploads не зависит от числа вложений')
+        return 0
+    finally:
+        remove_site_root(root)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,449 @@
+"""
+Нагрузочный тест: приложение под gunicorn и смесь публичного трафика с записями редактора.
+
+Генерирует данные во временном корне сайта (как python -m scripts.bench),
+запускает gunicorn с заданным числом воркеров и потоков и в течение
+--duration секунд шлет запросы из --clients потоков:
+
+    главная, список и страницы новостей, /sveden/<раздел>, /sidebar/<раздел>,
+    файлы меню /food/<файл>, скачивание документов разделов
+
+(веса — TRAFFIC_MIX), а раз в --write-interval секунд редактор сохраняет
+раздел (wizard_save) или загружает документ (upload_file).
+
+Отчет: пропускная способность, p50/p95/p99 по типам запросов, коды ответов,
+число 503 и сообщений "database is locked" в логе gunicorn, RSS воркеров.
+
+Запуск (из корня проекта):
+    python -m scripts.bench.load --workers 2 --threads 4 --clients 16 --duration 30
+    python -m scripts.bench.load --database-url postgresql://bench@localhost/bench_site
+
+С --database-url данные генерируются в указанной базе — используйте пустую
+базу, созданную для теста.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import secrets
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+import uuid
+from collections import Counter, defaultdict
+
+from .seed import PROJECT_ROOT, Scale, make_site_root, attach_site_root, remove_site_root, seed
+
+
+# Тип запроса -> вес в смеси публичного трафика
+TRAFFIC_MIX = {
+    'index': 30,
+    'news_list': 8,
+    'news_detail': 10,
+    'sveden': 25,
+    'sidebar': 5,
+    'food': 8,
+    'download': 14,
+}
+
+LOAD_USER = 'load-test'
+STARTUP_TIMEOUT_SECONDS = 60
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _quote(url):
+    return urllib.parse.quote(url, safe='/?=&')
+
+
+def prepare(app, scale):
+    """Данные сайта, пользователь-редактор и адреса для смеси запросов"""
+    from database import db
+    from info.models import InfoSection
+    from models.models import User, News, InfoFile
+
+    files_by_section = seed(app, scale)
+    with app.app_context():
+        user = User(username=LOAD_USER)
+        user.set_password(secrets.token_hex(8))
+        db.session.add(user)
+        db.session.commit()
+
+        sections = db.session.query(InfoSection.endpoint, InfoSection.url).filter(
+            InfoSection.endpoint.like('bench-%')).all()
+        targets = {
+            'index': ['/'],
+            'news_list': ['/news/'],
+            'news_detail': [f'/news/{news_id}' for (news_id,) in db.session.query(News.id)],
+            'sveden': [f'/sveden/{endpoint}' for endpoint, url in sections if not url.startswith('/sidebar/')],
+            'sidebar': [f'/sidebar/{endpoint}' for endpoint, url in sections if url.startswith('/sidebar/')],
+            'food': [f'/food/{name}' for (name,) in db.session.query(InfoFile.filename).filter_by(field_name='menu_file')],
+            'download': [url for files in files_by_section.values() for url, _, _ in files],
+        }
+
+        # Сессия редактора подписывается ключом приложения (SECRET_KEY общий с воркерами)
+        serializer = app.session_interface.get_signing_serializer(app)
+        cookie = serializer.dumps({'_user_id': str(user.id), '_fresh': True})
+        session_cookie = f"{app.config.get('SESSION_COOKIE_NAME', 'session')}={cookie}"
+        db.engine.dispose()
+    return {name: urls for name, urls in targets.items() if urls}, [e for e, _ in sections], session_cookie
+
+
+def start_gunicorn(root, port, args, env):
+    log_path = os.path.join(root, 'gunicorn.log')
+    command = [
+        sys.executable, '-m', 'gunicorn',
+        '--workers', str(args.workers),
+        '--threads', str(args.threads),
+        '--bind', f'127.0.0.1:{port}',
+        '--timeout', '120',
+        '--error-logfile', log_path,
+        'scripts.bench.wsgi:app',
+    ]
+    log = open(log_path, 'ab')
+    # Рабочий каталог — временный корень (logs/ и относительные пути uploads), проект — в PYTHONPATH
+    process = subprocess.Popen(command, cwd=root, env=env, stdout=log, stderr=subprocess.STDOUT)
+    log.close()
+
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'gunicorn завершился при запуске, см. {log_path}')
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                conn.close()
+                return process, log_path
+        except OSError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f'gunicorn не ответил за {STARTUP_TIMEOUT_SECONDS} с, см. {log_path}')
+
+
+def _worker_pids(master_pid):
+    pids = []
+    try:
+        for task in os.listdir(f'/proc/{master_pid}/task'):
+            with open(f'/proc/{master_pid}/task/{task}/children') as f:
+                pids.extend(int(pid) for pid in f.read().split())
+    except OSError:
+        pass
+    return pids
+
+
+def _rss_kb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+class RssSampler(threading.Thread):
+    """Пиковый RSS каждого воркера gunicorn (Linux, /proc)"""
+
+    def __init__(self, master_pid, interval=1.0):
+        super().__init__(daemon=True)
+        self.master_pid = master_pid
+        self.interval = interval
+        self.peak_kb = {}
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.is_set():
+            for pid in _worker_pids(self.master_pid):
+                rss = _rss_kb(pid)
+                if rss is not None:
+                    self.peak_kb[pid] = max(self.peak_kb.get(pid, 0), rss)
+            self._done.wait(self.interval)
+
+    def stop(self):
+        self._done.set()
+
+
+class Results:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.errors = Counter()
+
+    def add(self, kind, status, elapsed_ms):
+        with self.lock:
+            self.latencies[kind].append(elapsed_ms)
+            self.statuses[kind][status] += 1
+
+    def add_error(self, kind, error):
+        with self.lock:
+            self.errors[f'{kind}: {error}'] += 1
+
+
+def _request(conn, method, url, body=None, headers=None):
+    conn.request(method, _quote(url), body=body, headers=headers or {})
+    response = conn.getresponse()
+    return response.status, response.read()
+
+
+def _timed(results, kind, port, state, method, url, body=None, headers=None):
+    started = time.perf_counter()
+    try:
+        if state.get('conn') is None:
+            state['conn'] = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        status, data = _request(state['conn'], method, url, body, headers)
+        results.add(kind, status, (time.perf_counter() - started) * 1000)
+        # Обработчики редактора сообщают об ошибке в JSON с кодом 200
+        if method == 'POST' and b'"success":false' in data.replace(b' ', b''):
+            results.add_error(kind, 'success=false')
+    except (OSError, http.client.HTTPException) as e:
+        results.add_error(kind, type(e).__name__)
+        if state.get('conn') is not None:
+            state['conn'].close()
+        state['conn'] = None
+
+
+def reader(port, targets, deadline, results, seed_value):
+    rng = random.Random(seed_value)
+    kinds = [kind for kind in TRAFFIC_MIX if kind in targets]
+    weights = [TRAFFIC_MIX[kind] for kind in kinds]
+    state = {}
+    while time.monotonic() < deadline:
+        kind = rng.choices(kinds, weights)[0]
+        _timed(results, kind, port, state, 'GET', rng.choice(targets[kind]))
+    if state.get('conn') is not None:
+        state['conn'].close()
+
+
+def _multipart(fields, file_field, filename, payload):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+        f'Content-Type: application/octet-stream\r\n\r\n'.encode() + payload + b'\r\n'
+    )
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+def writer(port, endpoints, cookie, deadline, interval, results, seed_value):
+    """Редактор: попеременно сохраняет раздел и загружает документ"""
+    rng = random.Random(seed_value)
+    state = {}
+    step = 0
+    while time.monotonic() < deadline:
+        endpoint = rng.choice(endpoints)
+        if step % 2 == 0:
+            blocks = [{'type': 'text', 'title': 'Описание', 'content': f'<p>Правка {step}: ' + 'текст ' * 200 + '</p>'}]
+            wizard_data = {endpoint: {'title': f'Раздел {endpoint}', 'text': '', 'content': '', 'content_blocks': blocks}}
+            body = urllib.parse.urlencode({'wizard_data': json.dumps(wizard_data, ensure_ascii=False),
+                                           'save_single': 'true'}).encode()
+            headers = {'Cookie': cookie, 'Content-Type': 'application/x-www-form-urlencoded'}
+            _timed(results, 'admin:wizard_save', port, state, 'POST', '/sidebar/wizard_save', body, headers)
+        else:
+            payload = b'%PDF-1.4\n' + os.urandom(rng.randint(10_000, 200_000))
+            body, content_type = _multipart({'section': endpoint, 'field_name': 'documents'},
+                                            'file', f'load-{step}.pdf', payload)
+            headers = {'Cookie': cookie, 'Content-Type': content_type}
+            _timed(results, 'admin:upload_file', port, state, 'POST', '/sidebar/upload_file', body, headers)
+        step += 1
+        time.sleep(interval)
+    if state.get('conn') is not None:
+        state['conn'].close()
+
+
+def report(results, duration, log_path, sampler, log_offset):
+    total = sum(len(v) for v in results.latencies.values())
+    all_latencies = [ms for values in results.latencies.values() for ms in values]
+    status_total = Counter()
+    for counter in results.statuses.values():
+        status_total.update(counter)
+
+    print(f"\n{'запрос':<20} {'число':>7} {'p50, мс':>9} {'p95, мс':>9} {'p99, мс':>9}  коды")
+    print('-' * 80)
+    for kind in sorted(results.latencies):
+        values = results.latencies[kind]
+        codes = ', '.join(f'{code}: {count}' for code, count in sorted(results.statuses[kind].items()))
+        print(f'{kind:<20} {len(values):>7} {_percentile(values, 50):>9.1f} {_percentile(values, 95):>9.1f} '
+              f'{_percentile(values, 99):>9.1f}  {codes}')
+    print('-' * 80)
+    print(f'{"всего":<20} {total:>7} {_percentile(all_latencies, 50):>9.1f} {_percentile(all_latencies, 95):>9.1f} '
+          f'{_percentile(all_latencies, 99):>9.1f}')
+
+    locked = 0
+    try:
+        with open(log_path, encoding='utf-8', errors='replace') as f:
+            f.seek(log_offset)
+            locked = f.read().count('database is locked')
+    except OSError:
+        pass
+
+    summary = {
+        'requests': total,
+        'throughput_rps': round(total / duration, 1) if duration else 0,
+        'p50_ms': round(_percentile(all_latencies, 50), 1),
+        'p95_ms': round(_percentile(all_latencies, 95), 1),
+        'p99_ms': round(_percentile(all_latencies, 99), 1),
+        'mean_ms': round(statistics.mean(all_latencies), 1) if all_latencies else 0,
+        'status_503': status_total.get(503, 0),
+        'status_5xx': sum(count for code, count in status_total.items() if code >= 500),
+        'database_locked': locked,
+        'errors': sum(results.errors.values()),
+        'worker_rss_peak_mb': {str(pid): round(kb / 1024, 1) for pid, kb in sampler.peak_kb.items()},
+        'by_kind': {
+            kind: {
+                'count': len(values),
+                'p50_ms': round(_percentile(values, 50), 1),
+                'p95_ms': round(_percentile(values, 95), 1),
+                'p99_ms': round(_percentile(values, 99), 1),
+                'statuses': {str(code): count for code, count in results.statuses[kind].items()},
+            }
+            for kind, values in results.latencies.items()
+        },
+    }
+    print(f"\nПропускная способность: {summary['throughput_rps']} запросов/с за {duration:.0f} с")
+    print(f"Ответов 503: {summary['status_503']}, всего 5xx: {summary['status_5xx']}, "
+          f"\"database is locked\" в логе: {locked}, ошибок: {summary['errors']}")
+    if results.errors:
+        for error, count in results.errors.most_common():
+            print(f'  {error}: {count}')
+    if sampler.peak_kb:
+        peaks = ', '.join(f'{mb} МБ' for mb in summary['worker_rss_peak_mb'].values())
+        print(f'Пиковый RSS воркеров: {peaks}')
+    else:
+        print('RSS воркеров: недоступно (нужен /proc)')
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Нагрузочный тест под gunicorn')
+    defaults = Scale()
+    parser.add_argument('--workers', type=int, default=2, help='Воркеры gunicorn')
+    parser.add_argument('--threads', type=int, default=4, help='Потоки на воркер gunicorn')
+    parser.add_argument('--clients', type=int, default=16, help='Параллельных читателей')
+    parser.add_argument('--duration', type=float, default=30, help='Длительность, с')
+    parser.add_argument('--warmup', type=float, default=3, help='Прогрев перед замером, с')
+    parser.add_argument('--write-interval', type=float, default=2.0,
+                        help='Пауза между записями редактора, с (0 — без записей)')
+    parser.add_argument('--database-url', help='База для теста (по умолчанию SQLite во временном корне)')
+    parser.add_argument('--sections', type=int, default=defaults.sections)
+    parser.add_argument('--files', type=int, default=defaults.files)
+    parser.add_argument('--news', type=int, default=defaults.news)
+    parser.add_argument('--dishes', type=int, default=defaults.dishes)
+    parser.add_argument('--menus', type=int, default=defaults.menus)
+    parser.add_argument('--json', help='Сохранить сводку в JSON')
+    parser.add_argument('--keep', action='store_true', help='Не удалять временный корень сайта')
+    args = parser.parse_args()
+    json_path = os.path.abspath(args.json) if args.json else None
+
+    scale = Scale(sections=args.sections, files=args.files, news=args.news,
+                  dishes=args.dishes, menus=args.menus)
+    root = make_site_root()
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    os.environ['SECRET_KEY'] = secrets.token_hex(32)
+    sys.path.insert(0, PROJECT_ROOT)
+
+    process = None
+    try:
+        os.chdir(root)
+        from app import app
+
+        attach_site_root(app, root)
+        targets, endpoints, cookie = prepare(app, scale)
+        print(f'Данные: {scale.to_dict()}; корень сайта: {root}')
+
+        env = dict(os.environ)
+        env.update({
+            'BENCH_SITE_ROOT': root,
+            'PYTHONPATH': os.pathsep.join(filter(None, [PROJECT_ROOT, env.get('PYTHONPATH')])),
+            'AUTO_MIGRATE': '0',
+            'WEB_CONCURRENCY': str(args.workers),
+            'GUNICORN_THREADS': str(args.threads),
+        })
+        port = _free_port()
+        process, log_path = start_gunicorn(root, port, args, env)
+        print(f'gunicorn: {args.workers} воркер(ов) x {args.threads} поток(ов), порт {port}; '
+              f'{args.clients} читателей, запись раз в {args.write_interval} с')
+
+        if args.warmup > 0:
+            warmup = Results()
+            deadline = time.monotonic() + args.warmup
+            threads = [threading.Thread(target=reader, args=(port, targets, deadline, warmup, -i))
+                       for i in range(args.clients)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        log_offset = os.path.getsize(log_path)
+        sampler = RssSampler(process.pid)
+        sampler.start()
+        results = Results()
+        started = time.monotonic()
+        deadline = started + args.duration
+        threads = [threading.Thread(target=reader, args=(port, targets, deadline, results, i))
+                   for i in range(args.clients)]
+        if args.write_interval > 0 and endpoints:
+            threads.append(threading.Thread(
+                target=writer, args=(port, endpoints, cookie, deadline, args.write_interval, results, 0)))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duration = time.monotonic() - started
+        sampler.stop()
+
+        summary = report(results, duration, log_path, sampler, log_offset)
+        summary.update({
+            'workers': args.workers,
+            'threads': args.threads,
+            'clients': args.clients,
+            'write_interval': args.write_interval,
+            'database': 'sqlite' if not args.database_url else args.database_url.split(':', 1)[0],
+            'scale': scale.to_dict(),
+        })
+        if json_path:
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+            print(f'\nСводка сохранена: {json_path}')
+        return 1 if summary['status_5xx'] else 0
+    finally:
+        if process is not None and process.poll() is None:
+            process.send_signal(signal.SIGTERM)
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if args.keep:
+            os.chdir(PROJECT_ROOT)
+        else:
+            remove_site_root(root)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Счетчики для бенчмарка: SQL-запросы и обращения к файловой системе.
+
+SQL считается по событию before_cursor_execute всех движков (основной и
+read-only bind). Файловая система — по вызовам os.stat/lstat/listdir/scandir/
+open/mkdir/... и встроенного open на уровне Python: этого достаточно, чтобы
+увидеть os.path.exists и os.walk в обработчиках (они вызывают os.stat и
+os.scandir), без strace и прав на ptrace.
+"""
+
+import builtins
+import io
+import os
+from collections import Counter
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+_FS_FUNCTIONS = ('stat', 'lstat', 'listdir', 'scandir', 'open', 'mkdir',
+                 'remove', 'unlink', 'rename', 'replace', 'link', 'utime')
+
+
+class SqlCounter:
+    """Число SQL-запросов (и сами запросы) внутри блока with"""
+
+    def __init__(self):
+        self.statements = []
+        self._active = False
+        event.listen(Engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self._active:
+            self.statements.append(statement)
+
+    def __enter__(self):
+        self.statements = []
+        self._active = True
+        return self
+
+    def __exit__(self, *exc):
+        self._active = False
+        return False
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+class FsCounter:
+    """Обращения к файловой системе внутри блока with (по имени функции)"""
+
+    def __init__(self):
+        self.calls = Counter()
+        self._originals = {}
+
+    def _wrap(self, name, func):
+        calls = self.calls
+
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            return func(*args, **kwargs)
+
+        wrapper.__wrapped__ = func
+        return wrapper
+
+    def __enter__(self):
+        self.calls = Counter()
+        for name in _FS_FUNCTIONS:
+            func = getattr(os, name, None)
+            if func is not None:
+                self._originals[(os, name)] = func
+                setattr(os, name, self._wrap(f'os.{name}', func))
+        self._originals[(builtins, 'open')] = builtins.open
+        self._originals[(io, 'open')] = io.open
+        wrapped_open = self._wrap('open', builtins.open)
+        builtins.open = wrapped_open
+        io.open = wrapped_open
+        return self
+
+    def __exit__(self, *exc):
+        for (module, name), func in self._originals.items():
+            setattr(module, name, func)
+        self._originals = {}
+        return False
+
+    @property
+    def count(self):
+        return sum(self.calls.values())
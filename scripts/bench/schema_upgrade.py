@@ -0,0 +1,99 @@
+"""
+Проверка: база первого релиза обновляется миграциями до последней версии.
+
+Скрипт создает SQLite-базу со схемой миграции 0001 (schema_version = 1) без
+обязательного раздела education, запускает приложение с AUTO_MIGRATE и
+проверяет версию схемы, колонки, добавленные миграциями, восстановленный
+раздел и страницу /sveden/education.
+
+Запуск (из корня проекта):
+    python -m scripts.bench.schema_upgrade
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import sqlalchemy as sa
+
+from .seed import PROJECT_ROOT, make_site_root, attach_site_root, remove_site_root
+
+
+# Колонки, которых нет в схеме 0001: таблица -> колонки
+ADDED_COLUMNS = {
+    'info_section': ('version', 'blocks_index'),
+    'file': ('display_name', 'file_size', 'mime_type'),
+}
+ADDED_TABLES = ('nutrition_menu', 'nutrition_menu_item', 'daily_dish', 'deletion_job', 'cache_invalidation')
+
+
+def _create_baseline(database_url):
+    """База со схемой 0001 и записью schema_version = 1"""
+    from migrations.runner import schema_version
+    from migrations.versions import BASELINE_TABLES
+
+    engine = sa.create_engine(database_url)
+    try:
+        BASELINE_TABLES[0].metadata.create_all(engine, tables=BASELINE_TABLES)
+        schema_version.metadata.create_all(engine, tables=[schema_version])
+        with engine.begin() as conn:
+            conn.execute(schema_version.insert().values(version=1, name='baseline', applied_at=datetime.utcnow()))
+            conn.execute(BASELINE_TABLES[0].insert().values(
+                title='Новость до обновления', content='<p>Текст</p>', created_at=datetime.utcnow(),
+                is_featured=False, is_published=True,
+            ))
+    finally:
+        engine.dispose()
+
+
+def _check(app):
+    from database import db
+    from info.models import InfoSection
+    from migrations.runner import get_current_version, get_head_version
+
+    failures = []
+    with app.app_context():
+        current, head = get_current_version(), get_head_version()
+        if current != head:
+            failures.append(f'версия схемы {current}, ожидалась {head}')
+        inspector = sa.inspect(db.engine)
+        tables = set(inspector.get_table_names())
+        failures.extend(f'нет таблицы {name}' for name in ADDED_TABLES if name not in tables)
+        for table, columns in ADDED_COLUMNS.items():
+            existing = {column['name'] for column in inspector.get_columns(table)}
+            failures.extend(f'нет колонки {table}.{name}' for name in columns if name not in existing)
+        if not failures and InfoSection.query.filter_by(endpoint='education').first() is None:
+            failures.append('раздел education не создан')
+
+    if not failures:
+        response = app.test_client().get('/sveden/education')
+        if response.status_code != 200:
+            failures.append(f'/sveden/education -> {response.status_code}')
+        response.close()
+    return failures
+
+
+def main():
+    root = make_site_root()
+    sys.path.insert(0, PROJECT_ROOT)
+    try:
+        os.chdir(root)
+        _create_baseline(os.environ['DATABASE_URL'])
+        # Миграции применяются при создании приложения (AUTO_MIGRATE)
+        from app import app
+
+        attach_site_root(app, root)
+        failures = _check(app)
+        if failures:
+            print('База версии 1 не обновилась до последней версии:')
+            for line in failures:
+                print(f'  {line}')
+            return 1
+        print('База версии 1 обновлена до последней версии схемы')
+        return 0
+    finally:
+        remove_site_root(root)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""
+Временный корень сайта и синтетические данные для бенчмарка.
+
+Корень содержит ссылки на templates/ и файлы static/ проекта и собственную
+пустую static/uploads, так что файлы, создаваемые генератором, не попадают
+в рабочую папку uploads. База — SQLite-файл в том же каталоге.
+
+Модули приложения импортируются внутри функций: модуль app создает приложение
+при импорте и должен увидеть DATABASE_URL временного корня.
+"""
+
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+from dataclasses import dataclass, asdict
+from datetime import date, datetime, timedelta
+
+from werkzeug.datastructures import FileStorage
+
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+
+# Минимальный корректный PNG 1x1 — превью новостей проверяются на диске, а не декодируются
+_PNG_1X1 = bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+    '1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082'
+)
+
+# Каждый LEGACY_FILE_EVERY-й файл раздела хранится только на диске (как старые загрузки)
+LEGACY_FILE_EVERY = 4
+
+
+@dataclass
+class Scale:
+    """Объем синтетических данных"""
+    sections: int = 60
+    files: int = 300
+    news: int = 120
+    dishes: int = 400
+    menus: int = 60
+    seed: int = 1
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def make_site_root(workdir=None):
+    """
+    Создает временный корень сайта и возвращает его путь.
+
+    DATABASE_URL выставляется здесь: модуль app создает приложение при импорте,
+    поэтому make_site_root нужно вызвать до первого импорта app.
+    """
+    root = workdir or tempfile.mkdtemp(prefix='site-bench-')
+    os.makedirs(os.path.join(root, 'static', 'uploads'), exist_ok=True)
+    os.symlink(os.path.join(PROJECT_ROOT, 'templates'), os.path.join(root, 'templates'))
+    for name in os.listdir(os.path.join(PROJECT_ROOT, 'static')):
+        if name == 'uploads':
+            continue
+        os.symlink(os.path.join(PROJECT_ROOT, 'static', name), os.path.join(root, 'static', name))
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(root, 'site.db')}"
+    os.environ['AUTO_MIGRATE'] = '1'
+    return root
+
+
+def attach_site_root(app, root):
+    """Переключает приложение на uploads временного корня"""
+    import utils.blob_store as blob_store
+    from file_manager import file_manager
+
+    app.root_path = root
+    uploads = os.path.join(root, 'static', 'uploads')
+    file_manager.base_upload_path = uploads
+    blob_store.DEFAULT_UPLOAD_ROOT = uploads
+    # get_content_folder_path и часть обработчиков строят пути относительно рабочего каталога
+    os.chdir(root)
+
+
+def remove_site_root(root):
+    os.chdir(PROJECT_ROOT)
+    shutil.rmtree(root, ignore_errors=True)
+
+
+def _section_endpoint(index):
+    return f'bench-{index}'
+
+
+def _parent_index(index):
+    """Дерево разделов: у каждого раздела до трех детей (глубина ~log3 N)"""
+    return (index - 1) // 3 if index > 0 else None
+
+
+def _seed_sections(scale, rng):
+    from database import db
+    from info.models import InfoSection
+    from models.models import InfoFile
+    from file_manager import file_manager
+
+    sections = []
+    for index in range(scale.sections):
+        endpoint = _section_endpoint(index)
+        # Половина разделов открывается через /sidebar/<endpoint>, половина — через /sveden/<endpoint>
+        url = f'/sidebar/{endpoint}' if index % 2 else f'/sveden/{endpoint}'
+        sections.append(InfoSection(endpoint=endpoint, url=url, title=f'Раздел {index}'))
+    db.session.add_all(sections)
+
+    files_by_section = {section.endpoint: [] for section in sections}
+    for index in range(scale.files):
+        section = sections[index % len(sections)] if sections else None
+        if section is None:
+            break
+        name = f'Документ {index}.pdf'
+        payload = b'%PDF-1.4\n' + f'bench document {index}\n'.encode() + rng.randbytes(rng.randint(256, 4096))
+        info = file_manager.save_info_file(
+            FileStorage(stream=io.BytesIO(payload), filename=name),
+            section.endpoint, field_name='documents', section_url=section.url,
+        )
+        in_db = index % LEGACY_FILE_EVERY != 0
+        db.session.add(InfoFile(
+            filename=info['filename'],
+            original_filename=name,
+            file_path=info['file_path'],
+            section_endpoint=section.endpoint,
+            field_name='documents',
+            file_size=info['size'],
+            mime_type=info['mime_type'],
+            is_image=False,
+            display_name=name,
+            file_data=payload if in_db else None,
+            stored_in_db=in_db,
+            content_hash=info['sha256'],
+        ))
+        files_by_section[section.endpoint].append((info['url'], name, in_db))
+
+    for index, section in enumerate(sections):
+        files = files_by_section[section.endpoint]
+        form_data = {
+            'title': section.title,
+            'documents': ', '.join(url for url, _, _ in files),
+        }
+        parent = _parent_index(index)
+        if parent is not None:
+            form_data['parent'] = _section_endpoint(parent)
+            form_data['order'] = index
+        section.text = json.dumps({'text': '', 'form_data': form_data}, ensure_ascii=False)
+        section.set_content_blocks([
+            {'type': 'text', 'title': 'Описание', 'content': '<p>' + 'Текст раздела. ' * 40 + '</p>',
+             'documents': [{'url': url, 'name': name} for url, name, _ in files]},
+            {'type': 'table', 'title': 'Таблица',
+             'rows': [[f'{row}-{col}' for col in range(5)] for row in range(20)]},
+        ])
+    return files_by_section
+
+
+def _seed_news(scale, rng):
+    from database import db
+    from models.models import News, File
+    from utils.file_helpers import get_content_folder_path
+
+    now = datetime.utcnow()
+    for index in range(scale.news):
+        published = now - timedelta(days=index, hours=rng.randint(0, 23))
+        item = News(title=f'Новость {index}', content='<p>' + 'Текст новости. ' * 30 + '</p>',
+                    publication_date=published, is_published=True, is_featured=index % 25 == 0)
+        db.session.add(item)
+        db.session.flush()
+        folder = get_content_folder_path('news', item.id, published)
+        for number in range(rng.randint(1, 3)):
+            filename = f'image_{number}.png'
+            with open(os.path.join(folder, filename), 'wb') as f:
+                f.write(_PNG_1X1)
+            db.session.add(File(filename=filename, news_id=item.id, kind='image', is_preview=number == 0))
+
+
+def _seed_dishes(scale, rng):
+    from database import db
+    from models.models import DailyDish
+
+    today = date.today()
+    db.session.add_all(
+        DailyDish(title=f'Блюдо {index}', dish_date=today - timedelta(days=index // 2),
+                  publish_date=today - timedelta(days=index // 2),
+                  photo=f'/static/uploads/dishes/{index}.jpg')
+        for index in range(scale.dishes)
+    )
+
+
+def _seed_menus(scale):
+    from database import db
+    from models.models import InfoFile
+    from file_manager import file_manager
+
+    today = date.today()
+    for index in range(scale.menus):
+        name = f'{(today - timedelta(days=index)).isoformat()}-sm.xlsx'
+        payload = f'bench menu {index}'.encode()
+        info = file_manager.save_info_file(FileStorage(stream=io.BytesIO(payload), filename=name),
+                                           'food', field_name='menu_file', section_url='/sveden/food')
+        db.session.add(InfoFile(
+            filename=info['filename'], original_filename=name, file_path=info['file_path'],
+            section_endpoint='food', field_name='menu_file', file_size=info['size'],
+            mime_type=info['mime_type'], is_image=False, display_name=name,
+            file_data=payload, stored_in_db=True, content_hash=info['sha256'],
+        ))
+
+
+def seed(app, scale):
+    """
+    Заполняет базу и uploads временного корня.
+
+    Returns:
+        dict: endpoint раздела -> список (url, имя, хранится ли в БД) его документов
+    """
+    from database import db
+
+    rng = random.Random(scale.seed)
+    with app.app_context():
+        files_by_section = _seed_sections(scale, rng)
+        _seed_news(scale, rng)
+        _seed_dishes(scale, rng)
+        _seed_menus(scale)
+        db.session.commit()
+    return files_by_section
@@ -0,0 +1,14 @@
+"""
+WSGI-приложение для нагрузочного теста (scripts.bench.load).
+
+То же приложение, что и app:app, но с uploads временного корня сайта из
+переменной окружения BENCH_SITE_ROOT.
+"""
+
+import os
+
+from app import app
+from .seed import attach_site_root
+
+
+attach_site_root(app, os.environ['BENCH_SITE_ROOT'])
@@ -0,0 +1,87 @@
+"""
+Проверка веса публичных страниц: интерфейс редактора не должен попадать
+в HTML для анонимных посетителей.
+
+Рендерит страницы через test_client на временной SQLite-базе дважды —
+анонимно и от имени редактора — и выводит размер HTML и время рендера.
+
+Запуск:
+    python scripts/check_page_weight.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+_workdir = tempfile.mkdtemp(prefix='page-weight-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_workdir, 'site.db')}"
+os.environ.setdefault('AUTO_MIGRATE', '1')
+
+# Добавляем текущую директорию в путь импорта
+sys.path.append(os.getcwd())
+
+PAGES = ['/', '/news/', '/announcements/', '/sveden/education', '/sidebar/appeals']
+ADMIN_MARKERS = ['id="wizard-modal"', 'id="sidebarWizardModal"', '/static/wizard.js', '/static/admin-shell.js']
+RENDERS = 5
+
+
+def _editor_client(app):
+    from database import db
+    from models.models import User
+
+    with app.app_context():
+        user = User.query.filter_by(username='page-weight').first()
+        if not user:
+            user = User(username='page-weight')
+            user.set_password('page-weight')
+            db.session.add(user)
+            db.session.commit()
+        user_id = user.id
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return client
+
+
+def _measure(client, url):
+    sizes = []
+    started = time.perf_counter()
+    for _ in range(RENDERS):
+        response = client.get(url)
+        sizes.append(len(response.data))
+    elapsed = (time.perf_counter() - started) / RENDERS
+    return response, sizes[-1], elapsed
+
+
+def test_public_pages_without_admin_ui():
+    print("Measuring page weight...")
+    from app import app
+
+    anonymous = app.test_client()
+    editor = _editor_client(app)
+    failures = []
+
+    print(f"{'URL':<22} {'аноним, байт':>14} {'мс':>7} {'редактор, байт':>16} {'мс':>7}")
+    for url in PAGES:
+        public_response, public_size, public_time = _measure(anonymous, url)
+        _, editor_size, editor_time = _measure(editor, url)
+        print(f"{url:<22} {public_size:>14} {public_time * 1000:>7.1f} {editor_size:>16} {editor_time * 1000:>7.1f}")
+
+        html = public_response.get_data(as_text=True)
+        leaked = [marker for marker in ADMIN_MARKERS if marker in html]
+        if leaked:
+            failures.append(f"{url}: в публичной странице есть {', '.join(leaked)}")
+
+    if failures:
+        print("Page weight check failed:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("Page weight check passed.")
+
+
+if __name__ == "__main__":
+    test_public_pages_without_admin_ui()
@@ -0,0 +1,81 @@
+"""
+Замер холодного старта воркера: время импорта app (create_app) и число SQL-запросов.
+
+Каждый замер выполняется в отдельном процессе Python, как при запуске воркера
+gunicorn. Первый (прогревочный) запуск создает схему во временной БД и в
+статистику не входит.
+
+Запуск:
+    python scripts/measure_cold_start.py --runs 10
+    python scripts/measure_cold_start.py --database instance/site.db   # на копии рабочей БД
+
+Для сравнения "до/после" запустите скрипт на двух ревизиях (git worktree).
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+_CHILD = r'''
+import json, sys, time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+statements = []
+event.listen(Engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+started = time.perf_counter()
+import app  # noqa: F401  create_app() выполняется при импорте модуля
+elapsed = time.perf_counter() - started
+
+ddl = sum(1 for s in statements if s.lstrip().upper().startswith(('CREATE', 'ALTER')) or 'TABLE_INFO' in s.upper())
+print(json.dumps({'seconds': elapsed, 'statements': len(statements), 'ddl': ddl}))
+'''
+
+
+def run_once(env):
+    result = subprocess.run(
+        [sys.executable, '-c', _CHILD],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=False,
+    )
+    for line in reversed(result.stdout.strip().splitlines()):
+        if line.startswith('{'):
+            return json.loads(line)
+    raise RuntimeError(f'Не удалось запустить приложение:\n{result.stderr[-2000:]}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Замер холодного старта create_app()')
+    parser.add_argument('--runs', type=int, default=10, help='Число замеров')
+    parser.add_argument('--database', help='Файл SQLite, копия которого используется для замеров')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='cold-start-')
+    db_path = os.path.join(workdir, 'site.db')
+    if args.database:
+        shutil.copy2(args.database, db_path)
+
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{db_path}', PYTHONDONTWRITEBYTECODE='1')
+    try:
+        run_once(env)  # прогрев: создание схемы, кэш файловой системы
+        samples = [run_once(env) for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    times = sorted(sample['seconds'] * 1000 for sample in samples)
+    print(f'Замеров: {len(samples)}')
+    print(f'Импорт app: медиана {statistics.median(times):.1f} мс, '
+          f'мин {times[0]:.1f} мс, макс {times[-1]:.1f} мс')
+    print(f"SQL-запросов при старте: {samples[-1]['statements']} (DDL/inspect: {samples[-1]['ddl']})")
+
+
+if __name__ == '__main__':
+    main()
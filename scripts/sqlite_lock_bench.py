@@ -0,0 +1,190 @@
+"""
+Нагрузочная проверка профиля SQLite (database.sqlite_pragmas).
+
+Воспроизводит типичную нагрузку сайта под gunicorn: несколько потоков читают
+страницы (серия SELECT по разделам), параллельно администраторы сохраняют
+разделы (чтение + UPDATE большого JSON + COMMIT). Прогон выполняется дважды
+на временной копии схемы:
+
+    default — настройки по умолчанию (rollback journal, без PRAGMA)
+    tuned   — профиль приложения (WAL, synchronous=NORMAL, busy_timeout, ...)
+              и чтение через соединения mode=ro
+
+Для каждого профиля выводятся пропускная способность, p50/p95 задержки и
+число ошибок "database is locked" — именно они превращаются в ответ 503
+в handle_db_operational_error.
+
+Запуск:
+    python scripts/sqlite_lock_bench.py --duration 10 --readers 8 --writers 2
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.getcwd())
+
+from database import sqlite_pragmas
+
+
+SECTIONS = 300
+PAGE_QUERIES = 5
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def prepare_database(path):
+    """Создает таблицу разделов, похожую на info_section"""
+    conn = sqlite3.connect(path)
+    conn.execute(
+        'CREATE TABLE info_section (id INTEGER PRIMARY KEY, endpoint TEXT UNIQUE, '
+        'title TEXT, url TEXT, text TEXT)'
+    )
+    payload = json.dumps({'form_data': {f'field_{i}': 'x' * 200 for i in range(50)}})
+    conn.executemany(
+        'INSERT INTO info_section (endpoint, title, url, text) VALUES (?, ?, ?, ?)',
+        [(f'section-{i}', f'Раздел {i}', f'/sveden/section-{i}', payload) for i in range(SECTIONS)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def connect(path, profile, read_only=False, busy_timeout_ms=15000):
+    """Открывает соединение с выбранным профилем"""
+    if profile == 'default':
+        return sqlite3.connect(path, check_same_thread=False)
+
+    config = {'SQLITE_BUSY_TIMEOUT_MS': busy_timeout_ms}
+    if read_only:
+        conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True,
+                               timeout=busy_timeout_ms / 1000, check_same_thread=False)
+    else:
+        conn = sqlite3.connect(path, timeout=busy_timeout_ms / 1000, check_same_thread=False)
+    for pragma in sqlite_pragmas(config, read_only=read_only):
+        conn.execute(f'PRAGMA {pragma}')
+    return conn
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {'read': [], 'write': []}
+        self.errors = {'read': 0, 'write': 0}
+        self.locked = 0
+
+    def record(self, kind, seconds):
+        with self.lock:
+            self.latencies[kind].append(seconds)
+
+    def error(self, kind, exc):
+        with self.lock:
+            self.errors[kind] += 1
+            if 'locked' in str(exc) or 'busy' in str(exc):
+                self.locked += 1
+
+
+def reader(path, profile, stats, stop, seed):
+    conn = connect(path, profile, read_only=True)
+    n = seed
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            for i in range(PAGE_QUERIES):
+                endpoint = f'section-{(n + i * 37) % SECTIONS}'
+                conn.execute('SELECT id, title, text FROM info_section WHERE endpoint = ?', (endpoint,)).fetchone()
+            conn.execute("SELECT id, title, url FROM info_section WHERE url LIKE '/sveden/%' ORDER BY id").fetchall()
+            stats.record('read', time.perf_counter() - started)
+        except sqlite3.OperationalError as e:
+            stats.error('read', e)
+        n += 1
+    conn.close()
+
+
+def writer(path, profile, stats, stop, seed):
+    conn = connect(path, profile)
+    n = seed
+    while not stop.is_set():
+        started = time.perf_counter()
+        endpoint = f'section-{n % SECTIONS}'
+        try:
+            row = conn.execute('SELECT text FROM info_section WHERE endpoint = ?', (endpoint,)).fetchone()
+            data = json.loads(row[0])
+            data['form_data']['field_0'] = f'rev-{n}'
+            conn.execute('UPDATE info_section SET text = ? WHERE endpoint = ?', (json.dumps(data), endpoint))
+            conn.commit()
+            stats.record('write', time.perf_counter() - started)
+        except sqlite3.OperationalError as e:
+            conn.rollback()
+            stats.error('write', e)
+        n += 7
+        time.sleep(0.005)
+    conn.close()
+
+
+def run_profile(profile, duration, readers, writers):
+    workdir = tempfile.mkdtemp(prefix=f'sqlite-bench-{profile}-')
+    path = os.path.join(workdir, 'site.db')
+    prepare_database(path)
+    # Первое соединение с записью переводит файл в WAL до старта читателей
+    connect(path, profile).close()
+
+    stats = Stats()
+    stop = threading.Event()
+    threads = [threading.Thread(target=reader, args=(path, profile, stats, stop, i * 11)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(path, profile, stats, stop, i * 13)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    result = {'profile': profile}
+    for kind in ('read', 'write'):
+        values = stats.latencies[kind]
+        result[kind] = {
+            'ok': len(values),
+            'errors': stats.errors[kind],
+            'per_sec': round(len(values) / duration, 1),
+            'p50_ms': round(_percentile(values, 50) * 1000, 2),
+            'p95_ms': round(_percentile(values, 95) * 1000, 2),
+        }
+    result['locked_errors'] = stats.locked
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Сравнение профилей SQLite под конкурентной нагрузкой')
+    parser.add_argument('--duration', type=float, default=10.0, help='Длительность прогона каждого профиля, сек')
+    parser.add_argument('--readers', type=int, default=8, help='Число читающих потоков')
+    parser.add_argument('--writers', type=int, default=2, help='Число пишущих потоков')
+    parser.add_argument('--json', action='store_true', help='Вывести результат в JSON')
+    args = parser.parse_args()
+
+    results = [run_profile(profile, args.duration, args.readers, args.writers) for profile in ('default', 'tuned')]
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    print(f'Потоков: чтение {args.readers}, запись {args.writers}; длительность {args.duration} с')
+    for result in results:
+        print(f"\n[{result['profile']}] ошибок 'database is locked': {result['locked_errors']}")
+        for kind in ('read', 'write'):
+            r = result[kind]
+            print(f"  {kind:5}: {r['per_sec']:>8}/с  p50 {r['p50_ms']:>7} мс  p95 {r['p95_ms']:>7} мс  ошибок {r['errors']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,5 @@
-from flask import render_template, request, redirect, url_for, flash, jsonify, make_response
-from flask_login import login_required
+from flask import render_template, request, redirect, url_for, flash, jsonify, make_response, current_app
+from flask_login import login_required, current_user
 from . import sidebar_bp
 from info.models import InfoSection
 from database import db
@@ -8,6 +8,8 @@ import os
 import re
 from datetime import datetime
 from file_manager import file_manager
+from utils import chunked_upload
+from utils.file_helpers import store_uploads_concurrently, remove_batch_files
 from utils.logger import logger
 
 
@@ -242,17 +244,19 @@ def _clean_sidebar_form_data_files(section: InfoSection) -> int:
     except Exception:
         return 0
 
-def render_sidebar_section(endpoint, template_name):
+def render_sidebar_section(endpoint, template_name, **extra_context):
     """Отображает sidebar раздел с поддержкой редактирования через InfoSection"""
     section = InfoSection.query.filter_by(endpoint=endpoint).first()
     if section:
-        # Чистим content_blocks от ссылок на отсутствующие файлы (иначе появляются "пустые" плитки)
+        # Чистим content_blocks от ссылок на отсутствующие файлы (иначе появляются "пустые" плитки);
+        # по индексу блоков разделы без файлов в блоках пропускаются без разбора JSON
         try:
-            blocks = section.get_content_blocks()
-            cleaned_blocks, removed = _clean_sidebar_content_blocks_files(blocks)
-            if removed > 0:
-                section.set_content_blocks(cleaned_blocks)
-                db.session.commit()
+            if section.get_blocks_index().get('files'):
+                blocks = section.get_content_blocks()
+                cleaned_blocks, removed = _clean_sidebar_content_blocks_files(blocks)
+                if removed > 0:
+                    section.set_content_blocks(cleaned_blocks)
+                    db.session.commit()
         except Exception:
             pass
 
@@ -322,10 +326,8 @@ def render_sidebar_section(endpoint, template_name):
         # Если раздел есть в БД, отображаем его через info/section.html (даже если text пустой)
         # Передаем текущую дату для фильтрации блюд в архиве
         today = datetime.now().strftime('%d.%m.%Y')
-        response = make_response(render_template('info/section.html', section=section, children=children, all_sections=all_sections_for_template, today=today))
-        response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-        response.headers['Pragma'] = 'no-cache'
-        response.headers['Expires'] = '0'
+        # Cache-Control выставляет utils.http_cache: public для анонимных, no-store для редакторов
+        response = make_response(render_template('info/section.html', section=section, children=children, all_sections=all_sections_for_template, today=today, **extra_context))
         return response
     # Если раздела нет в БД, рендерим через общий шаблон info/section.html,
     # создавая временный объект с минимальными полями, чтобы была доступна кнопка "Редактировать"
@@ -338,14 +340,14 @@ def render_sidebar_section(endpoint, template_name):
             self.text = json.dumps({'text': '', 'form_data': {}}, ensure_ascii=False)
         def get_content_blocks(self):
             return []
+        def block_file_names(self, kind):
+            return []
 
     temp = TempSection(endpoint, template_name.replace('_', ' ').title(), f'/sidebar/{endpoint}')
 
     # для единообразия передаем пустые списки детей
-    response = make_response(render_template('info/section.html', section=temp, children=[], all_sections=[]))
-    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-    response.headers['Pragma'] = 'no-cache'
-    response.headers['Expires'] = '0'
+    # Cache-Control выставляет utils.http_cache: public для анонимных, no-store для редакторов
+    response = make_response(render_template('info/section.html', section=temp, children=[], all_sections=[], **extra_context))
     return response
 
 # Основные пункты меню
@@ -376,7 +378,10 @@ def food():
 
 @sidebar_bp.route('/nutrition-dishes-archive')
 def nutrition_dishes_archive():
-    return render_sidebar_section('nutrition-dishes-archive', 'nutrition_dishes_archive')
+    # Блюда архива — из таблицы DailyDish, по одному месяцу (?month=YYYY-MM&page=N)
+    from utils.dish_archive import load_archive_page
+    dish_archive = load_archive_page(request.args.get('month'), request.args.get('page', 1, type=int))
+    return render_sidebar_section('nutrition-dishes-archive', 'nutrition_dishes_archive', dish_archive=dish_archive)
 
 @sidebar_bp.route('/admission-grade1')
 def admission_grade1():
@@ -627,6 +632,83 @@ def get_nutrition_menu_files():
         }), 500
 
 
+# Максимальный период для выборки меню за диапазон дат (архив блюд листается по месяцам)
+NUTRITION_MENU_MAX_RANGE_DAYS = 92
+
+
+def _nutrition_menu_response(payload, menus):
+    """JSON меню с ETag по времени разбора файлов и публичным кэшированием"""
+    import hashlib
+
+    response = jsonify(payload)
+    version = ';'.join(f"{m.id}:{m.parsed_at.isoformat() if m.parsed_at else ''}" for m in menus)
+    response.set_etag(hashlib.sha1(version.encode('utf-8')).hexdigest())
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config.get('NUTRITION_MENU_MAX_AGE', 300)
+    return response.make_conditional(request)
+
+
+def _parse_menu_date(value):
+    try:
+        return datetime.strptime(value or '', '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+@sidebar_bp.route('/api/nutrition/menu/<menu_date>')
+def get_nutrition_menu(menu_date):
+    """Меню питания на день: блюда, приемы пищи, цены и калорийность"""
+    from models.models import NutritionMenu
+
+    day = _parse_menu_date(menu_date)
+    if day is None:
+        return jsonify({
+            'success': False,
+            'error': 'Неверная дата',
+            'instructions': ['Формат даты: YYYY-MM-DD (например: 2025-10-02)']
+        }), 400
+
+    menu = NutritionMenu.query.filter_by(menu_date=day).first()
+    if not menu:
+        return jsonify({'success': False, 'error': 'Меню на эту дату не найдено'}), 404
+    return _nutrition_menu_response({'success': True, 'menu': menu.to_dict()}, [menu])
+
+
+@sidebar_bp.route('/api/nutrition/menu')
+def get_nutrition_menus():
+    """Меню питания за период: ?from=YYYY-MM-DD&to=YYYY-MM-DD (для архива блюд)"""
+    from models.models import NutritionMenu
+    from sqlalchemy.orm import selectinload
+
+    start = _parse_menu_date(request.args.get('from'))
+    end = _parse_menu_date(request.args.get('to')) or start
+    if start is None or end < start:
+        return jsonify({
+            'success': False,
+            'error': 'Неверный период',
+            'instructions': ['Укажите период: ?from=YYYY-MM-DD&to=YYYY-MM-DD']
+        }), 400
+    if (end - start).days >= NUTRITION_MENU_MAX_RANGE_DAYS:
+        return jsonify({
+            'success': False,
+            'error': f'Период не может быть длиннее {NUTRITION_MENU_MAX_RANGE_DAYS} дней'
+        }), 400
+
+    # Два запроса на весь период: меню по индексу даты и их блюда
+    menus = (NutritionMenu.query
+             .filter(NutritionMenu.menu_date.between(start, end))
+             .options(selectinload(NutritionMenu.items))
+             .order_by(NutritionMenu.menu_date)
+             .all())
+    return _nutrition_menu_response({
+        'success': True,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'menus': [menu.to_dict() for menu in menus],
+        'total': len(menus)
+    }, menus)
+
+
 @sidebar_bp.route('/api/nutrition/upload-menu', methods=['POST'])
 @login_required
 def upload_nutrition_menu():
@@ -744,6 +826,7 @@ def upload_nutrition_menu():
                 existing_file.display_name = file_info['original_name']
                 existing_file.file_data = file_data
                 existing_file.stored_in_db = True
+                existing_file.content_hash = file_info.get('sha256')
                 existing_file.upload_date = datetime.now()
             else:
                 # Создаем новую запись в БД
@@ -758,7 +841,8 @@ def upload_nutrition_menu():
                     is_image=file_info['is_image'],
                     display_name=file_info['original_name'],
                     file_data=file_data,
-                    stored_in_db=True
+                    stored_in_db=True,
+                    content_hash=file_info.get('sha256')
                 )
                 db.session.add(info_file)
             
@@ -774,13 +858,35 @@ def upload_nutrition_menu():
                 logger.error(f"Ошибка при сохранении файла в БД: {db_error}")
                 db.session.rollback()
         
+        # Меню на день разбираем сразу: блюда отдаются через /sidebar/api/nutrition/menu/<date>
+        menu_parsed = False
+        menu_error = None
+        if file_date and filename.lower().endswith('.xlsx'):
+            from utils.nutrition_menu import import_menu, MenuParseError
+            try:
+                file.seek(0)
+                menu = import_menu(file_info['filename'], file.read(), file_date.date())
+                db.session.commit()
+                menu_parsed = True
+                logger.info(f"Меню питания {file_info['filename']} разобрано: блюд {len(menu.items)}")
+            except MenuParseError as e:
+                db.session.rollback()
+                menu_error = str(e)
+                logger.warning(f"Не удалось разобрать меню {file_info['filename']}: {e}")
+            except Exception as e:
+                db.session.rollback()
+                menu_error = 'Ошибка при сохранении блюд меню'
+                logger.error(f"Ошибка при сохранении меню {file_info['filename']}: {e}")
+
         return jsonify({
             'success': True,
             'message': 'Файл меню успешно загружен',
             'filename': file_info['filename'],
             'url': f'/food/{file_info["filename"]}',  # Используем специальный URL для питания
             'date': file_date.strftime('%Y-%m-%d') if file_date else '',
-            'is_template': is_template
+            'is_template': is_template,
+            'menu_parsed': menu_parsed,
+            'menu_error': menu_error
         })
     except Exception as e:
         return jsonify({
@@ -807,13 +913,14 @@ def dynamic_sidebar_section(section_endpoint):
     section = InfoSection.query.filter_by(endpoint=section_endpoint).first()
     
     if section:
-        # Чистим content_blocks от ссылок на отсутствующие файлы
+        # Чистим content_blocks от ссылок на отсутствующие файлы (только если они есть в индексе блоков)
         try:
-            blocks = section.get_content_blocks()
-            cleaned_blocks, removed = _clean_sidebar_content_blocks_files(blocks)
-            if removed > 0:
-                section.set_content_blocks(cleaned_blocks)
-                db.session.commit()
+            if section.get_blocks_index().get('files'):
+                blocks = section.get_content_blocks()
+                cleaned_blocks, removed = _clean_sidebar_content_blocks_files(blocks)
+                if removed > 0:
+                    section.set_content_blocks(cleaned_blocks)
+                    db.session.commit()
         except Exception:
             pass
 
@@ -879,10 +986,8 @@ def dynamic_sidebar_section(section_endpoint):
         try:
             # Передаем текущую дату для фильтрации блюд в архиве
             today = datetime.now().strftime('%d.%m.%Y')
+            # Cache-Control выставляет utils.http_cache: public для анонимных, no-store для редакторов
             response = make_response(render_template('info/section.html', section=section, children=children, all_sections=all_sections_for_template, today=today))
-            response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-            response.headers['Pragma'] = 'no-cache'
-            response.headers['Expires'] = '0'
             return response
         except Exception as e:
             # Ошибка при отображении раздела
@@ -1043,7 +1148,8 @@ def get_section_data(section_endpoint):
                 'title': section_endpoint.replace('-', ' ').title(),
                 'text': json.dumps({'text': '', 'form_data': {}}),
                 'content_blocks': [],
-                'form_data': {}
+                'form_data': {},
+                'version': 0
             }
         })
     
@@ -1056,34 +1162,15 @@ def get_section_data(section_endpoint):
     except Exception as e:
         pass
     
-    # Рекурсивная функция для нормализации блоков
-    def normalize_blocks_recursive(blocks_list):
-        normalized_blocks = []
-        for block in blocks_list:
-            if isinstance(block, dict):
-                # Проверяем, есть ли внутри блока content_blocks
-                if 'content_blocks' in block and isinstance(block['content_blocks'], list):
-                    # Если есть, добавляем только вложенные блоки, сам блок не добавляем
-                    normalized_blocks.extend(normalize_blocks_recursive(block['content_blocks']))
-                else:
-                    # Убираем вложенные content_blocks из блока
-                    normalized_block = {k: v for k, v in block.items() if k != 'content_blocks'}
-                    normalized_blocks.append(normalized_block)
-            elif isinstance(block, list):
-                # Если блок - это массив, рекурсивно обрабатываем его
-                normalized_blocks.extend(normalize_blocks_recursive(block))
-            else:
-                normalized_blocks.append(block)
-        return normalized_blocks
-    
-    # Нормализуем блоки при загрузке из базы данных
+    # Блоки нормализованы при записи (InfoSection.set_content_blocks)
     content_blocks = section.get_content_blocks()
-    if isinstance(content_blocks, list):
-        content_blocks = normalize_blocks_recursive(content_blocks)
 
     # Чистим блоки от ссылок на отсутствующие файлы (для стабильного UI в мастере)
     try:
-        content_blocks, removed = _clean_sidebar_content_blocks_files(content_blocks)
+        if section.get_blocks_index().get('files'):
+            content_blocks, removed = _clean_sidebar_content_blocks_files(content_blocks)
+        else:
+            removed = 0
         if removed > 0:
             section.set_content_blocks(content_blocks)
             db.session.commit()
@@ -1106,14 +1193,187 @@ def get_section_data(section_endpoint):
             'title': section.title,
             'text': section.text,
             'content_blocks': content_blocks,
-            'form_data': form_data
+            'form_data': form_data,
+            'version': section.version
         }
     })
 
+
+def _clean_wizard_field(key, value):
+    """Очищает поле content от HTML-тегов и JSON-строк"""
+    if key == 'content' and isinstance(value, str):
+        # Удаляем HTML-теги из поля content
+        value = re.sub(r'<[^>]+>', '', value)
+        # Удаляем JSON-строки, если они есть
+        if value.strip().startswith('{') and value.strip().endswith('}'):
+            try:
+                json_data = json.loads(value)
+                # Если это JSON, извлекаем только текстовое содержимое
+                if isinstance(json_data, dict):
+                    value = json_data.get('text', '') or json_data.get('content', '') or ''
+                else:
+                    value = ''
+            except:
+                pass
+    return value
+
+
+def _merge_block_files(form_data):
+    """Склеивает все block_*_photos/documents в images/documents, если они пустые"""
+    try:
+        # Простая и надежная версия без сложного маппинга ключей
+        if not (isinstance(form_data.get('images'), str) and form_data.get('images', '').strip()):
+            photo_values = []
+            for k, v in form_data.items():
+                if isinstance(k, str) and re.match(r'^block_\\d+_photos$', k) and isinstance(v, str) and v.strip():
+                    photo_values.append(v.strip())
+            if photo_values:
+                form_data['images'] = ', '.join(photo_values)
+
+        if not (isinstance(form_data.get('documents'), str) and form_data.get('documents', '').strip()):
+            doc_values = []
+            for k, v in form_data.items():
+                if isinstance(k, str) and re.match(r'^block_\\d+_documents$', k) and isinstance(v, str) and v.strip():
+                    doc_values.append(v.strip())
+            if doc_values:
+                form_data['documents'] = ', '.join(doc_values)
+    except Exception:
+        pass
+    return form_data
+
+
+def _set_sidebar_content_blocks(section_id, section, content_blocks):
+    """Нормализует блоки, переносит блюда в архив и сохраняет блоки раздела"""
+    # Нормализуем структуру блоков - убираем вложенные блоки
+    # Lazy import to avoid circular imports at module load time
+    from utils.content_blocks import normalize_blocks
+    if isinstance(content_blocks, list):
+        content_blocks = normalize_blocks(content_blocks)
+
+    # ВАЖНО: ранее для "nutrition-dishes-archive" была логика с merge, которая мешала
+    # удалять блоки (при пустом списке блоков возвращались существующие).
+    # Сейчас считаем, что content_blocks в запросе — источник истины (после normalize).
+
+    # Если это раздел "food" (питание) и есть блоки типа "daily-dish", копируем блюда в архив
+    # (таблица DailyDish; одно блюдо на дату блока)
+    # Lazy import to avoid circular imports at module load time
+    from utils.dish_archive import upsert_dishes, strip_archive_dishes
+    if section_id == 'food' or section_id == 'nutrition':
+        upsert_dishes(
+            [block.get('dish') for block in content_blocks
+             if isinstance(block, dict) and block.get('type') == 'daily-dish' and isinstance(block.get('dish'), dict)],
+            match_on='dish_date'
+        )
+    elif section_id == 'nutrition-dishes-archive':
+        # Блюда архива хранятся в таблице, в JSON блока dishes остается пустой список
+        content_blocks = strip_archive_dishes(content_blocks)
+
+    section.set_content_blocks(content_blocks)
+
+
+def _update_sidebar_section(section_id, section, section_data):
+    """Обновляет существующий раздел полными данными мастера"""
+    section.title = section_data.get('title', section.title)
+
+    excluded_keys = ['title', 'text', 'content_blocks']
+    form_data = {key: _clean_wizard_field(key, value)
+                 for key, value in section_data.items() if key not in excluded_keys}
+
+    existing_text_data = {}
+    if section.text:
+        try:
+            existing_text_data = json.loads(section.text)
+        except:
+            existing_text_data = {}
+    existing_form_data = existing_text_data.get('form_data', {}) if isinstance(existing_text_data, dict) else {}
+
+    # Для "nutrition-dishes-archive" не тащим весь старый form_data (это мешало чистить контент),
+    # но критичные служебные поля меню (parent/order/show_in_menu) сохраняем всегда.
+    if section_id != 'nutrition-dishes-archive':
+        for k, v in existing_form_data.items():
+            if k not in form_data:
+                form_data[k] = v
+    else:
+        for k in ('parent', 'menu_parent', 'order', 'show_in_menu'):
+            if k not in form_data and k in existing_form_data:
+                form_data[k] = existing_form_data.get(k)
+
+    text_data = {
+        # Для "nutrition-dishes-archive" всегда берем text из запроса (обычно пустой),
+        # чтобы можно было очищать значение и не дублировать контент.
+        'text': (section_data.get('text', '') if section_id == 'nutrition-dishes-archive'
+                 else existing_text_data.get('text', section_data.get('text', ''))),
+        'form_data': _merge_block_files(form_data)
+    }
+    section.text = json.dumps(text_data, ensure_ascii=False)
+
+    if 'content_blocks' in section_data:
+        _set_sidebar_content_blocks(section_id, section, section_data['content_blocks'])
+
+
+def _create_sidebar_section(section_id, section_data):
+    """Создает новый раздел из данных мастера"""
+    excluded_keys = ['title', 'text', 'content_blocks']
+    form_data = {key: _clean_wizard_field(key, value)
+                 for key, value in section_data.items() if key not in excluded_keys}
+
+    text_data = {
+        'text': section_data.get('text', ''),
+        'form_data': form_data
+    }
+
+    section = InfoSection(
+        endpoint=section_id,
+        title=section_data.get('title', ''),
+        text=json.dumps(text_data, ensure_ascii=False),
+        url=f'/sidebar/{section_id}'
+    )
+    _set_sidebar_content_blocks(section_id, section, section_data.get('content_blocks', []))
+    return section
+
+
+def _apply_sidebar_patch(section, patch):
+    """Применяет патч мастера: меняются только переданные ключи"""
+    # Lazy import to avoid circular imports at module load time
+    from info.section_patch import read_text_data, patched_form_data
+
+    text_data = read_text_data(section)
+    if 'title' in patch:
+        section.title = patch['title'] or section.title
+    if 'text' in patch:
+        text_data['text'] = patch['text']
+    form_data = patched_form_data(text_data['form_data'], patch, clean_value=_clean_wizard_field)
+    text_data['form_data'] = _merge_block_files(form_data)
+    section.text = json.dumps(text_data, ensure_ascii=False)
+    if 'content_blocks' in patch:
+        _set_sidebar_content_blocks(section.endpoint, section, patch['content_blocks'])
+
+
+def _create_sidebar_section_from_patch(section_id, patch):
+    """Новый раздел из патча мастера"""
+    section_data = dict(patch.get('fields') or {})
+    for key in ('title', 'text', 'content_blocks'):
+        if key in patch:
+            section_data[key] = patch[key]
+    return _create_sidebar_section(section_id, section_data)
+
+
 @sidebar_bp.route('/wizard_save', methods=['POST'])
 @login_required
 def wizard_save():
-    """Сохранение данных мастера заполнения для sidebar разделов"""
+    """
+    Сохранение данных мастера заполнения для sidebar разделов.
+
+    JSON-запрос — патчи измененных полей с версиями разделов (см. info.section_patch);
+    форма с wizard_data — полные данные разделов (старые формы редактирования).
+    """
+    if request.is_json:
+        # Lazy import to avoid circular imports at module load time
+        from info.section_patch import save_section_patches
+        payload = request.get_json(silent=True) or {}
+        return save_section_patches(payload, _apply_sidebar_patch, _create_sidebar_section_from_patch,
+                                    save_single=bool(payload.get('save_single')))
+
     try:
         wizard_data = request.form.get('wizard_data')
         save_single = request.form.get('save_single', 'false').lower() == 'true'
@@ -1123,234 +1383,20 @@ def wizard_save():
         
         data = json.loads(wizard_data)
         
+        # Все разделы запроса загружаются одним запросом
+        # Lazy import to avoid circular imports at module load time
+        from info.section_patch import load_sections
+        sections = load_sections(data)
+        
         # Обрабатываем каждый раздел
         for section_id, section_data in data.items():
-            section = InfoSection.query.filter_by(endpoint=section_id).first()
+            section = sections.get(section_id)
             
             if section:
-                # Обновляем существующий раздел
-                section.title = section_data.get('title', section.title)
-                
-                form_data = {}
-                excluded_keys = ['title', 'text', 'content_blocks']
-                
-                for key, value in section_data.items():
-                    if key not in excluded_keys:
-                        # Очищаем поле content от HTML-тегов и JSON-строк
-                        if key == 'content' and isinstance(value, str):
-                            # Удаляем HTML-теги из поля content
-                            value = re.sub(r'<[^>]+>', '', value)
-                            # Удаляем JSON-строки, если они есть
-                            if value.strip().startswith('{') and value.strip().endswith('}'):
-                                try:
-                                    json_data = json.loads(value)
-                                    # Если это JSON, извлекаем только текстовое содержимое
-                                    if isinstance(json_data, dict):
-                                        value = json_data.get('text', '') or json_data.get('content', '') or ''
-                                    else:
-                                        value = ''
-                                except:
-                                    pass
-                        form_data[key] = value
-                
-                existing_text_data = {}
-                if section.text:
-                    try:
-                        existing_text_data = json.loads(section.text)
-                    except:
-                        existing_text_data = {}
-                existing_form_data = existing_text_data.get('form_data', {}) if isinstance(existing_text_data, dict) else {}
-                
-                # Для "nutrition-dishes-archive" не тащим весь старый form_data (это мешало чистить контент),
-                # но критичные служебные поля меню (parent/order/show_in_menu) сохраняем всегда.
-                if section_id != 'nutrition-dishes-archive':
-                    for k, v in existing_form_data.items():
-                        if k not in form_data:
-                            form_data[k] = v
-                else:
-                    for k in ('parent', 'menu_parent', 'order', 'show_in_menu'):
-                        if k not in form_data and k in existing_form_data:
-                            form_data[k] = existing_form_data.get(k)
-
-                try:
-                    # Простая и надежная версия без сложного маппинга ключей:
-                    # склеиваем все block_*_photos/documents в images/documents если они пустые.
-                    if not (isinstance(form_data.get('images'), str) and form_data.get('images', '').strip()):
-                        photo_values = []
-                        for k, v in form_data.items():
-                            if isinstance(k, str) and re.match(r'^block_\\d+_photos$', k) and isinstance(v, str) and v.strip():
-                                photo_values.append(v.strip())
-                        if photo_values:
-                            form_data['images'] = ', '.join(photo_values)
-
-                    if not (isinstance(form_data.get('documents'), str) and form_data.get('documents', '').strip()):
-                        doc_values = []
-                        for k, v in form_data.items():
-                            if isinstance(k, str) and re.match(r'^block_\\d+_documents$', k) and isinstance(v, str) and v.strip():
-                                doc_values.append(v.strip())
-                        if doc_values:
-                            form_data['documents'] = ', '.join(doc_values)
-                except Exception:
-                    pass
-                
-                text_data = {
-                    # Для "nutrition-dishes-archive" всегда берем text из запроса (обычно пустой),
-                    # чтобы можно было очищать значение и не дублировать контент.
-                    'text': (section_data.get('text', '') if section_id == 'nutrition-dishes-archive'
-                             else existing_text_data.get('text', section_data.get('text', ''))),
-                    'form_data': form_data
-                }
-                
-                section.text = json.dumps(text_data, ensure_ascii=False)
-                
-                if 'content_blocks' in section_data:
-                    # Рекурсивная функция для нормализации блоков
-                    def normalize_blocks_recursive(blocks_list):
-                        normalized_blocks = []
-                        for block in blocks_list:
-                            if isinstance(block, dict):
-                                # Проверяем, есть ли внутри блока content_blocks
-                                if 'content_blocks' in block and isinstance(block['content_blocks'], list):
-                                    # Если есть, добавляем только вложенные блоки, сам блок не добавляем
-                                    normalized_blocks.extend(normalize_blocks_recursive(block['content_blocks']))
-                                else:
-                                    # Убираем вложенные content_blocks из блока
-                                    normalized_block = {k: v for k, v in block.items() if k != 'content_blocks'}
-                                    normalized_blocks.append(normalized_block)
-                            elif isinstance(block, list):
-                                # Если блок - это массив, рекурсивно обрабатываем его
-                                normalized_blocks.extend(normalize_blocks_recursive(block))
-                            else:
-                                normalized_blocks.append(block)
-                        return normalized_blocks
-                    
-                    # Нормализуем структуру блоков - убираем вложенные блоки
-                    content_blocks = section_data['content_blocks']
-                    if isinstance(content_blocks, list):
-                        content_blocks = normalize_blocks_recursive(content_blocks)
-                    
-                    # ВАЖНО: ранее для "nutrition-dishes-archive" была логика с merge, которая мешала
-                    # удалять блоки (при пустом списке блоков возвращались существующие).
-                    # Сейчас считаем, что content_blocks в запросе — источник истины (после normalize).
-                    
-                    # Если это раздел "food" (питание) и есть блоки типа "daily-dish", копируем их в "nutrition-dishes-archive"
-                    if section_id == 'food' or section_id == 'nutrition':
-                        archive_section = InfoSection.query.filter_by(endpoint='nutrition-dishes-archive').first()
-                        if archive_section:
-                            archive_blocks = archive_section.get_content_blocks() or []
-                            
-                            # Ищем или создаем блок "dishes" с названием "Ежедневное меню" в архиве
-                            dishes_block = None
-                            for archive_block in archive_blocks:
-                                if isinstance(archive_block, dict) and archive_block.get('type') == 'dishes' and archive_block.get('title') == 'Ежедневное меню':
-                                    dishes_block = archive_block
-                                    break
-                            
-                            if not dishes_block:
-                                dishes_block = {
-                                    'type': 'dishes',
-                                    'title': 'Ежедневное меню',
-                                    'dishes': []
-                                }
-                                archive_blocks.append(dishes_block)
-                            
-                            # Ищем блоки типа "daily-dish" в разделе питания
-                            for block in content_blocks:
-                                if isinstance(block, dict) and block.get('type') == 'daily-dish' and block.get('dish'):
-                                    dish = block.get('dish')
-                                    # Проверяем, нет ли уже такого блюда в архиве (по дате)
-                                    dish_date = dish.get('date', '')
-                                    existing_dish = None
-                                    dishes_list = dishes_block.get('dishes', [])
-                                    for existing_d in dishes_list:
-                                        if existing_d.get('date') == dish_date:
-                                            existing_dish = existing_d
-                                            break
-                                    
-                                    # Если блюдо уже есть, обновляем его, иначе добавляем новое
-                                    if existing_dish:
-                                        existing_dish.update({
-                                            'title': dish.get('title', ''),
-                                            'publish_date': dish.get('publish_date', ''),
-                                            'photo': dish.get('photo', '')
-                                        })
-                                    else:
-                                        dishes_block['dishes'].append({
-                                            'title': dish.get('title', ''),
-                                            'date': dish_date,
-                                            'publish_date': dish.get('publish_date', ''),
-                                            'photo': dish.get('photo', '')
-                                        })
-                            
-                            # Обновляем блок в архиве
-                            archive_section.set_content_blocks(archive_blocks)
-                            
-                            # Примечание: Статический блок "Ежедневное меню" отображается автоматически
-                            # в шаблоне templates/info/section.html и не редактируется через мастер
-                    
-                    section.set_content_blocks(content_blocks)
+                _update_sidebar_section(section_id, section, section_data)
+                section.version = (section.version or 0) + 1
             else:
-                # Создаем новый раздел
-                form_data = {}
-                excluded_keys = ['title', 'text', 'content_blocks']
-                
-                for key, value in section_data.items():
-                    if key not in excluded_keys:
-                        # Очищаем поле content от HTML-тегов и JSON-строк
-                        if key == 'content' and isinstance(value, str):
-                            # Удаляем HTML-теги из поля content
-                            value = re.sub(r'<[^>]+>', '', value)
-                            # Удаляем JSON-строки, если они есть
-                            if value.strip().startswith('{') and value.strip().endswith('}'):
-                                try:
-                                    json_data = json.loads(value)
-                                    # Если это JSON, извлекаем только текстовое содержимое
-                                    if isinstance(json_data, dict):
-                                        value = json_data.get('text', '') or json_data.get('content', '') or ''
-                                    else:
-                                        value = ''
-                                except:
-                                    pass
-                        form_data[key] = value
-                
-                text_data = {
-                    'text': section_data.get('text', ''),
-                    'form_data': form_data
-                }
-                
-                section = InfoSection(
-                    endpoint=section_id,
-                    title=section_data.get('title', ''),
-                    text=json.dumps(text_data, ensure_ascii=False),
-                    url=f'/sidebar/{section_id}'
-                )
-                
-                # Рекурсивная функция для нормализации блоков
-                def normalize_blocks_recursive(blocks_list):
-                    normalized_blocks = []
-                    for block in blocks_list:
-                        if isinstance(block, dict):
-                            # Проверяем, есть ли внутри блока content_blocks
-                            if 'content_blocks' in block and isinstance(block['content_blocks'], list):
-                                # Если есть, добавляем только вложенные блоки, сам блок не добавляем
-                                normalized_blocks.extend(normalize_blocks_recursive(block['content_blocks']))
-                            else:
-                                # Убираем вложенные content_blocks из блока
-                                normalized_block = {k: v for k, v in block.items() if k != 'content_blocks'}
-                                normalized_blocks.append(normalized_block)
-                        elif isinstance(block, list):
-                            # Если блок - это массив, рекурсивно обрабатываем его
-                            normalized_blocks.extend(normalize_blocks_recursive(block))
-                        else:
-                            normalized_blocks.append(block)
-                    return normalized_blocks
-                
-                # Нормализуем структуру блоков - убираем вложенные блоки
-                content_blocks = section_data.get('content_blocks', [])
-                if isinstance(content_blocks, list):
-                    content_blocks = normalize_blocks_recursive(content_blocks)
-                section.set_content_blocks(content_blocks)
-                db.session.add(section)
+                db.session.add(_create_sidebar_section(section_id, section_data))
         
         db.session.commit()
         
@@ -1366,6 +1412,11 @@ def wizard_save():
 def upload_file():
     """Загрузка файла на сервер с сохранением в базе данных"""
     try:
+        max_len = current_app.config.get('MAX_CONTENT_LENGTH')
+        if max_len and request.content_length and request.content_length > max_len:
+            max_mb = round(max_len / (1024 * 1024))
+            return jsonify({'success': False, 'error': f'Файл слишком большой. Максимум {max_mb} МБ'}), 413
+
         if 'file' not in request.files:
             return jsonify({'success': False, 'error': 'Файл не найден'})
         
@@ -1373,174 +1424,290 @@ def upload_file():
         section = request.form.get('section', 'general')
         field_name = request.form.get('field_name')
         
-        if file.filename == '':
-            return jsonify({'success': False, 'error': 'Файл не выбран'})
-        
-        section_obj = InfoSection.query.filter_by(endpoint=section).first()
-        if not section_obj:
-            # Создаем раздел, если его нет
-            section_obj = InfoSection(
-                endpoint=section,
-                title=section,
-                text=json.dumps({'form_data': {}}),
-                url=f'/sidebar/{section}'
-            )
-            db.session.add(section_obj)
-            db.session.commit()
+        return _save_uploaded_file(file, section, field_name)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)})
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Ошибка при загрузке файла: {str(e)}'})
+
+
+@sidebar_bp.route('/upload_files', methods=['POST'])
+@login_required
+def upload_files():
+    """Пакетная загрузка файлов: параллельное сохранение на диск и одна транзакция на пакет"""
+    max_len = current_app.config.get('MAX_CONTENT_LENGTH')
+    if max_len and request.content_length and request.content_length > max_len:
+        max_mb = round(max_len / (1024 * 1024))
+        return jsonify({'success': False, 'error': f'Файлы слишком большие. Максимум {max_mb} МБ за запрос'}), 413
+
+    files = [f for f in request.files.getlist('files') + request.files.getlist('file') if f and f.filename]
+    if not files:
+        return jsonify({'success': False, 'error': 'Файлы не найдены', 'results': []})
+
+    section = request.form.get('section', 'general')
+    field_name = request.form.get('field_name')
+
+    results = [None] * len(files)
+    to_store = []
+    for index, file in enumerate(files):
+        if file_manager.is_allowed_file(file.filename):
+            to_store.append(index)
+        else:
+            results[index] = {'success': False, 'original_name': file.filename,
+                              'error': f'Недопустимый тип файла: {file.filename}'}
+
+    stored = {}
+    try:
+        section_obj = _get_or_create_upload_section(section)
+        section_url = section_obj.url or ''
+        stored = store_uploads_concurrently(
+            files, to_store, lambda file: file_manager.save_info_file(file, section, field_name, section_url=section_url)
+        )
+
+        for index in to_store:
+            file_info, error = stored[index]
+            if error or not file_info:
+                results[index] = {'success': False, 'original_name': files[index].filename,
+                                  'error': error or 'Ошибка при сохранении файла'}
+                continue
+            results[index] = _register_uploaded_file(section_obj, file_info, field_name)
+
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Ошибка пакетной загрузки в раздел {section}: {e}")
+        remove_batch_files(stored)
+        for index in to_store:
+            results[index] = {'success': False, 'original_name': files[index].filename,
+                              'error': f'Ошибка при сохранении в базу данных: {e}'}
+
+    uploaded = sum(1 for r in results if r and r.get('success'))
+    return jsonify({
+        'success': uploaded > 0,
+        'uploaded': uploaded,
+        'failed': len(results) - uploaded,
+        'results': results
+    })
+
+def _save_uploaded_file(file, section, field_name):
+    """Сохраняет загруженный файл в sidebar-раздел: файл на диске, запись InfoFile и form_data.
+
+    Используется обычной загрузкой (upload_file) и сборкой загрузки по частям.
+    """
+    if file.filename == '':
+        return jsonify({'success': False, 'error': 'Файл не выбран'})
+    
+    section_obj = _get_or_create_upload_section(section)
+    file_info = file_manager.save_info_file(file, section, field_name, section_url=section_obj.url or '')
+    
+    if file_info:
+        result = _register_uploaded_file(section_obj, file_info, field_name)
+        db.session.commit()
+        return jsonify(result)
+    else:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': 'Ошибка при сохранении файла'})
+
+
+def _get_or_create_upload_section(section):
+    """Возвращает sidebar-раздел для загрузки; если его нет — создаёт (без commit)"""
+    section_obj = InfoSection.query.filter_by(endpoint=section).first()
+    if not section_obj:
+        # Создаем раздел, если его нет
+        section_obj = InfoSection(
+            endpoint=section,
+            title=section,
+            text=json.dumps({'form_data': {}}),
+            url=f'/sidebar/{section}'
+        )
+        db.session.add(section_obj)
+        db.session.flush()
+    return section_obj
+
+
+def _register_uploaded_file(section_obj, file_info, field_name):
+    """Записывает сохраненный файл в InfoFile и form_data раздела (без commit).
+
+    Returns:
+        dict — JSON-ответ для клиента
+    """
+    section = section_obj.endpoint
+    # Создаем или обновляем запись в БД для сохранения original_filename
+    from models.models import InfoFile
+    db_file = None
+    try:
+        # Ищем существующую запись
+        query = InfoFile.query.filter_by(
+            filename=file_info['filename'],
+            section_endpoint=section
+        )
+        if field_name:
+            query = query.filter_by(field_name=field_name)
+        db_file = query.first()
         
-        file_info = file_manager.save_info_file(file, section, field_name)
+        # Если не нашли с учетом field_name, ищем без него (для совместимости)
+        if not db_file:
+            db_file = InfoFile.query.filter_by(
+                filename=file_info['filename'],
+                section_endpoint=section
+            ).first()
         
-        if file_info:
-            # Создаем или обновляем запись в БД для сохранения original_filename
-            from models.models import InfoFile
-            db_file = None
+        # Если записи нет, создаем новую
+        if not db_file:
+            # Читаем данные файла для сохранения в БД
+            file_data = None
             try:
-                # Ищем существующую запись
-                query = InfoFile.query.filter_by(
-                    filename=file_info['filename'],
-                    section_endpoint=section
-                )
-                if field_name:
-                    query = query.filter_by(field_name=field_name)
-                db_file = query.first()
-                
-                # Если не нашли с учетом field_name, ищем без него (для совместимости)
-                if not db_file:
-                    db_file = InfoFile.query.filter_by(
-                        filename=file_info['filename'],
-                        section_endpoint=section
-                    ).first()
-                
-                # Если записи нет, создаем новую
-                if not db_file:
-                    # Читаем данные файла для сохранения в БД
-                    file_data = None
-                    try:
-                        with open(file_info['file_path'], 'rb') as f:
-                            file_data = f.read()
-                    except Exception as e:
-                        logger.warning(f"Не удалось прочитать файл для сохранения в БД: {e}")
-                    
-                    db_file = InfoFile(
-                        filename=file_info['filename'],
-                        original_filename=file_info['original_name'],
-                        file_path=file_info['file_path'],
-                        section_endpoint=section,
-                        field_name=field_name,
-                        file_size=file_info['size'],
-                        mime_type=file_info.get('mime_type'),
-                        is_image=file_info.get('is_image', False),
-                        display_name=file_info['original_name'],
-                        file_data=file_data,
-                        stored_in_db=file_data is not None
-                    )
-                    db.session.add(db_file)
-                    db.session.commit()
-                    logger.info(f"Создана запись InfoFile для файла {file_info['filename']}")
-                else:
-                    # Обновляем original_filename, если он изменился или отсутствует
-                    if not db_file.original_filename or db_file.original_filename != file_info['original_name']:
-                        db_file.original_filename = file_info['original_name']
-                        if not db_file.display_name:
-                            db_file.display_name = file_info['original_name']
-                        db.session.commit()
-                        logger.info(f"Обновлен original_filename для файла {file_info['filename']}")
+                with open(file_info['file_path'], 'rb') as f:
+                    file_data = f.read()
             except Exception as e:
-                # Если в БД нет колонок file_data/stored_in_db – просто пропускаем сохранение в БД
-                if 'no such column' in str(e).lower() or 'file_data' in str(e).lower():
-                    logger.warning(
-                        "Поля file_data/stored_in_db еще не добавлены в БД. "
-                        "Пропускаю сохранение файла в InfoFile. Имя будет взято из запроса."
-                    )
-                    db_file = None
-                    if db.session.is_active:
-                        db.session.rollback()
-                else:
-                    logger.error(f"Ошибка при сохранении файла в InfoFile: {e}")
-                    db_file = None
-                    if db.session.is_active:
-                        db.session.rollback()
+                logger.warning(f"Не удалось прочитать файл для сохранения в БД: {e}")
             
+            db_file = InfoFile(
+                filename=file_info['filename'],
+                original_filename=file_info['original_name'],
+                file_path=file_info['file_path'],
+                section_endpoint=section,
+                field_name=field_name,
+                file_size=file_info['size'],
+                mime_type=file_info.get('mime_type'),
+                is_image=file_info.get('is_image', False),
+                display_name=file_info['original_name'],
+                file_data=file_data,
+                stored_in_db=file_data is not None,
+                content_hash=file_info.get('sha256')
+            )
+            db.session.add(db_file)
+            db.session.flush()
+            logger.info(f"Создана запись InfoFile для файла {file_info['filename']}")
+        else:
+            # Обновляем original_filename, если он изменился или отсутствует
+            if not db_file.original_filename or db_file.original_filename != file_info['original_name']:
+                db_file.original_filename = file_info['original_name']
+                if not db_file.display_name:
+                    db_file.display_name = file_info['original_name']
+                logger.info(f"Обновлен original_filename для файла {file_info['filename']}")
+    except Exception as e:
+        # Запись InfoFile — часть общей транзакции загрузки: откат выполняет вызывающий код
+        logger.error(f"Ошибка при сохранении файла в InfoFile: {e}")
+        raise
+    
+    try:
+        if section_obj.text:
+            data = json.loads(section_obj.text)
+        else:
+            data = {'form_data': {}}
+        
+        if field_name:
+            # Для множественных полей (images/documents) — добавляем в список, а не перезаписываем,
+            # чтобы при загрузке нескольких файлов они все сохранялись.
             try:
-                if section_obj.text:
-                    data = json.loads(section_obj.text)
-                else:
-                    data = {'form_data': {}}
-                
-                if field_name:
-                    # Для множественных полей (images/documents) — добавляем в список, а не перезаписываем,
-                    # чтобы при загрузке нескольких файлов они все сохранялись.
-                    try:
-                        multi_fields = {'images', 'documents'}
-                        url_value = file_info['url']
-                        display_name = file_info.get('original_name') or file_info.get('filename')
-                        new_entry = f"{url_value}|{display_name}" if display_name else url_value
-
-                        if field_name in multi_fields:
-                            existing_value = data['form_data'].get(field_name) or ''
-                            existing_items = [x.strip() for x in str(existing_value).split(',') if x.strip()]
-
-                            def entry_key(item: str) -> str:
-                                item_clean = item.split('|')[0].strip() if '|' in item else item.strip()
-                                return item_clean.split('/')[-1].strip().lower()
-
-                            seen = {entry_key(x) for x in existing_items}
-                            if entry_key(new_entry) not in seen:
-                                existing_items.append(new_entry)
-
-                            data['form_data'][field_name] = ', '.join(existing_items)
-                        else:
-                            # Одиночные поля — перезаписываем как раньше
-                            data['form_data'][field_name] = new_entry
-                    except Exception:
-                        data['form_data'][field_name] = file_info['url']
+                multi_fields = {'images', 'documents'}
+                url_value = file_info['url']
+                display_name = file_info.get('original_name') or file_info.get('filename')
+                new_entry = f"{url_value}|{display_name}" if display_name else url_value
+
+                if field_name in multi_fields:
+                    existing_value = data['form_data'].get(field_name) or ''
+                    existing_items = [x.strip() for x in str(existing_value).split(',') if x.strip()]
+
+                    def entry_key(item: str) -> str:
+                        item_clean = item.split('|')[0].strip() if '|' in item else item.strip()
+                        return item_clean.split('/')[-1].strip().lower()
+
+                    seen = {entry_key(x) for x in existing_items}
+                    if entry_key(new_entry) not in seen:
+                        existing_items.append(new_entry)
+
+                    data['form_data'][field_name] = ', '.join(existing_items)
                 else:
-                    if 'files' not in data['form_data']:
-                        data['form_data']['files'] = []
-                    
-                    data['form_data']['files'].append({
-                        'filename': file_info['filename'],
-                        'original_name': file_info['original_name'],
-                        'url': file_info['url'],
-                        'size': file_info['size'],
-                        'uploaded_at': file_info['created_at']
-                    })
-                
-                section_obj.text = json.dumps(data, ensure_ascii=False)
-                db.session.commit()
-            except Exception as e:
-                # Ошибка при обновлении данных раздела
-                logger.warning(f"Ошибка при обновлении данных раздела: {e}")
-            
-            # Определяем правильный URL для sidebar разделов
-            download_url = file_info['url']
-            try:
-                # Проверяем, является ли раздел sidebar разделом
-                if section_obj.url and section_obj.url.startswith('/sidebar/'):
-                    # Если URL еще не правильный, исправляем его
-                    if not download_url.startswith('/sidebar/download_file/'):
-                        download_url = f'/sidebar/download_file/{section}/{file_info["filename"]}'
+                    # Одиночные поля — перезаписываем как раньше
+                    data['form_data'][field_name] = new_entry
             except Exception:
-                pass
+                data['form_data'][field_name] = file_info['url']
+        else:
+            if 'files' not in data['form_data']:
+                data['form_data']['files'] = []
             
-            return jsonify({
-                'success': True,
+            data['form_data']['files'].append({
                 'filename': file_info['filename'],
                 'original_name': file_info['original_name'],
-                'original_filename': file_info.get('original_name') or file_info.get('original_filename') or file_info['filename'],
-                'url': download_url,
-                'is_image': file_info['is_image'],
+                'url': file_info['url'],
                 'size': file_info['size'],
-                'mime_type': file_info['mime_type'],
-                'id': db_file.id if db_file else None
+                'uploaded_at': file_info['created_at']
             })
-        else:
-            return jsonify({'success': False, 'error': 'Ошибка при сохранении файла'})
-            
-    except ValueError as e:
-        return jsonify({'success': False, 'error': str(e)})
+        
+        section_obj.text = json.dumps(data, ensure_ascii=False)
     except Exception as e:
-        return jsonify({'success': False, 'error': f'Ошибка при загрузке файла: {str(e)}'})
+        # Ошибка при обновлении данных раздела
+        logger.warning(f"Ошибка при обновлении данных раздела: {e}")
+    
+    # Определяем правильный URL для sidebar разделов
+    download_url = file_info['url']
+    try:
+        # Проверяем, является ли раздел sidebar разделом
+        if section_obj.url and section_obj.url.startswith('/sidebar/'):
+            # Если URL еще не правильный, исправляем его
+            if not download_url.startswith('/sidebar/download_file/'):
+                download_url = f'/sidebar/download_file/{section}/{file_info["filename"]}'
+    except Exception:
+        pass
+    
+    return {
+        'success': True,
+        'filename': file_info['filename'],
+        'original_name': file_info['original_name'],
+        'original_filename': file_info.get('original_name') or file_info.get('original_filename') or file_info['filename'],
+        'url': download_url,
+        'is_image': file_info['is_image'],
+        'size': file_info['size'],
+        'mime_type': file_info['mime_type'],
+        'id': db_file.id if db_file else None
+    }
+
+
+def _chunked_section(section):
+    return section or 'general'
+
+
+def _chunked_save_error(e):
+    if isinstance(e, ValueError):
+        return jsonify({'success': False, 'error': str(e)})
+    return jsonify({'success': False, 'error': f'Ошибка при загрузке файла: {str(e)}'})
+
+
+@sidebar_bp.route('/upload_chunked/init', methods=['POST'])
+@login_required
+def upload_chunked_init():
+    """Начало загрузки по частям: проверка типа и размера до передачи содержимого"""
+    return chunked_upload.init_response(_chunked_section, file_manager.is_allowed_file)
+
+
+@sidebar_bp.route('/upload_chunked/<upload_id>/<int:index>', methods=['PUT', 'POST'])
+@login_required
+def upload_chunked_part(upload_id, index):
+    """Прием одной части файла (тело запроса — содержимое части, заголовок X-Chunk-SHA256)"""
+    return chunked_upload.chunk_response(upload_id, index)
+
+
+@sidebar_bp.route('/upload_chunked/<upload_id>', methods=['GET'])
+@login_required
+def upload_chunked_status(upload_id):
+    """Статус загрузки по частям (для продолжения после обрыва)"""
+    return chunked_upload.status_response(upload_id)
+
+
+@sidebar_bp.route('/upload_chunked/<upload_id>', methods=['DELETE'])
+@login_required
+def upload_chunked_abort(upload_id):
+    """Отмена загрузки по частям"""
+    return chunked_upload.abort_response(upload_id)
+
+
+@sidebar_bp.route('/upload_chunked/<upload_id>/complete', methods=['POST'])
+@login_required
+def upload_chunked_complete(upload_id):
+    """Сборка файла из частей и сохранение в раздел так же, как upload_file"""
+    return chunked_upload.complete_response(upload_id, _save_uploaded_file, _chunked_save_error)
 
 @sidebar_bp.route('/delete_file', methods=['POST'])
 @login_required
@@ -1760,6 +1927,13 @@ def download_file(section, filename):
             if not mimetype:
                 mimetype = 'application/octet-stream'
         
+        # Файл отдается по неизменяемому URL /media/<sha256>/<имя> с бессрочным кэшированием
+        from utils.media import media_redirect
+        media_response = media_redirect(download_filename, file_path=file_path, file_data=file_data,
+                                        content_hash=info_file.content_hash if info_file else None)
+        if media_response is not None:
+            return media_response
+
         encoded_filename = urllib.parse.quote(download_filename.encode('utf-8'))
 
         is_image = False
@@ -1787,9 +1961,8 @@ def download_file(section, filename):
         disposition = 'inline' if is_image else 'attachment'
         response.headers['Content-Disposition'] = f"{disposition}; filename*=UTF-8''{encoded_filename}"
         response.headers['X-Content-Type-Options'] = 'nosniff'
-        response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-        response.headers['Pragma'] = 'no-cache'
-        response.headers['Expires'] = '0'
+        # Сюда доходят только файлы, которые не удалось поместить в хранилище /media
+        response.headers['Cache-Control'] = 'no-cache'
         
         return response
         
@@ -1803,52 +1976,99 @@ def download_file(section, filename):
 def delete_dish():
     """Удалить блюдо из архива ежедневного меню"""
     try:
-        data = request.get_json()
+        from models.models import DailyDish
+        from utils.dish_archive import parse_dish_date
+
+        data = request.get_json() or {}
+        dish_id = data.get('dish_id')
         dish_date = data.get('dish_date')
         dish_title = data.get('dish_title')
-        
-        if not dish_date:
-            return jsonify({'success': False, 'error': 'Не указана дата блюда'})
-        
-        archive_section = InfoSection.query.filter_by(endpoint='nutrition-dishes-archive').first()
-        if not archive_section:
-            return jsonify({'success': False, 'error': 'Раздел архива не найден'})
-        
-        archive_blocks = archive_section.get_content_blocks() or []
-        
-        # Ищем блок "dishes" с названием "Ежедневное меню"
-        dishes_block = None
-        for block in archive_blocks:
-            if isinstance(block, dict) and block.get('type') == 'dishes' and block.get('title') == 'Ежедневное меню':
-                dishes_block = block
-                break
-        
-        if not dishes_block:
-            return jsonify({'success': False, 'error': 'Блок блюд не найден'})
-        
-        dishes_list = dishes_block.get('dishes', [])
-        original_count = len(dishes_list)
-        
-        # Удаляем блюдо по дате публикации (и по заголовку, если указан)
-        dishes_block['dishes'] = [
-            d for d in dishes_list 
-            if not ((d.get('publish_date') == dish_date or d.get('date') == dish_date) and (not dish_title or d.get('title') == dish_title))
-        ]
-        
-        if len(dishes_block['dishes']) == original_count:
+
+        if dish_id:
+            deleted = DailyDish.query.filter_by(id=int(dish_id)).delete()
+        else:
+            # Старые клиенты передают дату публикации и название
+            publish_date = parse_dish_date(dish_date)
+            if not publish_date:
+                return jsonify({'success': False, 'error': 'Не указана дата блюда'})
+            query = DailyDish.query.filter_by(publish_date=publish_date)
+            if dish_title:
+                query = query.filter_by(title=dish_title)
+            deleted = query.delete()
+
+        if not deleted:
             return jsonify({'success': False, 'error': 'Блюдо не найдено'})
-        
-        # Обновляем блок в архиве
-        archive_section.set_content_blocks(archive_blocks)
         db.session.commit()
-        
+
         return jsonify({'success': True, 'message': 'Блюдо успешно удалено'})
-        
+
     except Exception as e:
         db.session.rollback()
         logger.error(f"Ошибка при удалении блюда: {e}")
         return jsonify({'success': False, 'error': f'Ошибка при удалении блюда: {str(e)}'})
 
+
+@sidebar_bp.route('/api/nutrition/dishes')
+@login_required
+def get_archive_dishes():
+    """Блюда архива за месяц (для редактора «Ежедневное меню»)"""
+    from utils.dish_archive import load_archive_page
+
+    page = load_archive_page(request.args.get('month'), request.args.get('page', 1, type=int))
+    return jsonify({'success': True, **page})
+
+
+@sidebar_bp.route('/api/nutrition/dishes', methods=['POST'])
+@login_required
+def save_archive_dishes():
+    """
+    Сохранить блюда архива из редактора.
+
+    Тело: {"dishes": [{id?, title, publish_date, photo, menu_file_url, menu_file_name}],
+           "deleted_ids": [id, ...]}. Блюда с id обновляются, без id — добавляются.
+    """
+    try:
+        from models.models import DailyDish
+        from utils.dish_archive import dish_fields
+
+        data = request.get_json() or {}
+        dishes = data.get('dishes') or []
+        deleted_ids = [int(x) for x in (data.get('deleted_ids') or []) if str(x).isdigit()]
+        if not isinstance(dishes, list):
+            return jsonify({'success': False, 'error': 'Неверный формат списка блюд'}), 400
+
+        ids = [int(d['id']) for d in dishes if isinstance(d, dict) and str(d.get('id') or '').isdigit()]
+        existing = {dish.id: dish for dish in DailyDish.query.filter(DailyDish.id.in_(ids)).all()} if ids else {}
+
+        saved = 0
+        for item in dishes:
+            if not isinstance(item, dict):
+                continue
+            fields = dish_fields(item)
+            if not (fields['title'] or fields['photo'] or fields['menu_file_url']):
+                continue
+            dish = existing.get(int(item['id'])) if str(item.get('id') or '').isdigit() else None
+            if dish is None:
+                dish = DailyDish()
+                db.session.add(dish)
+            else:
+                # Дата блюда из раздела "Питание" редактором не меняется
+                fields.pop('dish_date')
+            for key, value in fields.items():
+                setattr(dish, key, value)
+            saved += 1
+
+        deleted = 0
+        if deleted_ids:
+            deleted = DailyDish.query.filter(DailyDish.id.in_(deleted_ids)).delete(synchronize_session=False)
+
+        db.session.commit()
+        return jsonify({'success': True, 'saved': saved, 'deleted': deleted})
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Ошибка при сохранении блюд архива: {e}")
+        return jsonify({'success': False, 'error': f'Ошибка при сохранении блюд: {str(e)}'}), 500
+
 @sidebar_bp.route('/create', methods=['GET', 'POST'])
 @login_required
 def create_section():
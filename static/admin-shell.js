@@ -0,0 +1,5517 @@
+/**
+ * Мастер заполнения разделов «Сведения об образовательной организации».
+ *
+ * Подключается только для авторизованных пользователей
+ * (templates/partials/admin_shell.html), публичные страницы его не загружают.
+ */
+// Версия скрипта для принудительного обновления кэша - v2024.12.19.15.30
+// Конфиг редактируемых заголовков блоков для разделов «Сведения об организации»
+const WIZARD_SECTION_HEADERS = {
+    main: [
+        { key: 'main_title', defaultText: 'Сведения об образовательной организации', label: 'Заголовок страницы (основной блок)' },
+        { key: 'founder_title', defaultText: 'Учредители образовательной организации', label: 'Заголовок блока «Учредители»' },
+        { key: 'working_hours_title', defaultText: 'Режим работы образовательной организации', label: 'Режим работы' },
+        { key: 'places_title', defaultText: 'Места осуществления образовательной деятельности', label: 'Места осуществления деятельности' },
+        { key: 'license_title', defaultText: 'Лицензия', label: 'Лицензия' },
+        { key: 'accreditation_title', defaultText: 'Аккредитация', label: 'Аккредитация' }
+    ],
+    structure: [
+        { key: 'structure_council_general_title', defaultText: 'Общее собрание трудового коллектива Гимназии', label: 'Общее собрание' },
+        { key: 'structure_council_ped_title', defaultText: 'Педагогический совет', label: 'Педагогический совет' },
+        { key: 'structure_council_mgmt_title', defaultText: 'Управляющий совет', label: 'Управляющий совет' },
+        { key: 'management_bodies_title', defaultText: 'Органы управления образовательной организации', label: 'Органы управления' }
+    ],
+    documents: [
+        { key: 'page_title', defaultText: 'Документы', label: 'Заголовок страницы' }
+    ],
+    education: [
+        { key: 'page_title', defaultText: 'Образование', label: 'Заголовок страницы' },
+        { key: 'documents_title', defaultText: 'Документы', label: 'Блок «Документы»' },
+        { key: 'images_title', defaultText: 'Изображения', label: 'Блок «Изображения»' }
+    ],
+    standards: [
+        { key: 'page_title', defaultText: '', label: 'Заголовок страницы' }
+    ],
+    management: [
+        { key: 'page_title', defaultText: '', label: 'Заголовок страницы' }
+    ],
+    teachers: [
+        { key: 'page_title', defaultText: '', label: 'Заголовок страницы' }
+    ],
+    facilities: [
+        { key: 'page_title', defaultText: '', label: 'Заголовок страницы' }
+    ],
+    scholarships: [
+        { key: 'page_title', defaultText: '', label: 'Заголовок страницы' }
+    ],
+    'paid-services': [
+        { key: 'page_title', defaultText: '', label: 'Заголовок страницы' }
+    ],
+    finance: [
+        { key: 'page_title', defaultText: '', label: 'Заголовок страницы' }
+    ],
+    vacancies: [
+        { key: 'page_title', defaultText: '', label: 'Заголовок страницы' }
+    ],
+    international: [
+        { key: 'page_title', defaultText: '', label: 'Заголовок страницы' }
+    ]
+};
+
+// Данные для мастера заполнения
+const wizardSteps = [
+    {
+        id: 'main',
+        title: 'Основные сведения',
+        icon: '🏢',
+        endpoint: 'main',
+        fields: [
+            { name: 'title', label: 'Заголовок страницы', type: 'text', required: true },
+            { name: 'full_name', label: 'Полное наименование образовательной организации', type: 'textarea', required: true },
+            { name: 'short_name', label: 'Сокращенное наименование образовательной организации', type: 'text', required: true },
+            { name: 'founding_date', label: 'Дата создания образовательной организации', type: 'date', required: true },
+            { name: 'location_address', label: 'Адрес местонахождения образовательной организации', type: 'textarea', required: true },
+            { name: 'contact_phone', label: 'Контактные телефоны образовательной организации', type: 'text', required: true },
+            { name: 'contact_email', label: 'Адрес электронной почты образовательной организации', type: 'email', required: true },
+            { name: 'official_website', label: 'Адрес официального сайта', type: 'url', required: false },
+            { name: 'founder_name', label: 'Наименование учредителя', type: 'text', required: true },
+            { name: 'founder_address', label: 'Адрес учредителя', type: 'textarea', required: false },
+            { name: 'founder_phone', label: 'Контактный телефон учредителя', type: 'text', required: false },
+            { name: 'founder_email', label: 'Электронная почта учредителя', type: 'email', required: false },
+            { name: 'founder_website', label: 'Сайт учредителя', type: 'url', required: false },
+            { name: 'social_media', label: 'Официальная страница в социальных сетях', type: 'textarea', required: false },
+            { name: 'license_document', label: 'Лицензия', type: 'file_or_text', required: false },
+            { name: 'license_attachment', label: 'Приложение к лицензии', type: 'file_or_text', required: false },
+            { name: 'accreditation_document', label: 'Свидетельство о государственной аккредитации', type: 'file_or_text', required: false },
+            { name: 'main_educational_location', label: 'Основное место осуществления образовательной деятельности', type: 'textarea', required: true },
+            { name: 'additional_educational_programs_location', label: 'Места осуществления образовательной деятельности по дополнительным образовательным программам', type: 'textarea', required: true },
+            { name: 'main_professional_training_location', label: 'Места осуществления образовательной деятельности по основным программам профессионального обучения', type: 'textarea', required: true },
+            { name: 'network_form_location', label: 'Места осуществления образовательной деятельности при использовании сетевой формы реализации образовательных программ', type: 'textarea', required: true },
+            { name: 'practice_location', label: 'Места проведения практики', type: 'textarea', required: false },
+            { name: 'practical_training_location', label: 'Места проведения практической подготовки обучающихся', type: 'textarea', required: false },
+            { name: 'gia_location', label: 'Места проведения государственной итоговой аттестации', type: 'textarea', required: false }
+        ],
+        tagsBlocks: [
+            { title: 'Основные сведения', fieldNames: ['title', 'full_name', 'short_name', 'founding_date', 'location_address', 'contact_phone', 'contact_email', 'official_website', 'social_media'] },
+            { title: 'Учредители', fieldNames: ['founder_name', 'founder_address', 'founder_phone', 'founder_email', 'founder_website'] },
+            { title: 'Места осуществления образовательной деятельности', fieldNames: ['main_educational_location', 'additional_educational_programs_location', 'main_professional_training_location', 'network_form_location', 'practice_location', 'practical_training_location', 'gia_location'] },
+            { title: 'Лицензия и аккредитация', fieldNames: ['license_document', 'license_attachment', 'accreditation_document'] }
+        ],
+        content_blocks: true
+    },
+    {
+        id: 'structure',
+        title: 'Структура и органы управления образовательной организацией',
+        icon: '🏗️',
+        endpoint: 'structure',
+        fields: [
+            { name: 'title', label: 'Название структуры', type: 'text', required: true },
+            { name: 'text', label: 'Описание структуры', type: 'textarea', required: false },
+            { name: 'head_name', label: 'ФИО руководителя', type: 'text', required: true },
+            { name: 'head_position', label: 'Должность', type: 'text', required: true },
+            { name: 'location', label: 'Место нахождения', type: 'textarea', required: true },
+            { name: 'is_branch', label: 'Структурное подразделение является филиалом', type: 'text', required: true },
+            { name: 'website', label: 'Адрес сайта', type: 'url', required: false },
+            { name: 'email', label: 'Электронная почта', type: 'email', required: false },
+            { name: 'additional_info', label: 'Дополнительная информация', type: 'textarea', required: false },
+            { name: 'management_bodies', label: 'Органы управления образовательной организации', type: 'textarea', required: false },
+            // Общее собрание трудового коллектива Гимназии
+            { name: 'structure_general_title', label: 'Общее собрание: Название структурного подразделения', type: 'text', required: true },
+            { name: 'structure_general_head_name', label: 'Общее собрание: ФИО руководителя', type: 'text', required: true },
+            { name: 'structure_general_head_position', label: 'Общее собрание: Должность', type: 'text', required: true },
+            { name: 'structure_general_location', label: 'Общее собрание: Место нахождения', type: 'textarea', required: true },
+            { name: 'structure_general_is_branch', label: 'Общее собрание: является филиалом', type: 'text', required: true },
+            { name: 'structure_general_website', label: 'Общее собрание: Адрес сайта', type: 'url', required: false },
+            { name: 'structure_general_email', label: 'Общее собрание: Электронная почта', type: 'email', required: false },
+            { name: 'structure_general_additional_info', label: 'Общее собрание: Дополнительная информация', type: 'textarea', required: false },
+            // Педагогический совет
+            { name: 'structure_ped_title', label: 'Педагогический совет: Название структурного подразделения', type: 'text', required: true },
+            { name: 'structure_ped_head_name', label: 'Педагогический совет: ФИО руководителя', type: 'text', required: true },
+            { name: 'structure_ped_head_position', label: 'Педагогический совет: Должность', type: 'text', required: true },
+            { name: 'structure_ped_location', label: 'Педагогический совет: Место нахождения', type: 'textarea', required: true },
+            { name: 'structure_ped_is_branch', label: 'Педагогический совет: является филиалом', type: 'text', required: true },
+            { name: 'structure_ped_website', label: 'Педагогический совет: Адрес сайта', type: 'url', required: false },
+            { name: 'structure_ped_email', label: 'Педагогический совет: Электронная почта', type: 'email', required: false },
+            { name: 'structure_ped_additional_info', label: 'Педагогический совет: Дополнительная информация', type: 'textarea', required: false },
+            // Управляющий совет
+            { name: 'structure_mgmt_title', label: 'Управляющий совет: Название структурного подразделения', type: 'text', required: true },
+            { name: 'structure_mgmt_head_name', label: 'Управляющий совет: ФИО руководителя', type: 'text', required: true },
+            { name: 'structure_mgmt_head_position', label: 'Управляющий совет: Должность', type: 'text', required: true },
+            { name: 'structure_mgmt_location', label: 'Управляющий совет: Место нахождения', type: 'textarea', required: true },
+            { name: 'structure_mgmt_is_branch', label: 'Управляющий совет: является филиалом', type: 'text', required: true },
+            { name: 'structure_mgmt_website', label: 'Управляющий совет: Адрес сайта', type: 'url', required: false },
+            { name: 'structure_mgmt_email', label: 'Управляющий совет: Электронная почта', type: 'email', required: false },
+            { name: 'structure_mgmt_additional_info', label: 'Управляющий совет: Дополнительная информация', type: 'textarea', required: false }
+        ],
+        tagsBlocks: [
+            { title: 'Основной блок (структура)', fieldNames: ['title', 'text', 'head_name', 'head_position', 'location', 'is_branch', 'website', 'email', 'additional_info', 'management_bodies'] },
+            { title: 'Общее собрание трудового коллектива Гимназии', fieldNames: ['structure_general_title', 'structure_general_head_name', 'structure_general_head_position', 'structure_general_location', 'structure_general_is_branch', 'structure_general_website', 'structure_general_email', 'structure_general_additional_info'] },
+            { title: 'Педагогический совет', fieldNames: ['structure_ped_title', 'structure_ped_head_name', 'structure_ped_head_position', 'structure_ped_location', 'structure_ped_is_branch', 'structure_ped_website', 'structure_ped_email', 'structure_ped_additional_info'] },
+            { title: 'Управляющий совет', fieldNames: ['structure_mgmt_title', 'structure_mgmt_head_name', 'structure_mgmt_head_position', 'structure_mgmt_location', 'structure_mgmt_is_branch', 'structure_mgmt_website', 'structure_mgmt_email', 'structure_mgmt_additional_info'] }
+        ],
+        content_blocks: true
+    },
+    {
+        id: 'documents',
+        title: 'Документы',
+        icon: '📄',
+        endpoint: 'documents',
+        fields: [
+            { name: 'title', label: 'Заголовок страницы', type: 'text', required: true },
+            { name: 'text', label: 'Описание документов', type: 'textarea', required: false },
+            { name: 'charter', label: 'Устав образовательной организации', type: 'file_or_text', required: true },
+            { name: 'charter_date', label: 'Устав: дата', type: 'text', required: false },
+            { name: 'charter_number', label: 'Устав: номер/приказ', type: 'text', required: false },
+            { name: 'license', label: 'Лицензия на осуществление образовательной деятельности', type: 'file_or_text', required: true },
+            { name: 'license_date', label: 'Лицензия: дата', type: 'text', required: false },
+            { name: 'license_number', label: 'Лицензия: номер', type: 'text', required: false },
+            { name: 'accreditation', label: 'Свидетельство о государственной аккредитации', type: 'file_or_text', required: false },
+            { name: 'accreditation_date', label: 'Аккредитация: дата', type: 'text', required: false },
+            { name: 'accreditation_number', label: 'Аккредитация: номер', type: 'text', required: false },
+            { name: 'pvr_students', label: 'Правила внутреннего распорядка обучающихся (воспитанников)', type: 'file_or_text', required: true },
+            { name: 'pvr_workers', label: 'Правила внутреннего трудового распорядка', type: 'file_or_text', required: true },
+            { name: 'collective_agreement', label: 'Коллективный договор', type: 'file_or_text', required: false },
+            { name: 'collective_agreement_date', label: 'Колдоговор: дата', type: 'text', required: false },
+            { name: 'collective_agreement_number', label: 'Колдоговор: номер', type: 'text', required: false },
+            { name: 'annual_report', label: 'Отчет о результатах самообследования (Публичный доклад)', type: 'file_or_text', required: true },
+            { name: 'annual_report_date', label: 'Самообследование: дата', type: 'text', required: false },
+            { name: 'annual_report_number', label: 'Самообследование: номер/приказ', type: 'text', required: false },
+            { name: 'financial_statements', label: 'Документ о порядке оказания платных образовательных услуг', type: 'file_or_text', required: true },
+            { name: 'financial_statements_date', label: 'Платные услуги: дата', type: 'text', required: false },
+            { name: 'financial_statements_number', label: 'Платные услуги: номер/приказ', type: 'text', required: false },
+            { name: 'admission_rules', label: 'Правила приема обучающихся (воспитанников)', type: 'file_or_text', required: true },
+            { name: 'admission_rules_date', label: 'Прием: дата', type: 'text', required: false },
+            { name: 'admission_rules_number', label: 'Прием: номер/приказ', type: 'text', required: false },
+            { name: 'education_programs', label: 'Образовательные программы', type: 'file_or_text', required: true },
+            { name: 'curriculum', label: 'Учебный план', type: 'file_or_text', required: true },
+            { name: 'calendar_schedule', label: 'Календарный учебный график', type: 'file_or_text', required: true },
+            { name: 'methodological_documents', label: 'Методические и иные документы', type: 'file_or_text', required: false },
+            { name: 'local_regulations', label: 'Локальные нормативные акты', type: 'file_or_text', required: false },
+            { name: 'prescriptions_reports', label: 'Предписания органов надзора и отчёты об их исполнении', type: 'file_or_text', required: false },
+            { name: 'prescriptions_reports_date', label: 'Предписания: дата', type: 'text', required: false },
+            { name: 'prescriptions_reports_number', label: 'Предписания: номер', type: 'text', required: false },
+            { name: 'training_schedule', label: 'Режим занятий обучающихся (воспитанников)', type: 'file_or_text', required: false },
+            { name: 'control_forms', label: 'Формы, периодичность и порядок текущего контроля успеваемости и промежуточной аттестации', type: 'file_or_text', required: false },
+            { name: 'transfer_reinstatement', label: 'Порядок и основания перевода, отчисления и восстановления обучающихся', type: 'file_or_text', required: false },
+            { name: 'relations_termination', label: 'Порядок оформления и прекращения отношений с обучающимися и родителями', type: 'file_or_text', required: false },
+            { name: 'other_local_acts', label: 'Иные локальные акты', type: 'file_or_text', required: false },
+            { name: 'students_count_docs', label: 'Численность обучающихся', type: 'file_or_text', required: false }
+        ],
+        content_blocks: true
+    },
+    {
+        id: 'education',
+        title: 'Образование',
+        icon: '🎓',
+        endpoint: 'education',
+        fields: [
+            { name: 'title', label: 'Заголовок страницы', type: 'text', required: true },
+            { name: 'implemented_programs', label: 'Реализуемые образовательные программы', type: 'textarea', required: true },
+            { name: 'adapted_programs', label: 'Образовательные программы (адаптированные)', type: 'textarea', required: true },
+            { name: 'curriculum_soo', label: 'Учебный план СОО', type: 'file_with_name', required: true },
+            { name: 'curriculum_ooo', label: 'Учебный план ООО', type: 'file_with_name', required: true },
+            { name: 'curriculum_noo', label: 'Учебный план НОО', type: 'file_with_name', required: true },
+            { name: 'calendar_schedule', label: 'Календарный учебный график', type: 'file_with_name', required: true },
+            { name: 'student_numbers_noo', label: 'Численность обучающихся НОО', type: 'textarea', required: true },
+            { name: 'student_numbers_ooo', label: 'Численность обучающихся ООО', type: 'textarea', required: true },
+            { name: 'student_numbers_soo', label: 'Численность обучающихся СОО', type: 'textarea', required: true },
+            { name: 'student_numbers_document', label: 'Документ о численности обучающихся', type: 'file', required: true },
+            { name: 'education_languages', label: 'Языки, на которых осуществляется образование', type: 'file', required: true },
+            { name: 'professional_programs', label: 'Профессиональные образовательные программы', type: 'textarea', required: true },
+            { name: 'graduate_employment', label: 'Трудоустройство выпускников', type: 'textarea', required: true }
+        ],
+        content_blocks: true
+    },
+    {
+        id: 'standards',
+        title: 'Образовательные стандарты и требования',
+        icon: '📊',
+        endpoint: 'standards',
+        fields: [
+            { name: 'title', label: 'Название раздела стандартов', type: 'text', required: true },
+            { name: 'text', label: 'Описание стандартов', type: 'textarea', required: false },
+            { name: 'federal_standards', label: 'Федеральные государственные образовательные стандарты', type: 'textarea', required: true },
+            { name: 'federal_requirements', label: 'Федеральные государственные требования', type: 'textarea', required: false },
+            { name: 'local_standards', label: 'Локальные нормативные акты, регламентирующие образовательную деятельность', type: 'textarea', required: false },
+            { name: 'standards_documents', label: 'Документы по образовательным стандартам', type: 'file', required: false },
+            { name: 'requirements_documents', label: 'Документы по требованиям', type: 'file', required: false },
+            { name: 'implementation_info', label: 'Информация о реализации образовательных стандартов', type: 'textarea', required: false }
+        ],
+        content_blocks: true
+    },
+    {
+        id: 'management',
+        title: 'Руководство',
+        icon: '👔',
+        endpoint: 'management',
+        fields: [
+            { name: 'title', label: 'Название раздела руководства', type: 'text', required: true },
+            { name: 'text', label: 'Описание руководства', type: 'textarea', required: false },
+            { name: 'director_name', label: 'ФИО руководителя образовательной организации', type: 'text', required: true },
+            { name: 'director_position', label: 'Должность руководителя', type: 'text', required: true },
+            { name: 'director_phone', label: 'Контактные телефоны руководителя', type: 'text', required: true },
+            { name: 'director_email', label: 'Адрес электронной почты руководителя', type: 'email', required: true },
+            { name: 'deputy_directors', label: 'Заместители руководителя', type: 'textarea', required: false },
+            { name: 'management_structure', label: 'Структура управления', type: 'textarea', required: false },
+            { name: 'management_documents', label: 'Документы руководства', type: 'file', required: false }
+        ],
+        content_blocks: true
+    },
+    {
+        id: 'teachers',
+        title: 'Педагогический состав',
+        icon: '👨‍🏫',
+        endpoint: 'teachers',
+        fields: [
+            { name: 'title', label: 'Название раздела педагогов', type: 'text', required: true },
+            { name: 'text', label: 'Описание педагогического состава', type: 'textarea', required: false },
+            { name: 'total_teachers', label: 'Общая численность педагогических работников', type: 'text', required: true },
+            { name: 'teachers_with_education', label: 'Педагогических работников с высшим образованием', type: 'text', required: true },
+            { name: 'teachers_with_category', label: 'Педагогических работников с квалификационной категорией', type: 'text', required: true },
+            { name: 'teachers_qualification', label: 'Информация о квалификации педагогических работников', type: 'textarea', required: false },
+            { name: 'teachers_development', label: 'Повышение квалификации педагогических работников', type: 'textarea', required: false },
+            { name: 'teachers_documents', label: 'Документы педагогического состава', type: 'file', required: false }
+        ],
+        content_blocks: true
+    },
+    {
+        id: 'facilities',
+        title: 'Материально-техническое обеспечение и оснащенность образовательного процесса',
+        icon: '🏫',
+        endpoint: 'facilities',
+        fields: [
+            { name: 'title', label: 'Название раздела МТО', type: 'text', required: true },
+            { name: 'text', label: 'Описание МТО', type: 'textarea', required: false },
+            { name: 'buildings_info', label: 'Информация о зданиях и помещениях', type: 'textarea', required: true },
+            { name: 'library_info', label: 'Информация о библиотеке', type: 'textarea', required: false },
+            { name: 'sports_facilities', label: 'Спортивные объекты', type: 'textarea', required: false },
+            { name: 'learning_equipment', label: 'Средства обучения и воспитания', type: 'textarea', required: false },
+            { name: 'catering_conditions', label: 'Условия питания обучающихся', type: 'textarea', required: false },
+            { name: 'health_conditions', label: 'Условия охраны здоровья обучающихся', type: 'textarea', required: false },
+            { name: 'accessible_environment', label: 'Доступная среда', type: 'textarea', required: false },
+            { name: 'facilities_documents', label: 'Документы материально-технического обеспечения', type: 'file', required: false }
+        ],
+        content_blocks: true
+    },
+    {
+        id: 'paid-services',
+        title: 'Платные образовательные услуги',
+        icon: '💰',
+        endpoint: 'paid-services',
+        fields: [
+            { name: 'title', label: 'Название раздела платных услуг', type: 'text', required: true },
+            { name: 'text', label: 'Описание платных услуг', type: 'textarea', required: false },
+            { name: 'services_list', label: 'Перечень платных образовательных услуг', type: 'textarea', required: true },
+            { name: 'services_prices', label: 'Цены на платные образовательные услуги', type: 'textarea', required: true },
+            { name: 'services_procedure', label: 'Порядок оказания платных образовательных услуг', type: 'textarea', required: true },
+            { name: 'services_contract', label: 'Образец договора об оказании платных образовательных услуг', type: 'file', required: false },
+            { name: 'services_documents', label: 'Документы по платным услугам', type: 'file', required: false }
+        ],
+        content_blocks: true
+    },
+    {
+        id: 'finance',
+        title: 'Финансово-хозяйственная деятельность',
+        icon: '📈',
+        endpoint: 'finance',
+        fields: [
+            { name: 'title', label: 'Название раздела финансов', type: 'text', required: true },
+            { name: 'text', label: 'Описание финансовой деятельности', type: 'textarea', required: false },
+            { name: 'budget_volume', label: 'Объем образовательной деятельности, финансовое обеспечение которой осуществляется за счет бюджетных ассигнований', type: 'textarea', required: true },
+            { name: 'extrabudgetary_income', label: 'Поступления финансовых и материальных средств по итогам финансового года', type: 'textarea', required: false },
+            { name: 'extrabudgetary_expenses', label: 'Расходы по поступившим финансовым и материальным средствам по итогам финансового года', type: 'textarea', required: false },
+            { name: 'financial_plans', label: 'Финансовые планы и отчеты', type: 'file', required: false },
+            { name: 'financial_documents', label: 'Документы финансово-хозяйственной деятельности', type: 'file', required: false }
+        ],
+        content_blocks: true
+    },
+    {
+        id: 'vacancies',
+        title: 'Вакантные места для приема (перевода) обучающихся',
+        icon: '🪑',
+        endpoint: 'vacancies',
+        fields: [
+            { name: 'title', label: 'Название раздела вакансий', type: 'text', required: true },
+            { name: 'text', label: 'Описание вакантных мест', type: 'textarea', required: false },
+            { name: 'elementary_vacancies', label: 'Вакантные места в 1-4 классах', type: 'textarea', required: true },
+            { name: 'basic_vacancies', label: 'Вакантные места в 5-9 классах', type: 'textarea', required: true },
+            { name: 'secondary_vacancies', label: 'Вакантные места в 10-11 классах', type: 'textarea', required: true },
+            { name: 'special_programs_vacancies', label: 'Вакантные места по адаптированным программам', type: 'textarea', required: false },
+            { name: 'vacancies_documents', label: 'Документы по вакантным местам', type: 'file', required: false }
+        ],
+        content_blocks: true
+    },
+    {
+        id: 'scholarships',
+        title: 'Стипендии и меры поддержки обучающихся',
+        icon: '🎓',
+        endpoint: 'scholarships',
+        fields: [
+            { name: 'title', label: 'Заголовок страницы', type: 'text', required: true },
+            { name: 'scholarships_info', label: 'Информация о стипендиях', type: 'textarea', required: true },
+            { name: 'support_measures', label: 'Меры поддержки обучающихся', type: 'textarea', required: true },
+            { name: 'social_support', label: 'Социальная поддержка', type: 'textarea', required: false },
+            { name: 'financial_aid', label: 'Материальная помощь', type: 'textarea', required: false },
+            { name: 'scholarship_documents', label: 'Документы о стипендиях и мерах поддержки', type: 'file', required: false }
+        ],
+        content_blocks: true
+    },
+    {
+        id: 'international',
+        title: 'Международное сотрудничество',
+        icon: '🌍',
+        endpoint: 'international',
+        fields: [
+            { name: 'title', label: 'Заголовок страницы', type: 'text', required: true },
+            { name: 'text', label: 'Описание международного сотрудничества', type: 'textarea', required: false },
+            { name: 'partnerships', label: 'Международные партнерства и соглашения', type: 'textarea', required: false },
+            { name: 'exchange_programs', label: 'Программы обмена обучающимися', type: 'textarea', required: false },
+            { name: 'joint_projects', label: 'Совместные проекты и инициативы', type: 'textarea', required: false },
+            { name: 'international_documents', label: 'Документы международного сотрудничества', type: 'file', required: false }
+        ],
+        content_blocks: true
+    },
+    {
+        id: 'food',
+        title: 'Организация питания в образовательной организации',
+        icon: '🍽️',
+        endpoint: 'food',
+        fields: [
+            { name: 'title', label: 'Заголовок страницы', type: 'text', required: true },
+            { name: 'text', label: 'Описание организации питания', type: 'textarea', required: false },
+            { name: 'catering_organization', label: 'Организация питания обучающихся', type: 'textarea', required: true },
+            { name: 'catering_menu', label: 'Меню и рацион питания', type: 'textarea', required: false },
+            { name: 'catering_conditions', label: 'Условия питания обучающихся', type: 'textarea', required: false },
+            { name: 'catering_documents', label: 'Документы по организации питания', type: 'file', required: false }
+        ],
+        content_blocks: true
+    },
+    {
+        id: 'projects',
+        title: 'Проекты',
+        icon: '🚀',
+        endpoint: 'projects',
+        fields: [
+            { name: 'title', label: 'Заголовок страницы', type: 'text', required: true },
+            { name: 'text', label: 'Описание проектов', type: 'textarea', required: false }
+        ],
+        content_blocks: true
+    },
+    {
+        id: 'albums',
+        title: 'Фотоальбомы',
+        icon: '📷',
+        endpoint: 'albums',
+        fields: [
+            { name: 'title', label: 'Заголовок страницы', type: 'text', required: true },
+            { name: 'text', label: 'Описание фотоальбомов', type: 'textarea', required: false }
+        ],
+        content_blocks: true
+    }
+];
+
+let currentWizardStep = 0;
+let wizardData = {};
+window.wizardMode = 'normal';
+
+var WIZARD_ITEMPROP_DEFAULTS = {
+    main: { full_name: 'fullName', short_name: 'shortName', founding_date: 'regDate', location_address: 'address', contact_phone: 'telephone', contact_email: 'email', official_website: 'url', visually_impaired_version: 'copy', founder_name: 'nameUchred', founder_address: 'addressUchred', founder_phone: 'telUchred', founder_email: 'mailUchred', founder_website: 'websiteUchred', main_educational_location: 'address', additional_educational_programs_location: 'addressPlaceDop', main_professional_training_location: 'addressPlaceOpp', network_form_location: 'addressPlaceSet', practice_location: 'addressPlacePrac', practical_training_location: 'addressPlacePodg', gia_location: 'addressPlaceGia' },
+    documents: { charter: 'ustavDocLink', license: 'licenseDocLink', license_document: 'licenseDocLink', accreditation_document: 'accreditationDocLink' },
+    structure: {},
+    education: {
+        title: 'name',
+        implemented_programs: 'eduOp',
+        adapted_programs: 'eduAdOp',
+        curriculum_noo: 'educationPlan',
+        curriculum_ooo: 'educationPlan',
+        curriculum_soo: 'educationPlan',
+        calendar_schedule: 'educationSchedule',
+        student_numbers_noo: 'eduChislenEl',
+        student_numbers_ooo: 'eduChislenEl',
+        student_numbers_soo: 'eduChislenEl',
+        student_numbers_document: 'eduChislenEl',
+        education_languages: 'languageEl',
+        professional_programs: 'eduOp',
+        graduate_employment: 'graduateJob'
+    },
+    standards: {
+        title: 'name',
+        federal_standards: 'eduFedDoc',
+        federal_requirements: 'eduFedTreb',
+        local_standards: 'eduStandartTreb',
+        standards_documents: 'eduStandartDoc',
+        requirements_documents: 'eduStandartTreb',
+        implementation_info: 'eduStandardsInfo'
+    },
+    management: {
+        title: 'name',
+        director_name: 'fio',
+        director_position: 'post',
+        director_phone: 'telephone',
+        director_email: 'email',
+        deputy_directors: 'deputy',
+        management_structure: 'structure',
+        management_documents: 'document'
+    },
+    teachers: {
+        title: 'name',
+        total_teachers: 'teacherCount',
+        teachers_with_education: 'teacherEducation',
+        teachers_with_category: 'teacherCategory',
+        teachers_qualification: 'qualification',
+        teachers_development: 'qualification',
+        teachers_documents: 'document'
+    },
+    facilities: {
+        title: 'name',
+        buildings_info: 'purposeCab',
+        library_info: 'purposeLibr',
+        sports_facilities: 'purposeSport',
+        learning_equipment: 'purposeFacil',
+        catering_conditions: 'purposeEios',
+        health_conditions: 'healthConditions',
+        accessible_environment: 'ovz',
+        facilities_documents: 'document'
+    },
+    scholarships: {
+        title: 'name',
+        scholarships_info: 'grant',
+        support_measures: 'support',
+        social_support: 'support',
+        financial_aid: 'support',
+        scholarship_documents: 'localAct'
+    },
+    'paid-services': {
+        title: 'name',
+        services_list: 'paidEdu',
+        services_prices: 'paidSt',
+        services_procedure: 'paidEdu',
+        services_contract: 'paidDog',
+        services_documents: 'paidSt'
+    },
+    finance: {
+        title: 'name',
+        budget_volume: 'volume',
+        extrabudgetary_income: 'finPost',
+        extrabudgetary_expenses: 'finRas',
+        financial_plans: 'finPlanDocLink',
+        financial_documents: 'document'
+    },
+    vacancies: {
+        title: 'name',
+        elementary_vacancies: 'vacant',
+        basic_vacancies: 'vacant',
+        secondary_vacancies: 'vacant',
+        special_programs_vacancies: 'vacant',
+        vacancies_documents: 'document'
+    },
+    international: {
+        title: 'name',
+        partnerships: 'internationalDog',
+        exchange_programs: 'internationalDog',
+        joint_projects: 'internationalDog',
+        international_documents: 'document'
+    },
+    food: {
+        title: 'name',
+        catering_organization: 'cateringInfo',
+        catering_menu: 'cateringMenu',
+        catering_conditions: 'cateringConditions',
+        catering_documents: 'document'
+    }
+};
+function getDefaultItemprop(stepId, fieldName) {
+    var stepDefaults = WIZARD_ITEMPROP_DEFAULTS[stepId];
+    return (stepDefaults && stepDefaults[fieldName]) ? stepDefaults[fieldName] : '';
+}
+function setWizardMode(mode) {
+    window.wizardMode = mode || 'normal';
+    var toggleEl = document.getElementById('wizard-mode-toggle');
+    var normalBtn = document.getElementById('wizard-mode-normal');
+    var tagsBtn = document.getElementById('wizard-mode-tags');
+    if (normalBtn) { normalBtn.classList.toggle('active', window.wizardMode === 'normal'); normalBtn.style.background = window.wizardMode === 'normal' ? '#eff6ff' : '#fff'; normalBtn.style.borderColor = window.wizardMode === 'normal' ? '#3b82f6' : '#e5e7eb'; }
+    if (tagsBtn) { tagsBtn.classList.toggle('active', window.wizardMode === 'tags'); tagsBtn.style.background = window.wizardMode === 'tags' ? '#eff6ff' : '#fff'; tagsBtn.style.borderColor = window.wizardMode === 'tags' ? '#3b82f6' : '#e5e7eb'; }
+    var step = typeof wizardSteps !== 'undefined' && wizardSteps[currentWizardStep];
+    if (step && typeof loadStepContent === 'function') loadStepContent(step);
+}
+
+// Проверка загрузки
+
+// ===== ФУНКЦИИ НАВИГАЦИИ МАСТЕРА =====
+
+// Следующий шаг
+async function wizardNext() {
+    if (currentWizardStep < wizardSteps.length - 1) {
+        await saveCurrentStepData();
+        // Проверяем, что функция loadStep существует
+        if (typeof loadStep === 'function') {
+            loadStep(currentWizardStep + 1);
+        } else {
+            console.error('loadStep function not found');
+        }
+    }
+}
+
+// Предыдущий шаг
+async function wizardPrevious() {
+    if (currentWizardStep > 0) {
+        await saveCurrentStepData();
+        loadStep(currentWizardStep - 1);
+    }
+}
+
+// Переход к шагу
+async function goToStep(stepIndex) {
+    // Сохранение данных текущего шага
+    await saveCurrentStepData();
+    
+    // Переход к новому шагу
+    loadStep(stepIndex);
+}
+
+// Очистка несуществующих файлов
+async function cleanOrphanedFiles() {
+    try {
+        
+        const response = await fetch('/info/clean_files', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            }
+        });
+        
+        const result = await response.json();
+        
+        if (result.success) {
+            
+            // Обновляем отображение файлов после очистки
+            const fileLists = document.querySelectorAll('[id$="_file_list"]');
+            fileLists.forEach(fileList => {
+                const fileItems = fileList.querySelectorAll('.file-item');
+                fileItems.forEach(item => {
+                    const fileUrl = item.querySelector('.file-url');
+                    if (fileUrl) {
+                        const url = fileUrl.textContent;
+                        // Проверяем, существует ли файл
+                        fetch(url, { method: 'HEAD' })
+                            .then(response => {
+                                if (!response.ok) {
+                                    // Файл не существует, удаляем элемент
+                                    item.remove();
+                                }
+                            })
+                            .catch(() => {
+                                // Ошибка при проверке, удаляем элемент
+                                item.remove();
+                            });
+                    }
+                });
+            });
+        } else {
+            console.warn('Failed to clean orphaned files:', result.error);
+        }
+    } catch (error) {
+        console.error('Error cleaning orphaned files:', error);
+    }
+}
+
+// Сохранение данных текущего шага
+async function saveCurrentStepData() {
+    const step = wizardSteps[currentWizardStep];
+    if (!step) {
+        console.error('saveCurrentStepData: Step not found:', currentWizardStep);
+        return;
+    }
+    
+    
+    // Сначала очищаем несуществующие файлы
+    await cleanOrphanedFiles();
+    
+    if (!wizardData[step.id]) {
+        wizardData[step.id] = {};
+    }
+
+    if (window.wizardMode === 'tags') {
+        var contentContainer = document.getElementById('wizard-step-content');
+        if (!contentContainer) return;
+        var tagInputs = contentContainer.querySelectorAll('.itemprop-input');
+        var mapping = {};
+        var invalid = false;
+        tagInputs.forEach(function(inp) {
+            var name = inp.getAttribute('data-field-name');
+            var val = (inp.value || '').trim();
+            if (!name) return;
+            if (val && !/^[A-Za-z0-9_]+$/.test(val)) { invalid = true; inp.style.borderColor = '#ef4444'; } else { inp.style.borderColor = '#e5e7eb'; if (val) mapping[name] = val; }
+        });
+        if (invalid) {
+            showSaveStatus('error', 'itemprop: только латиница, цифры и _');
+            return;
+        }
+        wizardData[step.id].itemprop_mapping = mapping;
+    } else {
+    
+    // Сохраняем основные поля напрямую из элементов
+    for (const field of (step.fields || [])) {
+        if (field.type === 'file_with_name') {
+            // Файлы с отображаемым именем уже загружены через handleFileWithName
+            // Не затираем объект/массив файлов данными из input (C:\fakepath)
+            const existingValue = wizardData[step.id][field.name] || [];
+            // Обновляем отображаемые имена, если пользователь ввел их вручную
+            if (Array.isArray(existingValue)) {
+                const displayInputs = document.querySelectorAll(`#file-container-${field.name} .file-display-name`);
+                displayInputs.forEach((input, index) => {
+                    if (existingValue[index]) {
+                        existingValue[index].displayName = input.value || existingValue[index].displayName;
+                    }
+                });
+            } else if (existingValue && typeof existingValue === 'object') {
+                const displayInput = document.querySelector(`#file-container-${field.name} .file-display-name`);
+                if (displayInput) {
+                    existingValue.displayName = displayInput.value || existingValue.displayName;
+                }
+            }
+            wizardData[step.id][field.name] = existingValue;
+        } else if (field.type === 'file_or_text') {
+            // Для полей file_or_text теперь только загрузка файлов
+            const fileElement = document.querySelector(`[name="${field.name}"]`);
+            
+            if (fileElement && fileElement.files && fileElement.files.length > 0) {
+                // Если выбраны новые файлы, загружаем их
+                await uploadFiles(fileElement.files, field.name, step.id);
+            } else {
+                // Сохраняем существующее значение
+                const existingValue = wizardData[step.id][field.name] || '';
+                wizardData[step.id][field.name] = existingValue;
+            }
+        } else if (field.type === 'file') {
+            // Для файловых полей загружаем файлы на сервер
+            const fileElement = document.querySelector(`[name="${field.name}"]`);
+            if (fileElement && fileElement.files && fileElement.files.length > 0) {
+                // Загружаем файлы на сервер и ждем завершения
+                await uploadFiles(fileElement.files, field.name, step.id);
+                // Очищаем input после загрузки, чтобы избежать повторной загрузки при следующем сохранении
+                fileElement.value = '';
+            } else {
+                // Если файл не выбран, сохраняем существующее значение из DOM
+                // Получаем файлы из списка на странице, а не из wizardData
+                const fileList = document.getElementById(`${field.name}_file_list`);
+                if (fileList) {
+                    const fileItems = fileList.querySelectorAll('.file-url');
+                    const files = Array.from(fileItems).map(item => item.textContent.trim()).filter(url => url);
+                    wizardData[step.id][field.name] = files.join(', ');
+                } else {
+                    // Если список не найден, используем существующее значение из wizardData
+                    const existingValue = wizardData[step.id][field.name] || '';
+                    wizardData[step.id][field.name] = existingValue;
+                }
+            }
+        } else {
+            // Для обычных полей
+            const inputElement = document.querySelector(`[name="${field.name}"]`);
+            if (inputElement) {
+                const value = inputElement.value || '';
+                wizardData[step.id][field.name] = value;
+            } else {
+                console.warn('Field not found:', field.name);
+            }
+        }
+    }
+    
+    if (typeof WIZARD_SECTION_HEADERS !== 'undefined' && WIZARD_SECTION_HEADERS[step.id]) {
+        const headersConfig = WIZARD_SECTION_HEADERS[step.id];
+        const collected = {};
+        headersConfig.forEach(function(h) {
+            const key = h.key;
+            const safeKey = (key || '').replace(/"/g, '');
+            const textEl = document.getElementById('section-header-' + safeKey + '-text');
+            const visibleEl = document.getElementById('section-header-' + safeKey + '-visible');
+            collected[key] = { text: textEl ? textEl.value.trim() : '', visible: visibleEl ? visibleEl.checked : true };
+        });
+        wizardData[step.id].section_headers = collected;
+    }
+
+    // Сохраняем блоки контента если они есть
+    if (step.content_blocks && wizardData[step.id].content_blocks) {
+        // Нормализуем структуру блоков - убираем вложенные content_blocks
+        const blocks = wizardData[step.id].content_blocks;
+        if (Array.isArray(blocks)) {
+            const normalizedBlocks = blocks.map(block => {
+                if (typeof block === 'object' && block !== null) {
+                    // Создаем новый объект без content_blocks
+                    const normalized = {};
+                    for (const key in block) {
+                        if (key !== 'content_blocks') {
+                            normalized[key] = block[key];
+                        }
+                    }
+                    return normalized;
+                }
+                return block;
+            });
+            wizardData[step.id].content_blocks = normalizedBlocks;
+        }
+    }
+    }
+    
+    
+    // Отправляем данные на сервер
+    try {
+        const formData = new FormData();
+        const dataToSave = {[step.id]: wizardData[step.id]};
+        formData.append('wizard_data', JSON.stringify(dataToSave));
+        formData.append('save_single', 'true');
+        
+        
+        const response = await fetch('/info/wizard_save', {
+            method: 'POST',
+            body: formData
+        });
+        
+        const responseData = await response.json();
+        
+        if (response.ok) {
+        } else {
+            console.error('Failed to save data to server:', response.statusText, responseData);
+        }
+    } catch (error) {
+        console.error('Error saving data to server:', error);
+    }
+}
+
+
+// Показ статуса сохранения
+function showSaveStatus(type, message) {
+    const statusElement = document.getElementById('wizard-save-status');
+    if (!statusElement) return;
+    
+    // Убираем предыдущие классы
+    statusElement.className = 'wizard-save-status';
+    
+    // Добавляем новый класс и текст
+    statusElement.classList.add(type);
+    statusElement.textContent = message;
+    
+    // Автоскрытие для успешных сообщений
+    if (type !== 'error') {
+        setTimeout(() => {
+            statusElement.className = 'wizard-save-status';
+            statusElement.textContent = '';
+        }, 3000);
+    }
+}
+
+// Дублирующаяся функция updateStepStatus удалена
+
+
+
+
+
+// ===== ФУНКЦИИ ПЕРЕТАСКИВАНИЯ ШАГОВ =====
+
+let draggedStep = null;
+
+function handleDragStart(e) {
+    draggedStep = this;
+    this.classList.add('dragging');
+    e.dataTransfer.effectAllowed = 'move';
+    e.dataTransfer.setData('text/html', this.outerHTML);
+}
+
+function handleStepDragOver(e) {
+    e.preventDefault();
+    e.dataTransfer.dropEffect = 'move';
+    
+    const afterElement = getDragAfterElement(this.parentNode, e.clientY);
+    if (afterElement == null) {
+        this.parentNode.appendChild(draggedStep);
+    } else {
+        this.parentNode.insertBefore(draggedStep, afterElement);
+    }
+}
+
+function handleDrop(e) {
+    e.preventDefault();
+    this.classList.remove('drag-over');
+}
+
+function handleDragEnd(e) {
+    this.classList.remove('dragging');
+    draggedStep = null;
+    
+    // Обновляем порядок шагов в массиве wizardSteps
+    updateWizardStepsOrder();
+}
+
+function getDragAfterElement(container, y) {
+    const draggableElements = [...container.querySelectorAll('.wizard-step:not(.dragging)')];
+    
+    return draggableElements.reduce((closest, child) => {
+        const box = child.getBoundingClientRect();
+        const offset = y - box.top - box.height / 2;
+        
+        if (offset < 0 && offset > closest.offset) {
+            return { offset: offset, element: child };
+        } else {
+            return closest;
+        }
+    }, { offset: Number.NEGATIVE_INFINITY }).element;
+}
+
+function updateWizardStepsOrder() {
+    const stepsContainer = document.getElementById('wizard-steps');
+    const stepElements = stepsContainer.querySelectorAll('.wizard-step');
+    const newOrder = [];
+    
+    stepElements.forEach((stepElement, index) => {
+        const stepIndex = parseInt(stepElement.getAttribute('data-step'));
+        newOrder.push(stepIndex);
+    });
+    
+    // Переупорядочиваем массив wizardSteps
+    const reorderedSteps = newOrder.map(index => wizardSteps[index]);
+    wizardSteps.splice(0, wizardSteps.length, ...reorderedSteps);
+    
+    // Обновляем data-step атрибуты
+    stepElements.forEach((stepElement, index) => {
+        stepElement.setAttribute('data-step', index);
+        stepElement.onclick = () => goToStep(index);
+    });
+    
+}
+
+
+    // ===== ФУНКЦИИ ДЛЯ HTML-РЕДАКТОРА =====
+    
+    // Функция insertHtmlTag вынесена в глобальную область ниже
+    
+    // Функция updateHtmlPreview вынесена в глобальную область ниже
+    
+    // Функция initializeHtmlEditors вынесена в глобальную область ниже
+    
+    // ===== ФУНКЦИИ ДЛЯ ФАЙЛОВ С ОТОБРАЖАЕМЫМИ ИМЕНАМИ =====
+
+async function handleFileWithName(event, fieldName) {
+    const files = event.target.files;
+    if (!files || files.length === 0) return;
+    
+    try {
+        // Определяем текущий раздел по currentWizardStep
+        let section = 'main';
+        if (!isNaN(currentWizardStep) && wizardSteps[currentWizardStep]) {
+            section = wizardSteps[currentWizardStep].endpoint || wizardSteps[currentWizardStep].id || 'main';
+        } else {
+            // Резерв: по активному элементу DOM
+            try {
+                const activeStep = document.querySelector('.wizard-step.active');
+                if (activeStep) {
+                    const stepIndex = parseInt(activeStep.getAttribute('data-step'));
+                    if (!isNaN(stepIndex) && wizardSteps[stepIndex]) {
+                        section = wizardSteps[stepIndex].endpoint || wizardSteps[stepIndex].id || 'main';
+                    }
+                }
+            } catch (e) {
+                console.warn('Не удалось определить шаг, используем main');
+            }
+        }
+        
+        // Получаем существующие файлы
+        if (!wizardData[section]) {
+            wizardData[section] = {};
+        }
+        const existingFiles = wizardData[section][fieldName];
+        const filesArray = Array.isArray(existingFiles) ? existingFiles : (existingFiles ? [existingFiles] : []);
+        
+        // Загружаем все файлы
+        const uploadPromises = Array.from(files).map(async (file) => {
+            const formData = new FormData();
+            formData.append('file', file);
+            formData.append('section', section);
+            formData.append('field_name', fieldName);
+            
+            try {
+            const response = await uploadFileRequest('/info/upload_file', formData);
+            
+            const result = await response.json();
+            
+            if (result.success) {
+                return {
+                        success: true,
+                    filename: result.filename,
+                    originalName: result.original_name,
+                    url: result.url,
+                    displayName: result.original_name
+                };
+            } else {
+                console.error('Upload failed:', result.error);
+                    return {
+                        success: false,
+                        error: result.error,
+                        filename: file.name
+                    };
+                }
+            } catch (error) {
+                console.error('Upload error:', error);
+                return {
+                    success: false,
+                    error: error.message || 'Ошибка загрузки файла',
+                    filename: file.name
+                };
+            }
+        });
+        
+        const uploadResults = await Promise.all(uploadPromises);
+        const successfulUploads = uploadResults.filter(f => f.success).map(f => ({
+            filename: f.filename,
+            originalName: f.originalName,
+            url: f.url,
+            displayName: f.displayName
+        }));
+        const failedUploads = uploadResults.filter(f => !f.success);
+        
+        if (successfulUploads.length > 0) {
+            // Добавляем новые файлы к существующим
+            const allFiles = [...filesArray, ...successfulUploads];
+            wizardData[section][fieldName] = allFiles;
+            
+            // Обновляем UI
+            updateFileWithNameUI(fieldName, allFiles);
+            if (failedUploads.length > 0) {
+                showSaveStatus('success', `Загружено ${successfulUploads.length} из ${files.length} файлов`);
+            } else {
+            showSaveStatus('success', `Загружено ${successfulUploads.length} файлов`);
+            }
+        } else if (failedUploads.length > 0) {
+            // Все файлы не загрузились
+            const errorMessages = failedUploads.map(f => `${f.filename}: ${f.error}`).join('; ');
+            showSaveStatus('error', 'Ошибка загрузки файлов: ' + errorMessages);
+        }
+    } catch (error) {
+        console.error('Error uploading files:', error);
+        showSaveStatus('error', 'Ошибка при загрузке файлов');
+    }
+    
+    // Очищаем input для возможности повторной загрузки
+    event.target.value = '';
+}
+
+function escapeFileDisplayHtml(s) {
+    if (s == null || s === '') return '';
+    const t = String(s);
+    return t.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;');
+}
+
+function updateFileWithNameUI(fieldName, filesData) {
+    const container = document.getElementById(`file-container-${fieldName}`);
+    if (!container) return;
+    
+    const filesArray = Array.isArray(filesData) ? filesData : (filesData ? [filesData] : []);
+    
+    container.innerHTML = filesArray.map((fileData, index) => {
+        const displayText = fileData.displayName || fileData.originalName || fileData.filename || 'Файл';
+        const displayValue = (fileData.displayName || '').replace(/"/g, '&quot;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/&/g, '&amp;');
+        return `
+        <div class="file-item-with-name" style="display: flex; align-items: center; justify-content: space-between; padding: 12px; margin: 8px 0; background: #f8f9fa; border-radius: 8px; border: 1px solid #e9ecef;">
+            <div class="file-info" style="display: flex; align-items: center; flex: 1;">
+                <i class="file-icon" style="margin-right: 8px; font-size: 16px;">📄</i>
+                <span class="file-name" style="color: #2563eb; font-weight: 500;">${escapeFileDisplayHtml(displayText)}</span>
+            </div>
+            <div class="file-actions" style="display: flex; align-items: center; gap: 8px;">
+                <input type="text" class="file-display-name" placeholder="Отображаемое имя" value="${displayValue}" onchange="updateFileDisplayNameMulti('${fieldName}', ${index}, this.value)" style="padding: 4px 8px; border: 1px solid #d1d5db; border-radius: 4px; font-size: 14px;">
+                <button type="button" class="btn-remove-file" onclick="removeFileWithNameMulti('${fieldName}', ${index})" style="background: #dc3545; color: white; border: none; border-radius: 50%; width: 24px; height: 24px; cursor: pointer; font-size: 14px;">×</button>
+            </div>
+        </div>
+    `;
+    }).join('');
+}
+
+function updateFileDisplayName(fieldName, displayName) {
+    const step = wizardSteps[currentWizardStep] || {};
+    const sectionKey = step.endpoint || step.id || 'main';
+
+    if (!wizardData[sectionKey]) {
+        wizardData[sectionKey] = {};
+    }
+    
+    const fileData = wizardData[sectionKey][fieldName];
+    if (fileData && typeof fileData === 'object') {
+        fileData.displayName = displayName;
+        
+        // Обновляем отображение
+        const fileNameElement = document.querySelector(`#file-container-${fieldName} .file-name`);
+        if (fileNameElement) {
+            fileNameElement.textContent = displayName || fileData.filename;
+        }
+        
+    }
+}
+
+function updateFileDisplayNameMulti(fieldName, index, displayName) {
+    const step = wizardSteps[currentWizardStep] || {};
+    const sectionKey = step.endpoint || step.id || 'main';
+    
+    if (!wizardData[sectionKey]) {
+        wizardData[sectionKey] = {};
+    }
+    
+    const filesData = wizardData[sectionKey][fieldName];
+    if (Array.isArray(filesData) && filesData[index]) {
+        filesData[index].displayName = displayName;
+        
+        // Обновляем отображение
+        const container = document.getElementById(`file-container-${fieldName}`);
+        if (container) {
+            const fileItems = container.querySelectorAll('.file-item-with-name');
+            if (fileItems[index]) {
+                const fileNameElement = fileItems[index].querySelector('.file-name');
+                if (fileNameElement) {
+                    fileNameElement.textContent = displayName || filesData[index].originalName || filesData[index].filename;
+                }
+            }
+        }
+    }
+}
+
+function removeFileWithName(fieldName) {
+    const step = wizardSteps[currentWizardStep] || {};
+    const sectionKey = step.endpoint || step.id || 'main';
+
+    if (!wizardData[sectionKey]) {
+        wizardData[sectionKey] = {};
+    }
+    
+    const fileData = wizardData[sectionKey][fieldName];
+    const filenameToDelete = fileData && typeof fileData === 'object'
+        ? (fileData.filename || (fileData.url ? fileData.url.split('/').filter(Boolean).pop() : null))
+        : null;
+    if (filenameToDelete) {
+        fetch('/info/delete_file', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                filename: filenameToDelete,
+                section: sectionKey,
+                field_name: fieldName
+            })
+        }).catch(() => {});
+    }
+    
+    wizardData[sectionKey][fieldName] = '';
+    
+    const container = document.getElementById(`file-container-${fieldName}`);
+    if (container) {
+        container.innerHTML = '';
+    }
+}
+
+async function removeFileWithNameMulti(fieldName, index) {
+    const step = wizardSteps[currentWizardStep] || {};
+    const sectionKey = step.endpoint || step.id || 'main';
+    
+    if (!wizardData[sectionKey]) {
+        wizardData[sectionKey] = {};
+    }
+    
+    const filesData = wizardData[sectionKey][fieldName];
+    if (!Array.isArray(filesData) || !filesData[index]) {
+        return;
+    }
+    const fileData = filesData[index];
+    const filenameToDelete = fileData.filename || (fileData.url ? fileData.url.split('/').filter(Boolean).pop() : null);
+    
+    if (filenameToDelete) {
+        try {
+            const response = await fetch('/info/delete_file', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({
+                    filename: filenameToDelete,
+                    section: sectionKey,
+                    field_name: fieldName
+                })
+            });
+            const result = await response.json();
+            if (!result.success) {
+                console.error('Failed to delete file from server:', result.error);
+            }
+        } catch (error) {
+            console.error('Error deleting file:', error);
+        }
+    }
+    
+    filesData.splice(index, 1);
+    wizardData[sectionKey][fieldName] = filesData;
+    updateFileWithNameUI(fieldName, filesData);
+    showSaveStatus('success', 'Файл удален');
+}
+
+// ===== ОСНОВНЫЕ ФУНКЦИИ МАСТЕРА =====
+
+
+// Показ статуса сохранения
+function showSaveStatus(type, message) {
+    const statusElement = document.getElementById('wizard-save-status');
+    if (!statusElement) return;
+    
+    // Убираем предыдущие классы
+    statusElement.className = 'wizard-save-status';
+    
+    // Добавляем новый класс и текст
+    statusElement.classList.add(type);
+    statusElement.textContent = message;
+    
+    // Автоскрытие для успешных сообщений
+    if (type !== 'error') {
+        setTimeout(() => {
+            statusElement.className = 'wizard-save-status';
+            statusElement.textContent = '';
+        }, 3000);
+    }
+}
+
+// Дублирующаяся функция updateStepStatus удалена
+
+// Функция для открытия мастера заполнения
+function openWizard() {
+    // openWizard вызван
+    
+    // Проверяем авторизацию пользователя
+    const isAuthenticated = document.body.querySelector('.user-box') !== null;
+    if (!isAuthenticated) {
+        // Пользователь не авторизован
+        alert('Для доступа к мастеру заполнения необходимо войти в систему');
+        // Открываем модальное окно входа
+        const loginBtn = document.getElementById('openLoginModalBtn');
+        if (loginBtn) {
+            loginBtn.click();
+        }
+        return;
+    }
+    
+    // Проверяем доступность мастера
+    // Явно выключаем режим sidebar мастера для обычного мастера
+    window.IS_SIDEBAR_WIZARD = false;
+    
+    if (typeof window.openWizardModal === 'function') {
+        // Используем openWizardModal
+        window.openWizardModal();
+    } else {
+        console.error('openWizardModal function not found in base.html');
+        alert('Мастер заполнения недоступен');
+    }
+}
+
+// Открыть модальное окно мастера
+function openWizardModal() {
+    // openWizardModal вызван
+    
+    try {
+        // Устанавливаем заголовок мастера в зависимости от режима
+        const titleEl = document.getElementById('wizardTitleText');
+        const subtitleEl = document.getElementById('wizardSubtitleText');
+        if (window.IS_SIDEBAR_WIZARD === true) {
+            if (titleEl) titleEl.innerHTML = '<i class="icon">⚡</i> Мастер бокового меню';
+            if (subtitleEl) subtitleEl.textContent = 'Редактирование разделов бокового меню';
+            // Синхронизируем шаги/данные с sidebar мастером
+            if (window.sidebarWizardManager && window.wizardManager) {
+                try {
+                    window.wizardManager.wizardSteps = window.sidebarWizardManager.wizardSteps;
+                    window.wizardManager.wizardData = window.sidebarWizardManager.wizardData;
+                    window.wizardManager.currentStep = 0;
+                    window.wizardSteps = window.sidebarWizardManager.wizardSteps;
+                    window.wizardData = window.sidebarWizardManager.wizardData;
+                    window.currentWizardStep = 0;
+                } catch (e) { console.warn('Sidebar sync failed', e); }
+            }
+        } else {
+            if (titleEl) titleEl.innerHTML = '<i class="icon">⚡</i> Мастер заполнения';
+            if (subtitleEl) subtitleEl.textContent = 'Сведения об образовательной организации';
+        }
+
+        // Проверяем инициализацию переменных
+        if (typeof wizardSteps === 'undefined') {
+            console.error('wizardSteps not defined');
+            alert('Данные мастера не загружены. Перезагрузите страницу.');
+            return;
+        }
+        
+        const modal = document.getElementById('wizard-modal');
+        
+        if (!modal) {
+            console.error('Wizard modal not found');
+            alert('Модальное окно мастера заполнения не найдено');
+            return;
+        }
+        modal.style.display = 'flex';
+        document.body.classList.add('modal-open');
+        
+        // Инициализация мастера (в обоих режимах, т.к. шаги уже установлены)
+        if (typeof initializeWizard === 'function') {
+            initializeWizard();
+        } else {
+            console.error('initializeWizard function not found!');
+            alert('Функция инициализации мастера не найдена!');
+        }
+        
+        // Загрузка данных с сервера
+        if (typeof loadWizardData === 'function') {
+            loadWizardData();
+        } else {
+            console.error('loadWizardData function not found!');
+            alert('Функция загрузки данных мастера не найдена!');
+        }
+    } catch (error) {
+        console.error('Error in openWizardModal:', error);
+        alert('Ошибка при открытии мастера заполнения: ' + error.message);
+    }
+}
+
+// Загрузка данных мастера с сервера
+function loadWizardData() {
+    // Загрузка данных мастера
+
+    // 1) Подгружаем подразделы для раздела "food" (Питание), чтобы они появились в списке шагов
+    const dynamicPromise = fetch('/info/subsections/food')
+        .then(r => r.json())
+        .then(data => {
+            if (!data || !data.success || !Array.isArray(data.subsections)) return;
+            const existing = new Set(wizardSteps.map(s => s.endpoint));
+
+            data.subsections.forEach(s => {
+                if (!s || !s.endpoint || existing.has(s.endpoint)) return;
+                wizardSteps.push({
+                    id: s.endpoint,
+                    title: s.title || s.endpoint,
+                    icon: '📄',
+                    endpoint: s.endpoint,
+                    parent: 'food',
+                    fields: [
+                        { name: 'title', label: 'Заголовок подраздела', type: 'text', required: true },
+                        { name: 'content', label: 'Текст', type: 'textarea', required: false }
+                    ],
+                    content_blocks: true
+                });
+                existing.add(s.endpoint);
+            });
+
+            // Перерисуем список шагов, сохранив текущий шаг по endpoint
+            try {
+                const currentEndpoint = wizardSteps[currentWizardStep]?.endpoint;
+                initializeWizard();
+                if (currentEndpoint) {
+                    const idx = wizardSteps.findIndex(st => st.endpoint === currentEndpoint);
+                    if (idx >= 0) loadStep(idx);
+                }
+            } catch (e) {
+                console.warn('Failed to refresh wizard steps after loading food subsections', e);
+            }
+        })
+        .catch(() => {});
+
+    // 2) Подгружаем пользовательские страницы /p/* (как отдельные шаги)
+    const customPagesPromise = fetch('/info/section_data')
+        .then(r => r.json())
+        .then(data => {
+            if (!data || !data.success || !Array.isArray(data.sections)) return;
+            const existing = new Set(wizardSteps.map(s => s.endpoint));
+
+            data.sections.forEach(s => {
+                try {
+                    const url = (s && s.url) ? String(s.url) : '';
+                    const endpoint = (s && s.endpoint) ? String(s.endpoint) : '';
+                    const title = (s && s.title) ? String(s.title) : endpoint;
+                    if (!url.startsWith('/p/')) return;
+                    if (!endpoint) return;
+                    if (existing.has(endpoint)) return;
+
+                    wizardSteps.push({
+                        id: endpoint,
+                        title: title || endpoint,
+                        icon: '🧩',
+                        endpoint: endpoint,
+                        fields: [
+                            { name: 'title', label: 'Заголовок страницы', type: 'text', required: true },
+                            { name: 'text', label: 'Текст (опционально)', type: 'textarea', required: false }
+                        ],
+                        content_blocks: true
+                    });
+                    existing.add(endpoint);
+                } catch (e) {
+                    // ignore bad entries
+                }
+            });
+        })
+        .catch(() => {});
+
+    Promise.allSettled([dynamicPromise, customPagesPromise]).finally(() => {
+        const loadPromises = wizardSteps.map(step => {
+            return fetch(`/info/section/${step.endpoint}`)
+                .then(response => response.json())
+                .then(data => {
+                    if (data.success && data.section) {
+                        // Загружаем все данные раздела
+                        wizardData[step.id] = {
+                            title: data.section.title || '',
+                            text: data.section.text || '',
+                            content_blocks: data.section.content_blocks || []
+                        };
+                        
+                        // Загружаем данные полей формы
+                        if (data.section.form_data) {
+                            Object.assign(wizardData[step.id], data.section.form_data);
+                            
+                            // Специальная обработка файловых полей
+                            Object.keys(data.section.form_data).forEach(fieldName => {
+                                const fieldValue = data.section.form_data[fieldName];
+                                if (typeof fieldValue === 'string' && fieldValue.trim()) {
+                                    if (fieldValue.includes('/download_file/') || fieldValue.includes('/info/download_file/') || fieldValue.includes('/food/')) {
+                                        wizardData[step.id][fieldName] = fieldValue;
+                                    }
+                                }
+                            });
+                        }
+                    } else {
+                        wizardData[step.id] = { title: '', text: '', content_blocks: [] };
+                    }
+                })
+                .catch(error => {
+                    console.error('Error loading data for step:', step.id, error);
+                    wizardData[step.id] = { title: '', text: '', content_blocks: [] };
+                });
+        });
+        
+        Promise.all(loadPromises).then(() => {
+            // Все данные мастера загружены
+            try {
+                let targetIndex = 0;
+                if (window.WIZARD_TARGET_ENDPOINT) {
+                    const idx = wizardSteps.findIndex(st => st && st.endpoint === window.WIZARD_TARGET_ENDPOINT);
+                    if (idx >= 0) {
+                        targetIndex = idx;
+                    }
+                    // Сбрасываем цель после использования
+                    window.WIZARD_TARGET_ENDPOINT = null;
+                }
+                loadStep(targetIndex);
+            } catch (e) {
+                console.error('Error selecting wizard step after load:', e);
+                loadStep(0);
+            }
+        });
+    });
+}
+
+async function createFoodSubsection() {
+    try {
+        const title = prompt('Название подраздела', 'Новый подраздел');
+        const cleanTitle = String(title || '').trim();
+        if (!cleanTitle) return;
+
+        const res = await fetch('/info/create_subsection', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ parent_endpoint: 'food', title: cleanTitle })
+        });
+        const data = await res.json();
+        if (!data || !data.success || !data.section || !data.section.endpoint) {
+            alert((data && data.error) ? data.error : 'Не удалось создать подраздел');
+            return;
+        }
+
+        const endpoint = data.section.endpoint;
+        const stepObj = {
+            id: endpoint,
+            title: data.section.title || cleanTitle,
+            icon: '📄',
+            endpoint,
+            parent: 'food',
+            fields: [
+                { name: 'title', label: 'Заголовок подраздела', type: 'text', required: true },
+                { name: 'content', label: 'Текст', type: 'textarea', required: false }
+            ],
+            content_blocks: true
+        };
+
+        // Вставляем сразу после "food" и его существующих подразделов
+        const foodIdx = wizardSteps.findIndex(s => s.endpoint === 'food');
+        let insertAt = foodIdx >= 0 ? foodIdx + 1 : wizardSteps.length;
+        for (let i = insertAt; i < wizardSteps.length; i++) {
+            if (wizardSteps[i].parent === 'food') {
+                insertAt = i + 1;
+            } else {
+                break;
+            }
+        }
+        wizardSteps.splice(insertAt, 0, stepObj);
+
+        // Инициализируем данные
+        wizardData[endpoint] = {
+            title: stepObj.title,
+            text: '',
+            content: '',
+            parent: 'food',
+            content_blocks: []
+        };
+
+        // Перерисуем и перейдем на новый шаг
+        initializeWizard();
+        loadStep(insertAt);
+    } catch (e) {
+        console.error(e);
+        alert('Ошибка при создании подраздела. Попробуйте снова.');
+    }
+}
+
+// Закрыть модальное окно мастера
+
+// Обработка drag & drop
+function handleDragOver(event) {
+    event.preventDefault();
+    event.currentTarget.classList.add('drag-over');
+}
+
+function handleDragLeave(event) {
+    event.currentTarget.classList.remove('drag-over');
+}
+
+async function handleFileDrop(event, fieldName) {
+    event.preventDefault();
+    event.currentTarget.classList.remove('drag-over');
+    
+    const files = event.dataTransfer.files;
+    if (files && files.length > 0) {
+        // Загружаем файлы на сервер (они автоматически добавятся в интерфейс через addFileToList)
+        const step = wizardSteps[currentWizardStep];
+        await uploadFiles(files, fieldName, step ? step.id : currentWizardStep);
+        // НЕ вызываем loadStepContent, чтобы не создавать дубликаты
+    }
+}
+
+async function handleFileSelect(event, fieldName) {
+    const files = event.target.files;
+    if (files && files.length > 0) {
+        // Загружаем файлы на сервер (они автоматически добавятся в интерфейс через addFileToList)
+        const step = wizardSteps[currentWizardStep];
+        await uploadFiles(files, fieldName, step ? step.id : currentWizardStep);
+        // НЕ вызываем loadStepContent, чтобы не создавать дубликаты
+    }
+}
+
+function handleFiles(files, fieldName) {
+    const fileList = document.getElementById(`${fieldName}_file_list`);
+    if (!fileList) return;
+    
+    // Получаем существующие файлы (только URL, не локальные пути)
+    const existingFiles = Array.from(fileList.querySelectorAll('.file-item')).map(item => {
+        const urlSpan = item.querySelector('.file-url');
+        return urlSpan ? urlSpan.textContent : null;
+    }).filter(url => url && !url.includes('C:\\fakepath\\'));
+    
+    // Добавляем новые файлы к существующим
+    Array.from(files).forEach((file, index) => {
+        const fileItem = document.createElement('div');
+        fileItem.className = 'file-item';
+        const newIndex = existingFiles.length + index;
+        fileItem.innerHTML = `
+            <div class="file-info">
+                <i class="file-icon">${getFileIcon(file.type)}</i>
+                <span class="file-name">${file.name}</span>
+                <span class="file-size">(${formatFileSize(file.size)})</span>
+            </div>
+            <button type="button" class="file-remove" onclick="removeFile('${fieldName}', ${newIndex})">×</button>
+        `;
+        fileList.appendChild(fileItem);
+    });
+    
+    // Обновляем wizardData только с существующими URL файлов
+    if (!wizardData[currentWizardStep]) {
+        wizardData[currentWizardStep] = {};
+    }
+    wizardData[currentWizardStep][fieldName] = existingFiles.join(', ');
+    
+    // Файлы добавлены в поле
+}
+
+function getFileIcon(fileType) {
+    if (fileType.includes('pdf')) return '📄';
+    if (fileType.includes('word') || fileType.includes('document')) return '📝';
+    if (fileType.includes('excel') || fileType.includes('spreadsheet')) return '📊';
+    if (fileType.includes('image')) return '🖼️';
+    if (fileType.includes('text')) return '📄';
+    return '📎';
+}
+
+function getFileIconFromUrl(url) {
+    const fileName = url.split('/').pop();
+    const extension = fileName.split('.').pop().toLowerCase();
+    
+    if (extension === 'pdf') return '📄';
+    if (['doc', 'docx'].includes(extension)) return '📝';
+    if (['xls', 'xlsx'].includes(extension)) return '📊';
+    if (['jpg', 'jpeg', 'png', 'gif'].includes(extension)) return '🖼️';
+    if (extension === 'txt') return '📄';
+    return '📎';
+}
+
+function formatFileSize(bytes) {
+    if (bytes === 0) return '0 Bytes';
+    const k = 1024;
+    const sizes = ['Bytes', 'KB', 'MB', 'GB'];
+    const i = Math.floor(Math.log(bytes) / Math.log(k));
+    return parseFloat((bytes / Math.pow(k, i)).toFixed(2)) + ' ' + sizes[i];
+}
+
+async function removeFile(fieldName, index) {
+    const fileList = document.getElementById(`${fieldName}_file_list`);
+    const fileItems = fileList.querySelectorAll('.file-item');
+    
+    if (fileItems[index]) {
+        // Получаем информацию о файле для удаления
+        const fileItem = fileItems[index];
+        const fileUrl = fileItem.querySelector('.file-url').textContent;
+        // Извлекаем URL часть из формата url|display_name
+        const urlPart = fileUrl.includes('|') ? fileUrl.split('|')[0].trim() : fileUrl;
+        const fileName = urlPart.split('/').pop();
+        
+        // Извлекаем раздел из URL (например, /download_file/main/filename.pdf -> main)
+        const section = urlPart.split('/')[2]; // /download_file/section/filename или /info/download_file/section/filename
+        
+        // Удаление файла
+        
+        // Отправляем запрос на удаление файла с сервера
+        try {
+            const response = await fetch('/info/delete_file', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({
+                    filename: fileName,
+                    section: section,
+                    field_name: fieldName
+                })
+            });
+            
+            const result = await response.json();
+            
+            if (result.success) {
+                // Удаляем элемент из DOM
+                fileItem.remove();
+                
+                // Обновляем wizardData
+                const remainingFiles = Array.from(fileList.querySelectorAll('.file-item')).map(item => {
+                    const urlSpan = item.querySelector('.file-url');
+                    return urlSpan ? urlSpan.textContent.trim() : null;
+                }).filter(url => url && !url.includes('C:\\fakepath\\'));
+                
+                if (!wizardData[currentWizardStep]) {
+                    wizardData[currentWizardStep] = {};
+                }
+                
+                wizardData[currentWizardStep][fieldName] = remainingFiles.join(', ');
+                
+                // wizardData обновлен после удаления
+                
+                // Обновляем индексы кнопок удаления для оставшихся файлов
+                const remainingItems = fileList.querySelectorAll('.file-item');
+                remainingItems.forEach((item, newIndex) => {
+                    const removeBtn = item.querySelector('.file-remove');
+                    if (removeBtn) {
+                        removeBtn.setAttribute('onclick', `removeFile('${fieldName}', ${newIndex})`);
+                    }
+                });
+                
+                // Показываем уведомление об успешном удалении
+                showSaveStatus('success', 'Файл удален с сервера и со страницы');
+                
+            } else {
+                console.error('Error deleting file:', result.error);
+                showSaveStatus('error', 'Ошибка при удалении файла: ' + result.error);
+            }
+            
+        } catch (error) {
+            console.error('Error deleting file:', error);
+            showSaveStatus('error', 'Ошибка при удалении файла');
+        }
+    }
+}
+
+// Загрузка файлов на сервер
+async function uploadFiles(files, fieldName, stepId) {
+    const step = wizardSteps.find(s => s.id === stepId);
+    const section = step ? step.endpoint : 'general';
+    
+    // Получаем существующие файлы из wizardData
+    const existingFiles = wizardData[stepId] && wizardData[stepId][fieldName] ? 
+        wizardData[stepId][fieldName].split(',').map(url => url.trim()).filter(url => url) : [];
+    
+    // Файлы отправляются пакетами (/info/upload_files): одна транзакция на пакет
+    const batchResults = await uploadFilesBatch('/info/upload_file', files, { section, field_name: fieldName });
+    const uploadPromises = batchResults.map(async ({ file, result }) => {
+        try {
+            if (result.success) {
+                // Используем display_name из ответа, если есть, иначе original_name или filename
+                const displayName = result.display_name || result.original_name || result.filename;
+                // Формируем URL с display_name в формате url|display_name
+                const urlWithName = result.display_name ? `${result.url}|${result.display_name}` : result.url;
+                // Добавляем файл в список на странице с правильным именем (проверка дубликатов внутри функции)
+                const wasAdded = addFileToList(fieldName, displayName, urlWithName, result.is_image);
+                // Возвращаем результат только если файл был добавлен (не был дубликатом)
+                if (wasAdded) {
+                    return { success: true, url: urlWithName, filename: displayName };
+                } else {
+                    // Файл уже был в списке, пропускаем
+                    return { success: false, error: 'Файл уже загружен', filename: file.name, skipped: true };
+                }
+            } else {
+                console.error('Upload failed:', result.error);
+                return { success: false, error: result.error, filename: file.name };
+            }
+        } catch (error) {
+            console.error('Upload error:', error);
+            return { success: false, error: error.message || 'Ошибка загрузки файла', filename: file.name };
+        }
+    });
+    
+    try {
+        const uploadResults = await Promise.all(uploadPromises);
+        // Фильтруем успешные загрузки (исключаем пропущенные дубликаты)
+        const successfulUploads = uploadResults.filter(r => r.success && !r.skipped).map(r => r.url);
+        const failedUploads = uploadResults.filter(r => !r.success && !r.skipped);
+        const skippedUploads = uploadResults.filter(r => r.skipped);
+        
+        if (successfulUploads.length > 0) {
+            // Объединяем существующие файлы с новыми
+            // successfulUploads уже содержат URL с display_name в формате url|display_name
+            // Проверяем, что файлы не дублируются в existingFiles
+            const newFiles = successfulUploads.filter(newUrl => {
+                const newUrlPart = newUrl.includes('|') ? newUrl.split('|')[0].trim() : newUrl;
+                return !existingFiles.some(existingUrl => {
+                    const existingUrlPart = existingUrl.includes('|') ? existingUrl.split('|')[0].trim() : existingUrl;
+                    return existingUrlPart === newUrlPart;
+                });
+            });
+            const allFiles = [...existingFiles, ...newFiles];
+            wizardData[stepId][fieldName] = allFiles.join(', ');
+            if (skippedUploads.length > 0 && newFiles.length > 0) {
+                showSaveStatus('success', `Загружено ${newFiles.length} файлов, ${skippedUploads.length} пропущено (дубликаты)`);
+            } else if (skippedUploads.length > 0 && newFiles.length === 0) {
+                showSaveStatus('warning', `Все файлы уже загружены (дубликаты)`);
+            } else if (failedUploads.length > 0) {
+                showSaveStatus('success', `Загружено ${newFiles.length} из ${files.length} файлов`);
+            } else {
+                showSaveStatus('success', `Загружено ${newFiles.length} файлов`);
+            }
+        } else if (failedUploads.length > 0) {
+            // Все файлы не загрузились
+            const errorMessages = failedUploads.map(f => `${f.filename}: ${f.error}`).join('; ');
+            showSaveStatus('error', 'Ошибка загрузки файлов: ' + errorMessages);
+        }
+    } catch (error) {
+        console.error('Error uploading files:', error);
+        showSaveStatus('error', 'Ошибка при загрузке файлов');
+    }
+}
+
+// Добавление файла в список на странице
+// Возвращает true, если файл был добавлен, false если был дубликатом
+function addFileToList(fieldName, filename, url, isImage = false) {
+    const fileList = document.getElementById(`${fieldName}_file_list`);
+    if (!fileList) return false;
+    
+    // URL может быть в формате url|display_name или просто url
+    const urlPart = url.includes('|') ? url.split('|')[0].trim() : url;
+    const displayName = url.includes('|') ? url.split('|')[1].trim() : filename;
+    
+    // Извлекаем имя файла из URL для проверки дубликатов
+    const urlFilename = urlPart.split('/').pop();
+    const normalizeFilename = (name) => {
+        if (!name) return '';
+        // Убираем суффиксы _2, _3 и т.д. для сравнения
+        const parts = name.split('.');
+        const ext = parts.length > 1 ? '.' + parts.pop().toLowerCase() : '';
+        let base = parts.join('.');
+        const baseParts = base.split('_');
+        if (baseParts.length > 1 && /^\d+$/.test(baseParts[baseParts.length - 1])) {
+            baseParts.pop();
+            base = baseParts.join('_');
+        }
+        return (base + ext).toLowerCase();
+    };
+    const normalizedUrlFilename = normalizeFilename(urlFilename);
+    
+    // Проверяем, нет ли уже этого файла в списке (по полному URL и по имени файла)
+    const existingItems = fileList.querySelectorAll('.file-url');
+    for (let item of existingItems) {
+        const existingUrl = item.textContent.trim();
+        // Проверяем по точному совпадению полного URL (включая display_name)
+        if (existingUrl === url) {
+            // Файл уже есть в списке с тем же URL и display_name, не добавляем дубликат
+            console.log(`Файл уже есть в списке (точное совпадение URL), пропускаем: ${url}`);
+            return false;
+        }
+        // Извлекаем URL часть из формата url|display_name для дополнительной проверки
+        const existingUrlPart = existingUrl.includes('|') ? existingUrl.split('|')[0].trim() : existingUrl;
+        const existingFilename = existingUrlPart.split('/').pop();
+        const normalizedExistingFilename = normalizeFilename(existingFilename);
+        
+        // Проверяем по совпадению URL части (без display_name) или по нормализованному имени файла
+        if (existingUrlPart === urlPart || normalizedExistingFilename === normalizedUrlFilename) {
+            // Файл уже есть в списке, не добавляем дубликат
+            console.log(`Файл уже есть в списке, пропускаем: ${url} (существующий: ${existingUrl})`);
+            return false;
+        }
+    }
+    
+    const fileItem = document.createElement('div');
+    fileItem.className = 'file-item';
+    fileItem.style.cssText = 'display: flex; align-items: center; justify-content: space-between; padding: 8px 12px; margin: 4px 0; background: #f8f9fa; border-radius: 6px; border: 1px solid #e9ecef;';
+    
+    const fileInfo = document.createElement('div');
+    fileInfo.style.cssText = 'display: flex; align-items: center; flex: 1;';
+    
+    // Иконка файла
+    const fileIcon = document.createElement('span');
+    fileIcon.style.cssText = 'margin-right: 8px; font-size: 16px;';
+    if (isImage) {
+        fileIcon.textContent = '🖼️';
+    } else {
+        fileIcon.textContent = '📄';
+    }
+    
+    // Ссылка на файл
+    const fileLink = document.createElement('a');
+    fileLink.href = urlPart;
+    fileLink.textContent = displayName;
+    fileLink.style.cssText = 'color: #2563eb; text-decoration: none; font-weight: 500;';
+    fileLink.target = '_blank';
+    
+    // Скрытый span с полным URL (включая display_name) для удаления и сохранения
+    const urlSpan = document.createElement('span');
+    urlSpan.className = 'file-url';
+    urlSpan.textContent = url; // Сохраняем полный формат url|display_name
+    urlSpan.style.display = 'none';
+    
+    // Кнопка удаления
+    const removeBtn = document.createElement('button');
+    removeBtn.textContent = '×';
+    removeBtn.className = 'file-remove';
+    removeBtn.style.cssText = 'background: #dc3545; color: white; border: none; border-radius: 50%; width: 24px; height: 24px; cursor: pointer; font-size: 14px; margin-left: 8px;';
+    
+    // Получаем текущий индекс для кнопки удаления
+    const currentItems = fileList.querySelectorAll('.file-item');
+    const index = currentItems.length;
+    removeBtn.setAttribute('onclick', `removeFile('${fieldName}', ${index})`);
+    
+    fileInfo.appendChild(fileIcon);
+    fileInfo.appendChild(fileLink);
+    fileInfo.appendChild(urlSpan);
+    
+    fileItem.appendChild(fileInfo);
+    fileItem.appendChild(removeBtn);
+    
+    fileList.appendChild(fileItem);
+    return true; // Файл успешно добавлен
+}
+
+function closeWizardModal() {
+    const modal = document.getElementById('wizard-modal');
+    modal.style.display = 'none';
+    document.body.classList.remove('modal-open');
+    
+    // Сброс данных
+    currentWizardStep = 0;
+    wizardData = {};
+}
+
+// Инициализация мастера
+function initializeWizard() {
+    // Инициализация мастера
+    // Создание шагов в сайдбаре
+    const stepsContainer = document.getElementById('wizard-steps');
+    stepsContainer.innerHTML = '';
+    
+    wizardSteps.forEach((step, index) => {
+        const stepElement = document.createElement('div');
+        stepElement.className = 'wizard-step';
+        stepElement.setAttribute('data-step', index);
+        stepElement.setAttribute('draggable', 'true');
+        stepElement.onclick = () => goToStep(index);
+
+        const isFoodSubsection = step.parent === 'food';
+        if (isFoodSubsection) {
+            stepElement.style.marginLeft = '14px';
+            stepElement.style.borderLeft = '3px solid rgba(102, 126, 234, 0.35)';
+        }
+        
+        stepElement.innerHTML = `
+            <div class="wizard-step-icon">${index + 1}</div>
+            <div class="wizard-step-text">${step.title}</div>
+            ${isFoodSubsection ? `<button type="button" class="wizard-step-delete" title="Удалить подраздел"
+                style="margin-left:auto; background:#ef4444; color:#fff; border:none; border-radius:6px; padding:6px 10px; cursor:pointer; font-weight:800;">🗑️</button>` : ''}
+            <div class="wizard-step-drag-handle">⋮⋮</div>
+        `;
+
+        if (isFoodSubsection) {
+            const delBtn = stepElement.querySelector('.wizard-step-delete');
+            if (delBtn) {
+                delBtn.onclick = async (e) => {
+                    e.stopPropagation();
+                    const endpoint = step.endpoint;
+                    if (!endpoint) return;
+                    if (!confirm(`Удалить подраздел "${step.title}"?`)) return;
+                    try {
+                        const res = await fetch('/info/delete_subsection', {
+                            method: 'POST',
+                            headers: { 'Content-Type': 'application/json' },
+                            body: JSON.stringify({ endpoint })
+                        });
+                        const result = await res.json();
+                        if (!result.success) {
+                            alert(result.error || 'Ошибка удаления подраздела');
+                            return;
+                        }
+
+                        // Удаляем шаг и его данные из памяти
+                        const idxToRemove = wizardSteps.findIndex(s => s.endpoint === endpoint);
+                        if (idxToRemove >= 0) {
+                            wizardSteps.splice(idxToRemove, 1);
+                        }
+                        delete wizardData[endpoint];
+
+                        // Перерисовка и переход к разделу food
+                        initializeWizard();
+                        const foodIdx = wizardSteps.findIndex(s => s.endpoint === 'food');
+                        if (foodIdx >= 0) loadStep(foodIdx);
+                    } catch (err) {
+                        console.error(err);
+                        alert('Ошибка удаления подраздела. Попробуйте снова.');
+                    }
+                };
+            }
+        }
+        
+        // Добавляем обработчики перетаскивания
+        stepElement.addEventListener('dragstart', handleDragStart);
+        stepElement.addEventListener('dragover', handleStepDragOver);
+        stepElement.addEventListener('drop', handleDrop);
+        stepElement.addEventListener('dragend', handleDragEnd);
+        
+        stepsContainer.appendChild(stepElement);
+    });
+    
+    // Загрузка первого шага
+    // Загрузка первого шага
+    loadStep(0);
+    // Мастер инициализирован
+}
+
+// Загрузка шага
+function loadStep(stepIndex) {
+    // loadStep вызван
+    currentWizardStep = stepIndex;
+    const step = wizardSteps[stepIndex];
+    
+    if (!step) {
+        console.error('Step not found:', stepIndex);
+        return;
+    }
+    
+    // Шаг найден
+    
+    // Обновление активного шага
+    document.querySelectorAll('.wizard-step').forEach((el, index) => {
+        el.classList.remove('active', 'completed');
+        if (index === stepIndex) {
+            el.classList.add('active');
+        } else if (index < stepIndex) {
+            el.classList.add('completed');
+        }
+    });
+    
+    // Обновление прогресса
+    const progress = ((stepIndex + 1) / wizardSteps.length) * 100;
+    document.getElementById('wizard-progress').style.width = progress + '%';
+    document.getElementById('wizard-progress-text').textContent = `Шаг ${stepIndex + 1} из ${wizardSteps.length}`;
+    
+    // Обновление кнопок
+    document.getElementById('wizard-prev').disabled = stepIndex === 0;
+    document.getElementById('wizard-next').style.display = stepIndex < wizardSteps.length - 1 ? 'flex' : 'none';
+    document.getElementById('wizard-save').style.display = stepIndex === wizardSteps.length - 1 ? 'flex' : 'none';
+    document.getElementById('wizard-save-current').style.display = 'flex';
+    document.getElementById('wizard-clean').style.display = 'flex'; // Показываем кнопку очистки на всех шагах
+    
+    // Вызов loadStepContent
+    // Загрузка содержимого шага
+    loadStepContent(step);
+}
+
+// Загрузка содержимого шага
+function loadStepContent(step) {
+    const contentContainer = document.getElementById('wizard-step-content');
+    if (!contentContainer) return;
+
+    var toggleEl = document.getElementById('wizard-mode-toggle');
+    if (toggleEl) toggleEl.style.display = 'flex';
+
+    if (window.wizardMode === 'tags') {
+        if (!wizardData[step.id]) wizardData[step.id] = {};
+        if (!wizardData[step.id].itemprop_mapping) wizardData[step.id].itemprop_mapping = {};
+        var mapping = wizardData[step.id].itemprop_mapping;
+        var fields = step.fields || [];
+        var fieldByName = {};
+        fields.forEach(function(f) { fieldByName[f.name] = f; });
+        function makeRow(field) {
+            var value = wizardData[step.id][field.name];
+            var hasValue = value !== undefined && value !== null && value !== '' && (typeof value !== 'object' || (Array.isArray(value) ? value.length > 0 : Object.keys(value).length > 0));
+            if (!hasValue && !field.required) return '';
+            var preview = (typeof value === 'string') ? (value.length > 60 ? value.substring(0, 60) + '…' : value) : (typeof value === 'object' ? JSON.stringify(value).substring(0, 60) + '…' : '');
+            var currentItemprop = (mapping && mapping[field.name]) || getDefaultItemprop(step.id, field.name);
+            var defaultHint = getDefaultItemprop(step.id, field.name) ? (' по умолчанию: ' + getDefaultItemprop(step.id, field.name)) : '';
+            return '<div class="wizard-tags-row" style="display:flex;flex-wrap:wrap;align-items:center;gap:12px;padding:12px 0;border-bottom:1px solid #e5e7eb;">' +
+                '<div style="flex:1;min-width:180px;"><strong>' + (field.label || field.name) + '</strong><div style="font-size:0.8rem;color:#6b7280;margin-top:4px;" title="' + (preview || '').replace(/"/g, '&quot;') + '">' + (preview || '—') + '</div></div>' +
+                '<div style="min-width:160px;"><input type="text" class="wizard-input itemprop-input" data-field-name="' + (field.name || '').replace(/"/g, '&quot;') + '" value="' + (currentItemprop || '').replace(/"/g, '&quot;').replace(/</g, '&lt;') + '" placeholder="itemprop" pattern="[A-Za-z0-9_]+" title="Только латиница, цифры и подчёркивание" style="width:100%;padding:8px 10px;border-radius:6px;border:1px solid #e5e7eb;" /></div>' +
+                '<div style="font-size:0.75rem;color:#9ca3af;">' + defaultHint + '</div></div>';
+        }
+        var html = '<div class="wizard-tags-view"><h4 style="margin:0 0 12px 0;">Редактирование itemprop для полей раздела</h4><p style="color:#6b7280;font-size:0.875rem;margin:0 0 16px 0;">Измените значение атрибута itemprop для каждого поля (только A–Z, a–z, 0–9, _).</p>';
+        if (step.tagsBlocks && step.tagsBlocks.length > 0) {
+            var usedNames = {};
+            step.tagsBlocks.forEach(function(block) {
+                var blockRows = [];
+                (block.fieldNames || []).forEach(function(fn) {
+                    var field = fieldByName[fn];
+                    if (field) { usedNames[fn] = true; var r = makeRow(field); if (r) blockRows.push(r); }
+                });
+                if (blockRows.length > 0) {
+                    html += '<div class="wizard-tags-block" style="margin-top:20px;"><h5 style="margin:0 0 10px 0;padding:8px 0;border-bottom:2px solid #3b82f6;color:#1e40af;font-size:1rem;">' + (block.title || '').replace(/</g, '&lt;') + '</h5>' + blockRows.join('') + '</div>';
+                }
+            });
+            fields.forEach(function(field) {
+                if (!usedNames[field.name]) {
+                    var r = makeRow(field);
+                    if (r) {
+                        if (!html.includes('wizard-tags-other')) {
+                            html += '<div class="wizard-tags-other" style="margin-top:20px;"><h5 style="margin:0 0 10px 0;padding:8px 0;border-bottom:2px solid #9ca3af;color:#6b7280;font-size:1rem;">Прочее</h5>';
+                        }
+                        html += r;
+                    }
+                }
+            });
+            if (html.includes('wizard-tags-other')) html += '</div>';
+        } else {
+            var rows = [];
+            fields.forEach(function(field) { var r = makeRow(field); if (r) rows.push(r); });
+            html += rows.length ? rows.join('') : '<p style="color:#6b7280;">Нет заполненных полей для отображения. Заполните данные в режиме «Обычный» или проверьте обязательные поля.</p>';
+        }
+        html += '</div>';
+        contentContainer.innerHTML = html;
+        return;
+    }
+
+    let fieldsHtml = '';
+    (step.fields || []).forEach(field => {
+        const value = wizardData[step.id]?.[field.name] || '';
+        const required = field.required ? 'required' : '';
+        
+        if (field.type === 'textarea') {
+            // Увеличиваем размер textarea для полей вакансий
+            const isVacancyField = field.name && (field.name.includes('vacancies') || field.name.includes('vacancy'));
+            const rows = isVacancyField ? '8' : '4';
+            fieldsHtml += `
+                <div class="wizard-field">
+                    <label class="wizard-label">
+                        <i class="icon">📝</i> ${field.label}
+                        ${field.required ? '<span class="required">*</span>' : ''}
+                    </label>
+                    <textarea name="${field.name}" class="wizard-input" rows="${rows}" ${required}>${value}</textarea>
+                </div>
+            `;
+        } else if (field.type === 'file') {
+            // Обрабатываем значение как список файлов (разделенных запятыми)
+            // Формат может быть: url или url|display_name
+            const fileUrls = value ? value.split(',').map(url => url.trim()).filter(url => url && !url.includes('C:\\fakepath\\')) : [];
+            const fileListHtml = fileUrls.map((fileUrl, index) => {
+                // Извлекаем URL и display_name из формата url|display_name
+                const urlPart = fileUrl.includes('|') ? fileUrl.split('|')[0].trim() : fileUrl;
+                const displayName = fileUrl.includes('|') ? fileUrl.split('|')[1].trim() : fileUrl.split('/').pop();
+                // Извлекаем имя файла из URL для определения типа
+                const fileName = urlPart.split('/').pop();
+                const isImage = /\.(jpg|jpeg|png|gif|bmp|tiff)$/i.test(fileName);
+                const fileIcon = isImage ? '🖼️' : '📄';
+                return `<div class="file-item" style="display: flex; align-items: center; justify-content: space-between; padding: 8px 12px; margin: 4px 0; background: #f8f9fa; border-radius: 6px; border: 1px solid #e9ecef;">
+                    <div class="file-info" style="display: flex; align-items: center; flex: 1;">
+                        <span style="margin-right: 8px; font-size: 16px;">${fileIcon}</span>
+                        <a href="${urlPart}" target="_blank" style="color: #2563eb; text-decoration: none; font-weight: 500;">${displayName}</a>
+                        <span class="file-url" style="display: none;">${fileUrl}</span>
+                    </div>
+                    <button type="button" class="file-remove" onclick="removeFile('${field.name}', ${index})" style="background: #dc3545; color: white; border: none; border-radius: 50%; width: 24px; height: 24px; cursor: pointer; font-size: 14px; margin-left: 8px;">×</button>
+                </div>`;
+            }).join('');
+            
+            fieldsHtml += `
+                <div class="wizard-field">
+                    <label class="wizard-label">
+                        <i class="icon">📎</i> ${field.label}
+                        ${field.required ? '<span class="required">*</span>' : ''}
+                    </label>
+                    <div class="file-upload-container" id="${field.name}_upload_container">
+                        <div class="file-drop-zone" id="${field.name}_drop_zone" ondrop="handleFileDrop(event, '${field.name}')" ondragover="handleDragOver(event)" ondragleave="handleDragLeave(event)">
+                            <div class="drop-zone-content">
+                                <i class="icon">📁</i>
+                                <p>Перетащите файлы сюда или <span class="file-select-link" onclick="document.getElementById('${field.name}_file_input').click()">выберите файлы</span></p>
+                                <p class="file-types">Поддерживаются: PDF, DOC, DOCX, XLS, XLSX, JPG, PNG, GIF, SIG, ZIP, RAR, 7Z, TAR, GZ</p>
+                            </div>
+                        </div>
+                        <input type="file" id="${field.name}_file_input" name="${field.name}" class="wizard-input" multiple style="display: none;" onchange="handleFileSelect(event, '${field.name}')" accept=".pdf,.doc,.docx,.xls,.xlsx,.jpg,.jpeg,.png,.gif,.sig,.zip,.rar,.7z,.tar,.gz,.tgz">
+                        <div class="file-list" id="${field.name}_file_list">
+                            ${fileListHtml}
+                        </div>
+                    </div>
+                </div>
+            `;
+        } else if (field.type === 'url') {
+            fieldsHtml += `
+                <div class="wizard-field">
+                    <label class="wizard-label">
+                        <i class="icon">🔗</i> ${field.label}
+                        ${field.required ? '<span class="required">*</span>' : ''}
+                    </label>
+                    <input type="url" name="${field.name}" class="wizard-input" value="${value}" placeholder="https://example.com" ${required}>
+                </div>
+            `;
+        } else if (field.type === 'file_or_text') {
+            // Обрабатываем файлы (исключаем локальные пути)
+            const fileUrls = value ? value.split(',').map(url => url.trim()).filter(url => url && !url.includes('C:\\fakepath\\')) : [];
+            const fileListHtml = fileUrls.map((url, index) => {
+                const fileName = url.split('/').pop(); // Используем имя файла как есть
+                const isImage = /\.(jpg|jpeg|png|gif|bmp|tiff)$/i.test(fileName);
+                const fileIcon = isImage ? '🖼️' : '📄';
+                return `<div class="file-item" style="display: flex; align-items: center; justify-content: space-between; padding: 8px 12px; margin: 4px 0; background: #f8f9fa; border-radius: 6px; border: 1px solid #e9ecef;">
+                    <div class="file-info" style="display: flex; align-items: center; flex: 1;">
+                        <span style="margin-right: 8px; font-size: 16px;">${fileIcon}</span>
+                        <a href="${url}" target="_blank" style="color: #2563eb; text-decoration: none; font-weight: 500;">${fileName}</a>
+                        <span class="file-url" style="display: none;">${url}</span>
+                    </div>
+                    <button type="button" class="file-remove" onclick="removeFile('${field.name}', ${index})" style="background: #dc3545; color: white; border: none; border-radius: 50%; width: 24px; height: 24px; cursor: pointer; font-size: 14px; margin-left: 8px;">×</button>
+                </div>`;
+            }).join('');
+            
+            fieldsHtml += `
+                <div class="wizard-field">
+                    <label class="wizard-label">
+                        <i class="icon">📄</i> ${field.label}
+                        ${field.required ? '<span class="required">*</span>' : ''}
+                    </label>
+                    <div class="file-upload-container" id="${field.name}_upload_container">
+                        <div class="file-drop-zone" id="${field.name}_drop_zone" ondrop="handleFileDrop(event, '${field.name}')" ondragover="handleDragOver(event)" ondragleave="handleDragLeave(event)">
+                            <div class="drop-zone-content">
+                                <i class="icon">📁</i>
+                                <p>Перетащите файлы сюда или <span class="file-select-link" onclick="document.getElementById('${field.name}_file_input').click()">выберите файлы</span></p>
+                                <p class="file-types">Поддерживаются: PDF, DOC, DOCX, XLS, XLSX, JPG, PNG, GIF, SIG, ZIP, RAR, 7Z, TAR, GZ</p>
+                            </div>
+                        </div>
+                        <input type="file" id="${field.name}_file_input" name="${field.name}" class="wizard-input" multiple style="display: none;" onchange="handleFileSelect(event, '${field.name}')" accept=".pdf,.doc,.docx,.xls,.xlsx,.jpg,.jpeg,.png,.gif,.sig,.zip,.rar,.7z,.tar,.gz,.tgz">
+                        <div class="file-list" id="${field.name}_file_list">
+                            ${fileListHtml}
+                        </div>
+                    </div>
+                </div>
+            `;
+        } else if (field.type === 'file_with_name') {
+            let filesData = [];
+            if (value) {
+                if (Array.isArray(value)) {
+                    filesData = value;
+                } else if (typeof value === 'object' && value !== null) {
+                    filesData = [value];
+                } else if (typeof value === 'string' && (value.includes('/info/download_file/') || value.includes('/download_file/'))) {
+                    const parts = value.split('|').map(s => s.trim());
+                    const url = parts[0] || '';
+                    const displayName = parts[1] || (url ? url.split('/').pop() : '');
+                    const filename = url ? url.split('/').filter(Boolean).pop() : '';
+                    if (url && filename) {
+                        filesData = [{ url: url, displayName: displayName, filename: filename }];
+                    }
+                }
+            }
+            if (!wizardData[step.id]) wizardData[step.id] = {};
+            wizardData[step.id][field.name] = filesData;
+            
+            const filesListHtml = filesData.map((fileData, index) => {
+                const disp = fileData.displayName || fileData.originalName || fileData.filename || 'Файл';
+                const dispEsc = (typeof escapeFileDisplayHtml === 'function' ? escapeFileDisplayHtml(disp) : disp.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;'));
+                const valEsc = (fileData.displayName || '').replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;');
+                return `
+                    <div class="file-item-with-name" style="display: flex; align-items: center; justify-content: space-between; padding: 12px; margin: 8px 0; background: #f8f9fa; border-radius: 8px; border: 1px solid #e9ecef;">
+                        <div class="file-info" style="display: flex; align-items: center; flex: 1;">
+                            <i class="file-icon" style="margin-right: 8px; font-size: 16px;">📄</i>
+                            <span class="file-name" style="color: #2563eb; font-weight: 500;">${dispEsc}</span>
+                        </div>
+                        <div class="file-actions" style="display: flex; align-items: center; gap: 8px;">
+                            <input type="text" class="file-display-name" placeholder="Отображаемое имя" value="${valEsc}" onchange="updateFileDisplayNameMulti('${field.name}', ${index}, this.value)" style="padding: 4px 8px; border: 1px solid #d1d5db; border-radius: 4px; font-size: 14px;">
+                            <button type="button" class="btn-remove-file" onclick="removeFileWithNameMulti('${field.name}', ${index})" style="background: #dc3545; color: white; border: none; border-radius: 50%; width: 24px; height: 24px; cursor: pointer; font-size: 14px;">×</button>
+                        </div>
+                    </div>`;
+            }).join('');
+            
+            fieldsHtml += `
+                <div class="wizard-field">
+                    <label class="wizard-label">
+                        <i class="icon">📎</i> ${field.label}
+                        ${field.required ? '<span class="required">*</span>' : ''}
+                    </label>
+                    <div class="file-upload-container" id="${field.name}_upload_container">
+                        <div class="file-drop-zone" id="${field.name}_drop_zone" onclick="document.getElementById('file-${field.name}').click()">
+                            <div class="drop-zone-content">
+                                <i class="icon">📁</i>
+                                <p>Перетащите файлы сюда или <span class="file-select-link" onclick="document.getElementById('file-${field.name}').click(); event.stopPropagation();">выберите файлы</span></p>
+                                <p class="file-types">Поддерживаются: PDF, DOC, DOCX, XLS, XLSX, JPG, PNG, GIF, SIG, ZIP, RAR, 7Z, TAR, GZ</p>
+                            </div>
+                        </div>
+                        <input type="file" id="file-${field.name}" name="${field.name}" multiple style="display: none;" onchange="handleFileWithName(event, '${field.name}')" accept=".pdf,.doc,.docx,.xls,.xlsx,.jpg,.jpeg,.png,.gif,.sig,.zip,.rar,.7z,.tar,.gz,.tgz">
+                    </div>
+                    <div class="file-with-name-container" id="file-container-${field.name}">
+                        ${filesListHtml}
+                    </div>
+                </div>
+            `;
+        } else if (field.type === 'html_editor') {
+            fieldsHtml += `
+                <div class="wizard-field">
+                    <label class="wizard-label">
+                        <i class="icon">🌐</i> ${field.label}
+                        ${field.required ? '<span class="required">*</span>' : ''}
+                    </label>
+                    <div class="html-editor-container">
+                        <div class="html-editor-toolbar">
+                            <button type="button" onclick="insertHtmlTag('${field.name}', 'h3')" class="html-btn" title="Заголовок H3">H3</button>
+                            <button type="button" onclick="insertHtmlTag('${field.name}', 'p')" class="html-btn" title="Параграф">P</button>
+                            <button type="button" onclick="insertHtmlTag('${field.name}', 'br')" class="html-btn" title="Перенос строки">BR</button>
+                            <button type="button" onclick="insertHtmlTag('${field.name}', 'strong')" class="html-btn" title="Жирный текст">B</button>
+                            <button type="button" onclick="insertHtmlTag('${field.name}', 'em')" class="html-btn" title="Курсив">I</button>
+                            <button type="button" onclick="insertHtmlTag('${field.name}', 'ul')" class="html-btn" title="Список">UL</button>
+                            <button type="button" onclick="insertHtmlTag('${field.name}', 'ol')" class="html-btn" title="Нумерованный список">OL</button>
+                            <button type="button" onclick="insertHtmlTag('${field.name}', 'li')" class="html-btn" title="Элемент списка">LI</button>
+                        </div>
+                        <textarea name="${field.name}" class="wizard-input html-editor-textarea" rows="12" ${required} placeholder="Введите HTML-разметку...">${value}</textarea>
+                        <div class="html-preview" id="${field.name}_preview">
+                            <h4>Предварительный просмотр:</h4>
+                            <div class="html-preview-content"></div>
+                        </div>
+                    </div>
+                </div>
+            `;
+        } else {
+            fieldsHtml += `
+                <div class="wizard-field">
+                    <label class="wizard-label">
+                        <i class="icon">📝</i> ${field.label}
+                        ${field.required ? '<span class="required">*</span>' : ''}
+                    </label>
+                    <input type="${field.type}" name="${field.name}" class="wizard-input" value="${value}" ${required}>
+                </div>
+            `;
+        }
+    });
+
+    let sectionHeadersHtml = '';
+    if (typeof WIZARD_SECTION_HEADERS !== 'undefined' && WIZARD_SECTION_HEADERS[step.id]) {
+        const headersConfig = WIZARD_SECTION_HEADERS[step.id];
+        const sh = wizardData[step.id]?.section_headers || {};
+        const stepTitle = (step.title || '').trim();
+        const rows = headersConfig.map(function(h) {
+            const cfg = sh[h.key] || {};
+            const defaultText = (h.defaultText !== undefined && h.defaultText !== '') ? h.defaultText : stepTitle;
+            const text = (cfg.text !== undefined && cfg.text !== '') ? cfg.text : defaultText;
+            const visible = cfg.visible !== false;
+            const safeText = (text || '').replace(/"/g, '&quot;').replace(/</g, '&lt;');
+            const safeKey = (h.key || '').replace(/"/g, '');
+            return '<div class="wizard-field" style="margin-bottom: 14px;">' +
+                '<label class="wizard-label">' + (h.label || h.key) + '</label>' +
+                '<input type="text" id="section-header-' + safeKey + '-text" class="wizard-input section-header-text" data-header-key="' + safeKey + '" value="' + safeText + '" placeholder="' + (defaultText || '').replace(/"/g, '&quot;') + '" style="margin-bottom: 8px;">' +
+                '<label style="display: inline-flex; align-items: center; gap: 6px; font-weight: normal;"><input type="checkbox" id="section-header-' + safeKey + '-visible" class="section-header-visible" data-header-key="' + safeKey + '" ' + (visible ? 'checked' : '') + '> Показывать заголовок</label>' +
+                '</div>';
+        }).join('');
+        sectionHeadersHtml = '<div class="wizard-section-headers" style="margin-top: 24px; padding: 16px; background: #f8fafc; border-radius: 12px; border: 1px solid #e2e8f0;">' +
+            '<h4 style="margin: 0 0 16px 0; font-size: 15px;"><i class="icon">📌</i> Заголовки основных блоков</h4>' +
+            '<p style="color: #64748b; font-size: 0.875rem; margin: 0 0 12px 0;">Текст и видимость заголовков на странице.</p>' +
+            rows + '</div>';
+    }
+    
+    // Добавляем блоки контента если нужно
+    let contentBlocksHtml = '';
+    if (step.content_blocks) {
+        const blocks = wizardData[step.id]?.content_blocks || [];
+        contentBlocksHtml = `
+            <div class="wizard-content-blocks">
+                <div class="wizard-blocks-header">
+                    <h4><i class="icon">📋</i> Блоки контента</h4>
+                    <button type="button" onclick="addContentBlock('${step.id}')" class="btn btn-primary btn-sm">
+                        <i class="icon">➕</i> Добавить блок
+                    </button>
+                </div>
+                <div class="wizard-blocks-list" id="blocks-${step.id}-${Date.now()}">
+                    ${generateBlocksHtml(step.id, blocks)}
+                </div>
+            </div>
+        `;
+    }
+    
+    contentContainer.innerHTML = `
+        <div class="wizard-step-header">
+            <h3><i class="icon">${step.icon}</i> ${step.title}</h3>
+            <p>Заполните информацию для раздела "${step.title}"</p>
+            ${step.endpoint === 'food' ? `
+                <div style="margin-top: 12px; display:flex; gap: 10px; flex-wrap: wrap;">
+                    <button type="button" onclick="createFoodSubsection()" class="btn btn-primary"
+                        style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 10px 14px; border-radius: 10px; border: none; color: white; cursor: pointer; font-size: 14px; font-weight: 800;">
+                        ➕ Создать подраздел
+                    </button>
+                </div>
+            ` : ''}
+        </div>
+        
+        <div class="wizard-form">
+            ${fieldsHtml}
+            ${sectionHeadersHtml}
+            ${contentBlocksHtml}
+        </div>
+    `;
+    
+    // Добавление стилей для полей
+    if (!document.getElementById('wizard-styles')) {
+        const style = document.createElement('style');
+        style.id = 'wizard-styles';
+        // CSS styles are now loaded from external files
+        style.textContent = `
+            .drop-zone-content {
+                display: flex;
+                flex-direction: column;
+                align-items: center;
+                gap: 8px;
+            }
+            
+            .drop-zone-content .icon {
+                font-size: 2rem;
+                color: #6b7280;
+            }
+            
+            .drop-zone-content p {
+                margin: 0;
+                color: #374151;
+                font-size: 0.875rem;
+            }
+            
+            .file-select-link {
+                color: #3b82f6;
+                text-decoration: underline;
+                cursor: pointer;
+            }
+            
+            .file-select-link:hover {
+                color: #1d4ed8;
+            }
+            
+            /* Однофайловые поля с отображаемым именем */
+            .file-upload-area {
+                border: 2px dashed #d1d5db;
+                border-radius: 8px;
+                padding: 18px;
+                text-align: center;
+                background: #f8fafc;
+                cursor: pointer;
+                transition: all 0.2s ease;
+            }
+            
+            .file-upload-area:hover {
+                border-color: #3b82f6;
+                background: #eff6ff;
+            }
+            
+            .file-upload-text {
+                display: flex;
+                flex-direction: column;
+                align-items: center;
+                gap: 6px;
+                color: #374151;
+                font-size: 0.95rem;
+            }
+            
+            .file-upload-text .icon {
+                font-size: 2rem;
+                color: #f59e0b;
+            }
+            
+            .file-with-name-container {
+                margin-top: 10px;
+                display: flex;
+                flex-direction: column;
+                gap: 8px;
+            }
+            
+            .file-types {
+                font-size: 0.75rem !important;
+                color: #6b7280 !important;
+            }
+            
+            .file-list {
+                margin-top: 12px;
+                display: flex;
+                flex-direction: column;
+                gap: 8px;
+            }
+            
+            .file-item {
+                display: flex;
+                align-items: center;
+                justify-content: space-between;
+                padding: 8px 12px;
+                background-color: #f3f4f6;
+                border: 1px solid #d1d5db;
+                border-radius: 6px;
+                font-size: 0.875rem;
+            }
+            
+            .file-info {
+                display: flex;
+                align-items: center;
+                gap: 8px;
+                flex: 1;
+            }
+            
+            .file-icon {
+                font-size: 1.2rem;
+            }
+            
+            .file-name {
+                font-weight: 500;
+                color: #374151;
+            }
+            
+            .file-size {
+                color: #6b7280;
+                font-size: 0.75rem;
+            }
+            
+            .file-remove {
+                background: none;
+                border: none;
+                color: #ef4444;
+                font-size: 1.2rem;
+                cursor: pointer;
+                padding: 4px;
+                border-radius: 4px;
+                transition: background-color 0.2s ease;
+            }
+            
+            .file-remove:hover {
+                background-color: #fee2e2;
+            }
+            
+            /* Стили для фотографий в текстовых блоках */
+            .block-photos-upload-container {
+                margin-top: 12px;
+            }
+            
+            .block-photos-drop-zone {
+                border: 2px dashed #d1d5db;
+                border-radius: 8px;
+                padding: 24px;
+                text-align: center;
+                background: #f8fafc;
+                transition: all 0.2s ease;
+            }
+            
+            .block-photos-drop-zone.drag-over {
+                border-color: #3b82f6;
+                background: #eff6ff;
+            }
+            
+            .person-photo-drop-zone.drag-over {
+                border-color: #3b82f6 !important;
+                background: #dbeafe !important;
+                border-style: solid !important;
+            }
+            
+            .block-photos-list {
+                margin-top: 16px;
+                display: flex;
+                flex-direction: column;
+                gap: 12px;
+            }
+            
+            .block-photo-item {
+                display: flex;
+                align-items: center;
+                gap: 12px;
+                padding: 12px;
+                background: #f8fafc;
+                border: 1px solid #e5e7eb;
+                border-radius: 8px;
+            }
+            
+            .block-photo-preview {
+                width: 140px;
+                height: 140px;
+                flex-shrink: 0;
+                border-radius: 8px;
+                overflow: hidden;
+                background: #fff;
+                border: 1px solid #e5e7eb;
+            }
+            
+            .block-photo-preview img {
+                width: 100%;
+                height: 100%;
+                object-fit: cover;
+            }
+            
+            .block-photo-info {
+                flex: 1;
+                min-width: 0;
+            }
+            
+            .block-photo-name {
+                font-size: 0.875rem;
+                color: #374151;
+                word-break: break-all;
+            }
+            
+            .block-photo-remove {
+                background: none;
+                border: none;
+                color: #ef4444;
+                font-size: 1.2rem;
+                cursor: pointer;
+                padding: 4px 8px;
+                border-radius: 4px;
+                transition: background-color 0.2s ease;
+            }
+            
+            .block-photo-remove:hover {
+                background-color: #fee2e2;
+            }
+            
+            /* Стили для документов в блоках документов */
+            .block-documents-upload-container {
+                margin-top: 12px;
+            }
+            
+            .block-documents-drop-zone {
+                border: 2px dashed #d1d5db;
+                border-radius: 8px;
+                padding: 24px;
+                text-align: center;
+                background: #f8fafc;
+                transition: all 0.2s ease;
+            }
+            
+            .block-documents-drop-zone.drag-over {
+                border-color: #3b82f6;
+                background: #eff6ff;
+            }
+            
+            .block-documents-list {
+                margin-top: 16px;
+                display: flex;
+                flex-direction: column;
+                gap: 12px;
+            }
+            
+            .block-document-item {
+                display: flex;
+                align-items: center;
+                justify-content: space-between;
+                gap: 12px;
+                padding: 12px;
+                background: #f8fafc;
+                border: 1px solid #e5e7eb;
+                border-radius: 8px;
+            }
+            
+            .block-document-info {
+                display: flex;
+                align-items: center;
+                gap: 12px;
+                flex: 1;
+                min-width: 0;
+            }
+            
+            .block-document-icon {
+                font-size: 1.5rem;
+                flex-shrink: 0;
+            }
+            
+            .block-document-name {
+                font-size: 0.875rem;
+                color: #374151;
+                word-break: break-all;
+            }
+            
+            .block-document-remove {
+                background: none;
+                border: none;
+                color: #ef4444;
+                font-size: 1.2rem;
+                cursor: pointer;
+                padding: 4px 8px;
+                border-radius: 4px;
+                transition: background-color 0.2s ease;
+            }
+            
+            .block-document-remove:hover {
+                background-color: #fee2e2;
+            }
+            
+            /* Стили для ссылок скачивания */
+            .download-link {
+                color: #3b82f6;
+                text-decoration: none;
+                font-weight: 500;
+                padding: 4px 8px;
+                border-radius: 4px;
+                background-color: #eff6ff;
+                border: 1px solid #dbeafe;
+                transition: all 0.2s ease;
+                display: inline-block;
+            }
+            
+            .download-link:hover {
+                color: #1d4ed8;
+                background-color: #dbeafe;
+                border-color: #3b82f6;
+                transform: translateY(-1px);
+                box-shadow: 0 2px 4px rgba(59, 130, 246, 0.2);
+            }
+        `;
+        document.head.appendChild(style);
+    }
+    
+    // Добавляем обработчики событий для кнопок блоков контента
+    // Используем setTimeout для гарантии, что DOM полностью обновлен
+    setTimeout(() => {
+        // Обработчик для кнопки редактирования
+        document.querySelectorAll('.edit-block-btn').forEach((btn, index) => {
+            // Удаляем старые обработчики, если они есть
+            btn.removeEventListener('click', btn._editHandler);
+            // Создаем новый обработчик
+            btn._editHandler = function(e) {
+                e.preventDefault();
+                e.stopPropagation();
+                const stepId = this.getAttribute('data-step-id');
+                const blockIndex = parseInt(this.getAttribute('data-block-index'));
+                editContentBlock(stepId, blockIndex);
+            };
+            btn.addEventListener('click', btn._editHandler);
+        });
+        
+        // Обработчик для кнопки удаления
+        document.querySelectorAll('.remove-block-btn').forEach((btn, index) => {
+            // Удаляем старые обработчики, если они есть
+            btn.removeEventListener('click', btn._removeHandler);
+            // Создаем новый обработчик
+            btn._removeHandler = function(e) {
+                e.preventDefault();
+                e.stopPropagation();
+                const stepId = this.getAttribute('data-step-id');
+                const blockIndex = parseInt(this.getAttribute('data-block-index'));
+                removeContentBlock(stepId, blockIndex);
+            };
+            btn.addEventListener('click', btn._removeHandler);
+        });
+        
+        // Обработчик для кнопки перемещения вверх
+        document.querySelectorAll('.move-block-up-btn').forEach((btn) => {
+            btn.removeEventListener('click', btn._moveUpHandler);
+            btn._moveUpHandler = function(e) {
+                e.preventDefault();
+                e.stopPropagation();
+                const stepId = this.getAttribute('data-step-id');
+                const blockIndex = parseInt(this.getAttribute('data-block-index'));
+                moveBlockUp(stepId, blockIndex);
+            };
+            btn.addEventListener('click', btn._moveUpHandler);
+        });
+        
+        // Обработчик для кнопки перемещения вниз
+        document.querySelectorAll('.move-block-down-btn').forEach((btn) => {
+            btn.removeEventListener('click', btn._moveDownHandler);
+            btn._moveDownHandler = function(e) {
+                e.preventDefault();
+                e.stopPropagation();
+                const stepId = this.getAttribute('data-step-id');
+                const blockIndex = parseInt(this.getAttribute('data-block-index'));
+                moveBlockDown(stepId, blockIndex);
+            };
+            btn.addEventListener('click', btn._moveDownHandler);
+        });
+        
+        // Добавляем обработчики для автоматического сохранения данных полей
+        const step = wizardSteps[currentWizardStep];
+        if (step && step.fields) {
+            step.fields.forEach(field => {
+                const inputElement = document.querySelector(`[name="${field.name}"]`);
+                if (inputElement) {
+                    // Удаляем старые обработчики
+                    inputElement.removeEventListener('input', inputElement._autoSaveHandler);
+                    inputElement.removeEventListener('change', inputElement._autoSaveHandler);
+                    
+                    // Создаем новый обработчик
+                    inputElement._autoSaveHandler = async function() {
+                        await saveCurrentStepData();
+                    };
+                    
+                    // Добавляем обработчики для разных типов полей
+                    inputElement.addEventListener('input', inputElement._autoSaveHandler);
+                    inputElement.addEventListener('change', inputElement._autoSaveHandler);
+                }
+            });
+        }
+    }, 100);
+    
+    // Обновляем индексы кнопок удаления для всех файловых полей
+    (step.fields || []).forEach(field => {
+        if (field.type === 'file' || field.type === 'file_or_text') {
+            const fileList = document.getElementById(`${field.name}_file_list`);
+            if (fileList) {
+                const fileItems = fileList.querySelectorAll('.file-item');
+                fileItems.forEach((item, index) => {
+                    const removeBtn = item.querySelector('.file-remove');
+                    if (removeBtn) {
+                        removeBtn.setAttribute('onclick', `removeFile('${field.name}', ${index})`);
+                    }
+                });
+            }
+        }
+    });
+    
+    // Инициализируем HTML-редакторы
+    setTimeout(() => {
+        initializeHtmlEditors();
+    }, 100);
+}
+
+// Получение иконки типа блока
+function getBlockTypeIcon(type) {
+    const icons = {
+        'text': '📝',
+        'table': '📊',
+        'list': '📋',
+        'documents': '📄',
+        'photos': '🖼️',
+        'person': '👤',
+        'dishes': '🍽️',
+        'daily-dish': '🍲'
+    };
+    return icons[type] || '📄';
+}
+
+// Получение названия типа блока
+function getBlockTypeName(type) {
+    const names = {
+        'text': 'Текстовый блок',
+        'table': 'Таблица',
+        'list': 'Список',
+        'documents': 'Документы',
+        'photos': 'Фотографии',
+        'person': 'Персона',
+        'dishes': 'Блюда',
+        'daily-dish': 'Блюдо на день'
+    };
+    return names[type] || 'Блок';
+}
+
+// Генерация HTML для блоков контента
+function generateBlocksHtml(stepId, blocks) {
+    if (!blocks || blocks.length === 0) {
+        return '<div class="wizard-empty-blocks">Нет добавленных блоков контента</div>';
+    }
+    
+    // Рекурсивная функция для нормализации блоков
+    function normalizeBlocksRecursive(blocksArray) {
+        const normalizedBlocks = [];
+        for (const block of blocksArray) {
+            if (typeof block === 'object' && block !== null && !Array.isArray(block)) {
+                // Проверяем, есть ли внутри блока content_blocks
+                if (block.content_blocks && Array.isArray(block.content_blocks)) {
+                    // Если есть, добавляем только вложенные блоки, сам блок не добавляем
+                    normalizedBlocks.push(...normalizeBlocksRecursive(block.content_blocks));
+                } else {
+                    // Создаем новый объект без content_blocks
+                    const normalized = {};
+                    for (const key in block) {
+                        if (key !== 'content_blocks') {
+                            normalized[key] = block[key];
+                        }
+                    }
+                    normalizedBlocks.push(normalized);
+                }
+            } else if (Array.isArray(block)) {
+                // Если блок - это массив, рекурсивно обрабатываем его
+                normalizedBlocks.push(...normalizeBlocksRecursive(block));
+            } else {
+                normalizedBlocks.push(block);
+            }
+        }
+        return normalizedBlocks;
+    }
+    
+    // Нормализуем блоки
+    const normalizedBlocks = normalizeBlocksRecursive(blocks);
+    
+    // Создаем HTML для каждого блока отдельно
+    let html = '';
+    for (let index = 0; index < normalizedBlocks.length; index++) {
+        const block = normalizedBlocks[index];
+        if (block && typeof block === 'object' && block.type) {
+            html += `
+        <div class="wizard-block-item" data-block-index="${index}">
+            <div class="wizard-block-header">
+                <span class="wizard-block-type">${getBlockTypeIcon(block.type)} ${getBlockTypeName(block.type)}${block.title ? ': ' + (typeof block.title === 'string' ? block.title : '') : ''}</span>
+                <div class="wizard-block-actions">
+                    <button type="button" class="btn btn-sm btn-secondary move-block-up-btn" data-step-id="${stepId}" data-block-index="${index}" ${index === 0 ? 'disabled' : ''} title="Переместить вверх">
+                        <i class="icon">⬆️</i>
+                    </button>
+                    <button type="button" class="btn btn-sm btn-secondary move-block-down-btn" data-step-id="${stepId}" data-block-index="${index}" ${index === normalizedBlocks.length - 1 ? 'disabled' : ''} title="Переместить вниз">
+                        <i class="icon">⬇️</i>
+                    </button>
+                    <button type="button" class="btn btn-sm btn-primary edit-block-btn" data-step-id="${stepId}" data-block-index="${index}">
+                        <i class="icon">✏️</i> Редактировать
+                    </button>
+                    <button type="button" class="btn btn-sm btn-danger remove-block-btn" data-step-id="${stepId}" data-block-index="${index}">
+                        <i class="icon">🗑️</i> Удалить
+                    </button>
+                </div>
+            </div>
+            <div class="wizard-block-preview">
+                ${generateBlockPreview(block)}
+            </div>
+        </div>
+    `;
+        }
+    }
+    
+    return html;
+}
+
+// Генерация предпросмотра блока
+function generateBlockPreview(block) {
+    switch (block.type) {
+        case 'text':
+            return `<div class="wizard-text-preview">${block.content ? block.content.substring(0, 100) + '...' : 'Пустой текстовый блок'}</div>`;
+        case 'table':
+            const headers = block.headers || [];
+            const rows = block.rows || [];
+            let tablePreview = `<div class="wizard-table-preview">`;
+            tablePreview += `<div class="wizard-table-stats">Таблица: ${headers.length} колонок, ${rows.length} строк</div>`;
+            
+            if (headers.length > 0 || rows.length > 0) {
+                tablePreview += `<div class="wizard-table-mini">`;
+                
+                // Показываем заголовки
+                if (headers.length > 0) {
+                    tablePreview += `<div class="wizard-table-mini-header">`;
+                    headers.slice(0, 3).forEach(header => {
+                        tablePreview += `<span class="wizard-table-mini-cell">${header}</span>`;
+                    });
+                    if (headers.length > 3) {
+                        tablePreview += `<span class="wizard-table-mini-cell">...</span>`;
+                    }
+                    tablePreview += `</div>`;
+                }
+                
+                // Показываем первые строки
+                if (rows.length > 0) {
+                    rows.slice(0, 2).forEach(row => {
+                        tablePreview += `<div class="wizard-table-mini-row">`;
+                        row.slice(0, 3).forEach(cell => {
+                            tablePreview += `<span class="wizard-table-mini-cell">${cell}</span>`;
+                        });
+                        if (row.length > 3) {
+                            tablePreview += `<span class="wizard-table-mini-cell">...</span>`;
+                        }
+                        tablePreview += `</div>`;
+                    });
+                    if (rows.length > 2) {
+                        tablePreview += `<div class="wizard-table-mini-more">...</div>`;
+                    }
+                }
+                
+                tablePreview += `</div>`;
+            }
+            
+            tablePreview += `</div>`;
+            return tablePreview;
+        case 'list':
+            return `<div class="wizard-list-preview">Список: ${block.items ? block.items.length : 0} элементов</div>`;
+        case 'documents':
+            return `<div class="wizard-docs-preview">Документы: ${block.documents ? block.documents.length : 0} файлов</div>`;
+        case 'photos':
+            return `<div class="wizard-photos-preview">Фотографии: ${block.photos ? block.photos.length : 0} изображений</div>`;
+        case 'person':
+            return `<div class="wizard-person-preview">Персона: ${block.persons ? block.persons.length : 0} записей</div>`;
+        case 'dishes':
+            return `<div class="wizard-dishes-preview">Блюда: ${block.dishes ? block.dishes.length : 0} блюд</div>`;
+        case 'daily-dish':
+            const dish = block.dish || {};
+            return `<div class="wizard-daily-dish-preview">${dish.title || 'Блюдо на день'}${dish.date ? ` (${dish.date})` : ''}</div>`;
+        default:
+            return '<div class="wizard-unknown-preview">Неизвестный тип блока</div>';
+    }
+}
+
+// Добавление блока контента
+function addContentBlock(stepId) {
+    // addContentBlock вызван
+    
+    // Проверяем, активен ли sidebar wizard
+    let step;
+    if (window.IS_SIDEBAR_WIZARD && window.sidebarWizardManager) {
+        // Используем шаги из sidebar wizard
+        step = window.sidebarWizardManager.wizardSteps.find(s => s.id === stepId);
+        if (!step) {
+            // Попробуем найти по endpoint
+            step = window.sidebarWizardManager.wizardSteps.find(s => s.endpoint === stepId);
+        }
+    } else {
+        // Используем шаги из основного wizard
+        step = wizardSteps.find(s => s.id === stepId);
+        if (!step) {
+            // Попробуем найти по endpoint
+            step = wizardSteps.find(s => s.endpoint === stepId);
+        }
+    }
+    
+    if (!step) {
+        console.error('Step not found:', stepId);
+        return;
+    }
+    // Показываем модальное окно выбора типа блока
+    showBlockTypeModal(stepId);
+}
+
+// Показ модального окна выбора типа блока
+function showBlockTypeModal(stepId) {
+    // showBlockTypeModal вызван
+    const modal = document.createElement('div');
+    modal.className = 'wizard-block-type-modal';
+    modal.style.cssText = `
+        position: fixed;
+        top: 0;
+        left: 0;
+        width: 100vw;
+        height: 100vh;
+        z-index: 2147483649;
+        display: flex;
+        align-items: center;
+        justify-content: center;
+    `;
+    modal.innerHTML = `
+        <div class="wizard-block-type-backdrop" onclick="closeBlockTypeModal()" style="position: absolute; top: 0; left: 0; width: 100%; height: 100%; background: rgba(0, 0, 0, 0.5); backdrop-filter: blur(4px);"></div>
+        <div class="wizard-block-type-container" style="position: relative; background: white; border-radius: 16px; padding: 2rem; max-width: 500px; width: 90%; box-shadow: 0 20px 25px -5px rgba(0, 0, 0, 0.1), 0 10px 10px -5px rgba(0, 0, 0, 0.04);">
+            <div class="wizard-block-type-header" style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 1.5rem;">
+                <h3 style="margin: 0; font-size: 1.5rem; font-weight: 600; color: #111827;">Выберите тип блока</h3>
+                <button onclick="closeBlockTypeModal()" class="wizard-block-type-close" style="background: none; border: none; font-size: 1.5rem; cursor: pointer; color: #6b7280; padding: 0.5rem;">✕</button>
+            </div>
+            <div class="wizard-block-type-options" style="display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 1rem;">
+                <div class="wizard-block-type-option" onclick="selectBlockType('${stepId}', 'text')" style="display: flex; align-items: center; gap: 0.75rem; padding: 1rem; border: 2px solid #e5e7eb; border-radius: 8px; cursor: pointer; transition: all 0.2s; background: white;">
+                    <i class="icon" style="font-size: 1.5rem;">📝</i>
+                    <span style="font-weight: 500; color: #374151;">Текстовый блок</span>
+                </div>
+                <div class="wizard-block-type-option" onclick="selectBlockType('${stepId}', 'table')" style="display: flex; align-items: center; gap: 0.75rem; padding: 1rem; border: 2px solid #e5e7eb; border-radius: 8px; cursor: pointer; transition: all 0.2s; background: white;">
+                    <i class="icon" style="font-size: 1.5rem;">📊</i>
+                    <span style="font-weight: 500; color: #374151;">Таблица</span>
+                </div>
+                <div class="wizard-block-type-option" onclick="selectBlockType('${stepId}', 'list')" style="display: flex; align-items: center; gap: 0.75rem; padding: 1rem; border: 2px solid #e5e7eb; border-radius: 8px; cursor: pointer; transition: all 0.2s; background: white;">
+                    <i class="icon" style="font-size: 1.5rem;">📋</i>
+                    <span style="font-weight: 500; color: #374151;">Список</span>
+                </div>
+                <div class="wizard-block-type-option" onclick="selectBlockType('${stepId}', 'documents')" style="display: flex; align-items: center; gap: 0.75rem; padding: 1rem; border: 2px solid #e5e7eb; border-radius: 8px; cursor: pointer; transition: all 0.2s; background: white;">
+                    <i class="icon" style="font-size: 1.5rem;">📄</i>
+                    <span style="font-weight: 500; color: #374151;">Документы</span>
+                </div>
+                <div class="wizard-block-type-option" onclick="selectBlockType('${stepId}', 'photos')" style="display: flex; align-items: center; gap: 0.75rem; padding: 1rem; border: 2px solid #e5e7eb; border-radius: 8px; cursor: pointer; transition: all 0.2s; background: white;">
+                    <i class="icon" style="font-size: 1.5rem;">🖼️</i>
+                    <span style="font-weight: 500; color: #374151;">Фотографии</span>
+                </div>
+                <div class="wizard-block-type-option" onclick="selectBlockType('${stepId}', 'person')" style="display: flex; align-items: center; gap: 0.75rem; padding: 1rem; border: 2px solid #e5e7eb; border-radius: 8px; cursor: pointer; transition: all 0.2s; background: white;">
+                    <i class="icon" style="font-size: 1.5rem;">👤</i>
+                    <span style="font-weight: 500; color: #374151;">Персона</span>
+                </div>
+            </div>
+        </div>
+    `;
+    
+    document.body.appendChild(modal);
+    // Модальное окно добавлено
+}
+
+// Закрытие модального окна выбора типа блока
+function closeBlockTypeModal() {
+    const modal = document.querySelector('.wizard-block-type-modal');
+    if (modal) {
+        modal.remove();
+    }
+}
+
+// Выбор типа блока
+function selectBlockType(stepId, blockType) {
+    // selectBlockType вызван
+    closeBlockTypeModal();
+    
+    // Создаем новый блок
+    const newBlock = {
+        type: blockType,
+        title: '',
+        content: '',
+        headers: [],
+        rows: [],
+        items: [],
+        documents: [],
+        photos: [],
+        persons: [],
+        dishes: [],
+        dish: blockType === 'daily-dish' ? {
+            title: '',
+            date: new Date().toISOString().split('T')[0],
+            publish_date: new Date().toISOString().split('T')[0],
+            photo: ''
+        } : null
+    };
+    
+    // Проверяем, активен ли sidebar wizard
+    if (window.IS_SIDEBAR_WIZARD && window.sidebarWizardManager) {
+        // Работаем с sidebar wizard
+        if (!window.sidebarWizardManager.wizardData[stepId]) {
+            window.sidebarWizardManager.wizardData[stepId] = {};
+        }
+        if (!window.sidebarWizardManager.wizardData[stepId].content_blocks) {
+            window.sidebarWizardManager.wizardData[stepId].content_blocks = [];
+        }
+        
+        // Рекурсивная функция для нормализации блоков
+        const normalizeBlocksRecursive = (blocksArray) => {
+            const normalizedBlocks = [];
+            for (const block of blocksArray) {
+                if (typeof block === 'object' && block !== null && !Array.isArray(block)) {
+                    // Проверяем, есть ли внутри блока content_blocks
+                    if (block.content_blocks && Array.isArray(block.content_blocks)) {
+                        // Если есть, добавляем только вложенные блоки, сам блок не добавляем
+                        normalizedBlocks.push(...normalizeBlocksRecursive(block.content_blocks));
+                    } else {
+                        // Создаем новый объект без content_blocks
+                        const normalized = {};
+                        for (const key in block) {
+                            if (key !== 'content_blocks') {
+                                normalized[key] = block[key];
+                            }
+                        }
+                        normalizedBlocks.push(normalized);
+                    }
+                } else if (Array.isArray(block)) {
+                    // Если блок - это массив, рекурсивно обрабатываем его
+                    normalizedBlocks.push(...normalizeBlocksRecursive(block));
+                } else {
+                    normalizedBlocks.push(block);
+                }
+            }
+            return normalizedBlocks;
+        };
+        
+        // Нормализуем существующие блоки - убираем вложенные content_blocks
+        const existingBlocks = window.sidebarWizardManager.wizardData[stepId].content_blocks;
+        if (Array.isArray(existingBlocks)) {
+            window.sidebarWizardManager.wizardData[stepId].content_blocks = normalizeBlocksRecursive(existingBlocks);
+        }
+        
+        // Добавляем новый блок в конец массива
+        window.sidebarWizardManager.wizardData[stepId].content_blocks.push(newBlock);
+        
+        // Синхронизируем с глобальными структурами
+        window.wizardData = window.sidebarWizardManager.wizardData;
+        
+        // Обновляем отображение
+        window.sidebarWizardManager.renderCurrentStep();
+    } else {
+        // Работаем с основным wizard
+        if (!wizardData[stepId]) {
+            wizardData[stepId] = {};
+        }
+        if (!wizardData[stepId].content_blocks) {
+            wizardData[stepId].content_blocks = [];
+        }
+        
+        // Рекурсивная функция для нормализации блоков
+        const normalizeBlocksRecursive = (blocksArray) => {
+            const normalizedBlocks = [];
+            for (const block of blocksArray) {
+                if (typeof block === 'object' && block !== null && !Array.isArray(block)) {
+                    // Проверяем, есть ли внутри блока content_blocks
+                    if (block.content_blocks && Array.isArray(block.content_blocks)) {
+                        // Если есть, добавляем только вложенные блоки, сам блок не добавляем
+                        normalizedBlocks.push(...normalizeBlocksRecursive(block.content_blocks));
+                    } else {
+                        // Создаем новый объект без content_blocks
+                        const normalized = {};
+                        for (const key in block) {
+                            if (key !== 'content_blocks') {
+                                normalized[key] = block[key];
+                            }
+                        }
+                        normalizedBlocks.push(normalized);
+                    }
+                } else if (Array.isArray(block)) {
+                    // Если блок - это массив, рекурсивно обрабатываем его
+                    normalizedBlocks.push(...normalizeBlocksRecursive(block));
+                } else {
+                    normalizedBlocks.push(block);
+                }
+            }
+            return normalizedBlocks;
+        };
+        
+        // Нормализуем существующие блоки - убираем вложенные content_blocks
+        const existingBlocks = wizardData[stepId].content_blocks;
+        if (Array.isArray(existingBlocks)) {
+            wizardData[stepId].content_blocks = normalizeBlocksRecursive(existingBlocks);
+        }
+        
+        // Добавляем новый блок в конец массива
+        wizardData[stepId].content_blocks.push(newBlock);
+        
+        // Обновляем отображение
+        const step = wizardSteps.find(s => s.id === stepId);
+        const stepIndex = wizardSteps.findIndex(s => s.id === stepId);
+        loadStepContent(wizardSteps[stepIndex]);
+    }
+}
+
+// Редактирование блока контента
+function editContentBlock(stepId, blockIndex) {
+    // Проверяем, активен ли sidebar wizard
+    let stepData;
+    if (window.IS_SIDEBAR_WIZARD && window.sidebarWizardManager) {
+        stepData = window.sidebarWizardManager.wizardData[stepId];
+    } else {
+        stepData = wizardData[stepId];
+    }
+    
+    if (!stepData || !stepData.content_blocks || !stepData.content_blocks[blockIndex]) {
+        console.error('Block not found for editing:', stepId, blockIndex);
+        return;
+    }
+    const block = stepData.content_blocks[blockIndex];
+        // Блок найден для редактирования
+    showBlockEditModal(stepId, blockIndex);
+}
+
+// Удаление блока контента
+function removeContentBlock(stepId, blockIndex) {
+    // removeContentBlock вызван
+    
+    // Проверяем, активен ли sidebar wizard
+    let stepData, steps, updateDisplay;
+    if (window.IS_SIDEBAR_WIZARD && window.sidebarWizardManager) {
+        stepData = window.sidebarWizardManager.wizardData[stepId];
+        steps = window.sidebarWizardManager.wizardSteps;
+        updateDisplay = () => window.sidebarWizardManager.renderCurrentStep();
+    } else {
+        stepData = wizardData[stepId];
+        steps = wizardSteps;
+        updateDisplay = () => {
+            const currentStepIndex = wizardSteps.findIndex(s => s.id === stepId);
+            loadStepContent(wizardSteps[currentStepIndex]);
+        };
+    }
+    
+    if (!stepData || !stepData.content_blocks || !stepData.content_blocks[blockIndex]) {
+        console.error('Block not found for removal:', stepId, blockIndex);
+        return;
+    }
+    
+    if (confirm('Вы уверены, что хотите удалить этот блок?')) {
+        stepData.content_blocks.splice(blockIndex, 1);
+        // Блок удален, обновляем отображение
+        updateDisplay();
+        // Блок успешно удален
+    }
+}
+
+// Перемещение блока вверх
+function moveBlockUp(stepId, blockIndex) {
+    // Проверяем, активен ли sidebar wizard
+    let stepData, updateDisplay;
+    if (window.IS_SIDEBAR_WIZARD && window.sidebarWizardManager) {
+        stepData = window.sidebarWizardManager.wizardData[stepId];
+        updateDisplay = () => window.sidebarWizardManager.renderCurrentStep();
+    } else {
+        stepData = wizardData[stepId];
+        updateDisplay = () => {
+            const currentStepIndex = wizardSteps.findIndex(s => s.id === stepId);
+            loadStepContent(wizardSteps[currentStepIndex]);
+        };
+    }
+    
+    if (!stepData || !stepData.content_blocks || blockIndex <= 0 || blockIndex >= stepData.content_blocks.length) {
+        return;
+    }
+    
+    // Меняем местами блоки
+    const blocks = stepData.content_blocks;
+    [blocks[blockIndex - 1], blocks[blockIndex]] = [blocks[blockIndex], blocks[blockIndex - 1]];
+    
+    // Обновляем отображение
+    updateDisplay();
+}
+
+// Перемещение блока вниз
+function moveBlockDown(stepId, blockIndex) {
+    // Проверяем, активен ли sidebar wizard
+    let stepData, updateDisplay;
+    if (window.IS_SIDEBAR_WIZARD && window.sidebarWizardManager) {
+        stepData = window.sidebarWizardManager.wizardData[stepId];
+        updateDisplay = () => window.sidebarWizardManager.renderCurrentStep();
+    } else {
+        stepData = wizardData[stepId];
+        updateDisplay = () => {
+            const currentStepIndex = wizardSteps.findIndex(s => s.id === stepId);
+            loadStepContent(wizardSteps[currentStepIndex]);
+        };
+    }
+    
+    if (!stepData || !stepData.content_blocks || blockIndex < 0 || blockIndex >= stepData.content_blocks.length - 1) {
+        return;
+    }
+    
+    // Меняем местами блоки
+    const blocks = stepData.content_blocks;
+    [blocks[blockIndex], blocks[blockIndex + 1]] = [blocks[blockIndex + 1], blocks[blockIndex]];
+    
+    // Обновляем отображение
+    updateDisplay();
+}
+
+// Показ модального окна редактирования блока
+function showBlockEditModal(stepId, blockIndex) {
+    // Проверяем, активен ли sidebar wizard
+    let stepData;
+    if (window.IS_SIDEBAR_WIZARD && window.sidebarWizardManager) {
+        stepData = window.sidebarWizardManager.wizardData[stepId];
+    } else {
+        stepData = wizardData[stepId];
+    }
+    
+    if (!stepData || !stepData.content_blocks || !stepData.content_blocks[blockIndex]) {
+        console.error('Block not found for editing modal:', stepId, blockIndex);
+        return;
+    }
+    
+    const block = stepData.content_blocks[blockIndex];
+    
+    const modal = document.createElement('div');
+    modal.className = 'wizard-block-edit-modal';
+    modal.innerHTML = `
+        <div class="wizard-block-edit-backdrop" onclick="closeBlockEditModal()"></div>
+        <div class="wizard-block-edit-container">
+            <div class="wizard-block-edit-header">
+                <h3>Редактирование блока: ${getBlockTypeName(block.type)}</h3>
+                <button onclick="closeBlockEditModal()" class="wizard-block-edit-close">✕</button>
+            </div>
+            <div class="wizard-block-edit-content">
+                ${generateBlockEditForm(stepId, blockIndex, block)}
+            </div>
+            <div class="wizard-block-edit-actions">
+                <button onclick="closeBlockEditModal()" class="btn btn-secondary">Отмена</button>
+                <button onclick="saveBlockEdit('${stepId}', ${blockIndex})" class="btn btn-primary">Сохранить</button>
+            </div>
+        </div>
+    `;
+    
+    document.body.appendChild(modal);
+    
+    // Инициализируем редактор для текстовых блоков
+    if (block.type === 'text') {
+        setTimeout(() => {
+            initializeBlockPhotos(stepId, blockIndex, block);
+            initializeBlockDocuments(stepId, blockIndex, block);
+            // Инициализируем HTML-редактор для содержимого
+            const textarea = modal.querySelector(`textarea[id^="block-content-${stepId}-${blockIndex}"]`);
+            if (textarea) {
+                initializeBlockContentEditor(textarea.id);
+            }
+        }, 100);
+    }
+    
+    // Инициализируем документы для блоков документов
+    if (block.type === 'documents') {
+        setTimeout(() => {
+            initializeBlockDocuments(stepId, blockIndex, block);
+        }, 100);
+    }
+
+    // Инициализируем список/превью фотографий для блоков "Фотографии"
+    if (block.type === 'photos') {
+        setTimeout(() => {
+            initializeBlockPhotos(stepId, blockIndex, block);
+        }, 100);
+    }
+    
+    // Инициализируем фотографии для блоков блюд
+    if (block.type === 'dishes') {
+        setTimeout(() => {
+            initializeDishesPhotos(stepId, blockIndex, block);
+        }, 100);
+    }
+    
+    // Инициализируем превью для персон
+    if (block.type === 'person' && block.persons) {
+        setTimeout(() => {
+            block.persons.forEach((person, idx) => {
+                if (person.photo) {
+                    updatePersonPhotoPreview(stepId, blockIndex, idx);
+                }
+            });
+        }, 100);
+    }
+}
+
+// Генерация формы редактирования блока
+function generateBlockEditForm(stepId, blockIndex, block) {
+    const showTitle = block.show_title !== false;
+    let formHtml = `
+        <div class="wizard-block-edit-field">
+            <label>Заголовок блока</label>
+            <input type="text" id="block-title-${stepId}-${blockIndex}-${Date.now()}" value="${(block.title || '').replace(/"/g, '&quot;')}" placeholder="Заголовок блока...">
+        </div>
+        <div class="wizard-block-edit-field" style="display:flex;align-items:center;gap:8px;">
+            <input type="checkbox" id="block-show-title-${stepId}-${blockIndex}-${Date.now()}" ${showTitle ? 'checked' : ''}>
+            <label for="block-show-title-${stepId}-${blockIndex}-${Date.now()}" style="margin:0;">Показывать заголовок на странице</label>
+        </div>
+    `;
+    
+    switch (block.type) {
+        case 'text':
+            const contentId = `block-content-${stepId}-${blockIndex}-${Date.now()}`;
+            formHtml += `
+                <div class="wizard-block-edit-field">
+                    <label>Содержимое</label>
+                    <div class="html-editor-container">
+                        <div class="html-editor-toolbar">
+                            <div class="toolbar-group">
+                                <button type="button" onclick="formatText('${contentId}', 'bold')" class="html-btn" title="Жирный текст"><b>B</b></button>
+                                <button type="button" onclick="formatText('${contentId}', 'italic')" class="html-btn" title="Курсив"><i>I</i></button>
+                                <button type="button" onclick="formatText('${contentId}', 'underline')" class="html-btn" title="Подчеркнутый"><u>U</u></button>
+                                <button type="button" onclick="formatText('${contentId}', 'strike')" class="html-btn" title="Зачеркнутый"><s>S</s></button>
+                            </div>
+                            <div class="toolbar-group">
+                                <button type="button" onclick="formatText('${contentId}', 'h1')" class="html-btn" title="Заголовок 1">H1</button>
+                                <button type="button" onclick="formatText('${contentId}', 'h2')" class="html-btn" title="Заголовок 2">H2</button>
+                                <button type="button" onclick="formatText('${contentId}', 'h3')" class="html-btn" title="Заголовок 3">H3</button>
+                                <button type="button" onclick="formatText('${contentId}', 'h4')" class="html-btn" title="Заголовок 4">H4</button>
+                                <button type="button" onclick="formatText('${contentId}', 'p')" class="html-btn" title="Параграф">P</button>
+                            </div>
+                            <div class="toolbar-group">
+                                <button type="button" onclick="formatText('${contentId}', 'ul')" class="html-btn" title="Маркированный список">UL</button>
+                                <button type="button" onclick="formatText('${contentId}', 'ol')" class="html-btn" title="Нумерованный список">OL</button>
+                                <button type="button" onclick="formatText('${contentId}', 'li')" class="html-btn" title="Элемент списка">LI</button>
+                            </div>
+                            <div class="toolbar-group">
+                                <button type="button" onclick="formatText('${contentId}', 'align-left')" class="html-btn" title="Выровнять по левому краю">⬅</button>
+                                <button type="button" onclick="formatText('${contentId}', 'align-center')" class="html-btn" title="Выровнять по центру">⬌</button>
+                                <button type="button" onclick="formatText('${contentId}', 'align-right')" class="html-btn" title="Выровнять по правому краю">➡</button>
+                                <button type="button" onclick="formatText('${contentId}', 'align-justify')" class="html-btn" title="Выровнять по ширине">⬌⬌</button>
+                            </div>
+                            <div class="toolbar-group">
+                                <button type="button" onclick="formatText('${contentId}', 'br')" class="html-btn" title="Перенос строки">BR</button>
+                                <button type="button" onclick="formatText('${contentId}', 'hr')" class="html-btn" title="Горизонтальная линия">HR</button>
+                            </div>
+                            <div class="toolbar-group">
+                                <button type="button" onclick="insertLink('${contentId}')" class="html-btn" title="Вставить ссылку">🔗</button>
+                                <button type="button" onclick="showEmojiPicker('${contentId}', event)" class="html-btn" title="Вставить смайл">😊</button>
+                            </div>
+                            <div class="toolbar-group">
+                                <button type="button" onclick="formatText('${contentId}', 'code')" class="html-btn" title="Код"><code>Code</code></button>
+                                <button type="button" onclick="formatText('${contentId}', 'mark')" class="html-btn" title="Выделить текст"><mark>Mark</mark></button>
+                                <button type="button" onclick="formatText('${contentId}', 'small')" class="html-btn" title="Маленький текст"><small>Small</small></button>
+                            </div>
+                        </div>
+                        <textarea id="${contentId}" name="${contentId}" class="wizard-input html-editor-textarea" rows="12" placeholder="Введите текст...">${block.content || ''}</textarea>
+                        <div class="html-preview" id="${contentId}_preview" style="margin-top: 10px; padding: 10px; border: 1px solid #e5e7eb; border-radius: 4px; background: #f9fafb;">
+                            <h4 style="margin: 0 0 10px 0; font-size: 12px; color: #6b7280;">Предварительный просмотр:</h4>
+                            <div class="html-preview-content" style="min-height: 50px; color: #374151;"></div>
+                        </div>
+                    </div>
+                </div>
+                <div class="wizard-block-edit-field">
+                    <label>Фотографии (необязательно)</label>
+                    <div class="block-photos-upload-container" id="block-photos-upload-${stepId}-${blockIndex}">
+                        <div class="file-drop-zone block-photos-drop-zone" 
+                             ondrop="handleBlockPhotosDrop(event, '${stepId}', ${blockIndex})" 
+                             ondragover="handleBlockPhotosDragOver(event)" 
+                             ondragleave="handleBlockPhotosDragLeave(event)">
+                            <div class="drop-zone-content">
+                                <i class="icon">🖼️</i>
+                                <p>Перетащите изображения сюда или <span class="file-select-link" onclick="document.getElementById('block-photos-input-${stepId}-${blockIndex}').click()">выберите изображения</span></p>
+                                <p class="file-types">Поддерживаются: JPG, JPEG, PNG, GIF</p>
+                            </div>
+                        </div>
+                        <input type="file" id="block-photos-input-${stepId}-${blockIndex}" accept="image/*" multiple style="display: none;" onchange="handleBlockPhotosSelect(event, '${stepId}', ${blockIndex})">
+                        <div class="block-photos-list" id="block-photos-list-${stepId}-${blockIndex}"></div>
+                    </div>
+                </div>
+                <div class="wizard-block-edit-field">
+                    <label>Документы (необязательно)</label>
+                    <div class="block-documents-upload-container" id="block-documents-upload-${stepId}-${blockIndex}">
+                        <div class="file-drop-zone block-documents-drop-zone" 
+                             ondrop="handleBlockDocumentsDrop(event, '${stepId}', ${blockIndex})" 
+                             ondragover="handleBlockDocumentsDragOver(event)" 
+                             ondragleave="handleBlockDocumentsDragLeave(event)">
+                            <div class="drop-zone-content">
+                                <i class="icon">📄</i>
+                                <p>Перетащите документы сюда или <span class="file-select-link" onclick="document.getElementById('block-documents-input-${stepId}-${blockIndex}').click()">выберите документы</span></p>
+                                <p class="file-types">Поддерживаются: PDF, DOC, DOCX, TXT, XLS, XLSX, PPT, PPTX, RTF, ODT, ODS, ODP, SIG, ZIP, RAR, 7Z, TAR, GZ и другие</p>
+                            </div>
+                        </div>
+                        <input type="file" id="block-documents-input-${stepId}-${blockIndex}" accept=".pdf,.doc,.docx,.txt,.xls,.xlsx,.ppt,.pptx,.rtf,.odt,.ods,.odp,.zip,.rar,.7z,.tar,.gz,.tgz" multiple style="display: none;" onchange="handleBlockDocumentsSelect(event, '${stepId}', ${blockIndex})">
+                        <div class="block-documents-list" id="block-documents-list-${stepId}-${blockIndex}"></div>
+                    </div>
+                </div>
+            `;
+            break;
+        case 'table':
+            formHtml += generateTableEditForm(stepId, blockIndex, block);
+            break;
+        case 'list':
+            formHtml += generateListEditForm(stepId, blockIndex, block);
+            break;
+        case 'photos':
+            formHtml += generatePhotosEditForm(stepId, blockIndex, block);
+            break;
+        case 'documents':
+            formHtml += generateDocumentsEditForm(stepId, blockIndex, block);
+            break;
+        case 'person':
+            formHtml += generatePersonEditForm(stepId, blockIndex, block);
+            break;
+        case 'dishes':
+            formHtml += generateDishesEditForm(stepId, blockIndex, block);
+            break;
+        case 'daily-dish':
+            formHtml += generateDailyDishEditForm(stepId, blockIndex, block);
+            break;
+    }
+    
+    return formHtml;
+}
+
+// Редактор фотографий (список URL строками)
+function generatePhotosEditForm(stepId, blockIndex, block){
+    const photos = Array.isArray(block.photos) ? block.photos : [];
+    return `
+        <div class="wizard-block-edit-field">
+            <label>Фотографии</label>
+            <div class="block-photos-upload-container" id="block-photos-upload-${stepId}-${blockIndex}">
+                <div class="file-drop-zone block-photos-drop-zone" 
+                     ondrop="handleBlockPhotosDrop(event, '${stepId}', ${blockIndex})" 
+                     ondragover="handleBlockPhotosDragOver(event)" 
+                     ondragleave="handleBlockPhotosDragLeave(event)">
+                    <div class="drop-zone-content">
+                        <i class="icon">🖼️</i>
+                        <p>Перетащите изображения сюда или <span class="file-select-link" onclick="document.getElementById('block-photos-input-${stepId}-${blockIndex}').click()">выберите изображения</span></p>
+                        <p class="file-types">Поддерживаются: JPG, JPEG, PNG, GIF</p>
+                    </div>
+                </div>
+                <input type="file" id="block-photos-input-${stepId}-${blockIndex}" accept="image/*" multiple style="display: none;" onchange="handleBlockPhotosSelect(event, '${stepId}', ${blockIndex})">
+                <div class="block-photos-list" id="block-photos-list-${stepId}-${blockIndex}"></div>
+            </div>
+            <div style="margin-top: 12px;">
+                <label style="margin-bottom: 6px;">Ссылки на изображения (по одной в строке)</label>
+                <textarea id="block-photos-${stepId}-${blockIndex}" rows="6" placeholder="https://...\nhttps://...">${photos.join('\n')}</textarea>
+                <small>Можно вставлять ссылки вручную. При загрузке изображений ссылки подставятся автоматически.</small>
+            </div>
+        </div>
+    `;
+}
+
+// Редактор документов с загрузкой файлов
+function generateDocumentsEditForm(stepId, blockIndex, block){
+    return `
+        <div class="wizard-block-edit-field">
+            <label>Документы</label>
+            <div class="block-documents-upload-container" id="block-documents-upload-${stepId}-${blockIndex}">
+                <div class="file-drop-zone block-documents-drop-zone" 
+                     ondrop="handleBlockDocumentsDrop(event, '${stepId}', ${blockIndex})" 
+                     ondragover="handleBlockDocumentsDragOver(event)" 
+                     ondragleave="handleBlockDocumentsDragLeave(event)">
+                    <div class="drop-zone-content">
+                        <i class="icon">📄</i>
+                        <p>Перетащите документы сюда или <span class="file-select-link" onclick="document.getElementById('block-documents-input-${stepId}-${blockIndex}').click()">выберите документы</span></p>
+                        <p class="file-types">Поддерживаются: PDF, DOC, DOCX, TXT, XLS, XLSX, PPT, PPTX, RTF, ODT, ODS, ODP, ZIP, RAR, 7Z, TAR, GZ и другие</p>
+                    </div>
+                </div>
+                <input type="file" id="block-documents-input-${stepId}-${blockIndex}" accept=".pdf,.doc,.docx,.txt,.xls,.xlsx,.ppt,.pptx,.rtf,.odt,.ods,.odp,.zip,.rar,.7z,.tar,.gz,.tgz" multiple style="display: none;" onchange="handleBlockDocumentsSelect(event, '${stepId}', ${blockIndex})">
+                <div class="block-documents-list" id="block-documents-list-${stepId}-${blockIndex}"></div>
+            </div>
+        </div>
+    `;
+}
+
+// Редактор персон (упрощенный список карточек)
+function generatePersonEditForm(stepId, blockIndex, block){
+    const persons = Array.isArray(block.persons) ? block.persons : [];
+    const listId = `person-list-${stepId}-${blockIndex}`;
+    const renderItem = (p, idx) => `
+        <div class="person-item" data-index="${idx}" style="display:flex; gap:12px; align-items:flex-start; border:1px solid #e5e7eb; border-radius:8px; padding:12px; margin-bottom:10px;">
+            <div style="flex:1; display:grid; grid-template-columns: 1fr 1fr; gap:10px;">
+                <div class="wizard-block-edit-field" style="grid-column: span 2;">
+                    <label>ФИО</label>
+                    <input type="text" value="${p.name || ''}" placeholder="Иванов Иван Иванович" class="person-name">
+                </div>
+                <div class="wizard-block-edit-field">
+                    <label>Должность</label>
+                    <input type="text" value="${p.position || ''}" placeholder="Должность" class="person-position">
+                </div>
+                <div class="wizard-block-edit-field" style="grid-column: span 2;">
+                    <label>Фото (URL, загрузка или перетаскивание)</label>
+                    <div class="person-photo-upload-container" id="person-photo-upload-${stepId}-${blockIndex}-${idx}" ondrop="handlePersonPhotoDrop(event, '${stepId}', ${blockIndex}, ${idx})" ondragover="handleDragOver(event)" ondragleave="handleDragLeave(event)">
+                        <div class="file-drop-zone person-photo-drop-zone" style="min-height: 120px; display: flex; flex-direction: column; align-items: center; justify-content: center; border: 2px dashed #cbd5e1; border-radius: 8px; background: #f8fafc; padding: 16px; cursor: pointer; transition: all 0.2s ease;" onclick="document.getElementById('person-photo-file-${stepId}-${blockIndex}-${idx}').click()">
+                            <i class="icon" style="font-size: 2rem; margin-bottom: 8px;">🖼️</i>
+                            <p style="margin: 0; color: #64748b; font-size: 0.9rem; text-align: center;">Перетащите изображение сюда<br>или <span style="color: #3b82f6; text-decoration: underline;">выберите файл</span></p>
+                            <p style="margin: 4px 0 0 0; color: #94a3b8; font-size: 0.75rem;">JPG, PNG, GIF</p>
+                        </div>
+                        <div style="display: flex; gap: 8px; align-items: flex-start; margin-top: 8px;">
+                            <input type="text" value="${p.photo || ''}" placeholder="https://..." class="person-photo" id="person-photo-${stepId}-${blockIndex}-${idx}" style="flex: 1; padding: 8px; border: 1px solid #e5e7eb; border-radius: 6px;" oninput="updatePersonPhotoPreview('${stepId}', ${blockIndex}, ${idx})">
+                            <button type="button" onclick="removePersonPhoto('${stepId}', ${blockIndex}, ${idx})" style="display: ${p.photo ? 'block' : 'none'}; background: #dc3545; color: white; border: none; border-radius: 6px; padding: 8px 12px; cursor: pointer; font-size: 14px; white-space: nowrap;" id="person-photo-remove-${stepId}-${blockIndex}-${idx}" title="Удалить фото">Удалить</button>
+                        </div>
+                        <input type="file" id="person-photo-file-${stepId}-${blockIndex}-${idx}" accept="image/*" style="display: none;" onchange="handlePersonPhotoSelect(event, '${stepId}', ${blockIndex}, ${idx})">
+                        <div class="person-photo-preview" id="person-photo-preview-${stepId}-${blockIndex}-${idx}" style="margin-top: 8px; ${p.photo ? '' : 'display: none;'}">
+                            ${p.photo ? `<img src="${p.photo}" alt="Фото" style="max-width: 200px; max-height: 150px; border-radius: 8px; border: 1px solid #e5e7eb; object-fit: cover;" onerror="this.style.display='none'">` : ''}
+                        </div>
+                    </div>
+                </div>
+                <div class="wizard-block-edit-field" style="grid-column: span 2;">
+                    <label>Описание</label>
+                    <textarea rows="4" placeholder="Краткая информация" class="person-description">${p.description || ''}</textarea>
+                </div>
+            </div>
+            <button type="button" class="btn btn-danger btn-sm" onclick="removePerson('${stepId}', ${blockIndex}, ${idx})">Удалить</button>
+        </div>`;
+    const itemsHtml = persons.map(renderItem).join('');
+    return `
+        <div class="wizard-block-edit-field">
+            <div style="display:flex; justify-content:space-between; align-items:center;">
+                <label>Персоны</label>
+                <button type="button" class="btn btn-sm btn-primary" onclick="addPerson('${stepId}', ${blockIndex})">➕ Добавить</button>
+            </div>
+            <div id="${listId}">${itemsHtml}</div>
+        </div>
+    `;
+}
+
+function addPerson(stepId, blockIndex){
+    const list = document.getElementById(`person-list-${stepId}-${blockIndex}`);
+    if(!list) return;
+    const idx = list.children.length;
+    const newPersonHtml = generatePersonEditForm(stepId, blockIndex, { persons: [{}] });
+    const match = newPersonHtml.match(/<div id="person-list-[^>]+>([\s\S]*)<\/div>/);
+    if (match && match[1]) {
+        list.insertAdjacentHTML('beforeend', match[1]);
+        // Обновляем превью для нового элемента
+        setTimeout(() => {
+            const photoInput = document.getElementById(`person-photo-${stepId}-${blockIndex}-${idx}`);
+            if (photoInput && photoInput.value) {
+                updatePersonPhotoPreview(stepId, blockIndex, idx);
+            }
+        }, 100);
+    }
+}
+
+function removePerson(stepId, blockIndex, idx){
+    const list = document.getElementById(`person-list-${stepId}-${blockIndex}`);
+    if(!list) return;
+    const item = list.querySelector(`.person-item[data-index="${idx}"]`);
+    if(item) item.remove();
+}
+
+// Редактор блюд
+function generateDishesEditForm(stepId, blockIndex, block){
+    const dishes = Array.isArray(block.dishes) ? block.dishes : [];
+    const listId = `dishes-list-${stepId}-${blockIndex}`;
+    const renderItem = (d, idx) => {
+        const today = new Date().toISOString().split('T')[0];
+        return `
+        <div class="dish-item" data-index="${idx}" style="border:1px solid #e5e7eb; border-radius:8px; padding:12px; margin-bottom:10px;">
+            <div style="display:grid; grid-template-columns: 1fr 1fr; gap:10px;">
+                <div class="wizard-block-edit-field" style="grid-column: span 2;">
+                    <label>Заголовок блюда</label>
+                    <input type="text" value="${d.title || ''}" placeholder="Блюдо на 07.11.2025" class="dish-title">
+                </div>
+                <div class="wizard-block-edit-field">
+                    <label>Дата блюда</label>
+                    <input type="date" value="${d.date || today}" class="dish-date">
+                </div>
+                <div class="wizard-block-edit-field">
+                    <label>Дата публикации</label>
+                    <input type="date" value="${d.publish_date || today}" class="dish-publish-date">
+                </div>
+                <div class="wizard-block-edit-field" style="grid-column: span 2;">
+                    <label>Фотография</label>
+                    <div style="display: flex; gap: 10px; align-items: flex-end;">
+                        <input type="text" value="${d.photo || ''}" placeholder="/static/uploads/nutrition/dishes/dish-2025-11-07.jpg" class="dish-photo" style="flex: 1;">
+                        <button type="button" class="btn btn-sm btn-secondary" onclick="uploadDishPhoto('${stepId}', ${blockIndex}, ${idx})" style="white-space: nowrap;">📤 Загрузить</button>
+                    </div>
+                    <div class="dish-photo-preview" id="dish-photo-preview-${stepId}-${blockIndex}-${idx}" style="margin-top: 10px; ${d.photo ? '' : 'display: none;'}">
+                        ${d.photo ? `<img src="${d.photo}" alt="Фото блюда" style="max-width: 200px; max-height: 150px; border-radius: 8px; border: 1px solid #e5e7eb;">` : ''}
+                    </div>
+                    <input type="file" id="dish-photo-input-${stepId}-${blockIndex}-${idx}" accept="image/*" style="display: none;" onchange="handleDishPhotoSelect(event, '${stepId}', ${blockIndex}, ${idx})">
+                </div>
+            </div>
+            <button type="button" class="btn btn-danger btn-sm" onclick="removeDish('${stepId}', ${blockIndex}, ${idx})" style="margin-top:10px;">Удалить</button>
+        </div>`;
+    };
+    const itemsHtml = dishes.map(renderItem).join('');
+    return `
+        <div class="wizard-block-edit-field">
+            <div style="display:flex; justify-content:space-between; align-items:center;">
+                <label>Блюда</label>
+                <button type="button" class="btn btn-sm btn-primary" onclick="addDish('${stepId}', ${blockIndex})">➕ Добавить блюдо</button>
+            </div>
+            <div id="${listId}">${itemsHtml}</div>
+        </div>
+    `;
+}
+
+function addDish(stepId, blockIndex){
+    const list = document.getElementById(`dishes-list-${stepId}-${blockIndex}`);
+    if(!list) return;
+    const idx = list.children.length;
+    const today = new Date().toISOString().split('T')[0];
+    const newDishHtml = `
+        <div class="dish-item" data-index="${idx}" style="border:1px solid #e5e7eb; border-radius:8px; padding:12px; margin-bottom:10px;">
+            <div style="display:grid; grid-template-columns: 1fr 1fr; gap:10px;">
+                <div class="wizard-block-edit-field" style="grid-column: span 2;">
+                    <label>Заголовок блюда</label>
+                    <input type="text" value="" placeholder="Блюдо на 07.11.2025" class="dish-title">
+                </div>
+                <div class="wizard-block-edit-field">
+                    <label>Дата блюда</label>
+                    <input type="date" value="${today}" class="dish-date">
+                </div>
+                <div class="wizard-block-edit-field">
+                    <label>Дата публикации</label>
+                    <input type="date" value="${today}" class="dish-publish-date">
+                </div>
+                <div class="wizard-block-edit-field" style="grid-column: span 2;">
+                    <label>Фотография</label>
+                    <div style="display: flex; gap: 10px; align-items: flex-end;">
+                        <input type="text" value="" placeholder="/static/uploads/nutrition/dishes/dish-2025-11-07.jpg" class="dish-photo" style="flex: 1;">
+                        <button type="button" class="btn btn-sm btn-secondary" onclick="uploadDishPhoto('${stepId}', ${blockIndex}, ${idx})" style="white-space: nowrap;">📤 Загрузить</button>
+                    </div>
+                    <div class="dish-photo-preview" id="dish-photo-preview-${stepId}-${blockIndex}-${idx}" style="margin-top: 10px; display: none;">
+                    </div>
+                    <input type="file" id="dish-photo-input-${stepId}-${blockIndex}-${idx}" accept="image/*" style="display: none;" onchange="handleDishPhotoSelect(event, '${stepId}', ${blockIndex}, ${idx})">
+                </div>
+            </div>
+            <button type="button" class="btn btn-danger btn-sm" onclick="removeDish('${stepId}', ${blockIndex}, ${idx})" style="margin-top:10px;">Удалить</button>
+        </div>`;
+    list.insertAdjacentHTML('beforeend', newDishHtml);
+}
+
+function removeDish(stepId, blockIndex, idx){
+    const list = document.getElementById(`dishes-list-${stepId}-${blockIndex}`);
+    if(!list) return;
+    const item = list.querySelector(`.dish-item[data-index="${idx}"]`);
+    if(item) item.remove();
+}
+
+// Функции для загрузки фотографий блюд
+function uploadDishPhoto(stepId, blockIndex, dishIndex) {
+    const input = document.getElementById(`dish-photo-input-${stepId}-${blockIndex}-${dishIndex}`);
+    if (input) {
+        input.click();
+    }
+}
+
+function updatePersonPhotoPreview(stepId, blockIndex, personIndex) {
+    const photoInput = document.getElementById(`person-photo-${stepId}-${blockIndex}-${personIndex}`);
+    const preview = document.getElementById(`person-photo-preview-${stepId}-${blockIndex}-${personIndex}`);
+    const removeButton = document.getElementById(`person-photo-remove-${stepId}-${blockIndex}-${personIndex}`);
+    if (photoInput && preview) {
+        const url = photoInput.value.trim();
+        if (url) {
+            preview.innerHTML = `<img src="${url}" alt="Фото" style="max-width: 200px; max-height: 150px; border-radius: 8px; border: 1px solid #e5e7eb; object-fit: cover;" onerror="this.onerror=null; this.src='data:image/svg+xml,%3Csvg%20xmlns%3D%27http%3A//www.w3.org/2000/svg%27%20width%3D%27400%27%20height%3D%27400%27%3E%3Crect%20width%3D%27100%25%27%20height%3D%27100%25%27%20fill%3D%27%23f1f5f9%27/%3E%3Ctext%20x%3D%2750%25%27%20y%3D%2750%25%27%20dominant-baseline%3D%27middle%27%20text-anchor%3D%27middle%27%20fill%3D%27%2394a3b8%27%20font-family%3D%27Arial%27%20font-size%3D%2718%27%3E%D0%A4%D0%BE%D1%82%D0%BE%3C/text%3E%3C/svg%3E';">`;
+            preview.style.display = 'block';
+            if (removeButton) {
+                removeButton.style.display = 'block';
+            }
+        } else {
+            preview.style.display = 'none';
+            preview.innerHTML = '';
+            if (removeButton) {
+                removeButton.style.display = 'none';
+            }
+        }
+    }
+}
+
+function removePersonPhoto(stepId, blockIndex, personIndex) {
+    const photoInput = document.getElementById(`person-photo-${stepId}-${blockIndex}-${personIndex}`);
+    const preview = document.getElementById(`person-photo-preview-${stepId}-${blockIndex}-${personIndex}`);
+    const removeButton = document.getElementById(`person-photo-remove-${stepId}-${blockIndex}-${personIndex}`);
+    const fileInput = document.getElementById(`person-photo-file-${stepId}-${blockIndex}-${personIndex}`);
+    
+    if (photoInput) {
+        photoInput.value = '';
+    }
+    if (preview) {
+        preview.style.display = 'none';
+        preview.innerHTML = '';
+    }
+    if (removeButton) {
+        removeButton.style.display = 'none';
+    }
+    if (fileInput) {
+        fileInput.value = '';
+    }
+}
+
+async function handlePersonPhotoSelect(event, stepId, blockIndex, personIndex) {
+    const file = event.target.files[0];
+    if (!file || !file.type.startsWith('image/')) {
+        return;
+    }
+    await uploadPersonPhoto(file, stepId, blockIndex, personIndex);
+    event.target.value = '';
+}
+
+async function handlePersonPhotoDrop(event, stepId, blockIndex, personIndex) {
+    event.preventDefault();
+    event.stopPropagation();
+    
+    const dropZone = event.currentTarget;
+    dropZone.classList.remove('drag-over');
+    
+    const files = event.dataTransfer.files;
+    if (files && files.length > 0) {
+        const file = files[0];
+        if (file.type.startsWith('image/')) {
+            await uploadPersonPhoto(file, stepId, blockIndex, personIndex);
+        }
+    }
+}
+
+async function uploadPersonPhoto(file, stepId, blockIndex, personIndex) {
+    if (!file || !file.type.startsWith('image/')) {
+        return;
+    }
+    
+    // Определяем, какой мастер заполнения активен
+    const isSidebar = window.IS_SIDEBAR_WIZARD && window.sidebarWizardManager;
+    let step;
+    if (isSidebar) {
+        step = window.sidebarWizardManager.wizardSteps.find(s => s.id === stepId);
+    } else {
+        step = wizardSteps.find(s => s.id === stepId);
+    }
+    
+    if (!step) {
+        console.error('Step not found:', stepId);
+        return;
+    }
+    
+    const section = step.endpoint || 'general';
+    const uploadEndpoint = isSidebar ? '/sidebar/upload_file' : '/info/upload_file';
+    
+    const formData = new FormData();
+    formData.append('file', file);
+    formData.append('section', section);
+    formData.append('field_name', `block_${blockIndex}_person_${personIndex}_photo`);
+    
+    try {
+        const res = await fetch(uploadEndpoint, { method: 'POST', body: formData });
+        const result = await res.json();
+        if (result.success) {
+            // Обновляем поле фотографии
+            const photoInput = document.getElementById(`person-photo-${stepId}-${blockIndex}-${personIndex}`);
+            if (photoInput) {
+                photoInput.value = result.url;
+                // Обновляем превью
+                const preview = document.getElementById(`person-photo-preview-${stepId}-${blockIndex}-${personIndex}`);
+                const removeButton = document.getElementById(`person-photo-remove-${stepId}-${blockIndex}-${personIndex}`);
+                if (preview) {
+                    preview.innerHTML = `<img src="${result.url}" alt="Фото" style="max-width: 200px; max-height: 150px; border-radius: 8px; border: 1px solid #e5e7eb; object-fit: cover;" onerror="this.style.display='none'">`;
+                    preview.style.display = 'block';
+                }
+                if (removeButton) {
+                    removeButton.style.display = 'block';
+                }
+            }
+        } else {
+            if (window.errorHandler && window.errorHandler.showError) {
+                window.errorHandler.showError(result.error || 'Ошибка загрузки изображения', result.instructions || []);
+            }
+        }
+    } catch (e) {
+        console.error('Ошибка загрузки изображения:', e);
+        if (window.errorHandler && window.errorHandler.showError) {
+            window.errorHandler.showError('Ошибка загрузки изображения', ['Проверьте подключение к интернету', 'Попробуйте снова']);
+        }
+    }
+}
+
+async function handleDishPhotoSelect(event, stepId, blockIndex, dishIndex) {
+    const file = event.target.files[0];
+    if (!file || !file.type.startsWith('image/')) {
+        return;
+    }
+    
+    // Определяем, какой мастер заполнения активен
+    const isSidebar = window.IS_SIDEBAR_WIZARD && window.sidebarWizardManager;
+    let step;
+    if (isSidebar) {
+        step = window.sidebarWizardManager.wizardSteps.find(s => s.id === stepId);
+    } else {
+        step = wizardSteps.find(s => s.id === stepId);
+    }
+    
+    if (!step) {
+        console.error('Step not found:', stepId);
+        return;
+    }
+    
+    const section = step.endpoint || 'general';
+    const uploadEndpoint = isSidebar ? '/sidebar/upload_file' : '/info/upload_file';
+    
+    const formData = new FormData();
+    formData.append('file', file);
+    formData.append('section', section);
+    formData.append('field_name', `block_${blockIndex}_dish_${dishIndex}_photo`);
+    
+    try {
+        const res = await fetch(uploadEndpoint, { method: 'POST', body: formData });
+        const result = await res.json();
+        if (result.success) {
+            // Обновляем поле фотографии
+            const dishItem = document.querySelector(`#dishes-list-${stepId}-${blockIndex} .dish-item[data-index="${dishIndex}"]`);
+            if (dishItem) {
+                const photoInput = dishItem.querySelector('.dish-photo');
+                if (photoInput) {
+                    photoInput.value = result.url;
+                    // Обновляем превью
+                    const preview = dishItem.querySelector(`#dish-photo-preview-${stepId}-${blockIndex}-${dishIndex}`);
+                    if (preview) {
+                        preview.innerHTML = `<img src="${result.url}" alt="Фото блюда" style="max-width: 200px; max-height: 150px; border-radius: 8px; border: 1px solid #e5e7eb;">`;
+                        preview.style.display = 'block';
+                    }
+                }
+            }
+        } else {
+            if (window.errorHandler && window.errorHandler.showError) {
+                window.errorHandler.showError(result.error || 'Ошибка загрузки изображения', result.instructions || []);
+            }
+        }
+    } catch (e) {
+        console.error('Ошибка загрузки изображения:', e);
+        if (window.errorHandler && window.errorHandler.showError) {
+            window.errorHandler.showError('Ошибка загрузки изображения', ['Проверьте подключение к интернету', 'Попробуйте снова']);
+        }
+    }
+    
+    // Очищаем input для возможности повторной загрузки того же файла
+    event.target.value = '';
+}
+
+function initializeDishesPhotos(stepId, blockIndex, block) {
+    const dishes = Array.isArray(block.dishes) ? block.dishes : [];
+    dishes.forEach((dish, idx) => {
+        if (dish.photo) {
+            const preview = document.getElementById(`dish-photo-preview-${stepId}-${blockIndex}-${idx}`);
+            if (preview) {
+                preview.innerHTML = `<img src="${dish.photo}" alt="Фото блюда" style="max-width: 200px; max-height: 150px; border-radius: 8px; border: 1px solid #e5e7eb;">`;
+                preview.style.display = 'block';
+            }
+        }
+    });
+}
+
+// Редактор блюда на день
+function generateDailyDishEditForm(stepId, blockIndex, block) {
+    const dish = block.dish || {
+        title: '',
+        date: new Date().toISOString().split('T')[0],
+        publish_date: new Date().toISOString().split('T')[0],
+        photo: ''
+    };
+    
+    // Преобразуем дату из формата DD.MM.YYYY в YYYY-MM-DD для input type="date"
+    let dateValue = dish.date || new Date().toISOString().split('T')[0];
+    if (dateValue.includes('.')) {
+        const parts = dateValue.split('.');
+        if (parts.length === 3) {
+            dateValue = `${parts[2]}-${parts[1]}-${parts[0]}`;
+        }
+    }
+    
+    let publishDateValue = dish.publish_date || new Date().toISOString().split('T')[0];
+    if (publishDateValue.includes('.')) {
+        const parts = publishDateValue.split('.');
+        if (parts.length === 3) {
+            publishDateValue = `${parts[2]}-${parts[1]}-${parts[0]}`;
+        }
+    }
+    
+    return `
+        <div class="wizard-block-edit-field">
+            <label>Заголовок блюда</label>
+            <input type="text" id="daily-dish-title-${stepId}-${blockIndex}" value="${dish.title || ''}" placeholder="Блюдо на день" class="wizard-input">
+        </div>
+        <div class="wizard-block-edit-field">
+            <label>Дата блюда</label>
+            <input type="date" id="daily-dish-date-${stepId}-${blockIndex}" value="${dateValue}" class="wizard-input">
+        </div>
+        <div class="wizard-block-edit-field">
+            <label>Дата публикации</label>
+            <input type="date" id="daily-dish-publish-date-${stepId}-${blockIndex}" value="${publishDateValue}" class="wizard-input">
+        </div>
+        <div class="wizard-block-edit-field">
+            <label>Фотография</label>
+            <div style="display: flex; gap: 10px; align-items: flex-end;">
+                <input type="text" id="daily-dish-photo-${stepId}-${blockIndex}" value="${dish.photo || ''}" placeholder="/static/uploads/nutrition/dishes/dish.jpg" class="wizard-input" style="flex: 1;">
+                <button type="button" class="btn btn-sm btn-secondary" onclick="uploadDailyDishPhoto('${stepId}', ${blockIndex})" style="white-space: nowrap;">📤 Загрузить</button>
+            </div>
+            <div class="dish-photo-preview" id="daily-dish-photo-preview-${stepId}-${blockIndex}" style="margin-top: 10px; ${dish.photo ? '' : 'display: none;'}">
+                ${dish.photo ? `<img src="${dish.photo}" alt="Фото блюда" style="max-width: 200px; max-height: 150px; border-radius: 8px; border: 1px solid #e5e7eb;">` : ''}
+            </div>
+            <input type="file" id="daily-dish-photo-input-${stepId}-${blockIndex}" accept="image/*" style="display: none;" onchange="handleDailyDishPhotoSelect(event, '${stepId}', ${blockIndex})">
+        </div>
+    `;
+}
+
+async function handleDailyDishPhotoSelect(event, stepId, blockIndex) {
+    const file = event.target.files[0];
+    if (!file || !file.type.startsWith('image/')) {
+        return;
+    }
+    
+    const isSidebar = window.IS_SIDEBAR_WIZARD && window.sidebarWizardManager;
+    let step;
+    if (isSidebar) {
+        step = window.sidebarWizardManager.wizardSteps.find(s => s.id === stepId);
+    } else {
+        step = wizardSteps.find(s => s.id === stepId);
+    }
+    
+    if (!step) {
+        console.error('Step not found:', stepId);
+        return;
+    }
+    
+    const section = step.endpoint || 'general';
+    const uploadEndpoint = isSidebar ? '/sidebar/upload_file' : '/info/upload_file';
+    
+    const formData = new FormData();
+    formData.append('file', file);
+    formData.append('section', section);
+    formData.append('field_name', `block_${blockIndex}_daily_dish_photo`);
+    
+    try {
+        const res = await fetch(uploadEndpoint, { method: 'POST', body: formData });
+        const result = await res.json();
+        if (result.success) {
+            const photoInput = document.getElementById(`daily-dish-photo-${stepId}-${blockIndex}`);
+            if (photoInput) {
+                photoInput.value = result.url;
+            }
+            const preview = document.getElementById(`daily-dish-photo-preview-${stepId}-${blockIndex}`);
+            if (preview) {
+                preview.innerHTML = `<img src="${result.url}" alt="Фото блюда" style="max-width: 200px; max-height: 150px; border-radius: 8px; border: 1px solid #e5e7eb;">`;
+                preview.style.display = 'block';
+            }
+        } else {
+            if (window.errorHandler && window.errorHandler.showError) {
+                window.errorHandler.showError(result.error || 'Ошибка загрузки изображения', result.instructions || []);
+            }
+        }
+    } catch (e) {
+        console.error('Ошибка загрузки изображения:', e);
+        if (window.errorHandler && window.errorHandler.showError) {
+            window.errorHandler.showError('Ошибка загрузки изображения', ['Проверьте подключение к интернету', 'Попробуйте снова']);
+        }
+    }
+    
+    event.target.value = '';
+}
+
+function uploadDailyDishPhoto(stepId, blockIndex) {
+    const input = document.getElementById(`daily-dish-photo-input-${stepId}-${blockIndex}`);
+    if (input) {
+        input.click();
+    }
+}
+
+// Генерация формы редактирования таблицы
+function generateTableEditForm(stepId, blockIndex, block) {
+    const headers = block.headers || [];
+    const rows = block.rows || [];
+    
+    let headersHtml = '';
+    for (let i = 0; i < Math.max(headers.length, 3); i++) {
+        headersHtml += `
+            <div class="table-header-input">
+                <input type="text" id="header-${stepId}-${blockIndex}-${i}" value="${headers[i] || ''}" placeholder="Заголовок ${i + 1}" oninput="updateTablePreview('${stepId}', ${blockIndex})">
+                <button type="button" onclick="removeTableHeader('${stepId}', ${blockIndex}, ${i})" class="btn-remove-header" title="Удалить заголовок">×</button>
+            </div>
+        `;
+    }
+    
+    let rowsHtml = '';
+    for (let i = 0; i < Math.max(rows.length, 2); i++) {
+        const row = rows[i] || [];
+        let cellsHtml = '';
+        for (let j = 0; j < Math.max(row.length, headers.length, 3); j++) {
+            cellsHtml += `
+                <input type="text" id="cell-${stepId}-${blockIndex}-${i}-${j}" value="${row[j] || ''}" placeholder="Ячейка ${i + 1},${j + 1}" oninput="updateTablePreview('${stepId}', ${blockIndex})">
+            `;
+        }
+        rowsHtml += `
+            <div class="table-row-input">
+                <div class="table-row-cells">
+                    ${cellsHtml}
+                </div>
+                <button type="button" onclick="removeTableRow('${stepId}', ${blockIndex}, ${i})" class="btn-remove-row" title="Удалить строку">×</button>
+            </div>
+        `;
+    }
+    
+    return `
+        <div class="table-editor">
+            <div class="table-editor-section">
+                <div class="table-editor-header">
+                    <h4>Заголовки таблицы</h4>
+                    <button type="button" onclick="addTableHeader('${stepId}', ${blockIndex})" class="btn btn-sm btn-primary">
+                        <i class="icon">➕</i> Добавить заголовок
+                    </button>
+                </div>
+                <div class="table-headers-input" id="headers-${stepId}-${blockIndex}">
+                    ${headersHtml}
+                </div>
+            </div>
+            
+            <div class="table-editor-section">
+                <div class="table-editor-header">
+                    <h4>Строки таблицы</h4>
+                    <button type="button" onclick="addTableRow('${stepId}', ${blockIndex})" class="btn btn-sm btn-primary">
+                        <i class="icon">➕</i> Добавить строку
+                    </button>
+                </div>
+                <div class="table-rows-input" id="rows-${stepId}-${blockIndex}">
+                    ${rowsHtml}
+                </div>
+            </div>
+            
+            <div class="table-editor-section">
+                <h4>Предпросмотр таблицы</h4>
+                <div class="table-preview-container" id="table-preview-${stepId}-${blockIndex}">
+                    ${generateTablePreview(stepId, blockIndex, block)}
+                </div>
+            </div>
+        </div>
+    `;
+}
+
+// Генерация формы редактирования списка
+function generateListEditForm(stepId, blockIndex, block) {
+    return `
+        <div class="wizard-block-edit-field">
+            <label>Элементы списка (каждый элемент с новой строки)</label>
+            <textarea id="block-items-${stepId}-${blockIndex}-${Date.now()}" rows="6" placeholder="Элемент 1&#10;Элемент 2&#10;...">${block.items ? block.items.join('\n') : ''}</textarea>
+        </div>
+    `;
+}
+
+// Закрытие модального окна редактирования блока
+function closeBlockEditModal() {
+    const modal = document.querySelector('.wizard-block-edit-modal');
+    if (modal) {
+        modal.remove();
+    }
+}
+
+// Добавление заголовка таблицы
+function addTableHeader(stepId, blockIndex) {
+    const headersContainer = document.getElementById(`headers-${stepId}-${blockIndex}`);
+    const rowsContainer = document.getElementById(`rows-${stepId}-${blockIndex}`);
+    const headerCount = headersContainer.children.length;
+    
+    const headerHtml = `
+        <div class="table-header-input">
+            <input type="text" id="header-${stepId}-${blockIndex}-${headerCount}" placeholder="Заголовок ${headerCount + 1}" oninput="updateTablePreview('${stepId}', ${blockIndex})">
+            <button type="button" onclick="removeTableHeader('${stepId}', ${blockIndex}, ${headerCount})" class="btn-remove-header" title="Удалить заголовок">×</button>
+        </div>
+    `;
+    
+    headersContainer.insertAdjacentHTML('beforeend', headerHtml);
+    
+    // Добавляем новую ячейку во все существующие строки
+    if (rowsContainer) {
+        const rowInputs = rowsContainer.querySelectorAll('.table-row-input');
+        rowInputs.forEach((rowInput, rowIndex) => {
+            const cellsContainer = rowInput.querySelector('.table-row-cells');
+            if (cellsContainer) {
+                const cellHtml = `
+                    <input type="text" id="cell-${stepId}-${blockIndex}-${rowIndex}-${headerCount}" placeholder="Ячейка ${rowIndex + 1},${headerCount + 1}" oninput="updateTablePreview('${stepId}', ${blockIndex})">
+                `;
+                cellsContainer.insertAdjacentHTML('beforeend', cellHtml);
+            }
+        });
+    }
+    
+    updateTablePreview(stepId, blockIndex);
+}
+
+// Удаление заголовка таблицы
+function removeTableHeader(stepId, blockIndex, headerIndex) {
+    const headerElement = document.getElementById(`header-${stepId}-${blockIndex}-${headerIndex}`);
+    const rowsContainer = document.getElementById(`rows-${stepId}-${blockIndex}`);
+    
+    if (headerElement) {
+        headerElement.parentElement.remove();
+        
+        // Удаляем соответствующую ячейку из всех строк
+        if (rowsContainer) {
+            const rowInputs = rowsContainer.querySelectorAll('.table-row-input');
+            rowInputs.forEach((rowInput, rowIndex) => {
+                const cellsContainer = rowInput.querySelector('.table-row-cells');
+                if (cellsContainer) {
+                    // Находим ячейку по точному ID
+                    const cellToRemove = document.getElementById(`cell-${stepId}-${blockIndex}-${rowIndex}-${headerIndex}`);
+                    if (cellToRemove) {
+                        cellToRemove.remove();
+                    } else {
+                        // Если не найдена по ID, удаляем по индексу в массиве
+                        const cellInputs = Array.from(cellsContainer.querySelectorAll('input'));
+                        if (cellInputs[headerIndex]) {
+                            cellInputs[headerIndex].remove();
+                        }
+                    }
+                }
+            });
+        }
+        
+        // Обновляем индексы оставшихся заголовков и ячеек
+        const headersContainer = document.getElementById(`headers-${stepId}-${blockIndex}`);
+        if (headersContainer) {
+            const headerInputs = headersContainer.querySelectorAll('input');
+            headerInputs.forEach((input, newIndex) => {
+                const oldId = input.id;
+                const newId = `header-${stepId}-${blockIndex}-${newIndex}`;
+                if (oldId !== newId) {
+                    input.id = newId;
+                    const removeBtn = input.parentElement.querySelector('button');
+                    if (removeBtn) {
+                        removeBtn.setAttribute('onclick', `removeTableHeader('${stepId}', ${blockIndex}, ${newIndex})`);
+                    }
+                }
+            });
+        }
+        
+        // Обновляем индексы ячеек в строках
+        if (rowsContainer) {
+            const rowInputs = rowsContainer.querySelectorAll('.table-row-input');
+            rowInputs.forEach((rowInput, rowIndex) => {
+                const cellsContainer = rowInput.querySelector('.table-row-cells');
+                if (cellsContainer) {
+                    const cellInputs = cellsContainer.querySelectorAll('input');
+                    cellInputs.forEach((cellInput, cellIndex) => {
+                        const oldId = cellInput.id;
+                        const newId = `cell-${stepId}-${blockIndex}-${rowIndex}-${cellIndex}`;
+                        if (oldId !== newId) {
+                            cellInput.id = newId;
+                            const placeholderMatch = cellInput.placeholder.match(/Ячейка \d+,(\d+)/);
+                            if (placeholderMatch) {
+                                cellInput.placeholder = `Ячейка ${rowIndex + 1},${cellIndex + 1}`;
+                            }
+                        }
+                    });
+                }
+            });
+        }
+        
+        updateTablePreview(stepId, blockIndex);
+    }
+}
+
+// Добавление строки таблицы
+function addTableRow(stepId, blockIndex) {
+    const rowsContainer = document.getElementById(`rows-${stepId}-${blockIndex}`);
+    const headersContainer = document.getElementById(`headers-${stepId}-${blockIndex}`);
+    const rowCount = rowsContainer.children.length;
+    const headerCount = headersContainer.children.length;
+    
+    let cellsHtml = '';
+    for (let j = 0; j < Math.max(headerCount, 3); j++) {
+        cellsHtml += `
+            <input type="text" id="cell-${stepId}-${blockIndex}-${rowCount}-${j}" placeholder="Ячейка ${rowCount + 1},${j + 1}" oninput="updateTablePreview('${stepId}', ${blockIndex})">
+        `;
+    }
+    
+    const rowHtml = `
+        <div class="table-row-input">
+            <div class="table-row-cells">
+                ${cellsHtml}
+            </div>
+            <button type="button" onclick="removeTableRow('${stepId}', ${blockIndex}, ${rowCount})" class="btn-remove-row" title="Удалить строку">×</button>
+        </div>
+    `;
+    
+    rowsContainer.insertAdjacentHTML('beforeend', rowHtml);
+    updateTablePreview(stepId, blockIndex);
+}
+
+// Удаление строки таблицы
+function removeTableRow(stepId, blockIndex, rowIndex) {
+    const rowElement = document.querySelector(`#rows-${stepId}-${blockIndex} .table-row-input:nth-child(${rowIndex + 1})`);
+    if (rowElement) {
+        rowElement.remove();
+        updateTablePreview(stepId, blockIndex);
+    }
+}
+
+// Обновление предпросмотра таблицы
+function updateTablePreview(stepId, blockIndex) {
+    const previewContainer = document.getElementById(`table-preview-${stepId}-${blockIndex}`);
+    if (!previewContainer) return;
+    
+    // Собираем заголовки
+    const headers = [];
+    const headersContainer = document.getElementById(`headers-${stepId}-${blockIndex}`);
+    if (headersContainer) {
+        const headerInputs = headersContainer.querySelectorAll('input');
+        headerInputs.forEach(input => {
+            if (input.value.trim()) {
+                headers.push(input.value.trim());
+            }
+        });
+    }
+    
+    // Собираем строки
+    const rows = [];
+    const rowsContainer = document.getElementById(`rows-${stepId}-${blockIndex}`);
+    if (rowsContainer) {
+        const rowInputs = rowsContainer.querySelectorAll('.table-row-input');
+        rowInputs.forEach(rowInput => {
+            const cellInputs = rowInput.querySelectorAll('.table-row-cells input');
+            const row = [];
+            cellInputs.forEach(cellInput => {
+                if (cellInput.value.trim()) {
+                    row.push(cellInput.value.trim());
+                }
+            });
+            if (row.length > 0) {
+                rows.push(row);
+            }
+        });
+    }
+    
+    // Генерируем HTML таблицы
+    let tableHtml = '<div class="table-preview-table">';
+    
+    if (headers.length > 0) {
+        tableHtml += '<div class="table-preview-header">';
+        headers.forEach(header => {
+            tableHtml += `<div class="table-preview-cell table-preview-header-cell">${header}</div>`;
+        });
+        tableHtml += '</div>';
+    }
+    
+    if (rows.length > 0) {
+        rows.forEach(row => {
+            tableHtml += '<div class="table-preview-row">';
+            for (let i = 0; i < Math.max(headers.length, row.length); i++) {
+                const cellValue = row[i] || '';
+                tableHtml += `<div class="table-preview-cell table-preview-data-cell">${cellValue}</div>`;
+            }
+            tableHtml += '</div>';
+        });
+    }
+    
+    if (headers.length === 0 && rows.length === 0) {
+        tableHtml += '<div class="table-preview-empty">Таблица пуста. Добавьте заголовки и строки.</div>';
+    }
+    
+    tableHtml += '</div>';
+    previewContainer.innerHTML = tableHtml;
+}
+
+// Генерация предпросмотра таблицы для блока
+function generateTablePreview(stepId, blockIndex, block) {
+    const headers = block.headers || [];
+    const rows = block.rows || [];
+    
+    let tableHtml = '<div class="table-preview-table">';
+    
+    if (headers.length > 0) {
+        tableHtml += '<div class="table-preview-header">';
+        headers.forEach(header => {
+            tableHtml += `<div class="table-preview-cell table-preview-header-cell">${header}</div>`;
+        });
+        tableHtml += '</div>';
+    }
+    
+    if (rows.length > 0) {
+        rows.forEach(row => {
+            tableHtml += '<div class="table-preview-row">';
+            for (let i = 0; i < Math.max(headers.length, row.length); i++) {
+                const cellValue = row[i] || '';
+                tableHtml += `<div class="table-preview-cell table-preview-data-cell">${cellValue}</div>`;
+            }
+            tableHtml += '</div>';
+        });
+    }
+    
+    if (headers.length === 0 && rows.length === 0) {
+        tableHtml += '<div class="table-preview-empty">Таблица пуста. Добавьте заголовки и строки.</div>';
+    }
+    
+    tableHtml += '</div>';
+    return tableHtml;
+}
+
+// Сохранение редактирования блока
+function saveBlockEdit(stepId, blockIndex) {
+    // Проверяем, активен ли sidebar wizard
+    let stepData, updateDisplay;
+    if (window.IS_SIDEBAR_WIZARD && window.sidebarWizardManager) {
+        stepData = window.sidebarWizardManager.wizardData[stepId];
+        updateDisplay = () => window.sidebarWizardManager.renderCurrentStep();
+    } else {
+        stepData = wizardData[stepId];
+        updateDisplay = () => {
+            const step = wizardSteps.find(s => s.id === stepId);
+            loadStepContent(step);
+        };
+    }
+    
+    if (!stepData || !stepData.content_blocks || !stepData.content_blocks[blockIndex]) {
+        console.error('Block not found for saving:', stepId, blockIndex);
+        return;
+    }
+    
+    const block = stepData.content_blocks[blockIndex];
+    // saveBlockEdit вызван
+    
+    const titleInput = document.querySelector(`input[id*="block-title-${stepId}-${blockIndex}"]`);
+    if (titleInput) block.title = titleInput.value;
+    const showTitleCheckbox = document.querySelector(`input[id*="block-show-title-${stepId}-${blockIndex}"]`);
+    block.show_title = showTitleCheckbox ? showTitleCheckbox.checked : true;
+    
+    // Сохраняем содержимое в зависимости от типа
+    switch (block.type) {
+        case 'text': {
+            const contentInput = document.querySelector(`textarea[id*="block-content-${stepId}-${blockIndex}"]`);
+            if (contentInput) {
+                block.content = contentInput.value;
+                // Содержимое сохранено
+            } else {
+                console.error('Content input not found');
+            }
+            // Сохраняем фотографии из списка
+            const photosList = document.getElementById(`block-photos-list-${stepId}-${blockIndex}`);
+            if (photosList) {
+                const photoItems = photosList.querySelectorAll('.block-photo-item');
+                const photos = [];
+                photoItems.forEach(item => {
+                    const photoUrl = item.dataset.photoUrl;
+                    if (photoUrl) {
+                        photos.push(photoUrl);
+                    }
+                });
+                block.photos = photos;
+            } else if (!block.photos) {
+                block.photos = [];
+            }
+            // Сохраняем документы из списка
+            const documentsList = document.getElementById(`block-documents-list-${stepId}-${blockIndex}`);
+            if (documentsList) {
+                const documentItems = documentsList.querySelectorAll('.block-document-item');
+                const documents = [];
+                documentItems.forEach(item => {
+                    const docUrl = item.dataset.docUrl;
+                    const docName = item.dataset.docName || '';
+                    if (docUrl) {
+                        // Всегда сохраняем документы как объекты с url и name для сохранения оригинального имени
+                        documents.push({ url: docUrl, name: docName || docUrl.split('/').pop() || 'Документ' });
+                    }
+                });
+                block.documents = documents;
+            } else if (!block.documents) {
+                block.documents = [];
+            }
+            break;
+        }
+        case 'table':
+            // Собираем заголовки
+            const headers = [];
+            const headersContainer = document.querySelector(`div[id*="headers-${stepId}-${blockIndex}"]`);
+            if (headersContainer) {
+                const headerInputs = headersContainer.querySelectorAll('input');
+                headerInputs.forEach(input => {
+                    if (input.value.trim()) {
+                        headers.push(input.value.trim());
+                    }
+                });
+            }
+            block.headers = headers;
+            // Заголовки сохранены
+            
+            // Собираем строки
+            const rows = [];
+            const rowsContainer = document.querySelector(`div[id*="rows-${stepId}-${blockIndex}"]`);
+            if (rowsContainer) {
+                const rowInputs = rowsContainer.querySelectorAll('.table-row-input');
+                rowInputs.forEach(rowInput => {
+                    const cellInputs = rowInput.querySelectorAll('.table-row-cells input');
+                    const row = [];
+                    cellInputs.forEach(cellInput => {
+                        if (cellInput.value.trim()) {
+                            row.push(cellInput.value.trim());
+                        }
+                    });
+                    if (row.length > 0) {
+                        rows.push(row);
+                    }
+                });
+            }
+            block.rows = rows;
+            // Строки сохранены
+            break;
+        case 'list':
+            const itemsInput = document.querySelector(`textarea[id*="block-items-${stepId}-${blockIndex}"]`);
+            if (itemsInput) {
+                const itemsText = itemsInput.value;
+                block.items = itemsText ? itemsText.split('\n').filter(item => item.trim()) : [];
+                // Элементы сохранены
+            } else {
+                console.error('Items input not found');
+            }
+            break;
+        case 'photos':
+            // Предпочитаем список превью (если он есть), иначе textarea со ссылками
+            const photosList = document.getElementById(`block-photos-list-${stepId}-${blockIndex}`);
+            if (photosList) {
+                const photoItems = photosList.querySelectorAll('.block-photo-item');
+                const photos = [];
+                photoItems.forEach(item => {
+                    const photoUrl = item.dataset.photoUrl;
+                    if (photoUrl) photos.push(photoUrl);
+                });
+                block.photos = photos;
+            } else {
+                const photosInput = document.getElementById(`block-photos-${stepId}-${blockIndex}`);
+                if (photosInput) {
+                    const lines = photosInput.value.split('\n').map(s => s.trim()).filter(Boolean);
+                    block.photos = lines;
+                }
+            }
+            break;
+        case 'documents': {
+            // Сохраняем документы из списка
+            const documentsList = document.getElementById(`block-documents-list-${stepId}-${blockIndex}`);
+            if (documentsList) {
+                const documentItems = documentsList.querySelectorAll('.block-document-item');
+                const documents = [];
+                documentItems.forEach(item => {
+                    const docUrl = item.dataset.docUrl;
+                    const docName = item.dataset.docName;
+                    if (docUrl) {
+                        documents.push({
+                            url: docUrl,
+                            name: docName || docUrl.split('/').pop() || 'Документ'
+                        });
+                    }
+                });
+                block.documents = documents;
+            } else if (!block.documents) {
+                block.documents = [];
+            }
+            break;
+        }
+        case 'person':
+            const listEl = document.getElementById(`person-list-${stepId}-${blockIndex}`);
+            if (listEl) {
+                const persons = [];
+                listEl.querySelectorAll('.person-item').forEach(item => {
+                    persons.push({
+                        name: item.querySelector('.person-name')?.value || '',
+                        position: item.querySelector('.person-position')?.value || '',
+                        photo: item.querySelector('.person-photo')?.value || '',
+                        description: item.querySelector('.person-description')?.value || ''
+                    });
+                });
+                block.persons = persons;
+                // Персоны сохранены
+            }
+            break;
+        case 'dishes':
+            const dishesListEl = document.getElementById(`dishes-list-${stepId}-${blockIndex}`);
+            if (dishesListEl) {
+                const dishes = [];
+                dishesListEl.querySelectorAll('.dish-item').forEach(item => {
+                    const dateValue = item.querySelector('.dish-date')?.value || '';
+                    const publishDateValue = item.querySelector('.dish-publish-date')?.value || '';
+                    // Преобразуем дату из формата YYYY-MM-DD в DD.MM.YYYY для отображения
+                    let dateDisplay = dateValue;
+                    if (dateValue) {
+                        const dateParts = dateValue.split('-');
+                        if (dateParts.length === 3) {
+                            dateDisplay = `${dateParts[2]}.${dateParts[1]}.${dateParts[0]}`;
+                        }
+                    }
+                    dishes.push({
+                        title: item.querySelector('.dish-title')?.value || '',
+                        date: dateDisplay,
+                        publish_date: publishDateValue,
+                        photo: item.querySelector('.dish-photo')?.value || ''
+                    });
+                });
+                block.dishes = dishes;
+                // Блюда сохранены
+            }
+            break;
+        case 'daily-dish':
+            const titleInput = document.getElementById(`daily-dish-title-${stepId}-${blockIndex}`);
+            const dateInput = document.getElementById(`daily-dish-date-${stepId}-${blockIndex}`);
+            const publishDateInput = document.getElementById(`daily-dish-publish-date-${stepId}-${blockIndex}`);
+            const photoInput = document.getElementById(`daily-dish-photo-${stepId}-${blockIndex}`);
+            
+            let dateDisplay = dateInput?.value || '';
+            if (dateDisplay) {
+                const dateParts = dateDisplay.split('-');
+                if (dateParts.length === 3) {
+                    dateDisplay = `${dateParts[2]}.${dateParts[1]}.${dateParts[0]}`;
+                }
+            }
+            
+            block.dish = {
+                title: titleInput?.value || '',
+                date: dateDisplay,
+                publish_date: publishDateInput?.value || '',
+                photo: photoInput?.value || ''
+            };
+            // Блюдо на день сохранено
+            break;
+    }
+    
+    // Синхронизируем с глобальными структурами для sidebar wizard
+    if (window.IS_SIDEBAR_WIZARD && window.sidebarWizardManager) {
+        // Убеждаемся, что данные блока обновлены в wizardData
+        if (!window.sidebarWizardManager.wizardData[stepId]) {
+            window.sidebarWizardManager.wizardData[stepId] = {};
+        }
+        if (!window.sidebarWizardManager.wizardData[stepId].content_blocks) {
+            window.sidebarWizardManager.wizardData[stepId].content_blocks = [];
+        }
+        // Обновляем блок в массиве
+        if (window.sidebarWizardManager.wizardData[stepId].content_blocks[blockIndex]) {
+            window.sidebarWizardManager.wizardData[stepId].content_blocks[blockIndex] = block;
+        }
+        window.wizardData = window.sidebarWizardManager.wizardData;
+    }
+    
+    // Блок успешно сохранен
+    closeBlockEditModal();
+    
+    // Обновляем отображение
+    updateDisplay();
+}
+
+// Обработчики для загрузки фотографий в текстовых блоках
+function handleBlockPhotosDragOver(event) {
+    event.preventDefault();
+    event.stopPropagation();
+    event.currentTarget.classList.add('drag-over');
+}
+
+function handleBlockPhotosDragLeave(event) {
+    event.preventDefault();
+    event.stopPropagation();
+    event.currentTarget.classList.remove('drag-over');
+}
+
+async function handleBlockPhotosDrop(event, stepId, blockIndex) {
+    event.preventDefault();
+    event.stopPropagation();
+    event.currentTarget.classList.remove('drag-over');
+    
+    const files = Array.from(event.dataTransfer.files || []);
+    if (files.length === 0) return;
+    
+    await uploadBlockPhotos(files, stepId, blockIndex);
+}
+
+async function handleBlockPhotosSelect(event, stepId, blockIndex) {
+    const files = Array.from(event.target.files || []);
+    if (files.length === 0) return;
+    
+    await uploadBlockPhotos(files, stepId, blockIndex);
+    // Очищаем input для возможности повторной загрузки того же файла
+    event.target.value = '';
+}
+
+async function uploadBlockPhotos(files, stepId, blockIndex) {
+    // Определяем, какой мастер заполнения активен
+    const isSidebar = window.IS_SIDEBAR_WIZARD && window.sidebarWizardManager;
+    let step;
+    if (isSidebar) {
+        step = window.sidebarWizardManager.wizardSteps.find(s => s.id === stepId);
+    } else {
+        step = wizardSteps.find(s => s.id === stepId);
+    }
+    
+    if (!step) {
+        console.error('Step not found:', stepId);
+        return;
+    }
+    
+    const section = step.endpoint || 'general';
+    const uploadEndpoint = isSidebar ? '/sidebar/upload_file' : '/info/upload_file';
+    
+    const photosList = document.getElementById(`block-photos-list-${stepId}-${blockIndex}`);
+    if (!photosList) return;
+    
+    for (const file of files) {
+        if (!file.type.startsWith('image/')) {
+            continue;
+        }
+        
+        const formData = new FormData();
+        formData.append('file', file);
+        formData.append('section', section);
+        formData.append('field_name', `block_${blockIndex}_photos`);
+        
+        try {
+            const res = await fetch(uploadEndpoint, { method: 'POST', body: formData });
+            const result = await res.json();
+            if (result.success) {
+                addBlockPhotoToList(stepId, blockIndex, result.url, result.original_name || result.filename);
+            } else {
+                if (window.errorHandler && window.errorHandler.showError) {
+                    window.errorHandler.showError(result.error || 'Ошибка загрузки изображения', result.instructions || []);
+                }
+            }
+        } catch (e) {
+            console.error('Ошибка загрузки изображения:', e);
+            if (window.errorHandler && window.errorHandler.showError) {
+                window.errorHandler.showError('Ошибка загрузки изображения', ['Проверьте подключение к интернету', 'Попробуйте снова']);
+            }
+        }
+    }
+}
+
+function addBlockPhotoToList(stepId, blockIndex, photoUrl, photoName) {
+    const photosList = document.getElementById(`block-photos-list-${stepId}-${blockIndex}`);
+    if (!photosList) return;
+    
+    const photoItem = document.createElement('div');
+    photoItem.className = 'block-photo-item';
+    photoItem.dataset.photoUrl = photoUrl;
+    photoItem.innerHTML = `
+        <div class="block-photo-preview">
+            <img src="${photoUrl}" alt="${photoName}" onerror="this.onerror=null; this.src='data:image/svg+xml,%3Csvg%20xmlns%3D%27http%3A//www.w3.org/2000/svg%27%20width%3D%27400%27%20height%3D%27400%27%3E%3Crect%20width%3D%27100%25%27%20height%3D%27100%25%27%20fill%3D%27%23f1f5f9%27/%3E%3Ctext%20x%3D%2750%25%27%20y%3D%2750%25%27%20dominant-baseline%3D%27middle%27%20text-anchor%3D%27middle%27%20fill%3D%27%2394a3b8%27%20font-family%3D%27Arial%27%20font-size%3D%2718%27%3E%D0%A4%D0%BE%D1%82%D0%BE%3C/text%3E%3C/svg%3E';">
+        </div>
+        <div class="block-photo-info">
+            <span class="block-photo-name">${photoName}</span>
+        </div>
+        <button type="button" class="block-photo-remove" onclick="removeBlockPhoto('${stepId}', ${blockIndex}, '${photoUrl}')">✕</button>
+    `;
+    photosList.appendChild(photoItem);
+
+    // Если есть textarea со ссылками (например, в блоке типа "photos") — синхронизируем
+    try {
+        const textarea = document.getElementById(`block-photos-${stepId}-${blockIndex}`);
+        if (textarea) {
+            const urls = Array.from(photosList.querySelectorAll('.block-photo-item'))
+                .map(el => el.dataset.photoUrl)
+                .filter(Boolean);
+            textarea.value = urls.join('\n');
+        }
+    } catch (e) {}
+}
+
+function removeBlockPhoto(stepId, blockIndex, photoUrl) {
+    const photosList = document.getElementById(`block-photos-list-${stepId}-${blockIndex}`);
+    if (!photosList) return;
+    
+    const photoItem = photosList.querySelector(`[data-photo-url="${photoUrl}"]`);
+    if (photoItem) {
+        photoItem.remove();
+    }
+
+    // Синхронизация textarea, если есть
+    try {
+        const textarea = document.getElementById(`block-photos-${stepId}-${blockIndex}`);
+        if (textarea) {
+            const urls = Array.from(photosList.querySelectorAll('.block-photo-item'))
+                .map(el => el.dataset.photoUrl)
+                .filter(Boolean);
+            textarea.value = urls.join('\n');
+        }
+    } catch (e) {}
+}
+
+// Инициализация фотографий при открытии модального окна редактирования
+function initializeBlockPhotos(stepId, blockIndex, block) {
+    const photosList = document.getElementById(`block-photos-list-${stepId}-${blockIndex}`);
+    if (!photosList) return;
+    
+    // Очищаем список
+    photosList.innerHTML = '';
+    
+    // Добавляем существующие фотографии
+    const photos = Array.isArray(block.photos) ? block.photos : [];
+    photos.forEach(photoUrl => {
+        if (photoUrl) {
+            const photoName = photoUrl.split('/').pop() || 'Изображение';
+            addBlockPhotoToList(stepId, blockIndex, photoUrl, photoName);
+        }
+    });
+
+    // Инициализируем textarea, если есть (для блока типа "photos")
+    try {
+        const textarea = document.getElementById(`block-photos-${stepId}-${blockIndex}`);
+        if (textarea) {
+            textarea.value = photos.filter(Boolean).join('\n');
+        }
+    } catch (e) {}
+}
+
+// Обработчики для загрузки документов в блоках документов
+function handleBlockDocumentsDragOver(event) {
+    event.preventDefault();
+    event.stopPropagation();
+    event.currentTarget.classList.add('drag-over');
+}
+
+function handleBlockDocumentsDragLeave(event) {
+    event.preventDefault();
+    event.stopPropagation();
+    event.currentTarget.classList.remove('drag-over');
+}
+
+async function handleBlockDocumentsDrop(event, stepId, blockIndex) {
+    event.preventDefault();
+    event.stopPropagation();
+    event.currentTarget.classList.remove('drag-over');
+    
+    const files = Array.from(event.dataTransfer.files || []);
+    if (files.length === 0) return;
+    
+    await uploadBlockDocuments(files, stepId, blockIndex);
+}
+
+async function handleBlockDocumentsSelect(event, stepId, blockIndex) {
+    const files = Array.from(event.target.files || []);
+    if (files.length === 0) return;
+    
+    await uploadBlockDocuments(files, stepId, blockIndex);
+    // Очищаем input для возможности повторной загрузки того же файла
+    event.target.value = '';
+}
+
+async function uploadBlockDocuments(files, stepId, blockIndex) {
+    // Определяем, какой мастер заполнения активен
+    const isSidebar = window.IS_SIDEBAR_WIZARD && window.sidebarWizardManager;
+    let step;
+    if (isSidebar) {
+        step = window.sidebarWizardManager.wizardSteps.find(s => s.id === stepId);
+    } else {
+        step = wizardSteps.find(s => s.id === stepId);
+    }
+    
+    if (!step) {
+        console.error('Step not found:', stepId);
+        return;
+    }
+    
+    const section = step.endpoint || 'general';
+    const uploadEndpoint = isSidebar ? '/sidebar/upload_file' : '/info/upload_file';
+    
+    const documentsList = document.getElementById(`block-documents-list-${stepId}-${blockIndex}`);
+    if (!documentsList) return;
+    
+    for (const file of files) {
+        const allowedTypes = ['.pdf', '.doc', '.docx', '.txt', '.xls', '.xlsx', '.ppt', '.pptx', '.rtf', '.odt', '.ods', '.odp', '.sig', '.zip', '.rar', '.7z', '.tar', '.gz', '.tgz'];
+        const fileExtension = '.' + file.name.split('.').pop().toLowerCase();
+        if (!allowedTypes.includes(fileExtension)) {
+            if (window.errorHandler && window.errorHandler.showError) {
+                window.errorHandler.showError(`Неподдерживаемый тип файла: ${fileExtension}`, ['Поддерживаются: PDF, DOC, DOCX, TXT, XLS, XLSX, PPT, PPTX, RTF, ODT, ODS, ODP, SIG']);
+            }
+            continue;
+        }
+        
+        const formData = new FormData();
+        formData.append('file', file);
+        formData.append('section', section);
+        formData.append('field_name', `block_${blockIndex}_documents`);
+        
+        try {
+            const res = await uploadFileRequest(uploadEndpoint, formData);
+            const result = await res.json();
+            if (result.success) {
+                addBlockDocumentToList(stepId, blockIndex, result.url, result.original_name || result.filename);
+            } else {
+                if (window.errorHandler && window.errorHandler.showError) {
+                    window.errorHandler.showError(result.error || 'Ошибка загрузки документа', result.instructions || []);
+                }
+            }
+        } catch (e) {
+            console.error('Ошибка загрузки документа:', e);
+            if (window.errorHandler && window.errorHandler.showError) {
+                window.errorHandler.showError('Ошибка загрузки документа', ['Проверьте подключение к интернету', 'Попробуйте снова']);
+            }
+        }
+    }
+}
+
+function addBlockDocumentToList(stepId, blockIndex, docUrl, docName) {
+    const documentsList = document.getElementById(`block-documents-list-${stepId}-${blockIndex}`);
+    if (!documentsList) return;
+    
+    const docItem = document.createElement('div');
+    docItem.className = 'block-document-item';
+    docItem.dataset.docUrl = docUrl;
+    docItem.dataset.docName = docName;
+    docItem.innerHTML = `
+        <div class="block-document-info">
+            <span class="block-document-icon">📄</span>
+            <span class="block-document-name">${docName}</span>
+        </div>
+        <button type="button" class="block-document-remove" onclick="removeBlockDocument('${stepId}', ${blockIndex}, '${docUrl}')">✕</button>
+    `;
+    documentsList.appendChild(docItem);
+}
+
+async function removeBlockDocument(stepId, blockIndex, docUrl) {
+    const documentsList = document.getElementById(`block-documents-list-${stepId}-${blockIndex}`);
+    if (!documentsList) return;
+    
+    const docItem = documentsList.querySelector(`[data-doc-url="${docUrl}"]`);
+    if (!docItem) return;
+    
+    // Определяем, какой мастер заполнения активен
+    const isSidebar = window.IS_SIDEBAR_WIZARD && window.sidebarWizardManager;
+    let step;
+    if (isSidebar) {
+        step = window.sidebarWizardManager.wizardSteps.find(s => s.id === stepId);
+    } else {
+        step = wizardSteps.find(s => s.id === stepId);
+    }
+    
+    if (!step) {
+        console.error('Step not found:', stepId);
+        return;
+    }
+    
+    const section = step.endpoint || 'general';
+    const deleteEndpoint = isSidebar ? '/sidebar/delete_file' : '/info/delete_file';
+    
+    // Извлекаем имя файла из URL
+    const filename = docUrl.split('/').pop();
+    
+    try {
+        // Удаляем файл с сервера
+        const res = await fetch(deleteEndpoint, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                filename: filename,
+                section: section,
+                field_name: `block_${blockIndex}_documents`
+            })
+        });
+        
+        const result = await res.json();
+        
+        if (result.success) {
+            // Удаляем элемент из DOM
+            docItem.remove();
+            
+            // Показываем уведомление об успешном удалении
+            if (window.errorHandler && window.errorHandler.showSuccess) {
+                window.errorHandler.showSuccess('Документ удален');
+            }
+        } else {
+            // Даже если файл не найден на сервере, удаляем из интерфейса
+            docItem.remove();
+            
+            if (window.errorHandler && window.errorHandler.showError) {
+                window.errorHandler.showError(result.error || 'Ошибка удаления документа', result.instructions || []);
+            }
+        }
+    } catch (e) {
+        console.error('Ошибка удаления документа:', e);
+        
+        // Удаляем из интерфейса даже при ошибке
+        docItem.remove();
+        
+        if (window.errorHandler && window.errorHandler.showError) {
+            window.errorHandler.showError('Ошибка удаления документа', ['Проверьте подключение к интернету', 'Попробуйте снова']);
+        }
+    }
+}
+
+// Инициализация документов при открытии модального окна редактирования
+function initializeBlockDocuments(stepId, blockIndex, block) {
+    const documentsList = document.getElementById(`block-documents-list-${stepId}-${blockIndex}`);
+    if (!documentsList) return;
+    
+    // Очищаем список
+    documentsList.innerHTML = '';
+    
+    // Добавляем существующие документы
+    const documents = Array.isArray(block.documents) ? block.documents : [];
+    documents.forEach(doc => {
+        if (doc) {
+            let docUrl, docName;
+            if (typeof doc === 'string') {
+                docUrl = doc;
+                docName = doc.split('/').pop() || 'Документ';
+            } else {
+                docUrl = doc.url || (doc.get && doc.get('url', '')) || '';
+                docName = doc.name || (doc.get && doc.get('name', '')) || docUrl.split('/').pop() || 'Документ';
+            }
+            if (docUrl) {
+                addBlockDocumentToList(stepId, blockIndex, docUrl, docName);
+            }
+        }
+    });
+}
+
+
+
+
+// Сохранение текущего шага
+async function saveCurrentStep() {
+    // saveCurrentStep вызван
+    const step = wizardSteps[currentWizardStep];
+    if (!step) {
+        console.error('Step not found:', currentWizardStep);
+        return;
+    }
+    
+    // Сохранение шага
+    
+    // Сохраняем данные текущего шага
+    await saveCurrentStepData();
+    
+    // Показываем статус сохранения
+    showSaveStatus('saving', 'Сохранение...');
+    
+    // Отправка данных на сервер
+    const formData = new FormData();
+    const dataToSend = {[step.id]: wizardData[step.id]};
+    // Отправка данных
+    formData.append('wizard_data', JSON.stringify(dataToSend));
+    formData.append('save_single', 'true');
+    
+    fetch('/info/wizard_save', {
+        method: 'POST',
+        body: formData,
+        headers: {
+            'X-CSRFToken': document.querySelector('meta[name=csrf-token]')?.getAttribute('content') || ''
+        }
+    })
+    .then(response => {
+        // Статус ответа получен
+        return response.json();
+    })
+    .then(data => {
+        // Данные ответа получены
+        if (data.success) {
+            showSaveStatus('success', 'Шаг сохранен!');
+            // Обновляем статус шага как завершенного
+            updateStepStatus(currentWizardStep, true);
+        } else {
+            console.error('Save failed:', data.error);
+            showSaveStatus('error', 'Ошибка сохранения: ' + data.error);
+        }
+    })
+    .catch(error => {
+        console.error('Fetch error:', error);
+        showSaveStatus('error', 'Ошибка при сохранении');
+    });
+}
+
+// Показ статуса сохранения
+function showSaveStatus(type, message) {
+    const statusElement = document.getElementById('wizard-save-status');
+    if (!statusElement) return;
+    
+    // Убираем предыдущие классы
+    statusElement.className = 'wizard-save-status';
+    
+    // Добавляем новый класс и текст
+    statusElement.classList.add(type);
+    statusElement.textContent = message;
+    
+    // Автоматически скрываем через 3 секунды (кроме ошибок)
+    if (type !== 'error') {
+        setTimeout(() => {
+            statusElement.className = 'wizard-save-status';
+            statusElement.textContent = '';
+        }, 3000);
+    }
+}
+
+// Обновление статуса шага
+function updateStepStatus(stepIndex, completed) {
+    const stepElement = document.querySelector(`.wizard-step:nth-child(${stepIndex + 1})`);
+    if (stepElement) {
+        if (completed) {
+            stepElement.classList.add('completed');
+            stepElement.classList.remove('active');
+        }
+    }
+}
+
+// Сохранение всех данных
+async function wizardSave() {
+    // Сначала очищаем несуществующие файлы
+    await cleanOrphanedFiles();
+    
+    await saveCurrentStepData();
+    
+    // Отправка данных на сервер
+    const formData = new FormData();
+    formData.append('wizard_data', JSON.stringify(wizardData));
+    
+    fetch('/info/wizard_save', {
+        method: 'POST',
+        body: formData,
+        headers: {
+            'X-CSRFToken': document.querySelector('meta[name=csrf-token]')?.getAttribute('content') || ''
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            alert('Все данные успешно сохранены!');
+            closeWizardModal();
+        } else {
+            alert('Ошибка при сохранении: ' + data.error);
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        alert('Ошибка при сохранении данных');
+    });
+}
+
+// Функция для очистки несуществующих файлов
+async function cleanMissingFiles() {
+    if (!confirm('ВЫ УВЕРЕНЫ? Это удалит все ссылки на несуществующие файлы из всех разделов!')) {
+        return;
+    }
+    
+    // Показываем сообщение о начале очистки
+    const statusElement = document.getElementById('wizard-save-status');
+    if (statusElement) {
+        statusElement.innerHTML = '🧹 Очищаем несуществующие файлы...';
+        statusElement.style.color = '#f59e0b';
+    }
+    
+    try {
+        const response = await fetch('/info/clean_missing_files', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            }
+        });
+        
+        const data = await response.json();
+        
+        if (data.success) {
+            if (statusElement) {
+                statusElement.innerHTML = '✅ ' + data.message;
+                statusElement.style.color = '#10b981';
+            }
+            // Перезагружаем текущий шаг для обновления данных
+            await loadWizardData();
+            alert('✅ ' + data.message + '\n\nФайлы очищены! Обновите страницу для проверки.');
+        } else {
+            if (statusElement) {
+                statusElement.innerHTML = '❌ Ошибка очистки: ' + data.error;
+                statusElement.style.color = '#ef4444';
+            }
+            alert('❌ Ошибка очистки: ' + data.error);
+        }
+    } catch (error) {
+        if (statusElement) {
+            statusElement.innerHTML = '❌ Ошибка очистки: ' + error.message;
+            statusElement.style.color = '#ef4444';
+        }
+        alert('❌ Ошибка очистки: ' + error.message);
+    }
+}
+
+// Обработка клика по фону
+document.addEventListener('click', function(e) {
+    if (e.target.classList.contains('wizard-backdrop')) {
+        closeWizardModal();
+    }
+});
+
+// Обработка клавиши Escape
+document.addEventListener('keydown', function(e) {
+    if (e.key === 'Escape' && document.getElementById('wizard-modal').style.display === 'flex') {
+        closeWizardModal();
+    }
+});
+
+
+
+// Экспорт функций в глобальную область видимости
+
+// Убеждаемся, что все функции доступны глобально
+window.openWizard = openWizard;
+window.openWizardModal = openWizardModal;
+window.closeWizardModal = closeWizardModal;
+window.wizardNext = wizardNext;
+window.wizardPrevious = wizardPrevious;
+window.saveCurrentStep = saveCurrentStep;
+window.goToStep = goToStep;
+window.loadStep = loadStep;
+window.loadStepContent = loadStepContent;
+window.setWizardMode = setWizardMode;
+window.addContentBlock = addContentBlock;
+window.showBlockTypeModal = showBlockTypeModal;
+window.closeBlockTypeModal = closeBlockTypeModal;
+window.selectBlockType = selectBlockType;
+window.editContentBlock = editContentBlock;
+window.removeContentBlock = removeContentBlock;
+window.moveBlockUp = moveBlockUp;
+window.moveBlockDown = moveBlockDown;
+window.generateBlocksHtml = generateBlocksHtml;
+// window.toggleInputType = toggleInputType; // Теперь экспортируется из wizard.js
+window.handleDragOver = handleDragOver;
+window.handleDragLeave = handleDragLeave;
+window.handleFileDrop = handleFileDrop;
+window.handleFileSelect = handleFileSelect;
+window.handleFiles = handleFiles;
+window.removeFile = removeFile;
+window.uploadFiles = uploadFiles;
+window.getFileIconFromUrl = getFileIconFromUrl;
+window.handleBlockPhotosDragOver = handleBlockPhotosDragOver;
+window.handleBlockPhotosDragLeave = handleBlockPhotosDragLeave;
+window.handleBlockPhotosDrop = handleBlockPhotosDrop;
+window.handleBlockPhotosSelect = handleBlockPhotosSelect;
+window.uploadBlockPhotos = uploadBlockPhotos;
+window.addBlockPhotoToList = addBlockPhotoToList;
+window.removeBlockPhoto = removeBlockPhoto;
+window.initializeBlockPhotos = initializeBlockPhotos;
+window.handleBlockDocumentsDragOver = handleBlockDocumentsDragOver;
+window.handleBlockDocumentsDragLeave = handleBlockDocumentsDragLeave;
+window.handleBlockDocumentsDrop = handleBlockDocumentsDrop;
+window.handleBlockDocumentsSelect = handleBlockDocumentsSelect;
+window.uploadBlockDocuments = uploadBlockDocuments;
+window.addBlockDocumentToList = addBlockDocumentToList;
+window.removeBlockDocument = removeBlockDocument;
+window.initializeBlockDocuments = initializeBlockDocuments;
+window.addDish = addDish;
+window.removeDish = removeDish;
+window.uploadDishPhoto = uploadDishPhoto;
+window.handleDishPhotoSelect = handleDishPhotoSelect;
+
+// Экспорт переменных в глобальную область видимости
+window.wizardSteps = wizardSteps;
+window.wizardData = wizardData;
+window.currentWizardStep = currentWizardStep;
+
+// Функция для HTML редактора
+function insertHtmlTag(fieldName, tag) {
+    const textarea = document.querySelector(`textarea[name="${fieldName}"]`);
+    if (!textarea) return;
+    
+    const start = textarea.selectionStart;
+    const end = textarea.selectionEnd;
+    const selectedText = textarea.value.substring(start, end);
+    
+    let htmlTag = '';
+    switch(tag) {
+        case 'h3':
+            htmlTag = `<h3>${selectedText || 'Заголовок'}</h3>`;
+            break;
+        case 'p':
+            htmlTag = `<p>${selectedText || 'Текст параграфа'}</p>`;
+            break;
+        case 'br':
+            htmlTag = '<br>';
+            break;
+        case 'strong':
+            htmlTag = `<strong>${selectedText || 'Жирный текст'}</strong>`;
+            break;
+        case 'em':
+            htmlTag = `<em>${selectedText || 'Курсив'}</em>`;
+            break;
+        case 'ul':
+            htmlTag = `<ul>\n<li>${selectedText || 'Элемент списка'}</li>\n</ul>`;
+            break;
+        case 'ol':
+            htmlTag = `<ol>\n<li>${selectedText || 'Элемент списка'}</li>\n</ol>`;
+            break;
+        case 'li':
+            htmlTag = `<li>${selectedText || 'Элемент списка'}</li>`;
+            break;
+        default:
+            return;
+    }
+    
+    // Вставляем HTML тег
+    textarea.value = textarea.value.substring(0, start) + htmlTag + textarea.value.substring(end);
+    
+    // Устанавливаем курсор после вставленного тега
+    const newPosition = start + htmlTag.length;
+    textarea.setSelectionRange(newPosition, newPosition);
+    textarea.focus();
+}
+
+window.insertHtmlTag = insertHtmlTag;
+
+// Функция для форматирования текста в textarea (для текстовых блоков)
+function formatText(textareaId, format) {
+    const textarea = document.getElementById(textareaId);
+    if (!textarea) return;
+    
+    const start = textarea.selectionStart;
+    const end = textarea.selectionEnd;
+    const selectedText = textarea.value.substring(start, end);
+    
+    let formattedText = '';
+    switch(format) {
+        case 'bold':
+            formattedText = `<strong>${selectedText || 'Жирный текст'}</strong>`;
+            break;
+        case 'italic':
+            formattedText = `<em>${selectedText || 'Курсив'}</em>`;
+            break;
+        case 'underline':
+            formattedText = `<u>${selectedText || 'Подчеркнутый текст'}</u>`;
+            break;
+        case 'strike':
+            formattedText = `<s>${selectedText || 'Зачеркнутый текст'}</s>`;
+            break;
+        case 'h1':
+            formattedText = `<h1>${selectedText || 'Заголовок 1'}</h1>`;
+            break;
+        case 'h2':
+            formattedText = `<h2>${selectedText || 'Заголовок 2'}</h2>`;
+            break;
+        case 'h3':
+            formattedText = `<h3>${selectedText || 'Заголовок 3'}</h3>`;
+            break;
+        case 'h4':
+            formattedText = `<h4>${selectedText || 'Заголовок 4'}</h4>`;
+            break;
+        case 'p':
+            formattedText = `<p>${selectedText || 'Текст параграфа'}</p>`;
+            break;
+        case 'ul':
+            formattedText = `<ul>\n<li>${selectedText || 'Элемент списка'}</li>\n</ul>`;
+            break;
+        case 'ol':
+            formattedText = `<ol>\n<li>${selectedText || 'Элемент списка'}</li>\n</ol>`;
+            break;
+        case 'li':
+            formattedText = `<li>${selectedText || 'Элемент списка'}</li>`;
+            break;
+        case 'align-left':
+            formattedText = `<div style="text-align: left;">${selectedText || 'Текст выровнен по левому краю'}</div>`;
+            break;
+        case 'align-center':
+            formattedText = `<div style="text-align: center;">${selectedText || 'Текст выровнен по центру'}</div>`;
+            break;
+        case 'align-right':
+            formattedText = `<div style="text-align: right;">${selectedText || 'Текст выровнен по правому краю'}</div>`;
+            break;
+        case 'align-justify':
+            formattedText = `<div style="text-align: justify;">${selectedText || 'Текст выровнен по ширине'}</div>`;
+            break;
+        case 'br':
+            formattedText = '<br>';
+            break;
+        case 'hr':
+            formattedText = '<hr>';
+            break;
+        case 'code':
+            formattedText = `<code>${selectedText || 'код'}</code>`;
+            break;
+        case 'mark':
+            formattedText = `<mark>${selectedText || 'выделенный текст'}</mark>`;
+            break;
+        case 'small':
+            formattedText = `<small>${selectedText || 'маленький текст'}</small>`;
+            break;
+        default:
+            return;
+    }
+    
+    // Вставляем отформатированный текст
+    textarea.value = textarea.value.substring(0, start) + formattedText + textarea.value.substring(end);
+    
+    // Устанавливаем курсор после вставленного текста
+    const newPosition = start + formattedText.length;
+    textarea.setSelectionRange(newPosition, newPosition);
+    textarea.focus();
+    
+    // Обновляем предварительный просмотр
+    updateBlockContentPreview(textareaId);
+}
+
+// Функция для вставки ссылки
+function insertLink(textareaId) {
+    const textarea = document.getElementById(textareaId);
+    if (!textarea) return;
+    
+    const start = textarea.selectionStart;
+    const end = textarea.selectionEnd;
+    const selectedText = textarea.value.substring(start, end);
+    
+    const url = prompt('Введите URL ссылки:', 'https://');
+    if (!url) return;
+    
+    const linkText = prompt('Введите текст ссылки:', selectedText || 'Ссылка');
+    if (linkText === null) return;
+    
+    const linkHtml = `<a href="${url}" target="_blank" rel="noopener noreferrer">${linkText}</a>`;
+    
+    textarea.value = textarea.value.substring(0, start) + linkHtml + textarea.value.substring(end);
+    
+    const newPosition = start + linkHtml.length;
+    textarea.setSelectionRange(newPosition, newPosition);
+    textarea.focus();
+    
+    updateBlockContentPreview(textareaId);
+}
+
+// Функция для показа палитры смайлов
+function showEmojiPicker(textareaId, event) {
+    const textarea = document.getElementById(textareaId);
+    if (!textarea) return;
+    
+    // Удаляем существующую палитру, если есть
+    const existingPicker = document.getElementById('emoji-picker');
+    if (existingPicker) {
+        existingPicker.remove();
+        return;
+    }
+    
+    // Популярные смайлы
+    const emojis = [
+        '😀', '😃', '😄', '😁', '😆', '😅', '😂', '🤣', '😊', '😇',
+        '🙂', '🙃', '😉', '😌', '😍', '🥰', '😘', '😗', '😙', '😚',
+        '😋', '😛', '😝', '😜', '🤪', '🤨', '🧐', '🤓', '😎', '🤩',
+        '🥳', '😏', '😒', '😞', '😔', '😟', '😕', '🙁', '☹️', '😣',
+        '😖', '😫', '😩', '🥺', '😢', '😭', '😤', '😠', '😡', '🤬',
+        '🤯', '😳', '🥵', '🥶', '😱', '😨', '😰', '😥', '😓', '🤗',
+        '🤔', '🤭', '🤫', '🤥', '😶', '😐', '😑', '😬', '🙄', '😯',
+        '😦', '😧', '😮', '😲', '🥱', '😴', '🤤', '😪', '😵', '🤐',
+        '👍', '👎', '👌', '✌️', '🤞', '🤟', '🤘', '🤙', '👏', '🙌',
+        '👐', '🤲', '🤝', '🙏', '✍️', '💪', '🦾', '🦿', '🦵', '🦶',
+        '❤️', '🧡', '💛', '💚', '💙', '💜', '🖤', '🤍', '🤎', '💔',
+        '❣️', '💕', '💞', '💓', '💗', '💖', '💘', '💝', '💟', '☮️',
+        '✝️', '☪️', '🕉', '☸️', '✡️', '🔯', '🕎', '☯️', '☦️', '🛐',
+        '⛎', '♈', '♉', '♊', '♋', '♌', '♍', '♎', '♏', '♐',
+        '♑', '♒', '♓', '🆔', '⚛️', '🉑', '☢️', '☣️', '📴', '📳',
+        '🈶', '🈚', '🈸', '🈺', '🈷️', '✴️', '🆚', '💮', '🉐', '㊙️',
+        '㊗️', '🈴', '🈵', '🈹', '🈲', '🅰️', '🅱️', '🆎', '🆑', '🅾️',
+        '🆘', '❌', '⭕', '🛑', '⛔', '📛', '🚫', '💯', '💢', '♨️',
+        '🚷', '🚯', '🚳', '🚱', '🔞', '📵', '🚭', '❗', '❕', '❓',
+        '❔', '‼️', '⁉️', '🔅', '🔆', '〽️', '⚠️', '🚸', '🔱', '⚜️',
+        '🔰', '♻️', '✅', '🈯', '💹', '❇️', '✳️', '❎', '🌐', '💠',
+        'Ⓜ️', '🌀', '💤', '🏧', '🚾', '♿', '🅿️', '🈳', '🈂️', '🛂',
+        '🛃', '🛄', '🛅', '🚹', '🚺', '🚼', '🚻', '🚮', '🎦', '📶',
+        '🈁', '🔣', 'ℹ️', '🔤', '🔡', '🔠', '🆖', '🆗', '🆙', '🆒',
+        '🆕', '🆓', '0️⃣', '1️⃣', '2️⃣', '3️⃣', '4️⃣', '5️⃣', '6️⃣', '7️⃣',
+        '8️⃣', '9️⃣', '🔟', '🔢', '#️⃣', '*️⃣', '▶️', '⏸', '⏯', '⏹',
+        '⏺', '⏭', '⏮', '⏩', '⏪', '⏫', '⏬', '◀️', '🔼', '🔽',
+        '➡️', '⬅️', '⬆️', '⬇️', '↗️', '↘️', '↙️', '↖️', '↕️', '↔️',
+        '↪️', '↩️', '⤴️', '⤵️', '🔀', '🔁', '🔂', '🔄', '🔃', '🎵',
+        '🎶', '➕', '➖', '➗', '✖️', '💲', '💱', '™️', '©️', '®️',
+        '〰️', '➰', '➿', '🔚', '🔙', '🔛', '🔜', '🔝', '✔️', '☑️',
+        '🔘', '⚪', '⚫', '🔴', '🔵', '🟠', '🟡', '🟢', '🟣', '🟤',
+        '⬛', '⬜', '🟥', '🟧', '🟨', '🟩', '🟦', '🟪', '🟫', '🔶',
+        '🔷', '🔸', '🔹', '🔺', '🔻', '💠', '🔘', '🔳', '🔲', '◼️',
+        '◻️', '◾', '◽', '▪️', '▫️'
+    ];
+    
+    const picker = document.createElement('div');
+    picker.id = 'emoji-picker';
+    picker.style.cssText = `
+        position: fixed;
+        background: white;
+        border: 2px solid #e5e7eb;
+        border-radius: 12px;
+        padding: 15px;
+        box-shadow: 0 10px 40px rgba(0, 0, 0, 0.15);
+        z-index: 10000;
+        max-width: 400px;
+        max-height: 400px;
+        overflow-y: auto;
+        display: grid;
+        grid-template-columns: repeat(8, 1fr);
+        gap: 8px;
+    `;
+    
+    emojis.forEach(emoji => {
+        const emojiBtn = document.createElement('button');
+        emojiBtn.textContent = emoji;
+        emojiBtn.type = 'button';
+        emojiBtn.style.cssText = `
+            background: #f8f9fa;
+            border: 1px solid #e5e7eb;
+            border-radius: 6px;
+            padding: 8px;
+            cursor: pointer;
+            font-size: 20px;
+            transition: all 0.2s;
+        `;
+        emojiBtn.onmouseover = function() {
+            this.style.background = '#3b82f6';
+            this.style.transform = 'scale(1.2)';
+        };
+        emojiBtn.onmouseout = function() {
+            this.style.background = '#f8f9fa';
+            this.style.transform = 'scale(1)';
+        };
+        emojiBtn.onclick = function() {
+            const start = textarea.selectionStart;
+            const end = textarea.selectionEnd;
+            textarea.value = textarea.value.substring(0, start) + emoji + textarea.value.substring(end);
+            textarea.setSelectionRange(start + emoji.length, start + emoji.length);
+            textarea.focus();
+            updateBlockContentPreview(textareaId);
+            picker.remove();
+        };
+        picker.appendChild(emojiBtn);
+    });
+    
+    // Позиционируем палитру рядом с кнопкой
+    let button = null;
+    if (event && event.currentTarget) {
+        button = event.currentTarget;
+    } else if (window.event && window.event.currentTarget) {
+        button = window.event.currentTarget;
+    } else {
+        button = document.querySelector(`button[onclick*="showEmojiPicker('${textareaId}')"]`);
+    }
+    
+    if (button) {
+        const rect = button.getBoundingClientRect();
+        picker.style.top = (rect.bottom + 5) + 'px';
+        picker.style.left = Math.max(10, rect.left - 100) + 'px';
+    } else {
+        picker.style.top = '50%';
+        picker.style.left = '50%';
+        picker.style.transform = 'translate(-50%, -50%)';
+    }
+    
+    document.body.appendChild(picker);
+    
+    // Закрываем палитру при клике вне её
+    setTimeout(() => {
+        const closePicker = (e) => {
+            if (!picker.contains(e.target) && (!button || e.target !== button)) {
+                picker.remove();
+                document.removeEventListener('click', closePicker);
+            }
+        };
+        document.addEventListener('click', closePicker);
+    }, 100);
+}
+
+// Функция для инициализации HTML-редактора для текстовых блоков
+function initializeBlockContentEditor(textareaId) {
+    const textarea = document.getElementById(textareaId);
+    if (!textarea) return;
+    
+    // Добавляем обработчик для обновления предварительного просмотра
+    textarea.addEventListener('input', function() {
+        updateBlockContentPreview(textareaId);
+    });
+    
+    // Инициализируем предварительный просмотр
+    updateBlockContentPreview(textareaId);
+}
+
+// Функция для обновления предварительного просмотра содержимого блока
+function updateBlockContentPreview(textareaId) {
+    const textarea = document.getElementById(textareaId);
+    const preview = document.getElementById(`${textareaId}_preview`);
+    
+    if (!textarea || !preview) return;
+    
+    const previewContent = preview.querySelector('.html-preview-content');
+    if (!previewContent) return;
+    
+    // Безопасно отображаем HTML
+    previewContent.innerHTML = textarea.value || '<em>Введите текст для предварительного просмотра</em>';
+}
+
+window.formatText = formatText;
+window.insertLink = insertLink;
+window.showEmojiPicker = showEmojiPicker;
+window.initializeBlockContentEditor = initializeBlockContentEditor;
+window.updateBlockContentPreview = updateBlockContentPreview;
+
+// Функция для обновления предварительного просмотра HTML
+function updateHtmlPreview(fieldName) {
+    const textarea = document.querySelector(`textarea[name="${fieldName}"]`);
+    const preview = document.getElementById(`${fieldName}_preview`);
+    
+    if (!textarea || !preview) return;
+    
+    const previewContent = preview.querySelector('.html-preview-content');
+    if (!previewContent) return;
+    
+    // Безопасно отображаем HTML
+    previewContent.innerHTML = textarea.value || '<em>Введите HTML-разметку для предварительного просмотра</em>';
+}
+
+window.updateHtmlPreview = updateHtmlPreview;
+
+// Функция для инициализации HTML редакторов
+function initializeHtmlEditors() {
+    // Добавляем обработчики для всех HTML-редакторов
+    document.querySelectorAll('.html-editor-textarea').forEach(textarea => {
+        textarea.addEventListener('input', function() {
+            updateHtmlPreview(this.name);
+        });
+        
+        // Инициализируем предварительный просмотр
+        updateHtmlPreview(textarea.name);
+    });
+}
+
+window.initializeHtmlEditors = initializeHtmlEditors;
+
+// Экспортируем дополнительные функции в глобальную область
+window.addTableHeader = addTableHeader;
+window.removeTableHeader = removeTableHeader;
+window.addTableRow = addTableRow;
+window.removeTableRow = removeTableRow;
+window.updateTablePreview = updateTablePreview;
+window.saveBlockEdit = saveBlockEdit;
+window.closeBlockEditModal = closeBlockEditModal;
+window.showBlockEditModal = showBlockEditModal;
+window.editContentBlock = editContentBlock;
+window.removeContentBlock = removeContentBlock;
+window.moveBlockUp = moveBlockUp;
+window.moveBlockDown = moveBlockDown;
+window.showBlockTypeModal = showBlockTypeModal;
+window.closeBlockTypeModal = closeBlockTypeModal;
+window.selectBlockType = selectBlockType;
+window.generateBlocksHtml = generateBlocksHtml;
+window.addContentBlock = addContentBlock;
+
+// Инициализация проверяется автоматически при загрузке модулей
@@ -0,0 +1,240 @@
+/**
+ * Загрузка больших файлов по частям (init → chunk → complete).
+ *
+ * uploadFileRequest(url, formData) — замена fetch(url, {method: 'POST', body: formData})
+ * для /info/upload_file и /sidebar/upload_file. Маленькие файлы отправляются как раньше,
+ * большие — частями с контрольной суммой SHA-256 каждой части. При обрыве связи часть
+ * отправляется повторно, а после перезагрузки страницы загрузка продолжается с
+ * недостающих частей. Возвращает Response с тем же JSON, что и upload_file.
+ *
+ * uploadFilesBatch(url, files, fields) — загрузка нескольких файлов пакетами.
+ */
+(function () {
+    'use strict';
+
+    const CHUNKED_THRESHOLD = 16 * 1024 * 1024;
+    const CHUNK_SIZE = 8 * 1024 * 1024;
+    const MAX_RETRIES = 5;
+    const STORAGE_PREFIX = 'chunked-upload:';
+
+    function canUseChunks(file) {
+        return file instanceof Blob
+            && file.size > CHUNKED_THRESHOLD
+            && window.crypto && window.crypto.subtle
+            && typeof window.crypto.subtle.digest === 'function';
+    }
+
+    function toHex(buffer) {
+        return Array.from(new Uint8Array(buffer))
+            .map(b => b.toString(16).padStart(2, '0'))
+            .join('');
+    }
+
+    async function sha256Hex(blob) {
+        const buffer = await blob.arrayBuffer();
+        return toHex(await window.crypto.subtle.digest('SHA-256', buffer));
+    }
+
+    function sleep(ms) {
+        return new Promise(resolve => setTimeout(resolve, ms));
+    }
+
+    function jsonResponse(payload, status) {
+        return new Response(JSON.stringify(payload), {
+            status: status || 200,
+            headers: { 'Content-Type': 'application/json' }
+        });
+    }
+
+    async function postJson(url, payload) {
+        const response = await fetch(url, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(payload || {})
+        });
+        return { status: response.status, data: await response.json() };
+    }
+
+    async function resumeOrInit(base, file, fields) {
+        const key = STORAGE_PREFIX + [base, fields.section, fields.field_name, file.name, file.size, file.lastModified].join('|');
+        const savedId = localStorage.getItem(key);
+        if (savedId) {
+            try {
+                const response = await fetch(`${base}/${savedId}`);
+                if (response.ok) {
+                    const status = await response.json();
+                    if (status.success) {
+                        return { key, status };
+                    }
+                }
+            } catch (e) {
+                // Сохраненная загрузка недоступна — начинаем заново
+            }
+            localStorage.removeItem(key);
+        }
+
+        const init = await postJson(`${base}/init`, {
+            filename: file.name,
+            size: file.size,
+            chunk_size: CHUNK_SIZE,
+            section: fields.section,
+            field_name: fields.field_name
+        });
+        if (!init.data.success) {
+            return { key, error: init };
+        }
+        localStorage.setItem(key, init.data.upload_id);
+        return { key, status: init.data };
+    }
+
+    async function sendChunk(base, status, index, file) {
+        const start = index * status.chunk_size;
+        const chunk = file.slice(start, Math.min(start + status.chunk_size, file.size));
+        const checksum = await sha256Hex(chunk);
+
+        for (let attempt = 1; attempt <= MAX_RETRIES; attempt++) {
+            try {
+                const response = await fetch(`${base}/${status.upload_id}/${index}`, {
+                    method: 'PUT',
+                    headers: { 'X-Chunk-SHA256': checksum, 'Content-Type': 'application/octet-stream' },
+                    body: chunk
+                });
+                if (response.ok) {
+                    return true;
+                }
+                // Ошибки валидации повторять бессмысленно
+                if (response.status >= 400 && response.status < 500 && response.status !== 408 && response.status !== 429) {
+                    return false;
+                }
+            } catch (e) {
+                // Сетевая ошибка — повторяем
+            }
+            await sleep(Math.min(1000 * 2 ** (attempt - 1), 15000));
+        }
+        return false;
+    }
+
+    async function uploadChunked(url, formData, options) {
+        const file = formData.get('file');
+        const base = url.replace(/\/upload_file\/?$/, '/upload_chunked');
+        const fields = {
+            section: formData.get('section'),
+            field_name: formData.get('field_name')
+        };
+        const onProgress = options && typeof options.onProgress === 'function' ? options.onProgress : null;
+
+        const started = await resumeOrInit(base, file, fields);
+        if (started.error) {
+            return jsonResponse(started.error.data, started.error.status);
+        }
+
+        const status = started.status;
+        let done = status.received ? status.received.length : 0;
+        for (const index of status.missing) {
+            const ok = await sendChunk(base, status, index, file);
+            if (!ok) {
+                return jsonResponse({
+                    success: false,
+                    error: 'Не удалось передать часть файла. Повторите загрузку — она продолжится с места обрыва.'
+                }, 503);
+            }
+            done += 1;
+            if (onProgress) {
+                onProgress(done / status.total_chunks);
+            }
+        }
+
+        const complete = await postJson(`${base}/${status.upload_id}/complete`);
+        if (complete.data.success || complete.status !== 409) {
+            localStorage.removeItem(started.key);
+        }
+        return jsonResponse(complete.data, complete.status);
+    }
+
+    const BATCH_MAX_FILES = 20;
+    const BATCH_MAX_BYTES = 48 * 1024 * 1024;
+
+    async function sendBatch(url, batch, fields) {
+        const formData = new FormData();
+        batch.forEach(file => formData.append('files', file));
+        Object.keys(fields).forEach(key => {
+            if (fields[key] !== undefined && fields[key] !== null) {
+                formData.append(key, fields[key]);
+            }
+        });
+        try {
+            const response = await fetch(url.replace(/\/upload_file\/?$/, '/upload_files'), {
+                method: 'POST',
+                body: formData
+            });
+            const data = await response.json();
+            if (Array.isArray(data.results)) {
+                return data.results;
+            }
+            return batch.map(() => ({ success: false, error: data.error || 'Ошибка загрузки файлов' }));
+        } catch (e) {
+            return batch.map(() => ({ success: false, error: 'Ошибка загрузки файлов' }));
+        }
+    }
+
+    /**
+     * Загружает несколько файлов: небольшие — пакетами через /upload_files
+     * (одна транзакция на пакет), большие — по одному через uploadFileRequest.
+     * Возвращает массив { file, result } в исходном порядке.
+     */
+    window.uploadFilesBatch = async function (url, files, fields) {
+        const list = Array.from(files);
+        const results = new Array(list.length);
+        const batches = [];
+        let current = [];
+        let currentBytes = 0;
+
+        const singles = list.map(async (file, index) => {
+            if (file.size > CHUNKED_THRESHOLD) {
+                const formData = new FormData();
+                formData.append('file', file);
+                Object.keys(fields).forEach(key => {
+                    if (fields[key] !== undefined && fields[key] !== null) {
+                        formData.append(key, fields[key]);
+                    }
+                });
+                try {
+                    const response = await window.uploadFileRequest(url, formData);
+                    results[index] = await response.json();
+                } catch (e) {
+                    results[index] = { success: false, error: 'Ошибка загрузки файла' };
+                }
+                return;
+            }
+            if (current.length >= BATCH_MAX_FILES || currentBytes + file.size > BATCH_MAX_BYTES) {
+                batches.push(current);
+                current = [];
+                currentBytes = 0;
+            }
+            current.push({ file, index });
+            currentBytes += file.size;
+        });
+        await Promise.all(singles);
+        if (current.length) {
+            batches.push(current);
+        }
+
+        // Пакеты отправляются последовательно: каждый — одна транзакция записи на сервере
+        for (const batch of batches) {
+            const batchResults = await sendBatch(url, batch.map(item => item.file), fields);
+            batch.forEach((item, i) => {
+                results[item.index] = batchResults[i] || { success: false, error: 'Нет ответа сервера' };
+            });
+        }
+
+        return list.map((file, index) => ({ file, result: results[index] }));
+    };
+
+    window.uploadFileRequest = async function (url, formData, options) {
+        const file = formData.get('file');
+        if (/\/upload_file\/?$/.test(url) && canUseChunks(file)) {
+            return uploadChunked(url, formData, options);
+        }
+        return fetch(url, { method: 'POST', body: formData });
+    };
+})();
@@ -3,6 +3,9 @@ class SidebarWizardManager {
     constructor() {
         this.currentStep = 0;
         this.wizardData = {};
+        // Версии разделов и снимки данных на момент загрузки: сохраняются только изменения
+        this.sectionVersions = {};
+        this.savedSnapshots = {};
         this.wizardSteps = [];
         // Какие разделы раскрыты в списке шагов мастера (accordion)
         this.expandedStepEndpoints = new Set();
@@ -572,6 +575,8 @@ class SidebarWizardManager {
                     text: '',
                     content_blocks: []
                 };
+                this.sectionVersions[step.endpoint] = 0;
+                this.savedSnapshots[step.id] = JSON.parse(JSON.stringify(this.wizardData[step.id]));
             };
             return (async () => {
                 try {
@@ -611,6 +616,8 @@ class SidebarWizardManager {
                         if (data.section.form_data) {
                             Object.assign(this.wizardData[step.id], data.section.form_data);
                         }
+                        this.sectionVersions[step.endpoint] = data.section.version || 0;
+                        this.savedSnapshots[step.id] = JSON.parse(JSON.stringify(this.wizardData[step.id]));
                     } else {
                         emptyData();
                     }
@@ -1308,7 +1315,7 @@ class SidebarWizardManager {
             formData.append('field_name', fieldName);
             
             try {
-                const res = await fetch('/sidebar/upload_file', { method: 'POST', body: formData });
+                const res = await uploadFileRequest('/sidebar/upload_file', formData);
                 const result = await res.json();
                 if (result.success) {
                     const displayName = result.original_name || result.original_filename || result.filename;
@@ -1354,7 +1361,7 @@ class SidebarWizardManager {
             formData.append('field_name', fieldName);
             
             try {
-                const res = await fetch('/sidebar/upload_file', { method: 'POST', body: formData });
+                const res = await uploadFileRequest('/sidebar/upload_file', formData);
                 const result = await res.json();
                 if (result.success) {
                     const displayName = result.original_name || result.original_filename || result.filename;
@@ -1663,14 +1670,9 @@ class SidebarWizardManager {
     async uploadFiles(files, fieldName){
         const step = this.wizardSteps[this.currentStep]; if(!step) return;
         const section = step.endpoint;
-        const promises = Array.from(files).map(async (file)=>{
-            const form = new FormData();
-            form.append('file', file);
-            form.append('section', section);
-            form.append('field_name', fieldName);
+        const batchResults = await uploadFilesBatch('/sidebar/upload_file', files, { section, field_name: fieldName });
+        const promises = batchResults.map(async ({ result })=>{
             try{
-                const res = await fetch('/sidebar/upload_file', { method:'POST', body: form });
-                const result = await res.json();
                 if(result.success){
                     const displayName = result.original_name || result.original_filename || result.filename;
                     const url = result.url || `/sidebar/download_file/${section}/${result.filename}`;
@@ -1880,19 +1882,41 @@ class SidebarWizardManager {
         }
         
         this.wizardData[step.id] = { ...(this.wizardData[step.id]||{}), ...stepData };
-        const form = new FormData();
-        form.append('wizard_data', JSON.stringify({[step.id]: stepData}));
-        form.append('save_single','true');
+        // Отправляем только поля, изменившиеся с момента загрузки, и версию раздела
+        const endpoint = step.endpoint || step.id;
+        const saved = this.savedSnapshots[step.id] || {};
+        const patch = { version: this.sectionVersions[endpoint] || 0 };
+        const fields = {};
+        Object.keys(stepData).forEach(key => {
+            if (JSON.stringify(stepData[key]) === JSON.stringify(saved[key])) return;
+            if (key === 'title' || key === 'text' || key === 'content_blocks') patch[key] = stepData[key];
+            else fields[key] = stepData[key];
+        });
+        if (Object.keys(fields).length > 0) patch.fields = fields;
         try {
-            const res = await fetch('/sidebar/wizard_save', { method:'POST', body: form });
+            const res = await fetch('/sidebar/wizard_save', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ sections: { [endpoint]: patch }, save_single: true })
+            });
             const result = await res.json();
             const status = document.getElementById('sidebar-wizard-save-status');
             if (result.success) {
+                if (result.versions && result.versions[endpoint] !== undefined) {
+                    this.sectionVersions[endpoint] = result.versions[endpoint];
+                }
+                this.savedSnapshots[step.id] = { ...saved, ...JSON.parse(JSON.stringify(stepData)) };
                 if (status){
                     status.textContent='Сохранено';
                     status.style.color='#10b981';
                     setTimeout(()=>status.textContent='',1500);
                 }
+            } else if (res.status === 409) {
+                // Раздел сохранили в другом окне: данные мастера устарели
+                if (status){
+                    status.textContent=result.error||'Раздел изменен в другом окне. Обновите страницу';
+                    status.style.color='#ef4444';
+                }
             } else {
                 if (status){
                     status.textContent='Ошибка: '+(result.error||'');
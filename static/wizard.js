@@ -3,6 +3,9 @@ class WizardManager {
     constructor() {
         this.currentStep = 0;
         this.wizardData = {};
+        // Версии разделов и снимки данных на момент загрузки: сохраняются только изменения
+        this.sectionVersions = {};
+        this.savedSnapshots = {};
         this.wizardSteps = [];
         this.mode = 'normal'; // normal | tags
         this.modalElement = null;
@@ -154,6 +157,8 @@ class WizardManager {
                     text: '',
                     content_blocks: []
                 };
+                this.sectionVersions[step.endpoint] = 0;
+                this.savedSnapshots[step.id] = JSON.parse(JSON.stringify(this.wizardData[step.id]));
             };
             return (async () => {
                 try {
@@ -168,6 +173,8 @@ class WizardManager {
                         if (data.section.form_data) {
                             Object.assign(this.wizardData[step.id], data.section.form_data);
                         }
+                        this.sectionVersions[step.endpoint] = data.section.version || 0;
+                        this.savedSnapshots[step.id] = JSON.parse(JSON.stringify(this.wizardData[step.id]));
                     } else {
                         emptyData();
                     }
@@ -1770,19 +1777,10 @@ class WizardManager {
         const section = step ? step.endpoint : 'general';
         const module = step && step.module ? step.module : 'info';
         
-        const uploadPromises = Array.from(files).map(async (file) => {
-            const formData = new FormData();
-            formData.append('file', file);
-            formData.append('section', section);
-            formData.append('field_name', fieldName);
-            
+        // Файлы отправляются пакетами (/upload_files): одна транзакция на пакет вместо запроса на каждый файл
+        const batchResults = await uploadFilesBatch(`/${module}/upload_file`, files, { section, field_name: fieldName });
+        const uploadPromises = batchResults.map(async ({ result }) => {
             try {
-                const response = await fetch(`/${module}/upload_file`, {
-                    method: 'POST',
-                    body: formData
-                });
-                
-                const result = await response.json();
                 if (result.success) {
                     return result;
                 } else {
@@ -1850,10 +1848,7 @@ class WizardManager {
             formData.append('type', 'image');
             
             try {
-                const response = await fetch(`/${module}/upload_file`, {
-                    method: 'POST',
-                    body: formData
-                });
+                const response = await uploadFileRequest(`/${module}/upload_file`, formData);
                 
                 const result = await response.json();
                 if (result.success) {
@@ -1932,10 +1927,7 @@ class WizardManager {
             formData.append('type', 'document');
             
             try {
-                const response = await fetch(`/${module}/upload_file`, {
-                    method: 'POST',
-                    body: formData
-                });
+                const response = await uploadFileRequest(`/${module}/upload_file`, formData);
                 
                 const result = await response.json();
                 if (result.success) {
@@ -2147,24 +2139,10 @@ class WizardManager {
         
         this.wizardData[step.id] = stepData;
         
-        // Отправляем данные на сервер
+        // Отправляем на сервер только измененные поля
         try {
-            const formData = new FormData();
-            formData.append('wizard_data', JSON.stringify({[step.id]: stepData}));
-            formData.append('save_single', 'true');
-            
-            const module = step.module || 'info';
-            const response = await fetch(`/${module}/wizard_save`, {
-                method: 'POST',
-                body: formData
-            });
-            
-            const result = await response.json();
-            if (result.success) {
-                this.showSaveStatus('success', 'Шаг сохранен');
-            } else {
-                this.showSaveStatus('error', 'Ошибка сохранения');
-            }
+            const result = await this.saveSectionPatches([{ step: step, data: stepData }], true);
+            this.showSaveResult(result, 'Шаг сохранен', 'Ошибка сохранения');
         } catch (error) {
             console.error('Error saving step:', error);
             this.showSaveStatus('error', 'Ошибка сохранения');
@@ -2332,22 +2310,8 @@ class WizardManager {
             if (sectionData.implemented_programs) this.wizardData[step.id].implemented_programs = sectionData.implemented_programs;
             if (sectionData.adapted_programs) this.wizardData[step.id].adapted_programs = sectionData.adapted_programs;
 
-            const formData = new FormData();
-            formData.append('wizard_data', JSON.stringify({ [step.id]: sectionData }));
-            formData.append('save_single', 'true');
-
-            const module = step.module || 'info';
-            const response = await fetch(`/${module}/wizard_save`, {
-                method: 'POST',
-                body: formData
-            });
-
-            const result = await response.json();
-            if (result.success) {
-                this.showSaveStatus('success', 'Шаг сохранен');
-            } else {
-                this.showSaveStatus('error', 'Ошибка сохранения');
-            }
+            const result = await this.saveSectionPatches([{ step: step, data: sectionData }], true);
+            this.showSaveResult(result, 'Шаг сохранен', 'Ошибка сохранения');
         } catch (error) {
             console.error('Error saving sveden step:', error);
             this.showSaveStatus('error', 'Ошибка сохранения');
@@ -2693,22 +2657,8 @@ class WizardManager {
 
             this.wizardData[step.id] = Object.assign({}, existing, { content_blocks: blocks });
 
-            const formData = new FormData();
-            formData.append('wizard_data', JSON.stringify({ [step.id]: sectionData }));
-            formData.append('save_single', 'true');
-
-            const module = step.module || 'info';
-            const response = await fetch(`/${module}/wizard_save`, {
-                method: 'POST',
-                body: formData
-            });
-
-            const result = await response.json();
-            if (result.success) {
-                this.showSaveStatus('success', 'Теги сохранены');
-            } else {
-                this.showSaveStatus('error', 'Ошибка сохранения тегов');
-            }
+            const result = await this.saveSectionPatches([{ step: step, data: sectionData }], true);
+            this.showSaveResult(result, 'Теги сохранены', 'Ошибка сохранения тегов');
         } catch (error) {
             console.error('Error saving sveden tags:', error);
             this.showSaveStatus('error', 'Ошибка сохранения тегов');
@@ -2972,10 +2922,7 @@ class WizardManager {
                     formData.append('section', step.endpoint || 'main');
                     formData.append('field_name', 'sveden_table_cell');
 
-                    const response = await fetch('/info/upload_file', {
-                        method: 'POST',
-                        body: formData
-                    });
+                    const response = await uploadFileRequest('/info/upload_file', formData);
 
                     const result = await response.json();
                     if (result && result.success) {
@@ -3084,10 +3031,7 @@ class WizardManager {
                     formData.append('section', step.endpoint || 'main');
                     formData.append('field_name', 'sveden_table_cell');
 
-                    const response = await fetch('/info/upload_file', {
-                        method: 'POST',
-                        body: formData
-                    });
+                    const response = await uploadFileRequest('/info/upload_file', formData);
 
                     const result = await response.json();
                     if (result && result.success) {
@@ -3254,10 +3198,7 @@ class WizardManager {
                 formData.append('section', step.endpoint || 'main');
                 formData.append('field_name', 'person_photo');
 
-                const response = await fetch('/info/upload_file', {
-                    method: 'POST',
-                    body: formData
-                });
+                const response = await uploadFileRequest('/info/upload_file', formData);
 
                 const result = await response.json();
                 if (!result || !result.success) {
@@ -3326,26 +3267,94 @@ class WizardManager {
         this.showSaveStatus('success', 'Фото удалено');
     }
 
-    async saveAllData() {
-        try {
-            const formData = new FormData();
-            formData.append('wizard_data', JSON.stringify(this.wizardData));
-            formData.append('save_single', 'false');
-            
-            // Сохраняем через модуль info, который обрабатывает все разделы
-            const response = await fetch('/info/wizard_save', {
+    /**
+     * Патч раздела для /<module>/wizard_save: только ключи, изменившиеся
+     * относительно снимка, загруженного с сервера, и версия этого снимка.
+     */
+    buildSectionPatch(step, sectionData) {
+        const endpoint = step.endpoint || step.id;
+        const saved = this.savedSnapshots[step.id] || {};
+        const patch = { version: this.sectionVersions[endpoint] || 0 };
+        const fields = {};
+        Object.keys(sectionData).forEach(key => {
+            if (JSON.stringify(sectionData[key]) === JSON.stringify(saved[key])) return;
+            if (key === 'title' || key === 'text' || key === 'content_blocks') {
+                patch[key] = sectionData[key];
+            } else {
+                fields[key] = sectionData[key];
+            }
+        });
+        if (Object.keys(fields).length > 0) {
+            patch.fields = fields;
+        }
+        return patch;
+    }
+
+    /**
+     * Сохранение изменений нескольких разделов одной транзакцией.
+     * entries — список {step, data}; разделы разных модулей уходят отдельными запросами.
+     * При конфликте версий (409) ничего не сохраняется, в результате conflict: true.
+     */
+    async saveSectionPatches(entries, saveSingle) {
+        const byModule = {};
+        entries.forEach(entry => {
+            const module = entry.step.module || 'info';
+            (byModule[module] = byModule[module] || []).push(entry);
+        });
+
+        let result = { success: true };
+        for (const [module, moduleEntries] of Object.entries(byModule)) {
+            const sections = {};
+            moduleEntries.forEach(({ step, data }) => {
+                sections[step.endpoint || step.id] = this.buildSectionPatch(step, data);
+            });
+            const response = await fetch(`/${module}/wizard_save`, {
                 method: 'POST',
-                body: formData
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ sections: sections, save_single: !!saveSingle })
             });
-            
-            const result = await response.json();
+            result = await response.json();
+            if (!result.success) {
+                result.conflict = response.status === 409;
+                return result;
+            }
+            const versions = result.versions || {};
+            moduleEntries.forEach(({ step, data }) => {
+                const endpoint = step.endpoint || step.id;
+                if (versions[endpoint] !== undefined) {
+                    this.sectionVersions[endpoint] = versions[endpoint];
+                }
+                this.savedSnapshots[step.id] = Object.assign({}, this.savedSnapshots[step.id], JSON.parse(JSON.stringify(data)));
+            });
+        }
+        return result;
+    }
+
+    /**
+     * Сообщение о результате сохранения (конфликт версий — с просьбой обновить страницу).
+     */
+    showSaveResult(result, successMessage, errorMessage) {
+        if (result.success) {
+            this.showSaveStatus('success', successMessage);
+        } else if (result.conflict) {
+            this.showSaveStatus('error', result.error || 'Раздел изменен в другом окне. Обновите страницу');
+        } else {
+            this.showSaveStatus('error', errorMessage);
+        }
+    }
+
+    async saveAllData() {
+        try {
+            // Изменения всех шагов сохраняются одной транзакцией на модуль
+            const entries = this.wizardSteps
+                .filter(step => this.wizardData[step.id])
+                .map(step => ({ step: step, data: this.wizardData[step.id] }));
+            const result = await this.saveSectionPatches(entries, false);
+            this.showSaveResult(result, 'Все данные сохранены', 'Ошибка сохранения');
             if (result.success) {
-                this.showSaveStatus('success', 'Все данные сохранены');
                 setTimeout(() => {
                     this.closeWizard();
                 }, 2000);
-            } else {
-                this.showSaveStatus('error', 'Ошибка сохранения');
             }
         } catch (error) {
             console.error('Error saving all data:', error);
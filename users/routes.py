@@ -1,4 +1,4 @@
-from flask import render_template, redirect, url_for, flash
+from flask import render_template, redirect, url_for, flash, make_response
 from flask_login import login_user, logout_user, login_required
 from . import users_bp
 from models.models import User
@@ -15,6 +15,18 @@ def login():
         flash('Неверные имя пользователя или пароль')
     return render_template('users/login.html', form=form)
 
+@users_bp.route('/login_fragment')
+def login_fragment():
+    """Форма входа для модального окна.
+
+    Загружается по клику на «Войти», поэтому CSRF-токен (и cookie сессии)
+    появляется только у тех, кто действительно входит, а публичные страницы
+    остаются без Set-Cookie и кэшируются.
+    """
+    response = make_response(render_template('users/login_fragment.html', form=LoginForm()))
+    response.headers['Cache-Control'] = 'no-store, private'
+    return response
+
 @users_bp.route('/logout', methods=['POST', 'GET'])
 @login_required
 def logout():
@@ -0,0 +1,316 @@
+"""
+Контентно-адресуемое хранилище загруженных файлов.
+
+Каждый уникальный по содержимому файл хранится один раз в каталоге
+static/uploads/blobs/<aa>/<sha256><ext>. Файлы разделов (info/<год>/<раздел>/...,
+<раздел>/..., news/...) являются жесткими ссылками на этот blob, поэтому все
+существующие пути, URL и os.walk-поиск продолжают работать без изменений.
+Если жесткие ссылки не поддерживаются (другая ФС, FAT), файл копируется.
+
+Blob-файлы нельзя изменять на месте: любая перезапись файла раздела должна
+выполняться через link_blob()/os.replace(), иначе изменятся все ссылки сразу.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+from utils.logger import logger
+
+
+BLOB_DIR_NAME = 'blobs'
+CHUNK_SIZE = 1024 * 1024
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+DEFAULT_UPLOAD_ROOT = os.path.join(_PROJECT_ROOT, 'static', 'uploads')
+
+
+def get_blob_root(base_upload_path=None):
+    """Возвращает (и создает) корень blob-хранилища"""
+    root = os.path.join(base_upload_path or DEFAULT_UPLOAD_ROOT, BLOB_DIR_NAME)
+    os.makedirs(root, exist_ok=True)
+    return root
+
+
+def blob_path_for(sha256, ext='', base_upload_path=None):
+    """Путь к blob-файлу по хэшу содержимого"""
+    ext = (ext or '').lower()
+    folder = os.path.join(get_blob_root(base_upload_path), sha256[:2])
+    return os.path.join(folder, f'{sha256}{ext}')
+
+
+def file_sha256(file_path):
+    """Считает SHA-256 файла на диске"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def store_upload(file, ext='', base_upload_path=None, transform=None):
+    """
+    Сохраняет загруженный файл в blob-хранилище.
+
+    Поток читается один раз: содержимое пишется во временный файл и
+    одновременно хэшируется. Если такой blob уже есть, временный файл удаляется.
+
+    Args:
+        file: FileStorage или любой объект с read()/stream
+        ext: Расширение blob-файла (с точкой)
+        base_upload_path: Корень static/uploads
+        transform: Необязательная функция(path), изменяющая временный файл
+            до помещения в хранилище (например, оптимизация изображения)
+
+    Returns:
+        (sha256, blob_path, size, is_new)
+    """
+    root = get_blob_root(base_upload_path)
+    stream = getattr(file, 'stream', file)
+    digest = hashlib.sha256()
+
+    fd, tmp_path = tempfile.mkstemp(prefix='.upload-', suffix=(ext or '').lower(), dir=root)
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+                out.write(chunk)
+
+        if transform is not None:
+            transform(tmp_path)
+            sha256 = file_sha256(tmp_path)
+        else:
+            sha256 = digest.hexdigest()
+
+        return (sha256,) + _adopt_temp_file(tmp_path, sha256, ext, base_upload_path)
+    except Exception:
+        _remove_quietly(tmp_path)
+        raise
+
+
+def store_existing_file(file_path, base_upload_path=None, sha256=None):
+    """
+    Помещает уже существующий файл в blob-хранилище (используется при миграции
+    и при первом обращении к старому URL файла, см. utils/media.py).
+
+    Args:
+        sha256: Уже посчитанный хэш файла (чтобы не читать файл повторно)
+
+    Returns:
+        (sha256, blob_path, size, is_new)
+    """
+    sha256 = sha256 or file_sha256(file_path)
+    ext = os.path.splitext(file_path)[1]
+    blob_path = blob_path_for(sha256, ext, base_upload_path)
+    if os.path.exists(blob_path):
+        return sha256, blob_path, os.path.getsize(blob_path), False
+
+    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+    if not _try_link(file_path, blob_path):
+        shutil.copy2(file_path, blob_path)
+    return sha256, blob_path, os.path.getsize(blob_path), True
+
+
+def link_blob(blob_path, target_path):
+    """
+    Делает target_path ссылкой на blob_path.
+
+    Существующий target_path заменяется атомарно (os.replace), а не перезаписывается,
+    поэтому другие ссылки на прежнее содержимое не затрагиваются.
+
+    Returns:
+        True если файл создан/заменен, False если target уже указывал на этот blob
+    """
+    if is_same_file(blob_path, target_path):
+        return False
+
+    folder = os.path.dirname(target_path)
+    os.makedirs(folder, exist_ok=True)
+    tmp_path = os.path.join(folder, f'.link-{os.getpid()}-{os.path.basename(target_path)}')
+    _remove_quietly(tmp_path)
+    try:
+        if not _try_link(blob_path, tmp_path):
+            shutil.copy2(blob_path, tmp_path)
+        os.replace(tmp_path, target_path)
+    except Exception:
+        _remove_quietly(tmp_path)
+        raise
+    return True
+
+
+def is_same_file(path_a, path_b):
+    """Проверяет, что два пути указывают на один и тот же inode"""
+    try:
+        return os.path.samefile(path_a, path_b)
+    except OSError:
+        return False
+
+
+def release_file(file_path, base_upload_path=None):
+    """
+    Удаляет файл раздела; если это была последняя ссылка на blob, удаляет и blob.
+
+    Returns:
+        Число освобожденных байт (0, если содержимое еще используется)
+    """
+    st = os.stat(file_path)
+    blob_path = None
+    if st.st_nlink == 2:
+        # Вторая ссылка — обычно blob этого файла; хэш считаем только в этом случае
+        _, ext = os.path.splitext(file_path)
+        candidate = blob_path_for(file_sha256(file_path), ext, base_upload_path)
+        if is_same_file(candidate, file_path):
+            blob_path = candidate
+    os.unlink(file_path)
+    if blob_path is not None:
+        _remove_quietly(blob_path)
+        return st.st_size
+    return st.st_size if st.st_nlink == 1 else 0
+
+
+def find_linked_name(folder, blob_path):
+    """
+    Ищет в папке файл, который уже является ссылкой на blob_path.
+
+    Позволяет повторной загрузке того же содержимого в тот же раздел
+    вернуть существующее имя вместо создания name_1.ext, name_2.ext...
+    """
+    try:
+        blob_stat = os.stat(blob_path)
+    except OSError:
+        return None
+    if blob_stat.st_nlink < 2:
+        return None
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.name.startswith('.') or not entry.is_file(follow_symlinks=False):
+                    continue
+                st = entry.stat(follow_symlinks=False)
+                if st.st_ino == blob_stat.st_ino and st.st_dev == blob_stat.st_dev:
+                    return entry.name
+    except OSError:
+        return None
+    return None
+
+
+def iter_blob_files(base_upload_path=None):
+    """Перебирает все blob-файлы хранилища"""
+    root = get_blob_root(base_upload_path)
+    for dirpath, _dirs, files in os.walk(root):
+        for name in files:
+            if not name.startswith('.'):
+                yield os.path.join(dirpath, name)
+
+
+def prune_unreferenced_blobs(base_upload_path=None, dry_run=False):
+    """
+    Удаляет blob-файлы, на которые не осталось ни одной ссылки из разделов.
+
+    Blob без ссылок определяется по числу жестких ссылок (st_nlink == 1).
+    В режиме копирования (без жестких ссылок) файлы разделов являются
+    самостоятельными копиями, поэтому удаление blob-а ничего не теряет.
+
+    Returns:
+        (removed_count, freed_bytes)
+    """
+    removed = 0
+    freed = 0
+    for path in iter_blob_files(base_upload_path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if st.st_nlink != 1:
+            continue
+        if not dry_run:
+            try:
+                os.unlink(path)
+            except OSError as e:
+                logger.warning(f'Не удалось удалить blob {path}: {e}')
+                continue
+        removed += 1
+        freed += st.st_size
+    return removed, freed
+
+
+def deduplicate_tree(base_upload_path=None, dry_run=False):
+    """
+    Переводит существующие загрузки на blob-хранилище.
+
+    Каждый обычный файл в static/uploads (кроме самого хранилища) хэшируется;
+    первый файл с данным содержимым становится blob-ом, остальные заменяются
+    жесткими ссылками на него.
+
+    Returns:
+        dict со статистикой: files, unchanged, linked, unique, saved_bytes, errors
+    """
+    upload_root = base_upload_path or DEFAULT_UPLOAD_ROOT
+    blob_root = os.path.abspath(get_blob_root(upload_root))
+    stats = {'files': 0, 'unchanged': 0, 'linked': 0, 'unique': 0, 'saved_bytes': 0, 'errors': 0}
+    seen = {}
+
+    for dirpath, dirs, files in os.walk(upload_root):
+        if os.path.abspath(dirpath) == blob_root or os.path.abspath(dirpath).startswith(blob_root + os.sep):
+            dirs[:] = []
+            continue
+        for name in files:
+            if name.startswith('.'):
+                continue
+            path = os.path.join(dirpath, name)
+            if not os.path.isfile(path) or os.path.islink(path):
+                continue
+            stats['files'] += 1
+            try:
+                if dry_run:
+                    sha256 = file_sha256(path)
+                    size = os.path.getsize(path)
+                    if sha256 in seen:
+                        stats['linked'] += 1
+                        stats['saved_bytes'] += size
+                    else:
+                        seen[sha256] = path
+                        stats['unique'] += 1
+                    continue
+
+                sha256, blob_path, size, is_new = store_existing_file(path, upload_root)
+                if is_new:
+                    stats['unique'] += 1
+                if link_blob(blob_path, path):
+                    stats['linked'] += 1
+                    stats['saved_bytes'] += size
+                else:
+                    stats['unchanged'] += 1
+            except OSError as e:
+                stats['errors'] += 1
+                logger.error(f'Ошибка дедупликации файла {path}: {e}')
+    return stats
+
+
+def _adopt_temp_file(tmp_path, sha256, ext, base_upload_path):
+    """Переносит временный файл в blob-хранилище (или удаляет, если blob уже есть)"""
+    blob_path = blob_path_for(sha256, ext, base_upload_path)
+    size = os.path.getsize(tmp_path)
+    if os.path.exists(blob_path):
+        _remove_quietly(tmp_path)
+        return blob_path, size, False
+    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+    os.replace(tmp_path, blob_path)
+    return blob_path, size, True
+
+
+def _try_link(src, dst):
+    """Пробует создать жесткую ссылку, возвращает False если ФС не поддерживает"""
+    try:
+        os.link(src, dst)
+        return True
+    except (OSError, AttributeError, NotImplementedError):
+        return False
+
+
+def _remove_quietly(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
@@ -0,0 +1,406 @@
+"""
+Возобновляемая загрузка больших файлов по частям (init → chunk → complete).
+
+Состояние загрузки хранится на диске в instance/chunked_uploads/<upload_id>/:
+    meta.json   — параметры, заданные при init (имя, размер, раздел, поле, хэш)
+    data.part   — собираемый файл (части пишутся по смещению index * chunk_size)
+    chunks/<N>  — маркер принятой части N (содержит SHA-256 части)
+
+Маркеры частей — отдельные файлы, поэтому части можно слать параллельно и из
+разных воркеров gunicorn, а после обрыва связи клиент узнает по статусу,
+какие части уже приняты, и досылает только недостающие.
+
+Маршруты /info/upload_chunked и /sidebar/upload_chunked используют общие
+обработчики *_response: загрузку продолжает только начавший ее пользователь.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+
+from flask import current_app, jsonify, request
+from flask_login import current_user
+from werkzeug.datastructures import FileStorage
+
+from utils.logger import logger
+
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+MAX_CHUNK_SIZE = 16 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+_UPLOAD_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+_SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+class ChunkedUploadError(ValueError):
+    """Ошибка протокола загрузки по частям (status — HTTP-код ответа)"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class ChunkedUploadStore:
+    """Хранилище незавершенных загрузок по частям"""
+
+    def __init__(self, root, max_size, chunk_size=DEFAULT_CHUNK_SIZE,
+                 max_chunk_size=MAX_CHUNK_SIZE, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.root = root
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.ttl_seconds = ttl_seconds
+
+    @classmethod
+    def from_app(cls, app):
+        """Создает хранилище по настройкам приложения"""
+        config = app.config
+        return cls(
+            root=os.path.join(app.instance_path, 'chunked_uploads'),
+            max_size=config.get('CHUNKED_UPLOAD_MAX_SIZE') or config.get('MAX_CONTENT_LENGTH'),
+            chunk_size=config.get('CHUNKED_UPLOAD_CHUNK_SIZE', DEFAULT_CHUNK_SIZE),
+            max_chunk_size=config.get('CHUNKED_UPLOAD_MAX_CHUNK_SIZE', MAX_CHUNK_SIZE),
+            ttl_seconds=config.get('CHUNKED_UPLOAD_TTL_SECONDS', DEFAULT_TTL_SECONDS),
+        )
+
+    # ------------------------------------------------------------------ init
+
+    def init_upload(self, filename, total_size, section, field_name=None,
+                    chunk_size=None, sha256=None, is_allowed=None, owner_id=None):
+        """
+        Регистрирует новую загрузку. Тип и размер проверяются здесь,
+        до передачи первого байта содержимого.
+
+        Args:
+            filename: Исходное имя файла
+            total_size: Полный размер файла в байтах
+            section: Раздел назначения
+            field_name: Поле формы раздела
+            chunk_size: Желаемый размер части (ограничивается max_chunk_size)
+            sha256: Необязательный SHA-256 всего файла для проверки при сборке
+            is_allowed: Функция(filename) -> bool для проверки типа файла
+            owner_id: Пользователь, начавший загрузку
+
+        Returns:
+            dict со статусом загрузки
+        """
+        self.cleanup_stale()
+
+        filename = (filename or '').strip()
+        if not filename:
+            raise ChunkedUploadError('Не указано имя файла')
+        if is_allowed is not None and not is_allowed(filename):
+            _, ext = os.path.splitext(filename)
+            raise ChunkedUploadError(f'Недопустимый формат файла: {ext or filename}')
+
+        try:
+            total_size = int(total_size)
+        except (TypeError, ValueError):
+            raise ChunkedUploadError('Не указан размер файла')
+        if total_size <= 0:
+            raise ChunkedUploadError('Файл пустой')
+        if self.max_size and total_size > self.max_size:
+            max_mb = round(self.max_size / (1024 * 1024))
+            raise ChunkedUploadError(f'Файл слишком большой. Максимум {max_mb} МБ', 413)
+
+        try:
+            chunk_size = int(chunk_size or self.chunk_size)
+        except (TypeError, ValueError):
+            chunk_size = self.chunk_size
+        chunk_size = max(64 * 1024, min(chunk_size, self.max_chunk_size))
+
+        if sha256:
+            sha256 = str(sha256).lower()
+            if not _SHA256_RE.match(sha256):
+                raise ChunkedUploadError('Некорректная контрольная сумма файла')
+
+        upload_id = uuid.uuid4().hex
+        upload_dir = self._upload_dir(upload_id)
+        os.makedirs(os.path.join(upload_dir, 'chunks'), exist_ok=True)
+
+        # Резервируем файл нужного размера, чтобы части можно было писать по смещению
+        with open(os.path.join(upload_dir, 'data.part'), 'wb') as f:
+            f.truncate(total_size)
+
+        meta = {
+            'upload_id': upload_id,
+            'filename': filename,
+            'total_size': total_size,
+            'chunk_size': chunk_size,
+            'total_chunks': (total_size + chunk_size - 1) // chunk_size,
+            'section': section,
+            'field_name': field_name,
+            'sha256': sha256 or None,
+            'owner_id': owner_id,
+            'created_at': time.time(),
+        }
+        with open(os.path.join(upload_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        logger.info(f'Начата загрузка по частям {upload_id}: {filename} ({total_size} байт, {meta["total_chunks"]} частей)')
+        return self._status(meta)
+
+    # ----------------------------------------------------------------- chunk
+
+    def write_chunk(self, upload_id, index, data, checksum=None, owner_id=None):
+        """
+        Принимает часть файла. Повторная отправка уже принятой части допустима.
+
+        Args:
+            upload_id: Идентификатор загрузки
+            index: Номер части (с нуля)
+            data: Содержимое части (bytes)
+            checksum: SHA-256 части в hex (обязателен)
+            owner_id: Текущий пользователь (должен совпадать с начавшим загрузку)
+
+        Returns:
+            dict со статусом загрузки
+        """
+        meta = self.get_meta(upload_id, owner_id)
+        if index < 0 or index >= meta['total_chunks']:
+            raise ChunkedUploadError(f'Неверный номер части: {index}')
+
+        expected_len = self._chunk_length(meta, index)
+        if len(data) != expected_len:
+            raise ChunkedUploadError(
+                f'Неверный размер части {index}: {len(data)} байт, ожидалось {expected_len}'
+            )
+
+        if not checksum:
+            raise ChunkedUploadError('Не передана контрольная сумма части (X-Chunk-SHA256)')
+        actual = hashlib.sha256(data).hexdigest()
+        if actual != str(checksum).lower():
+            raise ChunkedUploadError(f'Контрольная сумма части {index} не совпадает', 422)
+
+        upload_dir = self._upload_dir(upload_id)
+        with open(os.path.join(upload_dir, 'data.part'), 'r+b') as f:
+            f.seek(index * meta['chunk_size'])
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        # Маркер пишется после данных: часть считается принятой только целиком
+        marker_path = os.path.join(upload_dir, 'chunks', str(index))
+        with open(marker_path, 'w', encoding='ascii') as f:
+            f.write(actual)
+
+        return self._status(meta)
+
+    # ---------------------------------------------------------------- status
+
+    def get_meta(self, upload_id, owner_id=None):
+        """Читает параметры загрузки; с owner_id проверяет, что ее начал этот пользователь"""
+        if not upload_id or not _UPLOAD_ID_RE.match(upload_id):
+            raise ChunkedUploadError('Неверный идентификатор загрузки')
+        meta_path = os.path.join(self._upload_dir(upload_id), 'meta.json')
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            raise ChunkedUploadError('Загрузка не найдена или устарела', 404)
+        if owner_id is not None and meta.get('owner_id') not in (None, owner_id):
+            raise ChunkedUploadError('Загрузка начата другим пользователем', 403)
+        return meta
+
+    def get_status(self, upload_id, owner_id=None):
+        """Возвращает статус загрузки (какие части уже приняты)"""
+        return self._status(self.get_meta(upload_id, owner_id))
+
+    # -------------------------------------------------------------- complete
+
+    def assemble(self, upload_id, owner_id=None):
+        """
+        Проверяет, что все части приняты, и возвращает собранный файл.
+
+        Returns:
+            (meta, FileStorage) — FileStorage открыт на data.part, вызывающий
+            должен сохранить его и затем вызвать discard(upload_id)
+        """
+        meta = self.get_meta(upload_id, owner_id)
+        status = self._status(meta)
+        if status['missing']:
+            raise ChunkedUploadError(
+                f'Получены не все части файла: не хватает {len(status["missing"])}', 409
+            )
+
+        data_path = os.path.join(self._upload_dir(upload_id), 'data.part')
+        if os.path.getsize(data_path) != meta['total_size']:
+            raise ChunkedUploadError('Размер собранного файла не совпадает с заявленным', 422)
+
+        if meta.get('sha256'):
+            digest = hashlib.sha256()
+            with open(data_path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+            if digest.hexdigest() != meta['sha256']:
+                raise ChunkedUploadError('Контрольная сумма файла не совпадает', 422)
+
+        stream = open(data_path, 'rb')
+        return meta, FileStorage(stream=stream, filename=meta['filename'])
+
+    def discard(self, upload_id, owner_id=None):
+        """Удаляет временные данные загрузки (с owner_id — только загрузку этого пользователя)"""
+        if not upload_id or not _UPLOAD_ID_RE.match(upload_id):
+            return
+        if owner_id is not None:
+            try:
+                self.get_meta(upload_id, owner_id)
+            except ChunkedUploadError as e:
+                if e.status == 403:
+                    raise
+        shutil.rmtree(self._upload_dir(upload_id), ignore_errors=True)
+
+    def cleanup_stale(self):
+        """Удаляет брошенные загрузки старше ttl_seconds"""
+        if not os.path.isdir(self.root):
+            return 0
+        removed = 0
+        deadline = time.time() - self.ttl_seconds
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            try:
+                if os.path.isdir(path) and self._last_activity(path) < deadline:
+                    shutil.rmtree(path, ignore_errors=True)
+                    removed += 1
+            except OSError:
+                continue
+        if removed:
+            logger.info(f'Удалено брошенных загрузок по частям: {removed}')
+        return removed
+
+    # --------------------------------------------------------------- helpers
+
+    def _upload_dir(self, upload_id):
+        return os.path.join(self.root, upload_id)
+
+    @staticmethod
+    def _last_activity(upload_dir):
+        """Время последней записи загрузки: mtime каталога не меняется при записи частей"""
+        times = [os.path.getmtime(upload_dir)]
+        for name in ('meta.json', 'data.part'):
+            try:
+                times.append(os.path.getmtime(os.path.join(upload_dir, name)))
+            except OSError:
+                pass
+        try:
+            with os.scandir(os.path.join(upload_dir, 'chunks')) as entries:
+                times.extend(entry.stat().st_mtime for entry in entries)
+        except OSError:
+            pass
+        return max(times)
+
+    def _chunk_length(self, meta, index):
+        if index == meta['total_chunks'] - 1:
+            return meta['total_size'] - index * meta['chunk_size']
+        return meta['chunk_size']
+
+    def _status(self, meta):
+        chunks_dir = os.path.join(self._upload_dir(meta['upload_id']), 'chunks')
+        try:
+            received = sorted(int(name) for name in os.listdir(chunks_dir) if name.isdigit())
+        except OSError:
+            received = []
+        received_set = set(received)
+        missing = [i for i in range(meta['total_chunks']) if i not in received_set]
+        return {
+            'upload_id': meta['upload_id'],
+            'filename': meta['filename'],
+            'total_size': meta['total_size'],
+            'chunk_size': meta['chunk_size'],
+            'total_chunks': meta['total_chunks'],
+            'received': received,
+            'missing': missing,
+            'complete': not missing,
+        }
+
+
+# ------------------------------------------------------- обработчики маршрутов
+
+
+def _store():
+    return ChunkedUploadStore.from_app(current_app)
+
+
+def _error_response(error):
+    return jsonify({'success': False, 'error': str(error)}), error.status
+
+
+def init_response(section, is_allowed):
+    """Начало загрузки: параметры из JSON-тела запроса, section — раздел по умолчанию"""
+    try:
+        data = request.get_json(silent=True) or {}
+        status = _store().init_upload(
+            filename=data.get('filename'),
+            total_size=data.get('size'),
+            section=section(data.get('section')),
+            field_name=data.get('field_name') or None,
+            chunk_size=data.get('chunk_size'),
+            sha256=data.get('sha256'),
+            is_allowed=is_allowed,
+            owner_id=current_user.id,
+        )
+        return jsonify({'success': True, **status})
+    except ChunkedUploadError as e:
+        return _error_response(e)
+
+
+def chunk_response(upload_id, index):
+    """Прием одной части (тело запроса — содержимое части, заголовок X-Chunk-SHA256)"""
+    store = _store()
+    if not request.content_length or request.content_length > store.max_chunk_size:
+        return jsonify({'success': False, 'error': 'Недопустимый размер части'}), 413
+    try:
+        status = store.write_chunk(
+            upload_id, index, request.get_data(cache=False),
+            request.headers.get('X-Chunk-SHA256'), owner_id=current_user.id,
+        )
+        return jsonify({'success': True, **status})
+    except ChunkedUploadError as e:
+        return _error_response(e)
+
+
+def status_response(upload_id):
+    """Статус загрузки (для продолжения после обрыва)"""
+    try:
+        return jsonify({'success': True, **_store().get_status(upload_id, owner_id=current_user.id)})
+    except ChunkedUploadError as e:
+        return _error_response(e)
+
+
+def abort_response(upload_id):
+    """Отмена загрузки"""
+    try:
+        _store().discard(upload_id, owner_id=current_user.id)
+    except ChunkedUploadError as e:
+        return _error_response(e)
+    return jsonify({'success': True})
+
+
+def complete_response(upload_id, save, on_error):
+    """
+    Сборка файла и сохранение в раздел.
+
+    Args:
+        save: Функция(file, section, field_name) -> ответ Flask
+        on_error: Функция(exception) -> ответ Flask при ошибке save; части
+            загрузки при этом остаются, сборку можно повторить
+    """
+    store = _store()
+    try:
+        meta, file = store.assemble(upload_id, owner_id=current_user.id)
+    except ChunkedUploadError as e:
+        return _error_response(e)
+
+    try:
+        response = save(file, meta['section'], meta.get('field_name'))
+    except Exception as e:
+        return on_error(e)
+    finally:
+        file.close()
+    store.discard(upload_id)
+    return response
@@ -0,0 +1,125 @@
+"""
+Нормализация блоков контента разделов и производный индекс блоков
+
+Блоки нормализуются один раз при записи (InfoSection.set_content_blocks):
+вложенные content_blocks разворачиваются в плоский список. Вместе с блоками
+сохраняется компактный индекс, по которому страницы и очистка файлов
+работают без повторного обхода всего дерева:
+
+    {
+        "types": {"text": 2, "table": 1},   # типы блоков и их количество
+        "children": [3, 20],                # число элементов в каждом блоке
+        "documents": ["/info/download_file/..."],  # документы блоков text/documents
+        "photos": ["/static/uploads/..."],         # фото блоков text/photos
+        "files": [...]                      # все ссылки на файлы (в т.ч. фото персон и блюд)
+    }
+"""
+
+import json
+
+
+# Префиксы URL, которые считаются ссылками на загруженные файлы
+FILE_URL_PREFIXES = (
+    '/info/download_file/',
+    '/download_file/',
+    '/sidebar/download_file/',
+    '/static/uploads/',
+    '/food/',
+)
+
+# Ключи блока, содержащие его элементы (для подсчета children)
+CHILD_KEYS = ('rows', 'items', 'documents', 'photos', 'persons', 'dishes')
+
+
+def is_file_url(value):
+    """Является ли значение ссылкой на загруженный файл"""
+    return isinstance(value, str) and value.startswith(FILE_URL_PREFIXES)
+
+
+def normalize_blocks(blocks_list):
+    """Разворачивает вложенные content_blocks в плоский список блоков"""
+    normalized_blocks = []
+    for block in blocks_list:
+        if isinstance(block, dict):
+            # Проверяем, есть ли внутри блока content_blocks
+            if 'content_blocks' in block and isinstance(block['content_blocks'], list):
+                # Если есть, добавляем только вложенные блоки, сам блок не добавляем
+                normalized_blocks.extend(normalize_blocks(block['content_blocks']))
+            else:
+                # Убираем вложенные content_blocks из блока
+                normalized_block = {k: v for k, v in block.items() if k != 'content_blocks'}
+                normalized_blocks.append(normalized_block)
+        elif isinstance(block, list):
+            # Если блок - это массив, рекурсивно обрабатываем его
+            normalized_blocks.extend(normalize_blocks(block))
+        else:
+            normalized_blocks.append(block)
+    return normalized_blocks
+
+
+def _document_url(doc):
+    """URL документа в формате {url, name} или строки"""
+    return doc.get('url', '') if isinstance(doc, dict) else doc
+
+
+def _add(target, value):
+    if value and isinstance(value, str) and value not in target:
+        target.append(value)
+
+
+def build_blocks_index(blocks):
+    """Индекс нормализованных блоков (см. описание модуля)"""
+    index = {'types': {}, 'children': [], 'documents': [], 'photos': [], 'files': []}
+    if not isinstance(blocks, list):
+        return index
+
+    for block in blocks:
+        if not isinstance(block, dict):
+            index['children'].append(0)
+            continue
+        block_type = block.get('type') or 'text'
+        index['types'][block_type] = index['types'].get(block_type, 0) + 1
+        index['children'].append(sum(
+            len(block[key]) for key in CHILD_KEYS if isinstance(block.get(key), list)
+        ))
+
+        referenced = []
+        if block_type in ('text', 'documents'):
+            for doc in block.get('documents') or []:
+                _add(index['documents'], _document_url(doc))
+                referenced.append(_document_url(doc))
+        if block_type in ('text', 'photos'):
+            for photo in block.get('photos') or []:
+                _add(index['photos'], photo)
+                referenced.append(photo)
+        if block_type == 'person':
+            referenced.extend(p.get('photo') for p in block.get('persons') or [] if isinstance(p, dict))
+        if block_type == 'dishes':
+            for dish in block.get('dishes') or []:
+                if isinstance(dish, dict):
+                    referenced.extend([dish.get('photo'), dish.get('menu_file_url') or dish.get('menu_file')])
+        if block_type == 'daily-dish' and isinstance(block.get('dish'), dict):
+            referenced.append(block['dish'].get('photo'))
+
+        for url in referenced:
+            if is_file_url(url):
+                _add(index['files'], url)
+    return index
+
+
+def dump_blocks(blocks):
+    """Нормализованные блоки и их индекс как JSON-строки для хранения"""
+    if isinstance(blocks, list):
+        blocks = normalize_blocks(blocks)
+    return (json.dumps(blocks, ensure_ascii=False),
+            json.dumps(build_blocks_index(blocks), ensure_ascii=False))
+
+
+def file_names(urls):
+    """Имена файлов по ссылкам (последний сегмент URL)"""
+    names = []
+    for url in urls or []:
+        name = url.split('/')[-1] if isinstance(url, str) else ''
+        if name:
+            names.append(name)
+    return names
@@ -0,0 +1,257 @@
+"""
+Фоновое удаление медиа новостей и объявлений
+
+news_delete / announcement_delete в одной транзакции удаляют запись, ее
+строки File и ставят задание DeletionJob с папками материала
+(static/uploads/<тип>/ГГГГ/ММ/ДД/<id>/). Папки удаляет поток-обработчик
+процесса, поэтому ответ не ждет удаления галереи из сотен фотографий.
+
+Задания хранятся в БД: обработчик любого воркера забирает задание
+сравнением с заменой (pending -> running), задание упавшего процесса
+повторяется через STALE_AFTER, а ошибочные — до MAX_ATTEMPTS раз. Список
+заданий — страница /admin/deletions. Без потока (DELETION_WORKER_ENABLED=0)
+задания выполняет "flask --app app process-deletions".
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import update, or_, and_
+
+from database import db
+from utils.logger import logger
+
+
+DEFAULT_POLL_SECONDS = 30
+STALE_AFTER = timedelta(minutes=10)
+MAX_ATTEMPTS = 3
+
+# Сколько кандидатов выбирать за один запрос при захвате задания
+_CLAIM_BATCH = 5
+
+
+class DeletionQueue:
+    """Очередь заданий DeletionJob и поток, который их выполняет"""
+
+    def __init__(self, poll_seconds=DEFAULT_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self.enabled = True
+        self._app = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def init_app(self, app):
+        """Читает настройки; поток запускается при первом запросе воркера"""
+        self._app = app
+        self.poll_seconds = app.config.get('DELETION_POLL_SECONDS', self.poll_seconds)
+        self.enabled = app.config.get('DELETION_WORKER_ENABLED', self.enabled)
+        if self.enabled:
+            # Задания, оставшиеся от прошлого запуска, выполняются без нового удаления
+            app.before_request(self._ensure_worker)
+
+    def enqueue(self, content_type, item):
+        """
+        Добавляет в сессию задание удаления папок материала и удаляет его строки File.
+
+        Коммит выполняет вызывающий код (вместе с удалением самого материала),
+        после коммита нужно вызвать wake().
+        """
+        # Lazy import to avoid circular imports at module load time
+        from models.models import DeletionJob, File
+        from utils.file_helpers import CONTENT_FILE_COLUMNS, get_content_folder_path
+
+        paths = []
+        # Папка выбирается по дате публикации, а без нее — по дате создания (как в download_file)
+        for folder_date in (item.publication_date, item.created_at):
+            if folder_date is None:
+                continue
+            path = os.path.abspath(get_content_folder_path(content_type, item.id, folder_date, create=False))
+            if path not in paths:
+                paths.append(path)
+
+        column = getattr(File, CONTENT_FILE_COLUMNS[content_type])
+        File.query.filter(column == item.id).delete(synchronize_session='fetch')
+
+        job = DeletionJob(
+            content_type=content_type,
+            content_id=item.id,
+            title=(item.title or '')[:255],
+            paths=json.dumps(paths, ensure_ascii=False),
+        )
+        db.session.add(job)
+        return job
+
+    def wake(self):
+        """Будит обработчик (вызывать после коммита задания)"""
+        if self.enabled:
+            self._ensure_worker()
+            self._wakeup.set()
+
+    def retry(self, job_id):
+        """Возвращает ошибочное задание в очередь; False — если задание не найдено или уже выполнено"""
+        # Lazy import to avoid circular imports at module load time
+        from models.models import DeletionJob
+
+        result = db.session.execute(
+            update(DeletionJob)
+            .where(DeletionJob.id == job_id, DeletionJob.status == 'failed')
+            .values(status='pending', attempts=0, error=None, started_at=None, finished_at=None)
+        )
+        db.session.commit()
+        if result.rowcount != 1:
+            return False
+        self.wake()
+        return True
+
+    def process_pending(self, limit=None):
+        """Выполняет готовые задания в текущем потоке; возвращает их число"""
+        processed = []
+        while limit is None or len(processed) < limit:
+            job = self._claim_next(exclude=processed)
+            if job is None:
+                break
+            processed.append(job.id)
+            self._run_job(job)
+        return len(processed)
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._wakeup.set()
+            self._thread = threading.Thread(target=self._run, name='deletion-queue', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.poll_seconds)
+            self._wakeup.clear()
+            try:
+                with self._app.app_context():
+                    try:
+                        self.process_pending()
+                    finally:
+                        db.session.remove()
+            except Exception as e:
+                logger.error(f"Ошибка обработчика очереди удаления: {e}", exc_info=True)
+
+    def _claim_next(self, exclude=()):
+        """Захватывает следующее задание (pending или зависшее running) или возвращает None"""
+        # Lazy import to avoid circular imports at module load time
+        from models.models import DeletionJob
+
+        now = datetime.utcnow()
+        ready = or_(
+            DeletionJob.status == 'pending',
+            and_(DeletionJob.status == 'running', DeletionJob.started_at < now - STALE_AFTER),
+        )
+        query = db.session.query(DeletionJob.id, DeletionJob.status, DeletionJob.attempts).filter(ready)
+        if exclude:
+            query = query.filter(DeletionJob.id.notin_(exclude))
+        candidates = query.order_by(DeletionJob.id).limit(_CLAIM_BATCH).all()
+
+        for job_id, status, attempts in candidates:
+            # Сравнение с заменой: задание мог забрать обработчик другого воркера
+            result = db.session.execute(
+                update(DeletionJob)
+                .where(DeletionJob.id == job_id, DeletionJob.status == status, DeletionJob.attempts == attempts)
+                .values(status='running', started_at=now, attempts=attempts + 1)
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            if result.rowcount == 1:
+                return db.session.get(DeletionJob, job_id, populate_existing=True)
+        return None
+
+    def _run_job(self, job):
+        errors = []
+        files_removed = bytes_freed = 0
+        for path in job.get_paths():
+            if not _is_content_folder(path, job.content_type):
+                errors.append(f'Путь вне папки загрузок: {path}')
+                continue
+            removed, freed, failed = _remove_folder(path)
+            files_removed += removed
+            bytes_freed += freed
+            errors.extend(failed)
+
+        job.files_removed = (job.files_removed or 0) + files_removed
+        job.bytes_freed = (job.bytes_freed or 0) + bytes_freed
+        job.finished_at = datetime.utcnow()
+        if errors:
+            job.status = 'failed' if job.attempts >= MAX_ATTEMPTS else 'pending'
+            job.error = '; '.join(errors)[:2000]
+            logger.warning(f"Удаление медиа {job.content_type} {job.content_id} (попытка {job.attempts}): {job.error}")
+        else:
+            job.status = 'done'
+            job.error = None
+            logger.info(f"Удалены медиа {job.content_type} {job.content_id}: файлов {files_removed}, {bytes_freed} байт")
+        try:
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Не удалось сохранить результат задания удаления {job.id}: {e}")
+
+
+def _uploads_root(content_type):
+    return os.path.abspath(os.path.join('static', 'uploads', content_type))
+
+
+def _is_content_folder(path, content_type):
+    """Папка лежит внутри static/uploads/<тип>/ и не совпадает с ней"""
+    root = _uploads_root(content_type)
+    path = os.path.abspath(path)
+    try:
+        return path != root and os.path.commonpath([root, path]) == root
+    except ValueError:
+        return False
+
+
+def _remove_folder(path):
+    """
+    Удаляет папку материала и пустые папки дат над ней.
+
+    Документы — жесткие ссылки на blob-хранилище: blob удаляется вместе с
+    последней ссылкой. Returns: (число файлов, освобождено байт, ошибки)
+    """
+    # Lazy import to avoid circular imports at module load time
+    from utils.blob_store import release_file
+
+    removed = freed = 0
+    errors = []
+    if not os.path.isdir(path):
+        return removed, freed, errors
+
+    for dirpath, dirnames, filenames in os.walk(path, topdown=False):
+        for name in filenames:
+            file_path = os.path.join(dirpath, name)
+            try:
+                freed += release_file(file_path)
+                removed += 1
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                errors.append(f'{file_path}: {e}')
+        try:
+            os.rmdir(dirpath)
+        except OSError as e:
+            if not errors:
+                errors.append(f'{dirpath}: {e}')
+
+    # Пустые папки дня, месяца и года больше не нужны обходам uploads
+    parent = os.path.dirname(path)
+    for _ in range(3):
+        try:
+            os.rmdir(parent)
+        except OSError:
+            break
+        parent = os.path.dirname(parent)
+    return removed, freed, errors
+
+
+deletion_queue = DeletionQueue()
@@ -0,0 +1,191 @@
+"""
+Архив блюд «Ежедневное меню» (раздел nutrition-dishes-archive)
+
+Блюда хранятся в таблице DailyDish с индексом по дате публикации, а не в
+JSON блока dishes: страница архива показывает один месяц (с постраничным
+выводом), удаление блюда — удаление одной строки по id.
+"""
+
+import math
+from datetime import date, datetime
+
+from sqlalchemy import func
+
+from database import db
+
+
+ARCHIVE_ENDPOINT = 'nutrition-dishes-archive'
+ARCHIVE_BLOCK_TITLE = 'Ежедневное меню'
+DISHES_PER_PAGE = 30
+
+# Ключ месяца для блюд без даты публикации
+UNDATED_MONTH = 'unknown'
+
+MONTH_NAMES = {
+    1: 'Январь', 2: 'Февраль', 3: 'Март', 4: 'Апрель', 5: 'Май', 6: 'Июнь',
+    7: 'Июль', 8: 'Август', 9: 'Сентябрь', 10: 'Октябрь', 11: 'Ноябрь', 12: 'Декабрь',
+}
+
+
+def parse_dish_date(value):
+    """Дата из строки DD.MM.YYYY или YYYY-MM-DD (None, если не разобрать)"""
+    if isinstance(value, date):
+        return value
+    text = str(value or '').strip()
+    for fmt in ('%d.%m.%Y', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def dish_fields(data):
+    """Поля DailyDish из словаря блюда (формат блока dishes/daily-dish или API)"""
+    dish_date = parse_dish_date(data.get('date'))
+    return {
+        'title': str(data.get('title') or '').strip()[:255],
+        'dish_date': dish_date,
+        # Как и прежде, при сортировке дата публикации заменяется датой блюда
+        'publish_date': parse_dish_date(data.get('publish_date')) or dish_date,
+        'photo': (str(data.get('photo') or '').strip() or None),
+        'menu_file_url': (str(data.get('menu_file_url') or data.get('menu_file') or '').strip() or None),
+        'menu_file_name': (str(data.get('menu_file_name') or '').strip() or None),
+    }
+
+
+def upsert_dishes(dishes, match_on='publish_date'):
+    """
+    Добавляет блюда из JSON-блоков в таблицу (без удаления существующих).
+
+    Args:
+        dishes: Список словарей блюд
+        match_on: 'dish_date' — блюдо на день из раздела "Питание" (одно на дату),
+                  'publish_date' — совпадение по дате публикации и названию
+
+    Returns:
+        Число добавленных или обновленных блюд (коммит выполняет вызывающий код)
+    """
+    # Lazy import to avoid circular imports at module load time
+    from models.models import DailyDish
+
+    changed = 0
+    for data in dishes or []:
+        if not isinstance(data, dict):
+            continue
+        fields = dish_fields(data)
+        if not (fields['title'] or fields['photo'] or fields['menu_file_url']):
+            continue
+        query = DailyDish.query
+        if match_on == 'dish_date':
+            if fields['dish_date'] is None:
+                continue
+            query = query.filter_by(dish_date=fields['dish_date'])
+        else:
+            query = query.filter_by(publish_date=fields['publish_date'], title=fields['title'])
+        dish = query.first()
+        if dish is None:
+            dish = DailyDish()
+            db.session.add(dish)
+        for key, value in fields.items():
+            # Файл меню, выбранный в редакторе архива, не сбрасываем при повторном копировании
+            if value is None and key in ('menu_file_url', 'menu_file_name') and dish.id is not None:
+                continue
+            setattr(dish, key, value)
+        changed += 1
+    return changed
+
+
+def _month_key(year, month):
+    if not year or not month:
+        return UNDATED_MONTH
+    return f'{int(year):04d}-{int(month):02d}'
+
+
+def _month_label(key):
+    if key == UNDATED_MONTH:
+        return 'Без даты'
+    year, month = key.split('-')
+    return f'{MONTH_NAMES.get(int(month), month)} {year}'
+
+
+def archive_months():
+    """Месяцы архива с числом блюд: новые сверху, блюда без даты — в конце"""
+    # Lazy import to avoid circular imports at module load time
+    from models.models import DailyDish
+
+    year = func.extract('year', DailyDish.publish_date)
+    month = func.extract('month', DailyDish.publish_date)
+    rows = (db.session.query(year, month, func.count(DailyDish.id))
+            .group_by(year, month)
+            .all())
+    months = [{'key': _month_key(y, m), 'count': count} for y, m, count in rows]
+    months.sort(key=lambda m: (m['key'] != UNDATED_MONTH, m['key']), reverse=True)
+    for item in months:
+        item['label'] = _month_label(item['key'])
+    return months
+
+
+def load_archive_page(month=None, page=1, per_page=DISHES_PER_PAGE):
+    """
+    Блюда одного месяца архива для страницы раздела.
+
+    Args:
+        month: 'YYYY-MM' или 'unknown'; по умолчанию текущий месяц, а если в нем
+               нет блюд — последний месяц с блюдами
+        page: Номер страницы внутри месяца (с 1)
+
+    Returns:
+        dict: dishes (словари блюд), months, month, page, pages, total
+    """
+    # Lazy import to avoid circular imports at module load time
+    from models.models import DailyDish
+
+    months = archive_months()
+    keys = [item['key'] for item in months]
+    if month not in keys:
+        current = date.today().strftime('%Y-%m')
+        month = current if current in keys else (keys[0] if keys else None)
+
+    result = {'dishes': [], 'months': months, 'month': month, 'page': 1, 'pages': 0, 'total': 0}
+    if month is None:
+        return result
+
+    query = DailyDish.query
+    if month == UNDATED_MONTH:
+        query = query.filter(DailyDish.publish_date.is_(None))
+    else:
+        year, month_num = (int(part) for part in month.split('-'))
+        start = date(year, month_num, 1)
+        end = date(year + 1, 1, 1) if month_num == 12 else date(year, month_num + 1, 1)
+        query = query.filter(DailyDish.publish_date >= start, DailyDish.publish_date < end)
+
+    total = next((item['count'] for item in months if item['key'] == month), 0)
+    pages = max(1, math.ceil(total / per_page))
+    page = min(max(page or 1, 1), pages)
+    dishes = (query.order_by(DailyDish.publish_date.desc(), DailyDish.id.desc())
+              .offset((page - 1) * per_page)
+              .limit(per_page)
+              .all())
+
+    result.update({
+        'dishes': [dish.to_dict() for dish in dishes],
+        'page': page,
+        'pages': pages,
+        'total': total,
+    })
+    return result
+
+
+def strip_archive_dishes(blocks):
+    """
+    Выносит блюда из блоков dishes архива в таблицу DailyDish.
+
+    Блоки остаются на месте (с пустым списком dishes): по ним шаблон понимает,
+    где выводить архив. Возвращает блоки для сохранения в content_blocks.
+    """
+    for block in blocks or []:
+        if isinstance(block, dict) and block.get('type') == 'dishes' and block.get('dishes'):
+            upsert_dishes(block.get('dishes'))
+            block['dishes'] = []
+    return blocks
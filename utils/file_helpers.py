@@ -2,6 +2,7 @@
 Общие утилиты для работы с файлами
 """
 
+import mimetypes
 import os
 import uuid
 from datetime import datetime
@@ -10,6 +11,13 @@ from PIL import Image as PILImage
 from utils.logger import logger
 
 
+# Расширения документов новостей и объявлений (отдаются через роут скачивания)
+DOCUMENT_EXTENSIONS = {'.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.pdf', '.txt', '.rtf', '.odt', '.ods', '.odp'}
+
+# Тип контента -> колонка File со ссылкой на материал
+CONTENT_FILE_COLUMNS = {'news': 'news_id', 'announcements': 'announcement_id'}
+
+
 def generate_content_filename(original_filename, content_id, file_type='image', content_type=None):
     """
     Генерирует имя файла в формате день.месяц.год - номер файла
@@ -66,7 +74,7 @@ def generate_content_filename(original_filename, content_id, file_type='image',
     return filename
 
 
-def get_content_folder_path(content_type, content_id, publication_date=None):
+def get_content_folder_path(content_type, content_id, publication_date=None, create=True):
     """
     Создает путь к папке контента в формате год/месяц/дата/номер_контента/
     
@@ -74,6 +82,7 @@ def get_content_folder_path(content_type, content_id, publication_date=None):
         content_type: Тип контента ('news' или 'announcements')
         content_id: ID контента
         publication_date: Дата публикации (опционально)
+        create: Создать папку, если ее нет
     
     Returns:
         Путь к папке
@@ -85,7 +94,8 @@ def get_content_folder_path(content_type, content_id, publication_date=None):
     day = target_date.strftime("%d")
     
     folder_path = os.path.join('static', 'uploads', content_type, year, month, day, str(content_id))
-    os.makedirs(folder_path, exist_ok=True)
+    if create:
+        os.makedirs(folder_path, exist_ok=True)
     
     return folder_path
 
@@ -126,9 +136,16 @@ def save_image(file, content_type, content_id=None, publication_date=None, max_s
             os.makedirs(upload_folder, exist_ok=True)
         
         file_path = os.path.join(upload_folder, filename)
-        file.save(file_path)
-        
-        optimize_image(file_path, max_size, quality)
+        # Файл по этому пути мог стать жесткой ссылкой на blob (/media/<sha256>): пишем
+        # во временный файл и заменяем ссылку, не меняя содержимое blob-а
+        tmp_path = os.path.join(upload_folder, f'.upload-{uuid.uuid4().hex}{os.path.splitext(filename)[1]}')
+        try:
+            file.save(tmp_path)
+            optimize_image(tmp_path, max_size, quality)
+            os.replace(tmp_path, file_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
         
         return filename
     except Exception as e:
@@ -136,6 +153,52 @@ def save_image(file, content_type, content_id=None, publication_date=None, max_s
         return None
 
 
+def store_uploads_concurrently(files, indexes, save):
+    """
+    Сохраняет файлы пакета на диск в пуле потоков (UPLOAD_BATCH_WORKERS).
+
+    Args:
+        files: Список FileStorage пакета
+        indexes: Номера файлов, которые нужно сохранить
+        save: Функция(file) -> file_info; не должна обращаться к БД
+
+    Returns:
+        dict index -> (file_info, error)
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from flask import current_app
+
+    def store(index):
+        try:
+            return index, (save(files[index]), None)
+        except ValueError as e:
+            return index, (None, str(e))
+        except Exception as e:
+            logger.error(f"Ошибка сохранения файла {files[index].filename}: {e}")
+            return index, (None, f'Ошибка при сохранении файла: {e}')
+
+    if not indexes:
+        return {}
+    workers = max(1, min(int(current_app.config.get('UPLOAD_BATCH_WORKERS', 4)), len(indexes)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(pool.map(store, indexes))
+
+
+def remove_batch_files(stored):
+    """
+    Удаляет файлы пакета, сохраненные до неудачного коммита (кроме уже существовавших).
+
+    Содержимое в blob-хранилище остается до prune_unreferenced_blobs.
+    """
+    for file_info, _error in stored.values():
+        if not file_info or file_info.get('reused_existing'):
+            continue
+        try:
+            os.remove(file_info['file_path'])
+        except OSError as e:
+            logger.warning(f"Не удалось удалить файл {file_info['file_path']} после отката: {e}")
+
+
 def save_document(file, content_type, content_id=None, publication_date=None):
     """
     Сохраняет документ
@@ -153,15 +216,8 @@ def save_document(file, content_type, content_id=None, publication_date=None):
         return None
     
     try:
-        if content_id:
-            filename = generate_content_filename(file.filename, content_id, 'doc', content_type)
-        else:
-            filename = secure_filename(file.filename)
-            name, ext = os.path.splitext(filename)
-            filename = f"{uuid.uuid4()}{ext}"
-        
-        if not filename:
-            return None
+        # Lazy import to avoid circular imports at module load time.
+        from utils.blob_store import store_upload, link_blob, find_linked_name
         
         if content_id:
             upload_folder = get_content_folder_path(content_type, content_id, publication_date)
@@ -169,8 +225,24 @@ def save_document(file, content_type, content_id=None, publication_date=None):
             upload_folder = os.path.join('static', 'uploads', content_type)
             os.makedirs(upload_folder, exist_ok=True)
         
+        # Содержимое хранится один раз в blob-хранилище; если такой документ
+        # уже прикреплен к этому материалу, возвращаем его имя без нового файла
+        _, ext = os.path.splitext(file.filename)
+        _sha256, blob_path, _size, _is_new = store_upload(file, ext)
+        existing = find_linked_name(upload_folder, blob_path)
+        if existing:
+            return existing
+        
+        if content_id:
+            filename = generate_content_filename(file.filename, content_id, 'doc', content_type)
+        else:
+            filename = f"{uuid.uuid4()}{ext.lower()}"
+        
+        if not filename:
+            return None
+        
         file_path = os.path.join(upload_folder, filename)
-        file.save(file_path)
+        link_blob(blob_path, file_path)
         
         return filename
     except Exception as e:
@@ -238,7 +310,7 @@ def get_file_url(filename, content_type, content_id):
     # Для документов используем роут скачивания, для изображений - прямой путь
     _, ext = os.path.splitext(filename)
     ext = ext.lower()
-    is_document = ext in ['.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.pdf', '.txt', '.rtf', '.odt', '.ods', '.odp']
+    is_document = ext in DOCUMENT_EXTENSIONS
     
     if is_document:
         url = f"/{content_type}/download/{content_id}/{filename}"
@@ -248,56 +320,180 @@ def get_file_url(filename, content_type, content_id):
     return url
 
 
-def get_content_documents(content_type, content_id, publication_date=None):
+def document_download_url(content_type, content_id, filename):
+    """URL скачивания документа новости или объявления"""
+    return f"/{content_type}/download/{content_id}/{filename}"
+
+
+def record_document(content_type, content_id, filename, publication_date=None, display_name=None):
     """
-    Получает список документов из файловой системы для контента
+    Добавляет в сессию запись File(kind='doc') для сохраненного документа.
+
+    Размер и MIME-тип берутся с диска при загрузке, чтобы страница материала
+    выводила документы одним запросом без обращения к папке.
+
+    Args:
+        content_type: Тип контента ('news' или 'announcements')
+        content_id: ID контента
+        filename: Имя файла, которое вернул save_document
+        publication_date: Дата публикации (папка материала)
+        display_name: Имя для отображения (исходное имя загруженного файла)
+
+    Returns:
+        Запись File (новая или уже существующая для этого файла)
+    """
+    from models.models import File
+    from database import db
+
+    column = CONTENT_FILE_COLUMNS[content_type]
+    existing = File.query.filter_by(kind='doc', filename=filename, **{column: content_id}).first()
+    if existing:
+        return existing
+
+    file_path = os.path.join(get_content_folder_path(content_type, content_id, publication_date, create=False), filename)
+    try:
+        file_size = os.path.getsize(file_path)
+    except OSError:
+        file_size = None
+    record = File(
+        filename=filename,
+        kind='doc',
+        display_name=display_name or filename,
+        file_size=file_size,
+        mime_type=mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+        **{column: content_id},
+    )
+    db.session.add(record)
+    return record
+
+
+def get_content_documents(content_type, content_id, files=None):
+    """
+    Получает список документов контента из таблицы File (kind='doc')
     
     Args:
         content_type: Тип контента ('news' или 'announcements')
         content_id: ID контента
-        publication_date: Дата публикации (опционально, если None, получается из БД)
+        files: Уже загруженные файлы материала (item.files) — тогда запрос не выполняется
     
     Returns:
         Список словарей с информацией о документах
     """
-    if not content_id:
+    if not content_id or content_type not in CONTENT_FILE_COLUMNS:
         return []
     
     try:
-        # Если дата не передана, получаем из БД
-        if publication_date is None:
-            from models.models import News, Announcement
-            if content_type == 'news':
-                content = News.query.get(content_id)
-            elif content_type == 'announcements':
-                content = Announcement.query.get(content_id)
-            else:
-                return []
-            
-            if content:
-                publication_date = content.publication_date if content.publication_date else content.created_at
-        
-        folder_path = get_content_folder_path(content_type, content_id, publication_date)
-        if not os.path.exists(folder_path):
-            return []
-        
-        documents = []
-        for filename in os.listdir(folder_path):
-            file_path = os.path.join(folder_path, filename)
-            if os.path.isfile(file_path):
-                _, ext = os.path.splitext(filename)
-                ext = ext.lower()
-                # Проверяем, что это документ (не изображение)
-                is_document = ext in ['.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.pdf', '.txt', '.rtf', '.odt', '.ods', '.odp']
-                if is_document and 'документ' in filename:
-                    documents.append({
-                        'filename': filename,
-                        'url': get_file_url(filename, content_type, content_id),
-                        'size': os.path.getsize(file_path)
-                    })
+        if files is None:
+            from models.models import File
+            column = CONTENT_FILE_COLUMNS[content_type]
+            files = File.query.filter_by(kind='doc', **{column: content_id}).all()
         
+        documents = [{
+            'filename': f.filename,
+            'display_name': f.display_name or f.filename,
+            'url': document_download_url(content_type, content_id, f.filename),
+            'size': f.file_size,
+            'mime_type': f.mime_type,
+        } for f in files if f.kind == 'doc']
         return sorted(documents, key=lambda x: x['filename'])
     except Exception as e:
         logger.error(f"Ошибка при получении документов для {content_type} {content_id}: {e}")
         return []
 
+
+def content_zip_entries(content_type, item):
+    """
+    Файлы папки новости или объявления для архива «Скачать все»
+
+    Документы попадают в архив под исходными именами загрузки (File.display_name).
+
+    Returns:
+        Список ZipEntry (utils/zip_download.py)
+    """
+    # Lazy import to avoid circular imports at module load time
+    from utils.zip_download import file_entry
+
+    folder_path = get_content_folder_path(content_type, item.id, item.publication_date or item.created_at, create=False)
+    try:
+        names = sorted(os.listdir(folder_path))
+    except OSError:
+        return []
+
+    display_names = {f.filename: f.display_name for f in item.files if f.kind == 'doc' and f.display_name}
+    entries = []
+    for filename in names:
+        file_path = os.path.join(folder_path, filename)
+        if filename.startswith('.') or not os.path.isfile(file_path):
+            continue
+        entry = file_entry(display_names.get(filename, filename), file_path)
+        if entry is not None:
+            entries.append(entry)
+    return entries
+
+
+def import_content_documents(conn):
+    """
+    Создает записи File(kind='doc') для документов, лежащих в папках новостей
+    и объявлений (до появления записей документы сохранялись только на диск).
+
+    Документом считается файл с расширением из DOCUMENT_EXTENSIONS и словом
+    «документ» в имени — так их выбирала страница материала. Уже учтенные
+    файлы пропускаются, поэтому импорт можно запускать повторно.
+
+    Args:
+        conn: Соединение SQLAlchemy внутри транзакции
+
+    Returns:
+        Число созданных записей
+    """
+    import sqlalchemy as sa
+
+    # Только колонки миграции 8: импорт выполняется внутри нее, модели могут быть новее схемы
+    files = sa.table(
+        'file',
+        sa.column('filename'), sa.column('news_id'), sa.column('announcement_id'), sa.column('kind'),
+        sa.column('is_preview'), sa.column('upload_date', sa.DateTime), sa.column('display_name'),
+        sa.column('file_size'), sa.column('mime_type'),
+    )
+    created = 0
+    for content_type, table_name in (('news', 'news'), ('announcements', 'announcement')):
+        column = files.c[CONTENT_FILE_COLUMNS[content_type]]
+        table = sa.table(
+            table_name,
+            sa.column('id'), sa.column('publication_date', sa.DateTime), sa.column('created_at', sa.DateTime),
+        )
+        known = set(conn.execute(
+            sa.select(column, files.c.filename).where(files.c.kind == 'doc', column.is_not(None))
+        ).tuples())
+        rows = conn.execute(sa.select(table.c.id, table.c.publication_date, table.c.created_at)).all()
+        for content_id, publication_date, created_at in rows:
+            target_date = publication_date or created_at
+            if target_date is None:
+                continue
+            folder_path = get_content_folder_path(content_type, content_id, target_date, create=False)
+            try:
+                names = sorted(os.listdir(folder_path))
+            except OSError:
+                continue
+            new_rows = []
+            for filename in names:
+                file_path = os.path.join(folder_path, filename)
+                _, ext = os.path.splitext(filename)
+                if ext.lower() not in DOCUMENT_EXTENSIONS or 'документ' not in filename:
+                    continue
+                if (content_id, filename) in known or not os.path.isfile(file_path):
+                    continue
+                new_rows.append({
+                    column.name: content_id,
+                    'filename': filename,
+                    'kind': 'doc',
+                    'is_preview': False,
+                    'upload_date': datetime.fromtimestamp(os.path.getmtime(file_path)),
+                    'display_name': filename,
+                    'file_size': os.path.getsize(file_path),
+                    'mime_type': mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+                })
+            if new_rows:
+                conn.execute(files.insert(), new_rows)
+                created += len(new_rows)
+    return created
@@ -0,0 +1,43 @@
+"""
+Заголовки кэширования публичных страниц
+
+Анонимные GET-запросы к публичным разделам (главная, новости, объявления,
+/sveden, /sidebar, /info, /p/) не создают сессию, поэтому ответ зависит только от URL и
+может кэшироваться обратным прокси перед gunicorn. HTML-ответы авторизованным
+пользователям и любые ответы с Set-Cookie помечаются как private и no-store.
+"""
+
+from flask import request, session
+from flask_login import current_user
+
+
+DEFAULT_PUBLIC_PREFIXES = ('/news', '/announcements', '/sveden', '/sidebar', '/info', '/p/')
+
+
+def init_app(app):
+    """Регистрирует after_request с заголовками Cache-Control"""
+    max_age = int(app.config.get('PUBLIC_PAGE_MAX_AGE', 60))
+    prefixes = tuple(app.config.get('PUBLIC_CACHE_PREFIXES') or DEFAULT_PUBLIC_PREFIXES)
+
+    @app.after_request
+    def _public_cache_headers(response):
+        if request.method not in ('GET', 'HEAD') or max_age <= 0:
+            return response
+        # Заголовки, выставленные самим обработчиком (send_file, no-store), не трогаем
+        if 'Cache-Control' in response.headers:
+            return response
+        if response.status_code != 200 or response.mimetype != 'text/html':
+            return response
+
+        if current_user.is_authenticated or session.modified or 'Set-Cookie' in response.headers:
+            # Редактор должен сразу видеть свои изменения
+            response.headers['Cache-Control'] = 'private, no-cache, no-store, must-revalidate'
+            return response
+        if request.path != '/' and not request.path.startswith(prefixes):
+            return response
+
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        # Анонимный ответ не должен отдаваться из кэша пользователю с cookie сессии
+        response.vary.add('Cookie')
+        return response
@@ -0,0 +1,305 @@
+"""
+Шина сброса кэшей по тегам
+
+Хуки сохранения и удаления InfoSection, InfoFile, News, Announcement, File и
+PageContent собирают теги изменений транзакции в session.info. После
+коммита теги рассылаются подписчикам, а после отката отбрасываются:
+
+    'sections'               любой раздел (таблица url -> раздел)
+    'section:<endpoint>'     раздел, его родитель (список подразделов), файлы InfoFile раздела
+    'menu'                   дерево бокового меню (разделы /sidebar/* и 'food')
+    'news', 'news:<id>'      новость и ее файлы; 'announcements', 'announcements:<id>'
+    'page:<page_key>'        контент PageContent
+    '*'                      все кэши (например, после восстановления БД из копии)
+
+Кэш подписывается на точный тег или префикс ('page:*'):
+
+    invalidation.subscribe(('section:main',), lambda tags: site_settings.invalidate())
+
+Чтобы теги дошли до других воркеров gunicorn, они записываются в таблицу
+cache_invalidations той же БД. Каждый воркер перед запросом (не чаще
+INVALIDATION_POLL_SECONDS) читает новые строки и применяет чужие теги.
+Строки старше RETENTION удаляются. Воркер, который не опрашивал журнал
+дольше этого срока, сбрасывает все кэши. Пока журнал не читается,
+invalidation.healthy ложно: кэши без TTL в это время сверяют версии с БД.
+"""
+
+import json
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, delete, func, insert, inspect, select
+from sqlalchemy.orm import object_session
+
+from database import db, RoutingSession
+from utils.logger import logger
+
+
+ALL = '*'
+DEFAULT_POLL_SECONDS = 1.0
+RETENTION = timedelta(hours=1)
+PRUNE_INTERVAL_SECONDS = 300
+
+# Поля form_data, влияющие на дерево бокового меню (app.inject_sidebar_sections)
+MENU_FORM_KEYS = ('parent', 'order', 'show_in_menu')
+
+# Теги текущей транзакции в session.info
+_TAGS_KEY = 'invalidation_tags'
+
+
+class InvalidationBus:
+    """Подписки кэшей на теги и доставка тегов между воркерами"""
+
+    def __init__(self, poll_seconds=DEFAULT_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self.shared = True
+        self.origin = uuid.uuid4().hex
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._last_id = None
+        self._polled_at = 0.0
+        self._pruned_at = 0.0
+        self._poll_failed = False
+
+    def init_app(self, app):
+        """Регистрирует хуки моделей и опрос журнала других воркеров"""
+        self.poll_seconds = app.config.get('INVALIDATION_POLL_SECONDS', self.poll_seconds)
+        self.shared = app.config.get('INVALIDATION_SHARED', self.shared)
+        _register_hooks(self)
+        if self.shared:
+            app.before_request(self.poll)
+
+    @property
+    def healthy(self):
+        """Теги других воркеров доходят до процесса: журнал прочитан и последний опрос успешен"""
+        return self.shared and self._last_id is not None and not self._poll_failed
+
+    def subscribe(self, patterns, callback):
+        """
+        Подписывает callback(tags) на теги.
+
+        Args:
+            patterns: Точные теги или префиксы с '*' в конце ('page:*')
+            callback: Вызывается с множеством совпавших тегов (или {'*'})
+        """
+        self._subscribers.append((tuple(patterns), callback))
+
+    def publish(self, tags):
+        """Применяет теги в своем процессе и передает их другим воркерам"""
+        tags = set(tags)
+        if not tags:
+            return
+        self._deliver(tags)
+        if self.shared:
+            self._record(tags)
+
+    def poll(self):
+        """Применяет теги, записанные другими воркерами (не чаще poll_seconds)"""
+        now = time.monotonic()
+        if now - self._polled_at < self.poll_seconds or not self._lock.acquire(blocking=False):
+            return
+        try:
+            stale = self._last_id is not None and now - self._polled_at > RETENTION.total_seconds()
+            self._polled_at = now
+            table = _journal_table()
+            with db.engine.connect() as conn:
+                max_id = conn.execute(select(func.max(table.c.id))).scalar() or 0
+                if self._last_id is None or stale or max_id < self._last_id:
+                    # Первый опрос, журнал мог быть очищен с прошлого опроса или БД восстановлена из копии;
+                    # после неудачных опросов неизвестно, какие теги пропущены
+                    if self._last_id is not None or self._poll_failed:
+                        self._deliver({ALL})
+                    self._last_id = max_id
+                    self._set_failed(False)
+                    return
+                rows = []
+                if max_id > self._last_id:
+                    rows = conn.execute(
+                        select(table.c.id, table.c.tag, table.c.origin)
+                        .where(table.c.id > self._last_id, table.c.id <= max_id)
+                        .order_by(table.c.id)
+                    ).all()
+            self._last_id = max_id
+            self._set_failed(False)
+            tags = {row.tag for row in rows if row.origin != self.origin}
+            if tags:
+                self._deliver(tags)
+        except Exception as e:
+            # Таблицы нет, пока не применена миграция: сообщаем один раз
+            if not self._poll_failed:
+                logger.warning(f"Не удалось прочитать журнал сброса кэшей: {e}")
+            self._set_failed(True)
+        finally:
+            self._lock.release()
+
+    def _set_failed(self, failed):
+        if self._poll_failed and not failed:
+            logger.info("Журнал сброса кэшей снова читается")
+        self._poll_failed = failed
+
+    def _deliver(self, tags):
+        for patterns, callback in self._subscribers:
+            matched = tags if ALL in tags else {tag for tag in tags if _matches(tag, patterns)}
+            if not matched:
+                continue
+            try:
+                callback({ALL} if ALL in tags else matched)
+            except Exception as e:
+                logger.error(f"Ошибка сброса кэша по тегам {sorted(matched)}: {e}")
+
+    def _record(self, tags):
+        table = _journal_table()
+        now = datetime.utcnow()
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(insert(table), [
+                    {'tag': tag[:200], 'origin': self.origin, 'created_at': now} for tag in sorted(tags)
+                ])
+                if time.monotonic() - self._pruned_at > PRUNE_INTERVAL_SECONDS:
+                    self._pruned_at = time.monotonic()
+                    conn.execute(delete(table).where(table.c.created_at < now - RETENTION))
+        except Exception as e:
+            logger.warning(f"Не удалось записать теги сброса кэшей {sorted(tags)}: {e}")
+
+
+def _journal_table():
+    # Lazy import to avoid circular imports at module load time
+    from models.models import CacheInvalidation
+
+    return CacheInvalidation.__table__
+
+
+def _matches(tag, patterns):
+    for pattern in patterns:
+        if pattern == tag or (pattern.endswith('*') and tag.startswith(pattern[:-1])):
+            return True
+    return False
+
+
+# ------------------------------------------------------------------ разделы
+
+
+def section_form_data(text):
+    """form_data из InfoSection.text ({} для пустого или некорректного JSON)"""
+    try:
+        data = json.loads(text) if text else {}
+    except (TypeError, ValueError):
+        return {}
+    form_data = data.get('form_data') if isinstance(data, dict) else None
+    return form_data if isinstance(form_data, dict) else {}
+
+
+def parent_endpoint(form_data):
+    """endpoint родителя из form_data.parent ('/sidebar/x' или 'x'); None без родителя"""
+    parent = form_data.get('parent')
+    if not isinstance(parent, str) or not parent.strip():
+        return None
+    return parent.strip().rstrip('/').rsplit('/', 1)[-1] or None
+
+
+def is_menu_section(section):
+    """Раздел входит в боковое меню (app.inject_sidebar_sections)"""
+    return bool(section.url and section.url.startswith('/sidebar/')) or section.endpoint == 'food'
+
+
+def menu_changed(section, is_new_or_deleted):
+    """Изменилось ли дерево бокового меню (вызывать в хуках flush, пока доступна история атрибутов)"""
+    if not is_menu_section(section):
+        history = inspect(section).attrs.url.history
+        old_url = history.deleted[0] if history.deleted else None
+        # Раздел мог уйти из /sidebar/
+        return bool(old_url and old_url.startswith('/sidebar/'))
+    if is_new_or_deleted:
+        return True
+    state = inspect(section)
+    if state.attrs.title.history.has_changes() or state.attrs.url.history.has_changes():
+        return True
+    history = state.attrs.text.history
+    if not history.has_changes():
+        return False
+    old = section_form_data(history.deleted[0] if history.deleted else None)
+    new = section_form_data(section.text)
+    return any(old.get(key) != new.get(key) for key in MENU_FORM_KEYS)
+
+
+def _section_tags(section, kind):
+    tags = {'sections'}
+    state = inspect(section)
+    form_data = section_form_data(section.text)
+    endpoints = {section.endpoint, parent_endpoint(form_data)}
+    if kind == 'update':
+        endpoint_history = state.attrs.endpoint.history
+        text_history = state.attrs.text.history
+        endpoints.update(endpoint_history.deleted or ())
+        if text_history.deleted:
+            endpoints.add(parent_endpoint(section_form_data(text_history.deleted[0])))
+    tags.update(f'section:{endpoint}' for endpoint in endpoints if endpoint)
+    if menu_changed(section, kind != 'update'):
+        tags.add('menu')
+    return tags
+
+
+# ------------------------------------------------------------------ хуки
+
+
+def _keep_history(target, value, oldvalue, initiator):
+    """Пустой обработчик 'set': нужен только ради active_history"""
+
+
+def _register_hooks(bus):
+    # Lazy import to avoid circular imports at module load time
+    from info.models import InfoSection
+    from models.models import News, Announcement, File, InfoFile, PageContent
+
+    if getattr(bus, '_hooks_registered', False):
+        return
+    bus._hooks_registered = True
+
+    # Прежние значения нужны хукам даже после коммита (объект истек): грузятся при присваивании
+    for attr in (InfoSection.endpoint, InfoSection.url, InfoSection.title, InfoSection.text):
+        event.listen(attr, 'set', _keep_history, active_history=True)
+
+    def _collect(tags_for, kind):
+        def listener(mapper, connection, target):
+            session = object_session(target)
+            if session is not None:
+                session.info.setdefault(_TAGS_KEY, set()).update(tags_for(target, kind))
+        return listener
+
+    def _content_tags(prefix):
+        return lambda item, kind: {prefix, f'{prefix}:{item.id}'}
+
+    def _file_tags(item, kind):
+        tags = set()
+        if item.news_id:
+            tags |= {'news', f'news:{item.news_id}'}
+        if item.announcement_id:
+            tags |= {'announcements', f'announcements:{item.announcement_id}'}
+        return tags
+
+    hooks = (
+        (InfoSection, _section_tags),
+        (InfoFile, lambda item, kind: {f'section:{item.section_endpoint}'}),
+        (News, _content_tags('news')),
+        (Announcement, _content_tags('announcements')),
+        (File, _file_tags),
+        (PageContent, lambda item, kind: {f'page:{item.page_key}'}),
+    )
+    for model, tags_for in hooks:
+        for kind in ('insert', 'update', 'delete'):
+            event.listen(model, f'after_{kind}', _collect(tags_for, kind))
+
+    @event.listens_for(RoutingSession, 'after_commit')
+    def _publish_after_commit(session):
+        tags = session.info.pop(_TAGS_KEY, None)
+        if tags:
+            bus.publish(tags)
+
+    @event.listens_for(RoutingSession, 'after_rollback')
+    def _forget_after_rollback(session):
+        session.info.pop(_TAGS_KEY, None)
+
+
+invalidation = InvalidationBus()
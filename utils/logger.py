@@ -1,59 +1,211 @@
 """
 Централизованная система логирования
+
+Обработчики логгера не пишут на диск в потоке запроса: QueueHandler кладет
+запись в очередь, а файл (RotatingFileHandler) и консоль пишет отдельный
+поток QueueListener. Записи ниже уровня логгера отбрасываются до
+форматирования, поэтому сообщения пишутся в стиле %:
+
+    logger = get_logger(__name__)       # 'site_junona.<модуль>'
+    logger.debug('Удаление файла %s из раздела %s', filename, section_name)
+
+Настройки (config.py, применяются в init_app):
+    LOG_LEVEL           общий уровень ('INFO')
+    LOG_LEVELS          уровни модулей: 'file_manager=WARNING,news.routes=DEBUG'
+    LOG_FORMAT          'text' или 'json' (одна JSON-строка на запись)
+    LOG_SAMPLE_RATES    доля DEBUG-записей шумных модулей: 'info.routes=0.05'
 """
 
+import atexit
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+
+ROOT_LOGGER = 'site_junona'
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Стандартные атрибуты LogRecord: все остальные (extra=...) попадают в JSON
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'taskName'}
+
+# Очереди и потоки записи: логгер -> (QueueHandler, QueueListener)
+_pipelines = {}
+
+
+class JsonFormatter(logging.Formatter):
+    """Запись лога одной JSON-строкой: время, уровень, логгер, сообщение и поля extra"""
+
+    def format(self, record):
+        data = {
+            'time': self.formatTime(record, self.datefmt),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                data[key] = value
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Пропускает только долю DEBUG-записей модулей из rates (остальные уровни — все)"""
 
+    def __init__(self, rates=None):
+        super().__init__()
+        self.set_rates(rates or {})
 
-def setup_logger(name='site_junona', log_file='logs/app.log', level=logging.INFO):
+    def set_rates(self, rates):
+        self.rates = {_qualified_name(name): float(rate) for name, rate in rates.items()}
+        self._by_logger = {}
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or not self.rates:
+            return True
+        rate = self._by_logger.get(record.name)
+        if rate is None:
+            rate = self._rate_for(record.name)
+            self._by_logger[record.name] = rate
+        return rate >= 1 or random.random() < rate
+
+    def _rate_for(self, name):
+        # Самый длинный совпавший префикс: 'site_junona.info' действует и на 'site_junona.info.routes'
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition('.')[0]
+        return 1.0
+
+
+def setup_logger(name=ROOT_LOGGER, log_file='logs/app.log', level=logging.INFO):
     """
     Настраивает и возвращает логгер
-    
+
     Args:
         name: Имя логгера
         log_file: Путь к файлу лога
         level: Уровень логирования
-    
+
     Returns:
         Настроенный логгер
     """
     logger = logging.getLogger(name)
-    
+
     if logger.handlers:
         return logger
-    
+
     logger.setLevel(level)
-    
+
     log_dir = os.path.dirname(log_file)
     if log_dir and not os.path.exists(log_dir):
         os.makedirs(log_dir, exist_ok=True)
-    
+
     file_handler = RotatingFileHandler(
         log_file,
         maxBytes=10 * 1024 * 1024,
         backupCount=5,
         encoding='utf-8'
     )
-    file_handler.setLevel(level)
-    
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(level)
-    
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
+
+    formatter = logging.Formatter(TEXT_FORMAT, datefmt=DATE_FORMAT)
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
-    
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
+
+    # Уровни задаются логгерам (в том числе по модулям), обработчики пропускают все
+    queue_handler = QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(SamplingFilter())
+    listener = QueueListener(queue_handler.queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+
+    logger.addHandler(queue_handler)
+    _pipelines[name] = (queue_handler, listener)
     return logger
 
 
-logger = setup_logger()
+def get_logger(module_name):
+    """Дочерний логгер модуля: записи идут в обработчики основного логгера"""
+    return logging.getLogger(_qualified_name(module_name))
+
+
+def init_app(app):
+    """Применяет уровни, формат и выборку DEBUG-записей из конфигурации"""
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.setLevel(_level(app.config.get('LOG_LEVEL', 'INFO')))
+    for module_name, level in _parse_pairs(app.config.get('LOG_LEVELS')).items():
+        get_logger(module_name).setLevel(_level(level))
+
+    pipeline = _pipelines.get(ROOT_LOGGER)
+    if pipeline is None:
+        return
+    queue_handler, listener = pipeline
+    if str(app.config.get('LOG_FORMAT', 'text')).lower() == 'json':
+        formatter = JsonFormatter(datefmt=DATE_FORMAT)
+        for handler in listener.handlers:
+            handler.setFormatter(formatter)
+
+    rates = {}
+    for module_name, rate in _parse_pairs(app.config.get('LOG_SAMPLE_RATES')).items():
+        try:
+            rates[module_name] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            logger.warning('Некорректная доля выборки логов для %s: %r', module_name, rate)
+    for log_filter in queue_handler.filters:
+        if isinstance(log_filter, SamplingFilter):
+            log_filter.set_rates(rates)
+
+
+def _qualified_name(module_name):
+    if module_name == ROOT_LOGGER or module_name.startswith(f'{ROOT_LOGGER}.'):
+        return module_name
+    return f'{ROOT_LOGGER}.{module_name}'
+
 
+def _level(value):
+    """Уровень по имени ('debug', 'WARNING') или числу; неизвестное имя — INFO"""
+    if isinstance(value, int):
+        return value
+    level = logging.getLevelName(str(value).strip().upper())
+    return level if isinstance(level, int) else logging.INFO
+
+
+def _parse_pairs(value):
+    """'a=1,b=2' (или словарь) -> {'a': '1', 'b': '2'}"""
+    if isinstance(value, dict):
+        return dict(value)
+    pairs = {}
+    for item in (value or '').split(','):
+        key, sep, val = item.partition('=')
+        if sep and key.strip() and val.strip():
+            pairs[key.strip()] = val.strip()
+    return pairs
+
+
+def _restart_listeners():
+    """После fork (gunicorn --preload) поток записи в дочернем процессе не работает: запускаем заново"""
+    for queue_handler, listener in _pipelines.values():
+        # Очередь родителя могла быть захвачена в момент fork
+        queue_handler.queue = listener.queue = queue.SimpleQueue()
+        listener._thread = None
+        listener.start()
+
+
+def _stop_listeners():
+    """Дописывает очередь перед выходом процесса"""
+    for _queue_handler, listener in _pipelines.values():
+        if listener._thread is not None:
+            listener.stop()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_listeners)
+atexit.register(_stop_listeners)
+
+
+logger = setup_logger()
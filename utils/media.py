@@ -0,0 +1,172 @@
+"""
+Неизменяемые URL загруженных файлов: /media/<sha256>/<имя>
+
+Файл адресуется хэшем содержимого, поэтому ответ кэшируется браузером и
+прокси навсегда (Cache-Control: public, max-age=31536000, immutable): замена
+файла дает новый хэш и новый URL. Содержимое берется из blob-хранилища
+(utils/blob_store.py), а если его там нет — из InfoFile с тем же content_hash
+(файл на диске или file_data в БД).
+
+Старые URL (/news/download/..., /info/download_file/..., /food/...) остаются
+рабочими именами файлов: обработчик находит файл как раньше и отвечает
+302 на /media/... Сам редирект не кэшируется, поэтому после замены файла
+старый URL сразу ведет на новое содержимое.
+"""
+
+import mimetypes
+import os
+import re
+import threading
+import urllib.parse
+from io import BytesIO
+
+from flask import abort, redirect, send_file, url_for
+from sqlalchemy.orm import load_only
+
+from utils.logger import logger
+
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+_SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+_EXT_RE = re.compile(r'^\.[0-9A-Za-z]{1,10}$')
+
+# Хэши файлов без content_hash: (путь, mtime_ns, размер) -> sha256
+_HASH_CACHE_SIZE = 4096
+_hash_cache = {}
+_hash_lock = threading.Lock()
+
+
+def init_app(app):
+    """Регистрирует маршрут /media/<sha256>/<имя>"""
+    app.add_url_rule('/media/<sha256>/<path:name>', 'media_file', serve_media)
+
+
+def media_url(sha256, name):
+    """URL файла по хэшу содержимого"""
+    return url_for('media_file', sha256=sha256, name=name)
+
+
+def media_redirect(name, file_path=None, file_data=None, content_hash=None):
+    """
+    Ответ 302 на /media/... для файла, найденного старым обработчиком скачивания.
+
+    Args:
+        name: Имя файла для скачивания (последний сегмент нового URL)
+        file_path: Путь к файлу на диске
+        file_data: Содержимое файла из БД (InfoFile.file_data)
+        content_hash: InfoFile.content_hash, если известен
+
+    Returns:
+        Ответ Flask или None, если файл не удалось поместить в хранилище
+        (тогда обработчик отдает файл сам)
+    """
+    # Lazy import to avoid circular imports at module load time
+    from utils.blob_store import blob_path_for, store_existing_file, store_upload
+
+    ext = _name_ext(name)
+    try:
+        sha256 = content_hash
+        if sha256 and not file_data and not os.path.exists(blob_path_for(sha256, ext)):
+            # Хэш из БД без blob-а: /media найдет файл по InfoFile только если путь в записи верен
+            sha256 = None
+        if not sha256 and file_path:
+            sha256 = _file_hash(file_path)
+            if not os.path.exists(blob_path_for(sha256, ext)):
+                store_existing_file(file_path, sha256=sha256)
+        elif not sha256 and file_data is not None:
+            sha256, _blob_path, _size, _is_new = store_upload(BytesIO(file_data), ext)
+        if not sha256:
+            return None
+    except OSError as e:
+        logger.warning(f"Не удалось получить неизменяемый URL для {name}: {e}")
+        return None
+
+    response = redirect(media_url(sha256, name), code=302)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def serve_media(sha256, name):
+    """Отдает файл по хэшу содержимого с бессрочным кэшированием"""
+    # Lazy import to avoid circular imports at module load time
+    from utils.blob_store import blob_path_for
+
+    if not _SHA256_RE.match(sha256):
+        abort(404)
+
+    ext = _name_ext(name)
+    source = None
+    blob_path = blob_path_for(sha256, ext)
+    if os.path.isfile(blob_path):
+        source = blob_path
+    else:
+        source = _info_file_source(sha256)
+    if source is None:
+        abort(404)
+
+    mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    # Изображения отдаются inline (для <img>), остальное — скачиванием, как в старых обработчиках
+    is_inline = mimetype.startswith('image/')
+    if isinstance(source, bytes):
+        source = BytesIO(source)
+    response = send_file(
+        source,
+        mimetype=mimetype,
+        as_attachment=not is_inline,
+        download_name=name,
+        etag=sha256,
+        conditional=True,
+        max_age=31536000,
+    )
+    encoded_name = urllib.parse.quote(name.encode('utf-8'))
+    disposition = 'inline' if is_inline else 'attachment'
+    response.headers['Content-Disposition'] = f"{disposition}; filename*=UTF-8''{encoded_name}"
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    return response
+
+
+def _name_ext(name):
+    """Расширение имени файла (для пути blob-а); недопустимое расширение отбрасывается"""
+    ext = os.path.splitext(name or '')[1]
+    return ext if _EXT_RE.match(ext) else ''
+
+
+def _info_file_source(sha256):
+    """Путь или содержимое InfoFile с данным content_hash (None, если такого файла нет)"""
+    # Lazy import to avoid circular imports at module load time
+    from models.models import InfoFile
+
+    rows = (InfoFile.query
+            .options(load_only(InfoFile.id, InfoFile.file_path, InfoFile.stored_in_db))
+            .filter(InfoFile.content_hash == sha256)
+            .order_by(InfoFile.id)
+            .all())
+    for row in rows:
+        if row.file_path and os.path.isfile(row.file_path):
+            return row.file_path
+    for row in rows:
+        if row.stored_in_db:
+            # file_data загружается только для одной записи
+            data = InfoFile.query.with_entities(InfoFile.file_data).filter_by(id=row.id).scalar()
+            if data is not None:
+                return data
+    return None
+
+
+def _file_hash(file_path):
+    """SHA-256 файла с кэшем по (путь, mtime, размер)"""
+    # Lazy import to avoid circular imports at module load time
+    from utils.blob_store import file_sha256
+
+    st = os.stat(file_path)
+    key = (os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+    sha256 = _hash_cache.get(key)
+    if sha256 is None:
+        sha256 = file_sha256(file_path)
+        with _hash_lock:
+            if len(_hash_cache) >= _HASH_CACHE_SIZE:
+                _hash_cache.clear()
+            _hash_cache[key] = sha256
+    return sha256
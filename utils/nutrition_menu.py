@@ -0,0 +1,203 @@
+"""
+Меню питания: разбор файлов YYYY-MM-DD-sm.xlsx и хранение блюд в БД
+
+Файл разбирается один раз при загрузке (upload_nutrition_menu) или командой
+"flask --app app nutrition-parse-menus" для уже загруженных файлов. Таблица
+меню — типовая форма: шапка со строкой "Школа", затем строка заголовков
+("Прием пищи", "Раздел", "№ рец.", "Блюдо", "Выход, г", "Цена", "Калорийность",
+"Белки", "Жиры", "Углеводы") и строки блюд. Прием пищи указывается только в
+первой строке группы и переносится на следующие.
+"""
+
+import re
+from datetime import date, datetime
+
+from sqlalchemy import event
+
+from database import db
+from utils.logger import logger
+from utils.xlsx_reader import read_rows, XlsxReadError
+
+
+MENU_FILENAME_RE = re.compile(r'^(\d{4})-(\d{2})-(\d{2})')
+
+# Сколько строк от начала листа просматривать в поисках заголовков
+_HEADER_SCAN_ROWS = 30
+
+# Поле -> подстроки заголовка колонки (в нижнем регистре, ё заменена на е)
+_COLUMNS = (
+    ('meal', ('прием пищи',)),
+    ('section', ('раздел',)),
+    ('recipe', ('рец',)),
+    ('dish', ('блюдо',)),
+    ('weight', ('выход',)),
+    ('price', ('цена',)),
+    ('calories', ('калорийн', 'ккал')),
+    ('proteins', ('белки',)),
+    ('fats', ('жиры',)),
+    ('carbohydrates', ('углевод',)),
+)
+_NUMERIC_FIELDS = ('price', 'calories', 'proteins', 'fats', 'carbohydrates')
+
+
+class MenuParseError(ValueError):
+    """Файл меню не удалось разобрать"""
+
+
+def menu_date_from_filename(filename):
+    """Дата меню из имени файла YYYY-MM-DD-*.xlsx или None"""
+    match = MENU_FILENAME_RE.match(filename or '')
+    if not match:
+        return None
+    try:
+        return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+    except ValueError:
+        return None
+
+
+def _normalize_header(value):
+    return re.sub(r'\s+', ' ', str(value)).strip().lower().replace('ё', 'е')
+
+
+def _text(value):
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = re.sub(r'\s+', ' ', str(value)).strip()
+    return text or None
+
+
+def _number(value):
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).replace('\xa0', '').replace(' ', '').replace(',', '.'))
+    except ValueError:
+        return None
+
+
+def _find_header(rows):
+    """Номер строки заголовков и колонки полей"""
+    for index, row in enumerate(rows[:_HEADER_SCAN_ROWS]):
+        columns = {}
+        for column, value in enumerate(row):
+            if not isinstance(value, str):
+                continue
+            header = _normalize_header(value)
+            for field, needles in _COLUMNS:
+                if field not in columns and any(needle in header for needle in needles):
+                    columns[field] = column
+                    break
+        if 'dish' in columns:
+            return index, columns
+    raise MenuParseError('Не найдена строка заголовков с колонкой "Блюдо"')
+
+
+def _find_school(rows, header_index):
+    for row in rows[:header_index]:
+        cells = [value for value in row if value is not None]
+        if len(cells) >= 2 and isinstance(cells[0], str) and _normalize_header(cells[0]).startswith('школа'):
+            return _text(cells[1])
+    return None
+
+
+def parse_menu(data):
+    """
+    Разбирает файл меню.
+
+    Args:
+        data: Содержимое .xlsx (bytes или файловый объект)
+
+    Returns:
+        (school, items): название организации (или None) и список словарей
+        с полями NutritionMenuItem в порядке строк файла
+    """
+    try:
+        rows = read_rows(data)
+    except XlsxReadError as e:
+        raise MenuParseError(str(e)) from e
+
+    header_index, columns = _find_header(rows)
+    school = _find_school(rows, header_index)
+
+    def cell(row, field):
+        column = columns.get(field)
+        return row[column] if column is not None and column < len(row) else None
+
+    items = []
+    meal = None
+    for row in rows[header_index + 1:]:
+        meal = _text(cell(row, 'meal')) or meal
+        dish = _text(cell(row, 'dish'))
+        if not dish:
+            continue
+        item = {
+            'position': len(items),
+            'meal': meal,
+            'section': _text(cell(row, 'section')),
+            'recipe': _text(cell(row, 'recipe')),
+            'dish': dish[:500],
+            'weight': (_text(cell(row, 'weight')) or '')[:50] or None,
+        }
+        for field in _NUMERIC_FIELDS:
+            item[field] = _number(cell(row, field))
+        items.append(item)
+
+    if not items:
+        raise MenuParseError('В файле меню нет блюд')
+    return school, items
+
+
+def import_menu(filename, data, menu_date=None):
+    """
+    Разбирает файл и сохраняет блюда (заменяя прежнее меню на эту дату).
+
+    Коммит выполняет вызывающий код.
+
+    Returns:
+        NutritionMenu
+    """
+    # Lazy import to avoid circular imports at module load time
+    from models.models import NutritionMenu, NutritionMenuItem
+
+    menu_date = menu_date or menu_date_from_filename(filename)
+    if menu_date is None:
+        raise MenuParseError('В имени файла нет даты YYYY-MM-DD')
+
+    school, items = parse_menu(data)
+
+    menu = NutritionMenu.query.filter_by(menu_date=menu_date).first()
+    if menu is None:
+        menu = NutritionMenu(menu_date=menu_date)
+        db.session.add(menu)
+    menu.filename = filename
+    menu.school = school
+    menu.parsed_at = datetime.utcnow()
+    menu.items = [NutritionMenuItem(**item) for item in items]
+    return menu
+
+
+def init_app(app):
+    """Удаление разобранного меню вместе с файлом меню (InfoFile)"""
+    # Lazy import to avoid circular imports at module load time
+    from models.models import InfoFile, NutritionMenu, NutritionMenuItem
+
+    if getattr(init_app, '_registered', False):
+        return
+    init_app._registered = True
+
+    menus = NutritionMenu.__table__
+    menu_items = NutritionMenuItem.__table__
+
+    @event.listens_for(InfoFile, 'after_delete')
+    def _delete_parsed_menu(mapper, connection, target):
+        if target.field_name != 'menu_file' or menu_date_from_filename(target.filename) is None:
+            return
+        menu_ids = db.select(menus.c.id).where(menus.c.filename == target.filename)
+        connection.execute(menu_items.delete().where(menu_items.c.menu_id.in_(menu_ids)))
+        result = connection.execute(menus.delete().where(menus.c.filename == target.filename))
+        if result.rowcount:
+            logger.info(f'Удалено разобранное меню питания {target.filename}')
@@ -0,0 +1,103 @@
+"""
+Глобальные настройки сайта для шаблонов
+
+Настройки берутся из form_data раздела 'main' и загружаются один раз на
+процесс. Кэш сбрасывается по тегу 'section:main' шины utils/invalidation.py
+(в других воркерах gunicorn — при следующем опросе журнала), а
+SITE_SETTINGS_TTL_SECONDS ограничивает срок жизни кэша, если шина отключена.
+
+Значения доступны в шаблонах как ленивые глобальные переменные (LocalProxy):
+ни запрос к БД, ни создание LoginForm не выполняются, пока шаблон не
+обратится к переменной. JSON-ответы и страницы ошибок ничего не платят.
+"""
+
+import json
+import threading
+import time
+
+from flask import g
+from werkzeug.local import LocalProxy
+
+from database import db
+from utils.invalidation import invalidation
+from utils.logger import logger
+
+
+SETTINGS_SECTION = 'main'
+DEFAULT_TTL_SECONDS = 60
+
+
+class SiteSettings:
+    """Кэш form_data раздела 'main'"""
+
+    def __init__(self, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._data = None
+        self._loaded_at = 0.0
+
+    def init_app(self, app):
+        """Регистрирует ленивые глобальные переменные шаблонов и сброс кэша"""
+        self.ttl_seconds = app.config.get('SITE_SETTINGS_TTL_SECONDS', self.ttl_seconds)
+        app.jinja_env.globals.update(
+            visually_impaired_url=LocalProxy(lambda: self.get('visually_impaired_version')),
+            login_form=LocalProxy(get_login_form),
+        )
+        invalidation.subscribe((f'section:{SETTINGS_SECTION}',), lambda tags: self.invalidate())
+
+    def get(self, key, default=''):
+        """Значение поля раздела 'main' (пустые значения заменяются default)"""
+        return self.all().get(key) or default
+
+    def all(self):
+        """Все поля form_data раздела 'main'"""
+        data = self._data
+        if data is not None and time.monotonic() - self._loaded_at < self.ttl_seconds:
+            return data
+        with self._lock:
+            if self._data is not None and time.monotonic() - self._loaded_at < self.ttl_seconds:
+                return self._data
+            data = _load_settings()
+            if data is None:
+                return {}
+            self._data = data
+            self._loaded_at = time.monotonic()
+            return data
+
+    def invalidate(self):
+        """Сбрасывает кэш (следующее обращение перечитает раздел из БД)"""
+        self._data = None
+
+
+def _load_settings():
+    """Читает form_data раздела 'main'; None — если БД недоступна"""
+    # Lazy import to avoid circular imports at module load time
+    from info.models import InfoSection
+
+    try:
+        text = db.session.query(InfoSection.text).filter_by(endpoint=SETTINGS_SECTION).scalar()
+    except Exception as e:
+        logger.warning(f'Не удалось загрузить настройки сайта: {e}')
+        return None
+
+    if not text:
+        return {}
+    try:
+        text_data = json.loads(text)
+    except (TypeError, ValueError):
+        return {}
+    if isinstance(text_data, dict) and isinstance(text_data.get('form_data'), dict):
+        return text_data['form_data']
+    return {}
+
+
+def get_login_form():
+    """LoginForm текущего запроса (создается при первом обращении из шаблона)"""
+    if 'login_form' not in g:
+        # Lazy import to avoid circular imports at module load time
+        from users.forms import LoginForm
+        g.login_form = LoginForm()
+    return g.login_form
+
+
+site_settings = SiteSettings()
@@ -0,0 +1,505 @@
+"""
+Статический экспорт публичных страниц («заморозка»)
+
+Публичные страницы (/, /news, /announcements, /sveden/*, /sidebar/*, /p/*)
+меняются только при сохранении редактором. Экспорт отрисовывает их
+анонимными GET-запросами через test_client и пишет в каталог
+STATIC_EXPORT_DIR вместе с копией static/ (файлы — жесткие ссылки):
+
+    <каталог>/index.html
+    <каталог>/news/index.html, <каталог>/news/12/index.html
+    <каталог>/sveden/documents/index.html
+    <каталог>/static/...               # CSS, JS, static/uploads (без blobs/)
+    <каталог>/.export-manifest.json    # url -> SHA-256 страницы
+
+nginx отдает каталог напрямую, а все остальное (админка, API, скачивания,
+/media) проксирует в Flask. try_files не учитывает строку запроса, поэтому
+запросы с параметрами (?modal=true, ?month=&page=) тоже уходят в Flask:
+
+    location / {
+        error_page 418 = @flask;
+        if ($args) { return 418; }
+        try_files $uri $uri/index.html @flask;
+    }
+
+После коммита, изменившего раздел, новость, объявление, их файлы или
+контент страниц, перерисовываются только затронутые страницы: сам раздел и
+его родитель, списки и главная для новостей. Изменение меню бокового
+сайдбара (название, адрес, parent/order/show_in_menu раздела /sidebar/*) или
+настроек раздела 'main' затрагивает все страницы — меню есть на каждой.
+Страница без изменений не перезаписывается. static/ целиком сверяется только
+при полном экспорте; инкрементальный добавляет лишь файлы /static/..., на
+которые ссылаются перерисованные страницы. Экспорты в один каталог выполняются
+по одному и между воркерами gunicorn (flock на <каталог>/.export.lock).
+
+Отложенная публикация новостей не вызывает коммита: при использовании
+отложенных дат "flask --app app freeze" стоит запускать по расписанию.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import urllib.parse
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: экспорты упорядочиваются только внутри процесса
+    fcntl = None
+
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import object_session
+
+from database import db, RoutingSession
+from utils.dish_archive import ARCHIVE_ENDPOINT
+from utils.invalidation import menu_changed, parent_endpoint, section_form_data
+from utils.logger import logger
+
+
+MANIFEST_NAME = '.export-manifest.json'
+LOCK_NAME = '.export.lock'
+DEFAULT_DELAY_SECONDS = 2
+
+# Страницы без записей в БД (контент — PageContent и шаблоны)
+STATIC_PAGES = ('/', '/news/', '/announcements/', '/contacts', '/info', '/about', '/sitemap')
+
+# Префиксы URL разделов InfoSection, которые экспортируются
+SECTION_PREFIXES = ('/sveden/', '/sidebar/', '/p/', '/info/')
+
+# Разделы, изменение которых затрагивает все страницы (настройки сайта в base.html)
+SITE_WIDE_ENDPOINTS = ('main',)
+
+# Разделы, которые всегда отдает Flask: страница зависит от строки запроса, а
+# данные меняются не через InfoSection (архив блюд: таблица DailyDish, в том
+# числе массовые удаления, которые не вызывают хуков маппера)
+DYNAMIC_ENDPOINTS = (ARCHIVE_ENDPOINT,)
+
+# Флаг в session.info: изменения транзакции, еще не переданные экспорту
+_CHANGES_KEY = 'static_export_changes'
+
+# Ссылки страниц на файлы static/ (src, href, url(...))
+_STATIC_REF_RE = re.compile(rb'["\'(](/static/[^"\'()?#\s<>]+)')
+
+
+class StaticExporter:
+    """Экспорт публичных страниц в каталог и его инкрементальное обновление"""
+
+    def __init__(self, delay_seconds=DEFAULT_DELAY_SECONDS):
+        self.delay_seconds = delay_seconds
+        self.export_dir = None
+        self.auto = False
+        self._app = None
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._pending = None
+        self._timer = None
+        self.last_run = None
+
+    def init_app(self, app):
+        """Читает настройки; при STATIC_EXPORT_AUTO подписывается на коммиты"""
+        self._app = app
+        self.export_dir = app.config.get('STATIC_EXPORT_DIR') or None
+        self.delay_seconds = app.config.get('STATIC_EXPORT_DELAY_SECONDS', self.delay_seconds)
+        self.auto = bool(self.export_dir) and app.config.get('STATIC_EXPORT_AUTO', True)
+        if self.auto:
+            _register_change_tracking(self)
+
+    # ------------------------------------------------------------ экспорт
+
+    def export_all(self, export_dir=None):
+        """Полный экспорт: все публичные страницы, удаление лишних, синхронизация static/"""
+        export_dir = export_dir or self.export_dir
+        with self._exclusive(export_dir):
+            manifest = _load_manifest(export_dir)
+            urls = self.public_urls()
+            stats = self._render(export_dir, urls, manifest)
+            for url in sorted(set(manifest) - set(urls)):
+                _remove_page(export_dir, url)
+                manifest.pop(url, None)
+                stats['removed'] += 1
+            stats.update(_sync_static(self._app.static_folder, os.path.join(export_dir, 'static')))
+            _save_manifest(export_dir, manifest)
+            return self._finish(stats)
+
+    def export_urls(self, urls, removed=(), export_dir=None):
+        """
+        Инкрементальный экспорт: перерисовывает urls и удаляет страницы removed.
+
+        Из static/ копируются только файлы, на которые ссылаются перерисованные
+        страницы; удаленные медиафайлы убирает следующий полный экспорт.
+        """
+        export_dir = export_dir or self.export_dir
+        with self._exclusive(export_dir):
+            manifest = _load_manifest(export_dir)
+            public = set(self.public_urls())
+            static_refs = set()
+            stats = self._render(export_dir, [url for url in urls if url in public], manifest, static_refs)
+            for url in sorted(set(removed) | {url for url in urls if url not in public}):
+                if url in manifest or os.path.exists(_page_path(export_dir, url) or ''):
+                    _remove_page(export_dir, url)
+                    manifest.pop(url, None)
+                    stats['removed'] += 1
+            stats.update(_link_static(self._app.static_folder, os.path.join(export_dir, 'static'), static_refs))
+            _save_manifest(export_dir, manifest)
+            return self._finish(stats)
+
+    def section_urls(self, endpoints):
+        """URL разделов с данными endpoint и их родителей (для экспорта отдельных разделов)"""
+        # Lazy import to avoid circular imports at module load time
+        from info.models import InfoSection
+
+        urls = set()
+        for section in InfoSection.query.filter(InfoSection.endpoint.in_(list(endpoints))):
+            urls |= section_pages(section)[0]
+        return urls
+
+    def public_urls(self):
+        """Все экспортируемые URL: статические страницы, опубликованные материалы, разделы"""
+        # Lazy import to avoid circular imports at module load time
+        from info.models import InfoSection
+        from models.models import News, Announcement
+
+        urls = list(STATIC_PAGES)
+        now = datetime.utcnow()
+        for model, prefix in ((News, '/news'), (Announcement, '/announcements')):
+            published_dt = func.coalesce(model.publication_date, model.created_at)
+            ids = (db.session.query(model.id)
+                   .filter(model.is_published.is_(True), published_dt <= now)
+                   .order_by(model.id))
+            urls.extend(f'{prefix}/{item_id}' for (item_id,) in ids)
+        section_urls = (db.session.query(InfoSection.url)
+                        .filter(InfoSection.endpoint.notin_(DYNAMIC_ENDPOINTS))
+                        .order_by(InfoSection.id))
+        urls.extend(url for (url,) in section_urls if url and url.startswith(SECTION_PREFIXES))
+        return list(dict.fromkeys(urls))
+
+    def _render(self, export_dir, urls, manifest, static_refs=None):
+        stats = {'pages': 0, 'written': 0, 'unchanged': 0, 'removed': 0, 'errors': 0}
+        client = self._app.test_client()
+        for url in urls:
+            path = _page_path(export_dir, url)
+            if path is None:
+                continue
+            stats['pages'] += 1
+            try:
+                response = client.get(url)
+                body = response.get_data()
+                response.close()
+            except Exception as e:
+                logger.error(f"Ошибка экспорта страницы {url}: {e}")
+                stats['errors'] += 1
+                continue
+            if response.status_code != 200 or response.mimetype != 'text/html':
+                # Редирект или ошибка: страницу отдает Flask
+                if url in manifest:
+                    _remove_page(export_dir, url)
+                    manifest.pop(url, None)
+                    stats['removed'] += 1
+                continue
+            if static_refs is not None:
+                static_refs.update(ref.decode('utf-8', 'replace') for ref in _STATIC_REF_RE.findall(body))
+            digest = hashlib.sha256(body).hexdigest()
+            if manifest.get(url) == digest and os.path.isfile(path):
+                stats['unchanged'] += 1
+                continue
+            _write_atomic(path, body)
+            manifest[url] = digest
+            stats['written'] += 1
+        return stats
+
+    @contextmanager
+    def _exclusive(self, export_dir):
+        """Блокировка экспорта: потоки процесса и (через flock) другие воркеры"""
+        with self._run_lock:
+            os.makedirs(export_dir, exist_ok=True)
+            with open(os.path.join(export_dir, LOCK_NAME), 'a') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _finish(self, stats):
+        stats['finished_at'] = datetime.utcnow().isoformat(timespec='seconds')
+        self.last_run = stats
+        logger.info(f"Статический экспорт: {stats}")
+        return stats
+
+    # ------------------------------------------------ отложенное обновление
+
+    def schedule(self, urls=(), removed=(), full=False):
+        """Ставит обновление в очередь; изменения нескольких коммитов объединяются"""
+        if not self.export_dir:
+            return
+        with self._lock:
+            pending = self._pending or {'full': False, 'urls': set(), 'removed': set()}
+            pending['full'] = pending['full'] or full
+            pending['urls'].update(urls)
+            pending['removed'].update(removed)
+            self._pending = pending
+            if self._timer is None:
+                self._start_timer()
+
+    def _start_timer(self):
+        # Вызывается под self._lock
+        self._timer = threading.Timer(self.delay_seconds, self._run_pending)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _run_pending(self):
+        with self._lock:
+            pending, self._pending = self._pending, None
+        try:
+            if pending:
+                with self._app.app_context():
+                    try:
+                        if pending['full']:
+                            self.export_all()
+                        else:
+                            self.export_urls(sorted(pending['urls']), removed=pending['removed'])
+                    finally:
+                        db.session.remove()
+        except Exception as e:
+            logger.error(f"Ошибка статического экспорта: {e}", exc_info=True)
+        finally:
+            # Таймер снимается только после экспорта: коммиты во время прогона ждут следующего
+            with self._lock:
+                self._timer = None
+                if self._pending:
+                    self._start_timer()
+
+
+# ---------------------------------------------------------------- файлы
+
+
+def _page_path(export_dir, url):
+    """Файл страницы: /a/b -> <каталог>/a/b/index.html; None для небезопасных URL"""
+    parts = [p for p in urllib.parse.unquote(url.split('?')[0]).split('/') if p]
+    if any(p in ('.', '..') or '\\' in p for p in parts):
+        return None
+    return os.path.join(export_dir, *parts, 'index.html')
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _remove_page(export_dir, url):
+    path = _page_path(export_dir, url)
+    if path is None:
+        return
+    try:
+        os.unlink(path)
+        os.rmdir(os.path.dirname(path))
+    except OSError:
+        pass
+
+
+def _load_manifest(export_dir):
+    try:
+        with open(os.path.join(export_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(export_dir, manifest):
+    data = json.dumps(manifest, ensure_ascii=False, indent=0, sort_keys=True).encode('utf-8')
+    _write_atomic(os.path.join(export_dir, MANIFEST_NAME), data)
+
+
+def _sync_static(source_root, target_root):
+    """
+    Зеркалирует static/ в каталог экспорта жесткими ссылками (копией, если ссылки
+    не поддерживаются). Неизменившиеся файлы не трогаются, удаленные — удаляются.
+    """
+    # Lazy import to avoid circular imports at module load time
+    from utils.blob_store import BLOB_DIR_NAME
+
+    stats = {'media_linked': 0, 'media_removed': 0}
+    blob_root = os.path.join(source_root, 'uploads', BLOB_DIR_NAME)
+    expected = set()
+    for dirpath, dirs, files in os.walk(source_root):
+        # blobs/ — те же файлы, что и в папках разделов
+        dirs[:] = [d for d in dirs if os.path.join(dirpath, d) != blob_root]
+        rel_dir = os.path.relpath(dirpath, source_root)
+        for name in files:
+            if name.startswith('.'):
+                continue
+            source = os.path.join(dirpath, name)
+            rel_path = os.path.normpath(os.path.join(rel_dir, name))
+            expected.add(rel_path)
+            if _link_file(source, os.path.join(target_root, rel_path)):
+                stats['media_linked'] += 1
+
+    for dirpath, dirs, files in os.walk(target_root, topdown=False):
+        for name in files:
+            rel_path = os.path.normpath(os.path.relpath(os.path.join(dirpath, name), target_root))
+            if rel_path not in expected:
+                try:
+                    os.unlink(os.path.join(dirpath, name))
+                    stats['media_removed'] += 1
+                except OSError:
+                    pass
+        if dirpath != target_root:
+            try:
+                os.rmdir(dirpath)
+            except OSError:
+                pass
+    return stats
+
+
+def _link_static(source_root, target_root, refs):
+    """Копирует в экспорт файлы static/ по ссылкам страниц ('/static/uploads/...')"""
+    # Lazy import to avoid circular imports at module load time
+    from utils.blob_store import BLOB_DIR_NAME
+
+    stats = {'media_linked': 0, 'media_removed': 0}
+    for ref in sorted(refs):
+        parts = [p for p in urllib.parse.unquote(ref[len('/static/'):]).split('/') if p]
+        if not parts or any(p in ('.', '..') or '\\' in p or p.startswith('.') for p in parts):
+            continue
+        if parts[:2] == ['uploads', BLOB_DIR_NAME]:
+            continue
+        source = os.path.join(source_root, *parts)
+        if os.path.isfile(source) and _link_file(source, os.path.join(target_root, *parts)):
+            stats['media_linked'] += 1
+    return stats
+
+
+def _link_file(source, target):
+    """Жесткая ссылка (или копия) source -> target; False, если target уже совпадает"""
+    try:
+        src_stat = os.stat(source)
+        try:
+            dst_stat = os.stat(target)
+            if os.path.samestat(src_stat, dst_stat) or (
+                    dst_stat.st_size == src_stat.st_size and dst_stat.st_mtime_ns == src_stat.st_mtime_ns):
+                return False
+        except FileNotFoundError:
+            pass
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp_path = f'{target}.{os.getpid()}.tmp'
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            shutil.copy2(source, tmp_path)
+        os.replace(tmp_path, target)
+        return True
+    except OSError as e:
+        logger.warning(f"Не удалось скопировать {source} в экспорт: {e}")
+        return False
+
+
+# ------------------------------------------------------ отслеживание изменений
+
+
+def section_pages(section, menu_updated=False):
+    """(urls, full) для сохраненного раздела: сам раздел, родитель и, при смене меню, все страницы"""
+    if menu_updated or section.endpoint in SITE_WIDE_ENDPOINTS:
+        return set(), True
+    urls = {section.url} if section.url else set()
+    parent = parent_endpoint(section_form_data(section.text))
+    if parent:
+        # Lazy import to avoid circular imports at module load time
+        from info.url_map import section_url_map
+
+        entry = section_url_map.lookup_endpoint(parent)
+        urls.add(entry[1] if entry else f'/sidebar/{parent}')
+    return urls, False
+
+
+def _record(session, urls=(), removed=(), full=False):
+    changes = session.info.setdefault(_CHANGES_KEY, {'full': False, 'urls': set(), 'removed': set()})
+    changes['full'] = changes['full'] or full
+    changes['urls'].update(urls)
+    changes['removed'].update(removed)
+
+
+def _register_change_tracking(exporter):
+    # Lazy import to avoid circular imports at module load time
+    from info.models import InfoSection
+    from models.models import News, Announcement, File, PageContent
+
+    if getattr(exporter, '_tracking_registered', False):
+        return
+    exporter._tracking_registered = True
+
+    def _section_changed(kind):
+        def listener(mapper, connection, target):
+            session = object_session(target)
+            if session is None:
+                return
+            urls, full = section_pages(target, menu_changed(target, kind != 'update'))
+            removed = set()
+            url_history = inspect(target).attrs.url.history
+            if kind == 'delete':
+                removed, urls = urls & {target.url}, urls - {target.url}
+            elif url_history.deleted and url_history.deleted[0]:
+                removed.add(url_history.deleted[0])
+            _record(session, urls, removed, full)
+        return listener
+
+    for kind in ('insert', 'update', 'delete'):
+        event.listen(InfoSection, f'after_{kind}', _section_changed(kind))
+
+    def _content_changed(prefix, kind):
+        def listener(mapper, connection, target):
+            session = object_session(target)
+            if session is None:
+                return
+            detail = f'{prefix}/{target.id}'
+            if kind == 'delete':
+                _record(session, {'/', f'{prefix}/'}, {detail})
+            else:
+                # Снятая с публикации новость удаляется из экспорта в export_urls
+                _record(session, {'/', f'{prefix}/', detail})
+        return listener
+
+    for model, prefix in ((News, '/news'), (Announcement, '/announcements')):
+        for kind in ('insert', 'update', 'delete'):
+            event.listen(model, f'after_{kind}', _content_changed(prefix, kind))
+
+    def _file_changed(mapper, connection, target):
+        session = object_session(target)
+        if session is None:
+            return
+        urls = {'/'}
+        if target.news_id:
+            urls |= {'/news/', f'/news/{target.news_id}'}
+        if target.announcement_id:
+            urls |= {'/announcements/', f'/announcements/{target.announcement_id}'}
+        _record(session, urls)
+
+    def _page_content_changed(mapper, connection, target):
+        session = object_session(target)
+        if session is not None:
+            _record(session, {'/' if target.page_key == 'index' else f'/{target.page_key}'})
+
+    for kind in ('insert', 'update', 'delete'):
+        event.listen(File, f'after_{kind}', _file_changed)
+        event.listen(PageContent, f'after_{kind}', _page_content_changed)
+
+    @event.listens_for(RoutingSession, 'after_commit')
+    def _export_after_commit(session):
+        changes = session.info.pop(_CHANGES_KEY, None)
+        if changes:
+            exporter.schedule(changes['urls'], changes['removed'], changes['full'])
+
+    @event.listens_for(RoutingSession, 'after_rollback')
+    def _forget_after_rollback(session):
+        session.info.pop(_CHANGES_KEY, None)
+
+
+static_export = StaticExporter()
@@ -0,0 +1,144 @@
+"""
+Чтение значений ячеек XLSX средствами стандартной библиотеки (zipfile + ElementTree)
+
+Достаточно для табличных файлов вроде меню питания: читаются только значения
+(строки, числа, логические), без стилей, формул и объединений. openpyxl в
+зависимостях проекта нет, а для одного листа на несколько сотен строк он и не нужен.
+"""
+
+import io
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+
+_NS_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_NS_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_NS_PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+# Защита от zip-бомб: меню занимает десятки килобайт, лист в распакованном виде — до пары мегабайт
+MAX_PART_SIZE = 32 * 1024 * 1024
+
+_CELL_REF_RE = re.compile(r'^([A-Z]+)(\d+)$')
+
+
+class XlsxReadError(ValueError):
+    """Файл не является корректной книгой XLSX"""
+
+
+def _column_index(letters):
+    index = 0
+    for char in letters:
+        index = index * 26 + (ord(char) - ord('A') + 1)
+    return index - 1
+
+
+def _read_part(archive, name):
+    try:
+        info = archive.getinfo(name)
+    except KeyError:
+        return None
+    if info.file_size > MAX_PART_SIZE:
+        raise XlsxReadError(f'Слишком большой фрагмент книги: {name}')
+    return archive.read(info)
+
+
+def _shared_strings(archive):
+    data = _read_part(archive, 'xl/sharedStrings.xml')
+    if data is None:
+        return []
+    root = ET.fromstring(data)
+    # Строка может состоять из нескольких фрагментов с разным форматированием (<r><t>)
+    return [''.join(node.text or '' for node in si.iter(f'{_NS_MAIN}t')) for si in root.iter(f'{_NS_MAIN}si')]
+
+
+def _first_sheet_path(archive):
+    """Путь к первому листу книги (по workbook.xml и его связям)"""
+    workbook = _read_part(archive, 'xl/workbook.xml')
+    rels = _read_part(archive, 'xl/_rels/workbook.xml.rels')
+    if workbook is not None and rels is not None:
+        sheet = ET.fromstring(workbook).find(f'{_NS_MAIN}sheets/{_NS_MAIN}sheet')
+        if sheet is not None:
+            rel_id = sheet.get(f'{_NS_REL}id')
+            for rel in ET.fromstring(rels).iter(f'{_NS_PKG_REL}Relationship'):
+                if rel.get('Id') == rel_id:
+                    target = rel.get('Target', '')
+                    if target.startswith('/'):
+                        return target.lstrip('/')
+                    return posixpath.normpath(posixpath.join('xl', target))
+    return 'xl/worksheets/sheet1.xml'
+
+
+def _cell_value(cell, shared):
+    cell_type = cell.get('t', 'n')
+    if cell_type == 'inlineStr':
+        return ''.join(node.text or '' for node in cell.iter(f'{_NS_MAIN}t'))
+    value = cell.find(f'{_NS_MAIN}v')
+    if value is None or value.text is None:
+        return None
+    text = value.text
+    if cell_type == 's':
+        try:
+            return shared[int(text)]
+        except (ValueError, IndexError):
+            return None
+    if cell_type == 'b':
+        return text == '1'
+    if cell_type in ('str', 'e'):
+        return text
+    try:
+        number = float(text)
+    except ValueError:
+        return text
+    return int(number) if number.is_integer() else number
+
+
+def read_rows(source):
+    """
+    Значения первого листа книги.
+
+    Args:
+        source: bytes или файловый объект с содержимым .xlsx
+
+    Returns:
+        Список строк; каждая строка — список значений по колонкам (None для пустых ячеек).
+        Пустые строки листа сохраняются, чтобы номера строк совпадали с Excel.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    try:
+        archive = zipfile.ZipFile(source)
+    except zipfile.BadZipFile as e:
+        raise XlsxReadError('Файл не является книгой XLSX') from e
+
+    with archive:
+        try:
+            shared = _shared_strings(archive)
+            sheet_data = _read_part(archive, _first_sheet_path(archive))
+            if sheet_data is None:
+                raise XlsxReadError('В книге нет листов')
+            sheet = ET.fromstring(sheet_data)
+        except ET.ParseError as e:
+            raise XlsxReadError(f'Поврежденный XML в книге: {e}') from e
+
+    rows = []
+    for row in sheet.iter(f'{_NS_MAIN}row'):
+        try:
+            row_number = int(row.get('r'))
+        except (TypeError, ValueError):
+            row_number = len(rows) + 1
+        values = {}
+        next_column = 0
+        for cell in row.iter(f'{_NS_MAIN}c'):
+            match = _CELL_REF_RE.match(cell.get('r', ''))
+            column = _column_index(match.group(1)) if match else next_column
+            next_column = column + 1
+            value = _cell_value(cell, shared)
+            if value is not None and value != '':
+                values[column] = value
+        while len(rows) < row_number - 1:
+            rows.append([])
+        width = max(values) + 1 if values else 0
+        rows.append([values.get(column) for column in range(width)])
+    return rows
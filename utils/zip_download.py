@@ -0,0 +1,215 @@
+"""
+Архив «Скачать все»: ZIP с файлами раздела или новости/объявления
+
+Архив собирается на лету и сразу отправляется клиенту частями — без
+временного файла перед отправкой. Уже сжатые форматы (PDF, изображения,
+офисные документы OOXML/ODF, архивы) кладутся без сжатия (ZIP_STORED), остальные
+сжимаются deflate.
+
+Одновременно с отправкой архив пишется в instance/zip_cache/<ключ>.zip.
+Ключ включает версию раздела и отпечаток списка файлов (имена, размеры,
+время изменения), поэтому повторные запросы отдаются готовым файлом, а
+любое изменение раздела или его файлов дает новый ключ. Прежние архивы
+того же раздела удаляются после записи нового. Архив, в котором хотя бы один
+файл не прочитался, отправляется клиенту, но в кэш не кладется.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import time
+import urllib.parse
+import zipfile
+from collections import namedtuple
+
+from flask import Response, current_app, send_file, stream_with_context
+
+from utils.logger import logger
+
+
+ZIP_CACHE_DIR_NAME = 'zip_cache'
+CHUNK_SIZE = 256 * 1024
+
+# Форматы, которые deflate почти не уменьшает: только тратит CPU
+STORED_EXTENSIONS = {
+    '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic',
+    '.docx', '.xlsx', '.pptx', '.odt', '.ods', '.odp',
+    '.zip', '.rar', '.7z', '.gz', '.bz2', '.xz',
+    '.mp3', '.mp4', '.m4a', '.mov', '.avi', '.webm',
+}
+
+# Имя архива в кэше после префикса группы: [v<версия>-]<отпечаток>.zip
+_CACHE_NAME_RE = re.compile(r'^(v\d+-)?[0-9a-f]{16}\.zip$')
+
+# Файл архива: имя в архиве, путь на диске или id InfoFile (file_data в БД),
+# размер и метка для отпечатка (время изменения или content_hash)
+ZipEntry = namedtuple('ZipEntry', ['arcname', 'path', 'info_file_id', 'size', 'stamp'])
+
+
+def file_entry(arcname, path):
+    """Элемент архива для файла на диске (None, если файла нет)"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return ZipEntry(arcname, path, None, st.st_size, st.st_mtime_ns)
+
+
+def zip_response(entries, group, version, download_name):
+    """
+    Ответ с ZIP-архивом элементов entries.
+
+    Args:
+        entries: Список ZipEntry (имена в архиве делаются уникальными)
+        group: Префикс ключа кэша ('section-documents', 'news-12')
+        version: Версия содержимого (InfoSection.version или None)
+        download_name: Имя архива для браузера
+
+    Returns:
+        Готовый файл из кэша или потоковый ответ, который заполняет кэш
+    """
+    entries = _unique_arcnames(entries)
+    fingerprint = hashlib.sha256(repr(
+        [(e.arcname, e.size, e.stamp) for e in entries]
+    ).encode('utf-8')).hexdigest()[:16]
+    cache_key = f"{group}-v{version}-{fingerprint}" if version is not None else f"{group}-{fingerprint}"
+    cache_dir = os.path.join(current_app.instance_path, ZIP_CACHE_DIR_NAME)
+    cache_path = os.path.join(cache_dir, f'{cache_key}.zip')
+
+    if os.path.isfile(cache_path):
+        response = send_file(cache_path, mimetype='application/zip', as_attachment=True,
+                             download_name=download_name, conditional=True)
+        # URL архива не меняется при изменении раздела: браузер перепроверяет его по ETag
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    body = stream_with_context(_stream_zip(entries, cache_dir, cache_path, group))
+    response = Response(body, mimetype='application/zip')
+    encoded_name = urllib.parse.quote(download_name.encode('utf-8'))
+    response.headers['Content-Disposition'] = f"attachment; filename*=UTF-8''{encoded_name}"
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+class _StreamSink:
+    """Файлоподобный приемник для zipfile: копит записанные части для отправки и пишет их в кэш"""
+
+    def __init__(self, cache_file):
+        self._parts = []
+        self._cache_file = cache_file
+
+    def write(self, data):
+        data = bytes(data)
+        self._parts.append(data)
+        self._cache_file.write(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        parts, self._parts = self._parts, []
+        return parts
+
+
+def _stream_zip(entries, cache_dir, cache_path, group):
+    """Генератор частей архива; по завершении атомарно кладет архив в кэш"""
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.zip-', suffix='.part', dir=cache_dir)
+    cache_file = os.fdopen(fd, 'wb')
+    sink = _StreamSink(cache_file)
+    failed = []
+    completed = False
+    try:
+        # Приемник без seek/tell: zipfile пишет размеры в дескрипторы данных после каждого файла
+        with zipfile.ZipFile(sink, 'w', allowZip64=True) as zf:
+            for entry in entries:
+                info = zipfile.ZipInfo(entry.arcname, date_time=_zip_date_time(entry))
+                ext = os.path.splitext(entry.arcname)[1].lower()
+                info.compress_type = zipfile.ZIP_STORED if ext in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+                info.file_size = entry.size or 0
+                with zf.open(info, 'w') as dest:
+                    for chunk in _read_chunks(entry, failed):
+                        dest.write(chunk)
+                        yield from sink.drain()
+                yield from sink.drain()
+        yield from sink.drain()
+
+        if failed:
+            logger.warning(f"Архив {group} собран без {len(failed)} файлов и не сохранен в кэш: {failed}")
+            return
+        cache_file.close()
+        os.replace(tmp_path, cache_path)
+        completed = True
+        _remove_stale(cache_dir, group, cache_path)
+    finally:
+        if not completed:
+            # Клиент оборвал загрузку или файл не прочитался: неполный архив в кэш не попадает
+            cache_file.close()
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+
+def _read_chunks(entry, failed):
+    """Содержимое элемента архива частями; имена непрочитанных файлов добавляются в failed"""
+    if entry.path:
+        try:
+            with open(entry.path, 'rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    yield chunk
+        except OSError as e:
+            logger.warning(f"Файл для архива не прочитан {entry.path}: {e}")
+            failed.append(entry.arcname)
+        return
+
+    # Lazy import to avoid circular imports at module load time
+    from models.models import InfoFile
+
+    data = InfoFile.query.with_entities(InfoFile.file_data).filter_by(id=entry.info_file_id).scalar()
+    if data is None:
+        failed.append(entry.arcname)
+        return
+    for start in range(0, len(data or b''), CHUNK_SIZE):
+        yield data[start:start + CHUNK_SIZE]
+
+
+def _zip_date_time(entry):
+    """Дата файла в архиве: время изменения на диске (ZIP не хранит даты до 1980 года)"""
+    if entry.path and isinstance(entry.stamp, int):
+        return max(time.localtime(entry.stamp / 1e9)[:6], (1980, 1, 1, 0, 0, 0))
+    return time.localtime()[:6]
+
+
+def _unique_arcnames(entries):
+    """Одинаковые имена в архиве получают суффикс « (2)», « (3)»..."""
+    seen = set()
+    result = []
+    for entry in entries:
+        name = entry.arcname.replace('\\', '_').replace('/', '_').strip() or 'file'
+        base, ext = os.path.splitext(name)
+        candidate, counter = name, 2
+        while candidate.lower() in seen:
+            candidate = f'{base} ({counter}){ext}'
+            counter += 1
+        seen.add(candidate.lower())
+        result.append(entry._replace(arcname=candidate))
+    return result
+
+
+def _remove_stale(cache_dir, group, keep_path):
+    """Удаляет прежние архивы той же группы"""
+    prefix = f'{group}-'
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return
+    for name in names:
+        path = os.path.join(cache_dir, name)
+        if name.startswith(prefix) and _CACHE_NAME_RE.match(name[len(prefix):]) and path != keep_path:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass